@@ -30,6 +30,7 @@ export function ChatbotPopup({ isOpen, onClose }: ChatbotPopupProps) {
   const [inputMessage, setInputMessage] = useState("");
   const [isTyping, setIsTyping] = useState(false);
   const messagesEndRef = useRef<HTMLDivElement>(null);
+  const sessionIdRef = useRef<string | undefined>(undefined);
 
   const scrollToBottom = () => {
     messagesEndRef.current?.scrollIntoView({ behavior: "smooth" });
@@ -55,7 +56,11 @@ export function ChatbotPopup({ isOpen, onClose }: ChatbotPopupProps) {
     setIsTyping(true);
 
     try {
-      const response = await sendChatbotQuery(currentQuery);
+      const response = await sendChatbotQuery(
+        currentQuery,
+        sessionIdRef.current
+      );
+      sessionIdRef.current = response.session_id;
 
       const botMessage: Message = {
         id: (Date.now() + 1).toString(),
@@ -65,6 +70,23 @@ export function ChatbotPopup({ isOpen, onClose }: ChatbotPopupProps) {
         sources: response.sources,
       };
       setMessages((prev) => [...prev, botMessage]);
+
+      // Emergency instructions arrive first; fetch the full answer after them
+      if (response.full_answer_pending) {
+        const fullResponse = await sendChatbotQuery(
+          currentQuery,
+          sessionIdRef.current,
+          true
+        );
+        const fullMessage: Message = {
+          id: (Date.now() + 2).toString(),
+          text: fullResponse.answer,
+          sender: "bot",
+          timestamp: new Date(),
+          sources: fullResponse.sources,
+        };
+        setMessages((prev) => [...prev, fullMessage]);
+      }
     } catch (error) {
       const errorMessage: Message = {
         id: (Date.now() + 1).toString(),
@@ -7,13 +7,43 @@ const API_BASE_URL = process.env.NEXT_PUBLIC_CHATBOT_API_URL || 'http://localhos
 
 export interface ChatbotQueryRequest {
   query: string;
+  session_id?: string;
+  emergency?: boolean;
+  skip_fast_path?: boolean;
+  fields?: string[];
+  exclude?: string[];
+}
+
+export interface EmergencyInstructions {
+  intent: string;
+  title: string;
+  steps: string[];
+  answer: string;
+  call_emergency_services: boolean;
+  emergency_number: string;
 }
 
 export interface ChatbotQueryResponse {
-  query: string;
+  session_id: string;
+  query?: string;
   answer: string;
   sources: string[];
-  context_preview: string;
+  context_preview?: string;
+  emergency?: EmergencyInstructions;
+  full_answer_pending?: boolean;
+}
+
+/**
+ * Build a W3C traceparent header so backend spans join this request's trace
+ * @returns Header value and the trace ID, for correlating logs with traces
+ */
+export function createTraceparent(): { traceparent: string; traceId: string } {
+  const hex = (bytes: number) =>
+    Array.from(crypto.getRandomValues(new Uint8Array(bytes)), (b) =>
+      b.toString(16).padStart(2, '0')
+    ).join('');
+  const traceId = hex(16);
+  return { traceparent: `00-${traceId}-${hex(8)}-01`, traceId };
 }
 
 export interface ChatbotError {
@@ -24,16 +54,33 @@ export interface ChatbotError {
 /**
  * Send a query to the RAG chatbot backend
  * @param query - The user's question
+ * @param sessionId - Session ID from a previous response, for follow-up questions
+ * @param skipFastPath - Skip the emergency fast path and wait for the full answer
+ *   (the follow-up to an emergency response, so it is also sent as an emergency)
  * @returns The chatbot's response with answer and sources
  */
-export async function sendChatbotQuery(query: string): Promise<ChatbotQueryResponse> {
+export async function sendChatbotQuery(
+  query: string,
+  sessionId?: string,
+  skipFastPath = false
+): Promise<ChatbotQueryResponse> {
+  const { traceparent, traceId } = createTraceparent();
+
   try {
     const response = await fetch(`${API_BASE_URL}/query`, {
       method: 'POST',
       headers: {
         'Content-Type': 'application/json',
+        traceparent,
       },
-      body: JSON.stringify({ query }),
+      body: JSON.stringify({
+        query,
+        session_id: sessionId,
+        skip_fast_path: skipFastPath || undefined,
+        emergency: skipFastPath || undefined,
+        // The popup never shows these, so don't pay for them on mobile
+        exclude: ['query', 'context_preview'],
+      }),
     });
 
     if (!response.ok) {
@@ -45,9 +92,11 @@ export async function sendChatbotQuery(query: string): Promise<ChatbotQueryRespo
     return data;
   } catch (error) {
     if (error instanceof Error) {
-      throw new Error(`Failed to communicate with chatbot: ${error.message}`);
+      throw new Error(
+        `Failed to communicate with chatbot: ${error.message} (trace ${traceId})`
+      );
     }
-    throw new Error('Failed to communicate with chatbot: Unknown error');
+    throw new Error(`Failed to communicate with chatbot: Unknown error (trace ${traceId})`);
   }
 }
 
@@ -63,7 +112,9 @@ export async function checkChatbotHealth(): Promise<{
   chroma_mode?: string;
 }> {
   try {
-    const response = await fetch(`${API_BASE_URL}/health`);
+    const response = await fetch(`${API_BASE_URL}/health`, {
+      headers: { traceparent: createTraceparent().traceparent },
+    });
     
     if (!response.ok) {
       throw new Error(`HTTP error! status: ${response.status}`);
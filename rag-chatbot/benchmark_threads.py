@@ -0,0 +1,227 @@
+"""
+Thread Split Benchmark for RAG System
+Forks one process per gunicorn worker, sharing an embedding model loaded
+before the fork like the preloaded full profile, and has every worker embed
+queries back to back under each candidate split of intra-op threads, inter-op
+threads and CPU pinning. Reports per-query latency percentiles and total
+throughput for each split and the settings of the one with the lowest p99
+"""
+
+import os
+import sys
+import time
+import argparse
+import multiprocessing
+import numpy as np
+import logging
+
+# Add src to path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from src.utils.config import Config
+from src.utils.app_profiles import get_profile
+from src.utils.cpu_threads import (
+    apply_thread_settings,
+    available_cpus,
+    configure_thread_env,
+    slot_cpus,
+)
+
+# Configure logging
+logging.basicConfig(
+    level=logging.INFO, format="%(asctime)s - %(name)s - %(levelname)s - %(message)s"
+)
+logger = logging.getLogger(__name__)
+
+
+def load_queries(path: str):
+    """Read one query per line, skipping blanks"""
+    with open(path, encoding="utf-8") as f:
+        return [line.strip() for line in f if line.strip()]
+
+
+def candidate_splits(cores: int, workers: int, pinning: bool):
+    """
+    Splits worth measuring for this core count
+
+    Intra-op threads are powers of two below the core count, the even share
+    (cores / workers) and every core, the oversubscribed default the other
+    splits are compared against.
+    """
+    intra = {cores, max(1, cores // workers)}
+    threads = 1
+    while threads < cores:
+        intra.add(threads)
+        threads *= 2
+    pin_options = (False, True) if pinning else (False,)
+    return [
+        (intra_op, inter_op, pin)
+        for intra_op in sorted(intra)
+        for inter_op in (1, 2)
+        for pin in pin_options
+    ]
+
+
+def run_worker(
+    embeddings, queries, slot, workers, split, cpus, start, duration, results
+):
+    """Embed queries until the deadline and report per-query latencies"""
+    intra_op, inter_op, pin = split
+    applied = apply_thread_settings(
+        intra_op, inter_op, slot_cpus(slot, workers, cpus) if pin else None
+    )
+    # Warm up the thread pools outside the measurement
+    embeddings.embed_query(queries[slot % len(queries)])
+    start.wait()
+
+    latencies = []
+    deadline = time.perf_counter() + duration
+    i = slot
+    while time.perf_counter() < deadline:
+        began = time.perf_counter()
+        embeddings.embed_query(queries[i % len(queries)])
+        latencies.append(time.perf_counter() - began)
+        i += 1
+    results.put((applied, latencies))
+
+
+def measure_split(embeddings, queries, workers, split, cpus, duration):
+    """
+    Run every worker concurrently under one split
+
+    Returns:
+        Dict with p50/p95/p99 latency in ms, queries per second and the
+        settings that took effect in the workers
+    """
+    context = multiprocessing.get_context("fork")
+    start = context.Barrier(workers)
+    results = context.Queue()
+    processes = [
+        context.Process(
+            target=run_worker,
+            args=(
+                embeddings,
+                queries,
+                slot,
+                workers,
+                split,
+                cpus,
+                start,
+                duration,
+                results,
+            ),
+        )
+        for slot in range(workers)
+    ]
+    for process in processes:
+        process.start()
+    reports = [results.get() for _ in processes]
+    latencies = np.concatenate([latencies for _, latencies in reports]) * 1000
+    for process in processes:
+        process.join()
+
+    return {
+        "p50_ms": float(np.percentile(latencies, 50)),
+        "p95_ms": float(np.percentile(latencies, 95)),
+        "p99_ms": float(np.percentile(latencies, 99)),
+        "qps": len(latencies) / duration,
+        "applied": reports[0][0],
+    }
+
+
+def benchmark_threads(workers: int, cores: int, duration: float, queries_path: str):
+    """
+    Measure every candidate split and print the best settings
+
+    Args:
+        workers: Worker processes (gunicorn workers)
+        cores: CPUs to use (the first ones this process may run on)
+        duration: Seconds each split runs
+        queries_path: File of queries to embed (one per line)
+    """
+    cpus = available_cpus()[:cores]
+    cores = len(cpus)
+    try:
+        os.sched_setaffinity(0, cpus)
+        pinning = True
+    except AttributeError:
+        pinning = False
+
+    # Must happen before torch is imported, as in gunicorn.conf.py
+    configure_thread_env(max(1, cores // workers))
+    from src.embeddings.huggingface_embeddings import get_embeddings
+
+    queries = load_queries(queries_path)
+    embeddings = get_embeddings()
+
+    splits = candidate_splits(cores, workers, pinning)
+    logger.info(
+        f"Benchmarking {len(splits)} splits for {workers} workers on {cores} "
+        f"cores ({duration}s each)..."
+    )
+
+    rows = []
+    for split in splits:
+        stats = measure_split(embeddings, queries, workers, split, cpus, duration)
+        if stats["applied"].get("inter_op", split[1]) != split[1]:
+            # The inter-op pool was already running: this split is not real
+            logger.warning(f"Skipping {split}: inter-op threads could not be set")
+            continue
+        rows.append((split, stats))
+        logger.info(
+            f"intra={split[0]} inter={split[1]} pinned={split[2]}: "
+            f"p50 {stats['p50_ms']:.1f}ms, p99 {stats['p99_ms']:.1f}ms, "
+            f"{stats['qps']:.1f} q/s"
+        )
+
+    print()
+    print(
+        f"{'intra':>5} {'inter':>5} {'pinned':>6} "
+        f"{'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'q/s':>8}"
+    )
+    for (intra_op, inter_op, pin), stats in rows:
+        print(
+            f"{intra_op:>5} {inter_op:>5} {str(pin):>6} "
+            f"{stats['p50_ms']:>8.1f} {stats['p95_ms']:>8.1f} "
+            f"{stats['p99_ms']:>8.1f} {stats['qps']:>8.1f}"
+        )
+
+    # Lowest p99; throughput breaks near-ties (within 5%)
+    best_p99 = min(stats["p99_ms"] for _, stats in rows)
+    (intra_op, inter_op, pin), stats = max(
+        (row for row in rows if row[1]["p99_ms"] <= best_p99 * 1.05),
+        key=lambda row: row[1]["qps"],
+    )
+    print()
+    print(
+        f"Best split for {workers} workers on {cores} cores "
+        f"(p99 {stats['p99_ms']:.1f}ms, {stats['qps']:.1f} q/s):"
+    )
+    print(f"TORCH_INTRA_OP_THREADS={intra_op}")
+    print(f"TORCH_INTER_OP_THREADS={inter_op}")
+    print(f"CPU_PINNING={str(pin).lower()}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=get_profile().workers,
+        help="Worker processes (defaults to the APP_PROFILE's workers)",
+    )
+    parser.add_argument(
+        "--cores",
+        type=int,
+        default=len(available_cpus()),
+        help="CPUs to benchmark on (defaults to every available CPU)",
+    )
+    parser.add_argument("--duration", type=float, default=5.0, help="Seconds per split")
+    parser.add_argument(
+        "--queries",
+        default=Config.ANSWER_BANK_QUESTIONS,
+        help="File with one query per line",
+    )
+    args = parser.parse_args()
+
+    benchmark_threads(args.workers, args.cores, args.duration, args.queries)
@@ -0,0 +1,110 @@
+"""
+Answer Bank Script for RAG System
+Generates answers for the most frequent questions and stores them on disk
+"""
+
+import os
+import sys
+import argparse
+import logging
+
+# Add src to path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from src.utils.config import Config
+from src.embeddings.huggingface_embeddings import get_embeddings
+from src.vectorstore.chroma_store import ChromaStore
+from src.llm.groq_client import GroqClient
+from src.retriever.rag_retriever import RAGRetriever
+from src.retriever.answer_bank import AnswerBank
+
+# Configure logging
+logging.basicConfig(
+    level=logging.INFO, format="%(asctime)s - %(name)s - %(levelname)s - %(message)s"
+)
+logger = logging.getLogger(__name__)
+
+
+def load_questions(path: str = None, mine: int = 0):
+    """
+    Collect the question list
+
+    Args:
+        path: Curated file with one question per line (skipped if missing)
+        mine: Also take up to this many frequent questions from the
+            conversation store
+
+    Returns:
+        List of questions, curated ones first
+    """
+    questions = []
+    path = path or Config.ANSWER_BANK_QUESTIONS
+    if path and os.path.exists(path):
+        with open(path, encoding="utf-8") as f:
+            questions += [
+                line.strip() for line in f if line.strip() and not line.startswith("#")
+            ]
+        logger.info(f"Loaded {len(questions)} curated questions from {path}")
+
+    if mine:
+        from src.conversation.conversation_store import ConversationStore
+
+        mined = ConversationStore().frequent_questions(limit=mine)
+        logger.info(f"Mined {len(mined)} frequent questions from conversations")
+        questions += mined
+
+    return questions
+
+
+def build_answer_bank(questions_path: str = None, mine: int = 0, full: bool = False):
+    """
+    Build or refresh the answer bank
+
+    Args:
+        questions_path: Curated question file
+        mine: Number of frequent questions to mine from conversations
+        full: Regenerate every entry instead of only stale/missing ones
+    """
+    questions = load_questions(questions_path, mine)
+    if not questions:
+        logger.error(f"No questions found. Add some to {Config.ANSWER_BANK_QUESTIONS}.")
+        return
+
+    embeddings = get_embeddings()
+    vector_store = ChromaStore(embeddings=embeddings)
+    if vector_store.get_collection_count() == 0:
+        logger.error("Collection is empty. Run ingest_documents.py first.")
+        return
+
+    rag_retriever = RAGRetriever(vector_store=vector_store, llm_client=GroqClient())
+    bank = AnswerBank()
+
+    if full:
+        bank.build(rag_retriever, questions)
+        generated = len(bank)
+    else:
+        generated = bank.refresh(rag_retriever, questions)
+
+    logger.info("=" * 50)
+    logger.info(f"✓ Generated {generated} answers")
+    logger.info(f"✓ Answer bank: {len(bank)} entries at {Config.ANSWER_BANK_PATH}")
+    logger.info("=" * 50)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        "--questions", help="File with one question per line (default from .env)"
+    )
+    parser.add_argument(
+        "--mine",
+        type=int,
+        default=0,
+        help="Add up to N frequent questions from the conversation store",
+    )
+    parser.add_argument(
+        "--full", action="store_true", help="Regenerate every answer from scratch"
+    )
+    args = parser.parse_args()
+
+    build_answer_bank(args.questions, args.mine, args.full)
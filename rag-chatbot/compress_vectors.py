@@ -0,0 +1,85 @@
+"""
+Vector Compression Script for RAG System
+Builds the compressed embedding index and reports recall against float32
+"""
+
+import os
+import sys
+import argparse
+import logging
+
+# Add src to path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from src.utils.config import Config
+from src.embeddings.huggingface_embeddings import get_embeddings
+from src.vectorstore.chroma_store import ChromaStore
+from src.vectorstore.compressed_index import COMPRESSION_MODES
+
+# Configure logging
+logging.basicConfig(
+    level=logging.INFO, format="%(asctime)s - %(name)s - %(levelname)s - %(message)s"
+)
+logger = logging.getLogger(__name__)
+
+
+def load_queries(path: str):
+    """Read one query per line, skipping blanks"""
+    with open(path, encoding="utf-8") as f:
+        return [line.strip() for line in f if line.strip()]
+
+
+def compress_vectors(mode: str, queries_path: str = None, k: int = 10):
+    """
+    Build the compressed index and print a recall report
+
+    Args:
+        mode: Compression mode
+        queries_path: Optional file of evaluation queries (one per line)
+        k: Cut-off for recall@k
+    """
+    embeddings = get_embeddings()
+    vector_store = ChromaStore(embeddings=embeddings)
+
+    index, exact = vector_store.build_compressed_index(mode=mode)
+
+    if not len(index):
+        logger.error("Collection is empty. Run ingest_documents.py first.")
+        return
+
+    if queries_path:
+        query_embeddings = embeddings.embed_documents(load_queries(queries_path))
+    else:
+        # Without real queries, use stored chunks as stand-in queries
+        query_embeddings = exact[:100]
+
+    report = index.recall_report(exact, query_embeddings, k=k)
+
+    logger.info("=" * 50)
+    logger.info(f"Mode: {report['mode']} ({report['vectors']} vectors)")
+    logger.info(
+        f"Size: {report['uncompressed_bytes']} -> {report['compressed_bytes']} bytes "
+        f"({report['bytes_saved']} saved)"
+    )
+    logger.info(f"Recall@{k} (approximate): {report['recall_approximate']:.3f}")
+    logger.info(f"Recall@{k} (re-scored):   {report['recall_rescored']:.3f}")
+    logger.info(f"✓ Index saved to {Config.COMPRESSED_INDEX_PATH}")
+    logger.info("=" * 50)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        "--mode",
+        choices=COMPRESSION_MODES,
+        default=(
+            Config.VECTOR_COMPRESSION
+            if Config.VECTOR_COMPRESSION in COMPRESSION_MODES
+            else "float16"
+        ),
+    )
+    parser.add_argument("--queries", help="File with one evaluation query per line")
+    parser.add_argument("--k", type=int, default=10)
+    args = parser.parse_args()
+
+    compress_vectors(args.mode, args.queries, args.k)
@@ -0,0 +1,307 @@
+"""
+Retrieval Evaluation Script for RAG System
+Sweeps chunking, embedding model, k, threshold, retrieval mode and vector
+compression over a labelled question set, reports recall@k, hit rate, MRR
+and latency for each configuration, and picks the fastest configuration
+that meets a recall floor
+"""
+
+import os
+import sys
+import csv
+import json
+import time
+import uuid
+import shutil
+import argparse
+import tempfile
+import itertools
+from contextlib import contextmanager
+import logging
+
+# Add src to path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from src.utils.config import Config
+from src.embeddings.huggingface_embeddings import get_embeddings
+from src.vectorstore.chroma_store import ChromaStore
+from src.vectorstore.compressed_index import COMPRESSION_MODES
+from src.evaluation.retrieval_metrics import (
+    load_dataset,
+    relevant_chunk_count,
+    score_results,
+    select_fastest,
+    summarize,
+)
+from ingest_documents import load_documents, split_documents
+
+# Configure logging
+logging.basicConfig(
+    level=logging.INFO, format="%(asctime)s - %(name)s - %(levelname)s - %(message)s"
+)
+logger = logging.getLogger(__name__)
+
+RETRIEVAL_MODES = ("fixed", "adaptive")
+BACKENDS = ("local", "cloud")
+
+
+@contextmanager
+def override_config(**values):
+    """Temporarily set Config attributes (read at call time by the stores)"""
+    previous = {name: getattr(Config, name) for name in values}
+    for name, value in values.items():
+        setattr(Config, name, value)
+    try:
+        yield
+    finally:
+        for name, value in previous.items():
+            setattr(Config, name, value)
+
+
+@contextmanager
+def evaluation_store(embeddings, chunks, backend: str):
+    """
+    Ingest chunks into a throwaway collection
+
+    Local runs use a temporary ChromaDB directory even when cloud credentials
+    are configured; cloud runs use a uniquely named collection that is
+    deleted afterwards.
+    """
+    tmp_dir = tempfile.mkdtemp(prefix="rag-eval-")
+    overrides = {
+        # Never restore or reuse the production snapshot / compressed index
+        "VECTOR_SNAPSHOT_PATH": "",
+        "VECTOR_COMPRESSION": "none",
+        "COMPRESSED_INDEX_PATH": os.path.join(tmp_dir, "compressed_index.npz"),
+        # Every chunk must be stored for the relevance labels to hold
+        "DEDUP_MODE": "off",
+        "TOMBSTONE_DB_PATH": os.path.join(tmp_dir, "tombstones.sqlite3"),
+    }
+    if backend == "local":
+        overrides.update(CHROMA_DB_PATH=tmp_dir, CHROMA_CLOUD_TENANT="")
+    elif not Config.is_cloud_mode():
+        raise ValueError("Cloud backend requested but ChromaDB Cloud is not configured")
+
+    vector_store = None
+    try:
+        with override_config(**overrides):
+            vector_store = ChromaStore(
+                embeddings=embeddings, collection_name=f"eval_{uuid.uuid4().hex[:12]}"
+            )
+            vector_store.add_documents(chunks)
+        yield vector_store
+    finally:
+        if vector_store is not None and backend == "cloud":
+            try:
+                vector_store.delete_collection()
+            except Exception as e:
+                logger.warning(f"Could not delete evaluation collection: {str(e)}")
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+
+
+def run_configuration(
+    vector_store, dataset, query_embeddings, embed_ms, relevant, config
+):
+    """
+    Answer every labelled question with one retrieval configuration
+
+    Args:
+        vector_store: ChromaStore holding the evaluation collection
+        dataset: Labelled questions
+        query_embeddings: Precomputed embedding per question
+        embed_ms: Embedding latency per question
+        relevant: Relevant chunk count per question
+        config: Dict with "k", "threshold", "mode" and "compression"
+
+    Returns:
+        Metrics dict from summarize()
+    """
+    overrides = {
+        "SIMILARITY_THRESHOLD": config["threshold"],
+        "VECTOR_COMPRESSION": config["compression"],
+    }
+    with override_config(**overrides):
+        if config["compression"] != "none":
+            vector_store.build_compressed_index(config["compression"], save=False)
+
+        scores, latencies, search_latencies = [], [], []
+        for item, embedding, embed_latency, total_relevant in zip(
+            dataset, query_embeddings, embed_ms, relevant
+        ):
+            start = time.perf_counter()
+            if config["mode"] == "adaptive":
+                results = vector_store.adaptive_similarity_search(
+                    item["question"], k=config["k"], embedding=embedding
+                )
+            else:
+                results = vector_store.similarity_search_with_score(
+                    item["question"], k=config["k"], embedding=embedding
+                )
+            search_latency = (time.perf_counter() - start) * 1000
+
+            scores.append(
+                score_results([doc for doc, _ in results], item, total_relevant)
+            )
+            search_latencies.append(search_latency)
+            latencies.append(embed_latency + search_latency)
+
+    metrics = summarize(scores, latencies)
+    metrics["search_p95_ms"] = summarize(scores, search_latencies)["latency_p95_ms"]
+    return metrics
+
+
+def evaluate_retrieval(args):
+    """Run the parameter sweep and write the report"""
+    dataset = load_dataset(args.dataset, Config.DOCUMENTS_PATH)
+    documents = load_documents(Config.DOCUMENTS_PATH)
+    if not dataset or not documents:
+        logger.error("Nothing to evaluate (empty dataset or no documents)")
+        return []
+
+    retrieval_grid = list(
+        itertools.product(args.k, args.thresholds, args.modes, args.compression)
+    )
+    logger.info(
+        f"Sweeping {len(args.models)} models x "
+        f"{len(args.chunk_sizes) * len(args.overlaps)} chunkings x "
+        f"{len(retrieval_grid)} retrieval settings on {len(dataset)} questions"
+    )
+
+    results = []
+    for model in args.models:
+        embeddings = get_embeddings(model)
+        questions = [item["question"] for item in dataset]
+        embeddings.embed_query(questions[0])  # Warm up before timing
+
+        query_embeddings, embed_ms = [], []
+        for question in questions:
+            start = time.perf_counter()
+            query_embeddings.append(embeddings.embed_query(question))
+            embed_ms.append((time.perf_counter() - start) * 1000)
+
+        for chunk_size, overlap in itertools.product(args.chunk_sizes, args.overlaps):
+            if overlap >= chunk_size:
+                continue
+            chunks = split_documents(documents, chunk_size, overlap)
+            relevant = [relevant_chunk_count(chunks, item) for item in dataset]
+
+            # Search logs are per query, keep them out of the sweep output
+            search_logger = logging.getLogger("src")
+            search_logger.setLevel(logging.INFO if args.verbose else logging.WARNING)
+
+            with evaluation_store(embeddings, chunks, args.backend) as vector_store:
+                for k, threshold, mode, compression in retrieval_grid:
+                    config = {
+                        "model": model,
+                        "backend": args.backend,
+                        "chunk_size": chunk_size,
+                        "chunk_overlap": overlap,
+                        "chunks": len(chunks),
+                        "k": k,
+                        "threshold": threshold,
+                        "mode": mode,
+                        "compression": compression,
+                    }
+                    metrics = run_configuration(
+                        vector_store,
+                        dataset,
+                        query_embeddings,
+                        embed_ms,
+                        relevant,
+                        config,
+                    )
+                    results.append({**config, **metrics})
+                    logger.info(
+                        f"chunk={chunk_size}/{overlap} k={k} thr={threshold} "
+                        f"{mode}/{compression}: recall={metrics['recall']:.3f} "
+                        f"mrr={metrics['mrr']:.3f} p95={metrics['latency_p95_ms']:.1f}ms"
+                    )
+
+            search_logger.setLevel(logging.NOTSET)
+
+    write_report(results, args.output)
+
+    best = select_fastest(results, args.recall_floor)
+    logger.info("=" * 50)
+    if best is None:
+        logger.warning(f"No configuration reaches recall {args.recall_floor}")
+    else:
+        logger.info(f"✓ Fastest configuration with recall >= {args.recall_floor}:")
+        for key in (
+            "model",
+            "chunk_size",
+            "chunk_overlap",
+            "k",
+            "threshold",
+            "mode",
+            "compression",
+        ):
+            logger.info(f"  {key}: {best[key]}")
+        logger.info(
+            f"  recall={best['recall']:.3f} hit_rate={best['hit_rate']:.3f} "
+            f"mrr={best['mrr']:.3f} p50={best['latency_p50_ms']:.1f}ms "
+            f"p95={best['latency_p95_ms']:.1f}ms"
+        )
+    logger.info("=" * 50)
+    return results
+
+
+def write_report(results, output: str):
+    """Write results as JSON or CSV (picked by the file extension)"""
+    if not output or not results:
+        return
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    if output.endswith(".csv"):
+        with open(output, "w", newline="", encoding="utf-8") as f:
+            writer = csv.DictWriter(f, fieldnames=list(results[0]))
+            writer.writeheader()
+            writer.writerows(results)
+    else:
+        with open(output, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+    logger.info(f"✓ Report written to {output}")
+
+
+def _list(cast, choices=None):
+    """argparse type for comma-separated lists"""
+
+    def parse(value):
+        items = [cast(part.strip()) for part in value.split(",") if part.strip()]
+        if choices is not None:
+            unknown = [item for item in items if item not in choices]
+            if unknown:
+                raise argparse.ArgumentTypeError(
+                    f"invalid choice(s) {unknown}, expected {list(choices)}"
+                )
+        return items
+
+    return parse
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--dataset", default="./data/eval/retrieval_questions.jsonl")
+    parser.add_argument("--models", type=_list(str), default=[Config.EMBEDDING_MODEL])
+    parser.add_argument("--chunk-sizes", type=_list(int), default=[Config.CHUNK_SIZE])
+    parser.add_argument("--overlaps", type=_list(int), default=[Config.CHUNK_OVERLAP])
+    parser.add_argument("--k", type=_list(int), default=[Config.RETRIEVAL_K])
+    parser.add_argument(
+        "--thresholds", type=_list(float), default=[Config.SIMILARITY_THRESHOLD]
+    )
+    parser.add_argument(
+        "--modes", type=_list(str, RETRIEVAL_MODES), default=list(RETRIEVAL_MODES)
+    )
+    parser.add_argument(
+        "--compression",
+        type=_list(str, ("none",) + COMPRESSION_MODES),
+        default=["none"],
+    )
+    parser.add_argument("--backend", choices=BACKENDS, default="local")
+    parser.add_argument("--recall-floor", type=float, default=0.8)
+    parser.add_argument(
+        "--output", default="./data/eval/results.json", help=".json or .csv report"
+    )
+    parser.add_argument("--verbose", action="store_true")
+    args = parser.parse_args()
+
+    evaluate_retrieval(args)
@@ -1,33 +1,84 @@
-# Gunicorn configuration for Render deployment
+# Gunicorn configuration for every deployment profile (APP_PROFILE=full, lite
+# or minimal); worker settings come from src/utils/app_profiles.py
 import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from src.utils.app_profiles import get_profile
+from src.utils.cpu_threads import configure_thread_env, threads_per_worker
+
+profile = get_profile()
 
 # Server socket
 bind = f"0.0.0.0:{os.environ.get('PORT', 5000)}"
-backlog = 2048
+backlog = profile.backlog
 
 # Worker processes
-workers = int(os.environ.get("WEB_CONCURRENCY", 4))
-worker_class = "sync"
+workers = profile.workers
+worker_class = profile.worker_class
 worker_connections = 1000
-timeout = 30
-keepalive = 60
+timeout = profile.timeout
+keepalive = profile.keepalive
+if profile.worker_tmp_dir:
+    worker_tmp_dir = profile.worker_tmp_dir
+
+# Split the cores between workers before torch is loaded by the preload;
+# post_fork then sets each worker's torch threads and optional CPU pinning
+configure_thread_env(threads_per_worker(workers))
 
-# Restart workers after this many requests, to help control memory usage
-max_requests = 1000
-max_requests_jitter = 50
+# Workers are recycled by the memory governor when their private memory
+# exceeds MEMORY_RSS_BUDGET_MB (see hooks below), not after a fixed request count
 
 # Logging
 accesslog = "-"
 errorlog = "-"
-loglevel = "info"
+loglevel = profile.log_level
 access_log_format = '%(h)s %(l)s %(u)s %(t)s "%(r)s" %(s)s %(b)s "%(f)s" "%(a)s" %(D)s'
 
 # Process naming
-proc_name = "rag-chatbot"
+proc_name = f"rag-chatbot-{profile.name}"
 
-# Server mechanics
-preload_app = True
+# Server mechanics: the full profile builds its components before the fork
+# so every worker shares them
+preload_app = profile.preload_app
 enable_stdio_inheritance = True
 
 # Application
 module = "src.app:app"
+
+
+# Worker hooks: CPU threads and the memory governor (which replaces blind
+# max_requests recycling)
+def when_ready(server):
+    from src.utils.memory_governor import get_governor
+
+    # Preloaded objects go to the permanent generation before workers fork
+    get_governor().freeze()
+
+
+def pre_fork(server, worker):
+    from src.utils.cpu_threads import free_slot
+
+    # Runs in the master: a replacement worker takes over the slot (and CPU
+    # block) of the worker it replaces
+    worker.cpu_slot = free_slot(
+        (getattr(w, "cpu_slot", None) for w in server.WORKERS.values()),
+        server.num_workers,
+    )
+
+
+def post_fork(server, worker):
+    from src.utils.cpu_threads import configure_worker
+    from src.utils.memory_governor import get_governor
+
+    configure_worker(worker.cpu_slot, server.num_workers)
+    get_governor().start_worker()
+
+
+def post_request(worker, req, environ, resp):
+    from src.utils.memory_governor import get_governor
+
+    # Finish this request, then exit; the master spawns a fresh worker
+    if get_governor().after_request():
+        worker.alive = False
@@ -3,8 +3,12 @@ Document Ingestion Script for RAG System
 Loads documents from the data/documents folder and adds them to ChromaDB
 """
 
+import argparse
+import hashlib
+import json
 import os
 import sys
+import time
 from pathlib import Path
 from langchain_community.document_loaders import DirectoryLoader, TextLoader
 from langchain.text_splitter import RecursiveCharacterTextSplitter
@@ -17,6 +21,10 @@ sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 from src.utils.config import Config
 from src.embeddings.huggingface_embeddings import get_embeddings
 from src.vectorstore.chroma_store import ChromaStore
+from src.vectorstore.ingest_log import IngestLog
+from src.vectorstore.parent_store import split_with_parents
+from src.retriever.answer_bank import AnswerBank
+from src.utils.file_watcher import create_watcher, debounced_changes
 
 # Configure logging
 logging.basicConfig(
@@ -24,6 +32,8 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+DOCUMENT_SUFFIXES = (".md", ".txt")
+
 
 def load_documents(documents_path: str):
     """
@@ -88,7 +98,8 @@ def split_documents(documents: list, chunk_size: int = None, chunk_overlap: int
         List of chunked Document objects
     """
     chunk_size = chunk_size or Config.CHUNK_SIZE
-    chunk_overlap = chunk_overlap or Config.CHUNK_OVERLAP
+    if chunk_overlap is None:
+        chunk_overlap = Config.CHUNK_OVERLAP
 
     logger.info(
         f"Splitting documents (chunk_size={chunk_size}, overlap={chunk_overlap})..."
@@ -108,6 +119,173 @@ def split_documents(documents: list, chunk_size: int = None, chunk_overlap: int
     return chunks
 
 
+def refresh_answer_bank(vector_store: ChromaStore):
+    """Regenerate answer bank entries whose source chunks changed"""
+    from src.llm.groq_client import GroqClient
+    from src.retriever.rag_retriever import RAGRetriever
+
+    try:
+        logger.info("Refreshing answer bank...")
+        rag_retriever = RAGRetriever(vector_store=vector_store, llm_client=GroqClient())
+        regenerated = AnswerBank().refresh(rag_retriever)
+        logger.info(f"✓ Regenerated {regenerated} banked answers")
+    except Exception as e:
+        # The ingest itself succeeded; build_answer_bank.py can be re-run
+        logger.warning(f"Could not refresh answer bank: {str(e)}")
+
+
+def file_digest(path: str) -> str:
+    """sha1 of a file's bytes"""
+    with open(path, "rb") as f:
+        return hashlib.sha1(f.read()).hexdigest()
+
+
+def load_manifest() -> dict:
+    """Digest of every ingested file, keyed by source"""
+    try:
+        with open(Config.INGEST_MANIFEST_PATH) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def save_manifest(manifest: dict):
+    """Write the manifest atomically, so a crash never leaves half a file"""
+    Path(Config.INGEST_MANIFEST_PATH).parent.mkdir(parents=True, exist_ok=True)
+    temporary = f"{Config.INGEST_MANIFEST_PATH}.tmp"
+    with open(temporary, "w") as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+    os.replace(temporary, Config.INGEST_MANIFEST_PATH)
+
+
+def document_sources(documents_path: str) -> list:
+    """Source names of the files on disk, as DirectoryLoader reports them"""
+    return sorted(
+        str(path)
+        for path in Path(documents_path).rglob("*")
+        if path.suffix in DOCUMENT_SUFFIXES and path.is_file()
+    )
+
+
+def ingest_changes(vector_store: ChromaStore, paths, manifest: dict) -> dict:
+    """
+    Re-ingest changed files and delete removed ones
+
+    Each changed file is loaded, split and swapped in with replace_documents(),
+    so only its own chunks are embedded; files whose content digest matches the
+    manifest (a touch, or an editor rewriting the same bytes) are skipped.
+
+    Args:
+        vector_store: Store to update
+        paths: Paths reported by the watcher; a path ending in os.sep is a
+            removed directory
+        manifest: Digest per source, updated in place
+
+    Returns:
+        Dict with counts of files updated, files deleted and chunks added
+    """
+    stats = {"updated": 0, "deleted": 0, "chunks_added": 0}
+    sources = set()
+    for path in paths:
+        if path.endswith(os.sep):
+            prefix = str(Path(path)) + os.sep
+            sources.update(s for s in manifest if s.startswith(prefix))
+        else:
+            sources.add(str(Path(path)))
+
+    for source in sorted(sources):
+        try:
+            if not os.path.isfile(source):
+                if manifest.pop(source, None) is not None:
+                    vector_store.delete_documents(source=source)
+                    stats["deleted"] += 1
+                continue
+
+            digest = file_digest(source)
+            if manifest.get(source) == digest:
+                continue
+
+            documents = TextLoader(source).load()
+            parents = None
+            if Config.PARENT_RETRIEVAL:
+                parents, chunks = split_with_parents(documents)
+            else:
+                chunks = split_documents(documents)
+
+            if chunks:
+                added_ids, _ = vector_store.replace_documents(source, chunks, parents)
+                stats["chunks_added"] += len(added_ids)
+            else:
+                vector_store.delete_documents(source=source)
+            manifest[source] = digest
+            stats["updated"] += 1
+
+        except Exception as e:
+            # Leave the manifest entry alone so the next change retries it
+            logger.error(f"Could not ingest {source}: {str(e)}")
+
+    return stats
+
+
+def watch_documents(debounce: float = None, poll_interval: float = None, polling=False):
+    """
+    Keep the vector store in sync with the documents folder
+
+    Files that changed since the last run are ingested first; after that each
+    debounced batch of changes is re-chunked, embedded and upserted as it
+    happens, so edits are searchable within seconds without a full re-ingest
+    or a server restart.
+
+    Args:
+        debounce: Seconds without changes before a batch is ingested
+            (defaults to Config.INGEST_WATCH_DEBOUNCE)
+        poll_interval: Scan interval when inotify is unavailable
+            (defaults to Config.INGEST_POLL_INTERVAL)
+        polling: Poll even where inotify is available
+    """
+    debounce = debounce or Config.INGEST_WATCH_DEBOUNCE
+    poll_interval = poll_interval or Config.INGEST_POLL_INTERVAL
+    documents_path = Config.DOCUMENTS_PATH
+    Path(documents_path).mkdir(parents=True, exist_ok=True)
+
+    embeddings = get_embeddings()
+    vector_store = ChromaStore(embeddings=embeddings)
+    manifest = load_manifest()
+
+    # Watch before the catch-up pass, so nothing changes unnoticed in between
+    watcher = create_watcher(documents_path, DOCUMENT_SUFFIXES, poll_interval, polling)
+    pending = set(document_sources(documents_path)) | set(manifest)
+    logger.info(f"Checking {len(pending)} files against the ingest manifest...")
+
+    try:
+        batches = debounced_changes(watcher, debounce)
+        while True:
+            started = time.perf_counter()
+            stats = ingest_changes(vector_store, pending, manifest)
+            if stats["updated"] or stats["deleted"]:
+                save_manifest(manifest)
+
+                # Running workers reload the saved compressed index
+                vector_store.refresh_compressed_index()
+                if Config.ANSWER_BANK_ENABLED and os.path.exists(
+                    Config.ANSWER_BANK_PATH
+                ):
+                    refresh_answer_bank(vector_store)
+
+                logger.info(
+                    f"✓ Synced {stats['updated']} changed and {stats['deleted']} "
+                    f"removed files ({stats['chunks_added']} chunks added) "
+                    f"in {time.perf_counter() - started:.2f}s"
+                )
+            vector_store.maybe_compact()
+            pending = next(batches)
+
+    except KeyboardInterrupt:
+        logger.info("Stopped watching")
+    finally:
+        watcher.close()
+
+
 def ingest_documents():
     """Main function to ingest documents into ChromaDB"""
     try:
@@ -130,19 +308,57 @@ def ingest_documents():
             )
             return
 
-        # Split documents into chunks
-        chunks = split_documents(documents)
+        # Split documents into chunks (and parent sections for parent retrieval)
+        parents = None
+        if Config.PARENT_RETRIEVAL:
+            parents, chunks = split_with_parents(documents)
+        else:
+            chunks = split_documents(documents)
 
-        # Add documents to vector store
+        # Add documents to vector store, resuming an interrupted run if any
         logger.info("Adding documents to vector store...")
-        vector_store.add_documents(chunks)
+        log = IngestLog()
+        added_ids = vector_store.add_documents(chunks, parents=parents, log=log)
+        duplicates = len(chunks) - len(added_ids)
+
+        # Remove deleted chunks so they are not counted or exported
+        vector_store.compact()
+
+        # Record what was ingested, so watch mode only re-ingests later changes
+        save_manifest(
+            {
+                source: file_digest(source)
+                for source in {doc.metadata.get("source") for doc in documents}
+                if source and os.path.isfile(source)
+            }
+        )
+
+        # Every batch is stored, the next run starts from scratch
+        log.clear()
+
+        # Save the compressed index so running workers serve the new chunks
+        vector_store.refresh_compressed_index()
 
         # Get final count
         final_count = vector_store.get_collection_count()
 
+        # Export a snapshot so fresh instances can restore instead of re-ingesting
+        if Config.VECTOR_SNAPSHOT_PATH:
+            logger.info("Exporting vector snapshot...")
+            vector_store.export_snapshot(Config.VECTOR_SNAPSHOT_PATH)
+
+        # Regenerate banked answers built from re-ingested sources
+        if Config.ANSWER_BANK_ENABLED and os.path.exists(Config.ANSWER_BANK_PATH):
+            refresh_answer_bank(vector_store)
+
         logger.info("=" * 50)
         logger.info("✓ Document ingestion completed successfully!")
         logger.info(f"✓ Total documents in collection: {final_count}")
+        if vector_store.duplicate_index is not None:
+            logger.info(
+                f"✓ Near-duplicates skipped: {duplicates}/{len(chunks)} "
+                f"(dedup ratio {duplicates / len(chunks):.1%})"
+            )
         logger.info("=" * 50)
 
     except Exception as e:
@@ -151,4 +367,32 @@ def ingest_documents():
 
 
 if __name__ == "__main__":
-    ingest_documents()
+    parser = argparse.ArgumentParser(description="Ingest documents into ChromaDB")
+    parser.add_argument(
+        "--watch",
+        action="store_true",
+        help="Keep running and ingest files as they change",
+    )
+    parser.add_argument(
+        "--debounce",
+        type=float,
+        default=None,
+        help="Seconds without changes before a batch is ingested",
+    )
+    parser.add_argument(
+        "--poll-interval",
+        type=float,
+        default=None,
+        help="Scan interval when inotify is unavailable",
+    )
+    parser.add_argument(
+        "--polling",
+        action="store_true",
+        help="Poll for changes even where inotify is available",
+    )
+    args = parser.parse_args()
+
+    if args.watch:
+        watch_documents(args.debounce, args.poll_interval, args.polling)
+    else:
+        ingest_documents()
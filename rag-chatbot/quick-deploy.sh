@@ -22,7 +22,7 @@ echo "✅ Deploy initiated!"
 echo ""
 echo "🔧 Don't forget to update Render settings:"
 echo "   Build Command: ./build-minimal.sh"
-echo "   Start Command: gunicorn -w 1 -b 0.0.0.0:\$PORT --timeout 60 src.app-minimal:app"
+echo "   Start Command: APP_PROFILE=minimal gunicorn -c gunicorn.conf.py src.app:app"
 echo ""
 echo "🔑 Environment Variables needed:"
 echo "   GROQ_API_KEY=your_actual_api_key"
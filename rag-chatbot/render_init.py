@@ -33,8 +33,10 @@ def initialize_for_render():
         embeddings = get_embeddings()
         logger.info("✅ Embeddings initialized successfully")
 
-        # Initialize vector store
+        # Initialize vector store (restores VECTOR_SNAPSHOT_PATH into an empty local collection)
         logger.info("🗄️  Initializing vector store...")
+        if Config.VECTOR_SNAPSHOT_PATH:
+            logger.info(f"💾 Using vector snapshot: {Config.VECTOR_SNAPSHOT_PATH}")
         vector_store = ChromaStore(embeddings=embeddings)
 
         # Check if documents exist
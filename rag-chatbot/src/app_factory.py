@@ -0,0 +1,729 @@
+"""
+Application factory shared by every deployment
+create_app(profile) builds the Flask app for the full, lite or minimal
+profile (see src/utils/app_profiles.py): the profile picks the embedding
+backend, whether a vector store is used, eager or lazy initialization and
+which caches are enabled, while the handlers are the same code for all.
+Heavy modules are imported only by the components a profile builds.
+"""
+
+import threading
+from flask import Flask, Response, request, jsonify, stream_with_context
+from flask_cors import CORS
+from src.conversation.conversation_store import ConversationStore
+from src.llm.scheduler import (
+    LLMOverloadedError,
+    PRIORITY_EMERGENCY,
+    PRIORITY_NORMAL,
+    get_scheduler,
+)
+from src.utils.admission import (
+    AdmissionRejected,
+    client_id,
+    get_admission,
+    request_queue_time,
+)
+from src.utils.app_profiles import AppProfile, get_profile
+from src.utils.config import Config
+from src.utils.health import HealthMonitor, init_health
+from src.utils.memory_governor import get_governor
+from src.utils.profiling import init_profiling, is_admin
+from src.utils.tracing import init_tracing
+from src.utils.responses import (
+    FastJSONProvider,
+    apply_field_mask,
+    init_compression,
+    requested_field_mask,
+)
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class Components:
+    """RAG components for one profile, built eagerly or on first use"""
+
+    NAMES = (
+        "embeddings",
+        "vector_store",
+        "llm_client",
+        "rag_retriever",
+        "conversation_store",
+        "emergency_detector",
+        "answer_bank",
+        "groq_client",
+    )
+
+    def __init__(self, profile: AppProfile):
+        self.profile = profile
+        self._built = {}
+        self._lock = threading.RLock()
+
+    def __getattr__(self, name):
+        if name not in Components.NAMES:
+            raise AttributeError(name)
+        return self.get(name)
+
+    def get(self, name: str):
+        """Return a component, building it (and its dependencies) if needed"""
+        if name in self._built:
+            return self._built[name]
+        with self._lock:
+            if name not in self._built:
+                self._built[name] = getattr(self, f"_build_{name}")()
+                if not self.profile.eager_init and self.warmed_up():
+                    # Keep the lazily loaded objects out of future GC passes;
+                    # runs once, when the last component has been built
+                    get_governor().freeze()
+        return self._built[name]
+
+    def warmed_up(self) -> bool:
+        """Whether every component the profile uses has been built"""
+        return all(name in self._built for name in self.profile_components())
+
+    def loaded(self, name: str):
+        """The component if it has been built, else None (never builds it)"""
+        return self._built.get(name)
+
+    def profile_components(self) -> list:
+        """Names of the components the profile uses, in build order"""
+        if self.profile.vector_store:
+            names = [
+                "embeddings",
+                "vector_store",
+                "llm_client",
+                "rag_retriever",
+                "conversation_store",
+                "answer_bank",
+            ]
+        else:
+            names = ["groq_client"]
+        return names + ["emergency_detector"]
+
+    def load_all(self):
+        """Build every component the profile uses"""
+        for name in self.profile_components():
+            self.get(name)
+
+    def _build_embeddings(self):
+        if self.profile.embeddings == "lightweight":
+            from src.embeddings.lightweight_embeddings import (
+                get_lightweight_embeddings,
+            )
+
+            return get_lightweight_embeddings()
+        if self.profile.embeddings == "huggingface":
+            from src.embeddings.huggingface_embeddings import get_embeddings
+
+            return get_embeddings()
+        raise ValueError(f"Profile {self.profile.name} has no embedding backend")
+
+    def _build_vector_store(self):
+        from src.vectorstore.chroma_store import ChromaStore
+
+        return ChromaStore(embeddings=self.embeddings)
+
+    def _build_llm_client(self):
+        from src.llm.groq_client import GroqClient
+
+        return GroqClient()
+
+    def _build_rag_retriever(self):
+        from src.retriever.rag_retriever import RAGRetriever
+
+        return RAGRetriever(vector_store=self.vector_store, llm_client=self.llm_client)
+
+    def _build_conversation_store(self):
+        if not self.profile.conversations:
+            return None
+        summarizer = None
+        if Config.CONVERSATION_SUMMARIZER == "llm":
+            summarizer = self.llm_client.summarize_conversation
+        return ConversationStore(summarizer=summarizer)
+
+    def _build_emergency_detector(self):
+        if not self.profile.emergency_fast_path:
+            return None
+        from src.emergency.intent_detector import EmergencyIntentDetector
+
+        # Patterns are precompiled on import
+        return EmergencyIntentDetector()
+
+    def _build_answer_bank(self):
+        if not self.profile.answer_bank:
+            return None
+        from src.retriever.answer_bank import AnswerBank
+
+        return AnswerBank()
+
+    def _build_groq_client(self):
+        import httpx
+        from groq import Groq
+
+        if not Config.GROQ_API_KEY:
+            raise ValueError("GROQ_API_KEY environment variable not set")
+        # Retries and rate limits are owned by the shared scheduler
+        return Groq(
+            api_key=Config.GROQ_API_KEY,
+            max_retries=0,
+            http_client=httpx.Client(
+                event_hooks={"response": [get_scheduler().observe_response]}
+            ),
+        )
+
+
+def create_app(profile: str = None) -> Flask:
+    """
+    Build the Flask app for a deployment profile
+
+    Args:
+        profile: "full", "lite" or "minimal" (defaults to Config.APP_PROFILE)
+
+    Returns:
+        Configured Flask app (its components are in app.extensions["rag"])
+    """
+    profile = get_profile(profile)
+
+    logging.basicConfig(
+        level=getattr(logging, profile.log_level.upper(), logging.INFO),
+        format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
+    )
+
+    app = Flask(__name__)
+    app.json = FastJSONProvider(app)
+    CORS(app)
+    init_compression(app)
+    init_profiling(app)
+    init_tracing(app)
+
+    components = Components(profile)
+    app.extensions["rag"] = components
+
+    if profile.eager_init:
+        logger.info(f"Initializing components for the {profile.name} profile...")
+        try:
+            components.load_all()
+            logger.info("✓ All components initialized successfully")
+        except Exception as e:
+            logger.error(f"Failed to initialize components: {str(e)}")
+            raise
+
+    _register_health(app, components)
+    _register_routes(app, components)
+    logger.info(f"✓ App created with the {profile.name} profile")
+    return app
+
+
+def _register_health(app, components: Components):
+    """Probes read a snapshot and never trigger lazy initialization"""
+    profile = components.profile
+    monitor = HealthMonitor()
+
+    if profile.vector_store:
+
+        def check_vector_store() -> dict:
+            vector_store = components.loaded("vector_store")
+            if vector_store is None:
+                return {"vector_store_loaded": False}
+            return {
+                "vector_store_loaded": True,
+                "documents_count": vector_store.get_collection_count(),
+            }
+
+        def check_llm() -> dict:
+            """Usable unless every circuit is open (no API call)"""
+            llm_client = components.loaded("llm_client")
+            if llm_client is None:
+                return {"llm_loaded": False}
+            backends = llm_client.router.stats()["backends"]
+            available = [name for name, b in backends.items() if not b["open"]]
+            if not available:
+                raise RuntimeError("All LLM backends have open circuits")
+            return {"llm_backends_available": available}
+
+        monitor.add_check("vector_store", check_vector_store)
+        monitor.add_check("llm", check_llm)
+        info = {
+            "model": Config.LLM_MODEL,
+            "embedding_model": Config.EMBEDDING_MODEL,
+            "chroma_mode": "cloud" if Config.is_cloud_mode() else "local",
+        }
+    else:
+        # Building the client makes no API call
+        monitor.add_check(
+            "groq", lambda: {"groq_connected": components.groq_client is not None}
+        )
+        info = {"model": Config.STATIC_LLM_MODEL}
+
+    monitor.refresh()
+    init_health(app, monitor, profile=profile.name, **info)
+
+
+def _register_routes(app, components: Components):
+    profile = components.profile
+    admission = get_admission()
+
+    @app.route("/", methods=["GET"])
+    def home():
+        """Service description"""
+        endpoints = {
+            "/query": "POST - Query the chatbot",
+            "/health": "GET - Health check (cached snapshot)",
+            "/health/live": "GET - Liveness probe",
+            "/health/ready": "GET - Readiness probe",
+            "/stats": "GET - Get system statistics",
+        }
+        if profile.vector_store:
+            endpoints["/ingest"] = "POST - Ingest documents into vector store"
+            endpoints["/documents"] = (
+                "DELETE - Delete documents by source or IDs (admin)"
+            )
+        return jsonify(
+            {
+                "status": "ok",
+                "message": "RAG Chatbot API is running",
+                "profile": profile.name,
+                "endpoints": endpoints,
+            }
+        )
+
+    @app.route("/stats", methods=["GET"])
+    def stats():
+        """Get system statistics"""
+        try:
+            payload = {
+                "profile": profile.as_dict(),
+                "admission": admission.stats() if admission else None,
+                "llm_scheduler": get_scheduler().stats(),
+                # Allocation snapshots are slow: admins ask for them
+                "memory": get_governor().stats(
+                    allocations=is_admin()
+                    and request.args.get("allocations", "false").lower() == "true"
+                ),
+            }
+            if profile.vector_store:
+                # Only report what is already built: /stats never loads a
+                # lazy profile's components
+                vector_store = components.loaded("vector_store")
+                rag_retriever = components.loaded("rag_retriever")
+                answer_bank = components.loaded("answer_bank")
+                llm_client = components.loaded("llm_client")
+                payload.update(
+                    {
+                        "collection_name": (
+                            vector_store.collection_name
+                            if vector_store
+                            else Config.CHROMA_COLLECTION_NAME
+                        ),
+                        "vector_store_loaded": vector_store is not None,
+                        "documents_count": (
+                            vector_store.get_collection_count()
+                            if vector_store
+                            else None
+                        ),
+                        "pending_deletes": (
+                            len(vector_store.tombstones) if vector_store else None
+                        ),
+                        "retrieval_k": Config.RETRIEVAL_K,
+                        "similarity_threshold": Config.SIMILARITY_THRESHOLD,
+                        "llm_model": Config.LLM_MODEL,
+                        "embedding_model": Config.EMBEDDING_MODEL,
+                        "llm_router": llm_client.router.stats() if llm_client else None,
+                        "answer_bank": answer_bank.stats() if answer_bank else None,
+                        "dedup": (
+                            vector_store.duplicate_index.stats()
+                            if vector_store and vector_store.duplicate_index
+                            else None
+                        ),
+                        "single_flight": (
+                            rag_retriever.single_flight.stats()
+                            if rag_retriever and rag_retriever.single_flight
+                            else None
+                        ),
+                    }
+                )
+            else:
+                payload["llm_model"] = Config.STATIC_LLM_MODEL
+            return jsonify(payload)
+        except Exception as e:
+            return jsonify({"error": str(e)}), 500
+
+    def answer_with_rag(user_query: str, session_id: str, priority: int) -> dict:
+        """Run the RAG pipeline for one turn and record it in the session"""
+        conversation_store = components.conversation_store
+        answer_bank = components.answer_bank
+        conversation = (
+            conversation_store.get(session_id) if conversation_store else None
+        )
+
+        # Standalone frequent questions are served from the answer bank
+        query_embedding = None
+        if answer_bank is not None and len(answer_bank):
+            from src.retriever.query_rewriter import looks_like_follow_up
+
+            if not (
+                conversation and conversation.turns and looks_like_follow_up(user_query)
+            ):
+                query_embedding = components.embeddings.embed_query(user_query)
+                banked = answer_bank.lookup(
+                    query_embedding, vector_store=components.vector_store
+                )
+                if banked:
+                    logger.info(f"Answer bank hit ({banked['similarity']:.3f})")
+                    if conversation_store:
+                        conversation_store.append_turn(
+                            session_id, user_query, banked["answer"]
+                        )
+                    return {
+                        "session_id": session_id,
+                        "query": user_query,
+                        "answer": banked["answer"],
+                        "sources": banked["source_labels"],
+                        "context_preview": banked["context"],
+                        "answer_bank": {
+                            "question": banked["question"],
+                            "similarity": banked["similarity"],
+                        },
+                    }
+
+        result = components.rag_retriever.generate_answer(
+            user_query,
+            priority=priority,
+            conversation=conversation,
+            query_embedding=query_embedding,
+        )
+
+        if conversation_store:
+            conversation_store.append_turn(
+                session_id, user_query, result["answer"], conversation.retrievals
+            )
+
+        return {
+            "session_id": session_id,
+            "query": user_query,
+            "answer": result["answer"],
+            "sources": result["sources"],
+            "context_preview": result["context"],
+        }
+
+    def answer_from_static_knowledge(user_query: str, session_id: str, priority):
+        """Answer with the built-in knowledge base (profiles without a vector store)"""
+        from src.llm.prompts import usage_from_response
+        from src.llm.static_knowledge import STATIC_PROMPT as prompt
+
+        # Static knowledge base is a fixed system prefix; only the question varies
+        messages = prompt.render(question=user_query)
+        usage = prompt.token_counts(messages)
+        groq_client = components.groq_client
+
+        response = get_scheduler().submit(
+            lambda: groq_client.chat.completions.create(
+                messages=messages,
+                model=Config.STATIC_LLM_MODEL,
+                temperature=0.3,
+                max_tokens=Config.STATIC_LLM_MAX_TOKENS,
+            ),
+            priority=priority,
+            estimated_tokens=usage["prompt_tokens"] + Config.STATIC_LLM_MAX_TOKENS,
+        )
+        usage.update(usage_from_response(response))
+        return {
+            "session_id": session_id,
+            "query": user_query,
+            "answer": response.choices[0].message.content,
+            "sources": ["first_aid_knowledge_base"],
+            "context_preview": "",
+            "mode": "groq_direct",
+            "usage": usage,
+        }
+
+    pipeline = answer_with_rag if profile.vector_store else answer_from_static_knowledge
+
+    def answer(user_query: str, session_id: str, priority: int) -> dict:
+        """Run the pipeline under admission control (raises AdmissionRejected)"""
+        if admission is None:
+            return pipeline(user_query, session_id, priority)
+        with admission.admit(
+            client_id(request), priority, request_queue_time(request.headers)
+        ):
+            return pipeline(user_query, session_id, priority)
+
+    def stream_emergency(emergency: dict, user_query: str, session_id: str, mask):
+        """NDJSON stream: vetted instructions first, then the full answer"""
+        yield app.json.dumps(
+            {"type": "emergency", "session_id": session_id, "emergency": emergency}
+        ) + "\n"
+
+        try:
+            payload = answer(user_query, session_id, PRIORITY_EMERGENCY)
+            payload = apply_field_mask(payload, *mask)
+            payload["type"] = "answer"
+        except Exception as e:
+            logger.error(f"Error streaming full answer: {str(e)}")
+            payload = {"type": "error", "error": "Full answer unavailable"}
+
+        yield app.json.dumps(payload) + "\n"
+
+    @app.route("/query", methods=["POST"])
+    def query():
+        """
+        Query the chatbot
+
+        Expected JSON body:
+        {
+            "query": "Your question here",
+            "session_id": "...",  // optional, returned by the previous response
+            "emergency": false,  // optional, prioritizes the LLM call
+            "stream": false,  // optional, NDJSON stream when an emergency is detected
+            "skip_fast_path": false,  // optional, always run the full pipeline
+            "fields": ["answer", "session_id"],  // optional, only return these fields
+            "exclude": ["context_preview", "sources"]  // optional, drop these fields
+        }
+
+        "fields" and "exclude" may also be passed as comma-separated query
+        string parameters.
+        """
+        try:
+            # Get query from request
+            data = request.get_json()
+
+            if not data or "query" not in data:
+                return jsonify({"error": "Missing 'query' field in request body"}), 400
+
+            user_query = data.get("query", "").strip()
+
+            if not user_query:
+                return jsonify({"error": "Query cannot be empty"}), 400
+
+            logger.info(f"Processing query: {user_query[:100]}...")
+
+            try:
+                mask = requested_field_mask(data)
+            except ValueError as e:
+                return jsonify({"error": str(e)}), 400
+
+            # A new session starts when none is given
+            session_id = data.get("session_id") or ConversationStore.new_session_id()
+
+            # Emergency fast path: vetted instructions before any embedding/LLM work
+            emergency = None
+            emergency_detector = components.emergency_detector
+            if emergency_detector is not None:
+                emergency = emergency_detector.detect(user_query)
+
+            if emergency and not data.get("skip_fast_path"):
+                if data.get("stream"):
+                    return Response(
+                        stream_with_context(
+                            stream_emergency(emergency, user_query, session_id, mask)
+                        ),
+                        mimetype="application/x-ndjson",
+                    )
+                return jsonify(
+                    apply_field_mask(
+                        {
+                            "session_id": session_id,
+                            "query": user_query,
+                            "answer": emergency["answer"],
+                            "sources": [],
+                            "context_preview": "",
+                            "emergency": emergency,
+                            "full_answer_pending": True,
+                        },
+                        *mask,
+                    )
+                )
+
+            # Emergencies jump the LLM queue, including the follow-up request
+            # that fetches the full answer after the fast path
+            priority = (
+                PRIORITY_EMERGENCY
+                if emergency or data.get("emergency")
+                else PRIORITY_NORMAL
+            )
+
+            return jsonify(
+                apply_field_mask(answer(user_query, session_id, priority), *mask)
+            )
+
+        except AdmissionRejected as e:
+            error = "Too many requests" if e.status == 429 else "Server busy"
+            return (
+                jsonify({"error": error, "details": str(e)}),
+                e.status,
+                {"Retry-After": str(e.retry_after)},
+            )
+
+        except LLMOverloadedError as e:
+            return (
+                jsonify({"error": "Service temporarily overloaded", "details": str(e)}),
+                503,
+                {"Retry-After": str(e.retry_after)},
+            )
+
+        except Exception as e:
+            logger.error(f"Error processing query: {str(e)}")
+            return jsonify({"error": "Internal server error", "details": str(e)}), 500
+
+    if profile.vector_store:
+        _register_ingest(app, components)
+
+    @app.errorhandler(404)
+    def not_found(error):
+        return jsonify({"error": "Endpoint not found"}), 404
+
+    @app.errorhandler(500)
+    def internal_error(error):
+        return jsonify({"error": "Internal server error"}), 500
+
+
+def _register_ingest(app, components: Components):
+    def refresh_answer_bank():
+        """Regenerate invalidated banked answers (runs in a background thread)"""
+        try:
+            components.answer_bank.refresh(components.rag_retriever)
+        except Exception as e:
+            logger.error(f"Error refreshing answer bank: {str(e)}")
+
+    def invalidate_answers(sources):
+        """Withdraw banked answers built from these sources and regenerate them"""
+        answer_bank = components.answer_bank
+        if answer_bank is not None and len(answer_bank):
+            if answer_bank.invalidate(sources):
+                threading.Thread(target=refresh_answer_bank, daemon=True).start()
+
+    @app.route("/ingest", methods=["POST"])
+    def ingest_documents():
+        """
+        Ingest documents into the vector store
+
+        Expected JSON body:
+        {
+            "text": "Document content to ingest",
+            "metadata": {"source": "filename", "title": "Document Title"},  // optional
+            "replace": false  // optional, replace every chunk of metadata.source
+        }
+
+        Replacing removes the source's current chunks, so like DELETE
+        /documents it requires the X-Admin-Token header.
+        """
+        try:
+            data = request.get_json()
+
+            if not data or "text" not in data:
+                return jsonify({"error": "Missing 'text' field in request body"}), 400
+
+            text_content = data.get("text", "").strip()
+            metadata = data.get("metadata", {})
+            replace = bool(data.get("replace"))
+
+            if not text_content:
+                return jsonify({"error": "Text content cannot be empty"}), 400
+
+            if replace and not is_admin():
+                return jsonify({"error": "Forbidden"}), 403
+            if replace and not metadata.get("source"):
+                return jsonify({"error": "'replace' needs 'metadata.source'"}), 400
+
+            logger.info(f"Ingesting document with {len(text_content)} characters...")
+
+            # Create document object
+            from langchain_core.documents import Document
+            from langchain.text_splitter import RecursiveCharacterTextSplitter
+            from src.vectorstore.parent_store import split_with_parents
+
+            doc = Document(page_content=text_content, metadata=metadata)
+
+            # Split document into chunks (and parent sections for parent retrieval)
+            parents = None
+            if Config.PARENT_RETRIEVAL:
+                parents, chunks = split_with_parents([doc])
+            else:
+                text_splitter = RecursiveCharacterTextSplitter(
+                    chunk_size=Config.CHUNK_SIZE,
+                    chunk_overlap=Config.CHUNK_OVERLAP,
+                    length_function=len,
+                )
+                chunks = text_splitter.split_documents([doc])
+
+            # Add to vector store (near-duplicates of stored chunks are skipped)
+            vector_store = components.vector_store
+            replaced = 0
+            if replace:
+                added_ids, replaced = vector_store.replace_documents(
+                    metadata["source"], chunks, parents=parents
+                )
+            else:
+                added_ids = vector_store.add_documents(chunks, parents=parents)
+            duplicates = len(chunks) - len(added_ids)
+            if added_ids:
+                # Other workers reload the saved compressed index
+                vector_store.refresh_compressed_index()
+
+            invalidate_answers(
+                {chunk.metadata.get("source", "Unknown") for chunk in chunks}
+            )
+
+            new_count = vector_store.get_collection_count()
+
+            return jsonify(
+                {
+                    "message": "Document ingested successfully",
+                    "chunks_created": len(chunks),
+                    "chunks_added": len(added_ids),
+                    "chunks_replaced": replaced,
+                    "duplicates_skipped": duplicates,
+                    "dedup_ratio": (
+                        round(duplicates / len(chunks), 4) if chunks else 0.0
+                    ),
+                    "total_documents": new_count,
+                }
+            )
+
+        except Exception as e:
+            logger.error(f"Error ingesting document: {str(e)}")
+            return jsonify({"error": "Internal server error", "details": str(e)}), 500
+
+    @app.route("/documents", methods=["DELETE"])
+    def delete_documents():
+        """
+        Delete documents from the vector store
+
+        Requires the X-Admin-Token header. Expected JSON body (one of):
+        {"source": "filename"}  // every chunk of a source
+        {"ids": ["chunk-id", ...]}  // individual chunks
+        """
+        if not is_admin():
+            return jsonify({"error": "Forbidden"}), 403
+
+        try:
+            data = request.get_json(silent=True) or {}
+            if not isinstance(data, dict):
+                return jsonify({"error": "Body must be a JSON object"}), 400
+            source = data.get("source")
+            ids = data.get("ids")
+
+            if not source and not ids:
+                return jsonify({"error": "Give 'source' or 'ids' to delete"}), 400
+            if ids is not None and not isinstance(ids, list):
+                return jsonify({"error": "'ids' must be a list"}), 400
+
+            vector_store = components.vector_store
+            deleted = vector_store.delete_documents(ids=ids, source=source)
+            if not deleted:
+                return jsonify({"error": "No matching documents"}), 404
+
+            invalidate_answers(set(deleted))
+
+            return jsonify(
+                {
+                    "message": "Documents deleted",
+                    "chunks_deleted": sum(deleted.values()),
+                    "sources": deleted,
+                    "pending_compaction": len(vector_store.tombstones),
+                }
+            )
+
+        except Exception as e:
+            logger.error(f"Error deleting documents: {str(e)}")
+            return jsonify({"error": "Internal server error", "details": str(e)}), 500
@@ -0,0 +1 @@
+# Conversation package
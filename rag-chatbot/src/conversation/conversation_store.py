@@ -0,0 +1,325 @@
+"""
+Session-scoped conversation memory shared by all workers on a host
+Keeps the last few turns verbatim and folds older turns into a running
+summary, so the prompt stays the same size however long the chat gets.
+An LLM summarizer runs in the background: the overflow turns stay verbatim
+until its summary lands, so no request waits for the extra LLM call.
+"""
+
+import json
+import math
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from typing import Callable, List, Optional
+from src.utils.config import Config
+from src.utils.sqlite import thread_connection
+import logging
+
+logger = logging.getLogger(__name__)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS sessions (
+    session_id TEXT PRIMARY KEY,
+    summary TEXT NOT NULL DEFAULT '',
+    turns TEXT NOT NULL DEFAULT '[]',
+    retrievals TEXT NOT NULL DEFAULT '[]',
+    updated_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS sessions_updated_at ON sessions (updated_at);
+CREATE TABLE IF NOT EXISTS question_counts (
+    question TEXT PRIMARY KEY,
+    asked INTEGER NOT NULL DEFAULT 0,
+    last_asked REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS question_counts_last_asked
+    ON question_counts (last_asked);
+"""
+
+
+class Conversation:
+    """Summary of older turns plus the most recent turns"""
+
+    def __init__(
+        self,
+        session_id: str,
+        summary: str = "",
+        turns: List[dict] = None,
+        retrievals: List[dict] = None,
+    ):
+        self.session_id = session_id
+        self.summary = summary
+        self.turns = turns or []
+        self.retrievals = retrievals or []
+
+    def find_retrieval(self, embedding: List[float], min_similarity: float):
+        """
+        Return cached results of a recent search close to this embedding
+
+        Returns:
+            List of cached result dicts, or None when nothing is close enough
+        """
+        best, best_similarity = None, min_similarity
+        for entry in self.retrievals:
+            similarity = _cosine(embedding, entry["embedding"])
+            if similarity >= best_similarity:
+                best, best_similarity = entry, similarity
+        return best["results"] if best else None
+
+    def remember_retrieval(
+        self, query: str, embedding: List[float], results: List[dict], limit: int
+    ):
+        """Cache a search (query, embedding, serialized results), newest last"""
+        self.retrievals.append(
+            {"query": query, "embedding": list(embedding), "results": results}
+        )
+        del self.retrievals[:-limit]
+
+    def history_text(self, answer_chars: int = 400) -> str:
+        """Render summary and recent turns for a prompt"""
+        lines = []
+        if self.summary:
+            lines.append(f"Summary of earlier conversation: {self.summary}")
+        for turn in self.turns:
+            lines.append(f"User: {turn['question']}")
+            lines.append(f"Assistant: {turn['answer'][:answer_chars]}")
+        return "\n".join(lines)
+
+
+def extractive_summary(summary: str, turns: List[dict]) -> str:
+    """
+    Fold turns into the summary without an LLM call
+
+    Keeps each question and the first sentence of its answer, then trims
+    the oldest text so the summary stays within CONVERSATION_SUMMARY_CHARS.
+    """
+    parts = [summary] if summary else []
+    for turn in turns:
+        first_sentence = turn["answer"].split(". ")[0].strip()
+        parts.append(f"User asked: {turn['question']} Assistant: {first_sentence}.")
+    text = " ".join(parts)
+    return text[-Config.CONVERSATION_SUMMARY_CHARS :]
+
+
+class ConversationStore:
+    """SQLite-backed store with TTL and size-bounded eviction"""
+
+    def __init__(
+        self,
+        path: str = None,
+        ttl: float = None,
+        max_sessions: int = None,
+        recent_turns: int = None,
+        summarizer: Optional[Callable[[str, List[dict]], str]] = None,
+    ):
+        """
+        Initialize conversation store (defaults come from Config)
+
+        Args:
+            path: SQLite file; use a local path so every worker shares it
+            ttl: Seconds of inactivity before a session is evicted
+            max_sessions: Sessions kept; least recently used go first
+            recent_turns: Turns kept verbatim before folding into the summary
+            summarizer: Callable(summary, turns) -> new summary; anything but
+                extractive_summary is slow and runs in a background thread
+        """
+        self.path = path or Config.CONVERSATION_DB_PATH
+        self.ttl = ttl or Config.CONVERSATION_TTL
+        self.max_sessions = max_sessions or Config.CONVERSATION_MAX_SESSIONS
+        self.recent_turns = recent_turns or Config.CONVERSATION_RECENT_TURNS
+        self.summarizer = summarizer or extractive_summary
+        self._folding = set()
+        self._folding_lock = threading.Lock()
+
+        directory = os.path.dirname(os.path.abspath(self.path))
+        os.makedirs(directory, exist_ok=True)
+        connection = self._connection()
+        connection.executescript(_SCHEMA)
+        columns = {row[1] for row in connection.execute("PRAGMA table_info(sessions)")}
+        if "retrievals" not in columns:
+            connection.execute(
+                "ALTER TABLE sessions ADD COLUMN retrievals TEXT NOT NULL DEFAULT '[]'"
+            )
+        logger.info(f"✓ Conversation store at {self.path}")
+
+    @staticmethod
+    def new_session_id() -> str:
+        return uuid.uuid4().hex
+
+    def get(self, session_id: str) -> Conversation:
+        """Load a session (empty if unknown or expired)"""
+        row = (
+            self._connection()
+            .execute(
+                "SELECT summary, turns, retrievals, updated_at "
+                "FROM sessions WHERE session_id = ?",
+                (session_id,),
+            )
+            .fetchone()
+        )
+        if row is None or time.time() - row[3] > self.ttl:
+            return Conversation(session_id)
+        return Conversation(session_id, row[0], json.loads(row[1]), json.loads(row[2]))
+
+    def append_turn(
+        self, session_id: str, question: str, answer: str, retrievals: List[dict] = None
+    ) -> Conversation:
+        """
+        Record a turn, folding overflow turns into the running summary
+
+        Args:
+            session_id: Session identifier
+            question: User's question
+            answer: Assistant's answer
+            retrievals: Updated retrieval cache for the session, if any
+
+        Returns:
+            Updated Conversation
+        """
+        conversation = self.get(session_id)
+        conversation.turns.append({"question": question, "answer": answer})
+        if retrievals is not None:
+            conversation.retrievals = retrievals
+
+        overflow = len(conversation.turns) - self.recent_turns
+        fold_later = None
+        if overflow > 0 and self.summarizer is extractive_summary:
+            folded = conversation.turns[:overflow]
+            conversation.turns = conversation.turns[overflow:]
+            conversation.summary = extractive_summary(conversation.summary, folded)
+        elif overflow > 0:
+            # The turns stay verbatim until the background fold replaces them
+            fold_later = (conversation.summary, conversation.turns[:overflow])
+
+        connection = self._connection()
+        with connection:
+            connection.execute(
+                "INSERT OR REPLACE INTO sessions "
+                "(session_id, summary, turns, retrievals, updated_at) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (
+                    session_id,
+                    conversation.summary,
+                    json.dumps(conversation.turns),
+                    json.dumps(conversation.retrievals),
+                    time.time(),
+                ),
+            )
+            # Outlives session eviction, so frequent questions can be mined
+            connection.execute(
+                "INSERT INTO question_counts (question, asked, last_asked) "
+                "VALUES (?, 1, ?) ON CONFLICT(question) DO UPDATE SET "
+                "asked = asked + 1, last_asked = excluded.last_asked",
+                (" ".join(question.lower().split()), time.time()),
+            )
+        self.evict()
+        if fold_later is not None:
+            self._fold_in_background(session_id, *fold_later)
+        return conversation
+
+    def evict(self):
+        """Drop expired sessions and trim to max_sessions"""
+        connection = self._connection()
+        with connection:
+            connection.execute(
+                "DELETE FROM sessions WHERE updated_at < ?", (time.time() - self.ttl,)
+            )
+            connection.execute(
+                "DELETE FROM sessions WHERE session_id IN ("
+                "SELECT session_id FROM sessions ORDER BY updated_at DESC "
+                "LIMIT -1 OFFSET ?)",
+                (self.max_sessions,),
+            )
+            # Raw questions are only kept as long as mining needs them
+            connection.execute(
+                "DELETE FROM question_counts WHERE last_asked < ?",
+                (time.time() - Config.CONVERSATION_QUESTION_RETENTION,),
+            )
+            connection.execute(
+                "DELETE FROM question_counts WHERE question IN ("
+                "SELECT question FROM question_counts ORDER BY last_asked DESC "
+                "LIMIT -1 OFFSET ?)",
+                (Config.CONVERSATION_MAX_QUESTIONS,),
+            )
+
+    def delete(self, session_id: str):
+        connection = self._connection()
+        with connection:
+            connection.execute(
+                "DELETE FROM sessions WHERE session_id = ?", (session_id,)
+            )
+
+    def frequent_questions(self, limit: int = 100, min_count: int = 2) -> List[str]:
+        """Most frequently asked (normalized) questions, most asked first"""
+        rows = (
+            self._connection()
+            .execute(
+                "SELECT question FROM question_counts WHERE asked >= ? "
+                "ORDER BY asked DESC, last_asked DESC LIMIT ?",
+                (min_count, limit),
+            )
+            .fetchall()
+        )
+        return [row[0] for row in rows]
+
+    def count(self) -> int:
+        return self._connection().execute("SELECT COUNT(*) FROM sessions").fetchone()[0]
+
+    def _fold_in_background(self, session_id: str, summary: str, turns: List[dict]):
+        """Start folding turns into the summary unless a fold is running"""
+        with self._folding_lock:
+            if session_id in self._folding:
+                return
+            self._folding.add(session_id)
+        threading.Thread(
+            target=self._fold, args=(session_id, summary, turns), daemon=True
+        ).start()
+
+    def _fold(self, session_id: str, summary: str, turns: List[dict]):
+        """Summarize turns, then swap them out of the session if it still has them"""
+        try:
+            try:
+                new_summary = self.summarizer(summary, turns)
+            except Exception as e:
+                logger.warning(f"Summarizer failed, using extractive summary: {str(e)}")
+                new_summary = extractive_summary(summary, turns)
+
+            connection = self._connection()
+            with connection:
+                row = connection.execute(
+                    "SELECT summary, turns FROM sessions WHERE session_id = ?",
+                    (session_id,),
+                ).fetchone()
+                if row is None or row[0] != summary:
+                    return
+                current = json.loads(row[1])
+                if current[: len(turns)] != turns:
+                    return
+                # Compare-and-swap: another worker may have folded meanwhile
+                connection.execute(
+                    "UPDATE sessions SET summary = ?, turns = ? "
+                    "WHERE session_id = ? AND summary = ? AND turns = ?",
+                    (
+                        new_summary,
+                        json.dumps(current[len(turns) :]),
+                        session_id,
+                        summary,
+                        row[1],
+                    ),
+                )
+        except Exception as e:
+            logger.warning(f"Could not fold conversation turns: {str(e)}")
+        finally:
+            with self._folding_lock:
+                self._folding.discard(session_id)
+
+    def _connection(self) -> sqlite3.Connection:
+        return thread_connection(self.path)
+
+
+def _cosine(a: List[float], b: List[float]) -> float:
+    dot = sum(x * y for x, y in zip(a, b))
+    norm = math.sqrt(sum(x * x for x in a)) * math.sqrt(sum(y * y for y in b))
+    return dot / norm if norm else 0.0
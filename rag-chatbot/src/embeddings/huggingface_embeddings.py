@@ -1,5 +1,6 @@
 from langchain_huggingface import HuggingFaceEmbeddings
 from src.utils.config import Config
+from src.embeddings.traced_embeddings import instrument_embeddings
 import logging
 
 logger = logging.getLogger(__name__)
@@ -13,7 +14,7 @@ def get_embeddings(model_name: str = None):
         model_name: Name of the sentence-transformers model
 
     Returns:
-        HuggingFaceEmbeddings instance
+        HuggingFaceEmbeddings instance (wrapped for tracing when enabled)
     """
     model_name = model_name or Config.EMBEDDING_MODEL
 
@@ -27,4 +28,4 @@ def get_embeddings(model_name: str = None):
 
     logger.info("✓ Embedding model loaded successfully")
 
-    return embeddings
+    return instrument_embeddings(embeddings)
@@ -6,6 +6,7 @@ More memory-efficient than local sentence-transformers
 import os
 from langchain_openai import OpenAIEmbeddings
 from src.utils.config import Config
+from src.embeddings.traced_embeddings import instrument_embeddings
 
 
 def get_lightweight_embeddings():
@@ -19,11 +20,13 @@ def get_lightweight_embeddings():
 
     if openai_key:
         print("✅ Using OpenAI embeddings (memory efficient)")
-        return OpenAIEmbeddings(
-            openai_api_key=openai_key,
-            model="text-embedding-3-small",  # Smaller, faster model
-            chunk_size=1000,
-            max_retries=3,
+        return instrument_embeddings(
+            OpenAIEmbeddings(
+                openai_api_key=openai_key,
+                model="text-embedding-3-small",  # Smaller, faster model
+                chunk_size=1000,
+                max_retries=3,
+            )
         )
     else:
         # Fallback: Try to use a very small local model
@@ -35,10 +38,12 @@ def get_lightweight_embeddings():
             # Use the smallest possible model
             model = SentenceTransformer("all-MiniLM-L6-v2", device="cpu")
 
-            return HuggingFaceEmbeddings(
-                model_name="all-MiniLM-L6-v2",
-                model_kwargs={"device": "cpu"},
-                encode_kwargs={"normalize_embeddings": True, "batch_size": 1},
+            return instrument_embeddings(
+                HuggingFaceEmbeddings(
+                    model_name="all-MiniLM-L6-v2",
+                    model_kwargs={"device": "cpu"},
+                    encode_kwargs={"normalize_embeddings": True, "batch_size": 1},
+                )
             )
         except Exception as e:
             print(f"❌ Error loading embeddings: {e}")
@@ -0,0 +1,31 @@
+"""
+Embeddings wrapper that records a tracing span per embed call
+"""
+
+from typing import List
+from langchain_core.embeddings import Embeddings
+from src.utils.config import Config
+from src.utils.tracing import span
+
+
+class TracedEmbeddings(Embeddings):
+    """Delegates to the wrapped embeddings inside a span"""
+
+    def __init__(self, inner: Embeddings):
+        self.inner = inner
+
+    def embed_query(self, text: str) -> List[float]:
+        with span("embeddings.embed_query", **{"embedding.chars": len(text)}):
+            return self.inner.embed_query(text)
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        with span("embeddings.embed_documents", **{"embedding.texts": len(texts)}):
+            return self.inner.embed_documents(texts)
+
+    def __getattr__(self, name):
+        return getattr(self.inner, name)
+
+
+def instrument_embeddings(embeddings):
+    """Wrap embeddings in TracedEmbeddings when tracing is enabled"""
+    return TracedEmbeddings(embeddings) if Config.TRACING_ENABLED else embeddings
@@ -0,0 +1 @@
+# Emergency package
@@ -0,0 +1,275 @@
+"""
+Emergency intent detection in front of the RAG pipeline
+Precompiled keyword patterns pick the emergency type and a tiny linear
+classifier decides whether the message describes a situation happening now
+(as opposed to a general question), so vetted instructions can be returned
+in well under a millisecond while the full RAG answer follows
+"""
+
+import math
+import re
+import time
+from typing import Optional
+from src.utils.config import Config
+import logging
+
+logger = logging.getLogger(__name__)
+
+EMERGENCY_NUMBER = "911"
+
+# Vetted instructions, kept short enough to read aloud on a phone call
+EMERGENCY_PROTOCOLS = {
+    "not_breathing": {
+        "title": "Not breathing / unresponsive - start CPR",
+        "patterns": [
+            r"\b(not|isn'?t|stopped|no longer|can'?t|cannot|doesn'?t)\s+breath",
+            r"\bno (pulse|heartbeat)\b",
+            r"\b(unresponsive|unconscious|passed out|collapsed)\b",
+            r"\bcardiac arrest\b",
+            r"\bcpr\b",
+        ],
+        "steps": [
+            f"Call {EMERGENCY_NUMBER} now, or have someone else call and put the phone on speaker.",
+            "Lay the person on their back on a firm surface.",
+            "Place the heel of your hand on the center of the chest, other hand on top.",
+            "Push hard and fast: at least 2 inches deep, 100-120 compressions per minute.",
+            "If trained, give 2 rescue breaths after every 30 compressions.",
+            "Use an AED as soon as one is available and follow its prompts.",
+            "Keep going until help arrives or the person starts breathing.",
+        ],
+    },
+    "choking": {
+        "title": "Choking",
+        "patterns": [
+            r"\bchok(e|es|ed|ing)\b",
+            r"\b(something|food|object) (stuck|lodged) in (his|her|their|my) throat\b",
+            r"\bcan'?t (speak|cough)\b",
+        ],
+        "steps": [
+            "If they can cough forcefully, encourage them to keep coughing.",
+            "If they cannot cough, speak or breathe: give 5 firm back blows between the shoulder blades.",
+            "Then give 5 abdominal thrusts (hands above the navel, quick inward and upward pulls).",
+            "Alternate 5 back blows and 5 abdominal thrusts until the object comes out.",
+            f"If they become unresponsive, call {EMERGENCY_NUMBER} and start CPR.",
+        ],
+    },
+    "severe_bleeding": {
+        "title": "Severe bleeding",
+        "patterns": [
+            r"\b(bleeding|blood)\b.*\b(won'?t stop|a lot|heavily|badly|spurting|everywhere|severe)\b",
+            r"\b(severe|heavy|uncontrolled|massive) bleeding\b",
+            r"\b(deep|big) (cut|wound|gash)\b",
+        ],
+        "steps": [
+            f"Call {EMERGENCY_NUMBER}.",
+            "Press firmly on the wound with a clean cloth or your hands and do not let go.",
+            "If blood soaks through, add more cloth on top; do not remove the first layer.",
+            "Do not remove objects stuck in the wound; press around them.",
+            "For a limb that keeps bleeding, apply a tourniquet 2-3 inches above the wound if available.",
+            "Keep the person warm and lying down.",
+        ],
+    },
+    "stroke": {
+        "title": "Possible stroke - act F.A.S.T.",
+        "patterns": [
+            r"\bstroke\b",
+            r"\b(face|mouth) (is )?droop",
+            r"\bslurr(ed|ing) (speech|words)\b",
+            r"\b(one side|arm) (is )?(numb|weak)\b",
+        ],
+        "steps": [
+            "Face: ask them to smile - does one side droop?",
+            "Arms: ask them to raise both arms - does one drift down?",
+            "Speech: is their speech slurred or strange?",
+            f"Time: call {EMERGENCY_NUMBER} immediately and note when symptoms started.",
+            "Do not give food, drink or medication.",
+        ],
+    },
+    "heart_attack": {
+        "title": "Possible heart attack",
+        "patterns": [
+            r"\bheart attack\b",
+            r"\bchest (pain|pressure|tightness)\b",
+        ],
+        "steps": [
+            f"Call {EMERGENCY_NUMBER} now.",
+            "Have the person sit down, rest and stay calm.",
+            "If not allergic, have them chew one adult aspirin (325 mg).",
+            "Loosen tight clothing.",
+            "If they become unresponsive and stop breathing normally, start CPR.",
+        ],
+    },
+    "anaphylaxis": {
+        "title": "Severe allergic reaction",
+        "patterns": [
+            r"\banaphyla",
+            r"\b(allergic reaction|allergy)\b.*\b(swell|breath|throat)",
+            r"\b(throat|tongue|lips?) (is |are )?(swelling|swollen|closing)\b",
+        ],
+        "steps": [
+            "Use their epinephrine auto-injector (EpiPen) in the outer thigh right away.",
+            f"Call {EMERGENCY_NUMBER}.",
+            "Have them lie down with legs raised, or sit up if breathing is hard.",
+            "Give a second dose after 5-15 minutes if symptoms do not improve.",
+            "Start CPR if they stop breathing.",
+        ],
+    },
+    "seizure": {
+        "title": "Seizure",
+        "patterns": [
+            r"\bseiz(ure|ing)\b",
+            r"\bconvuls",
+            r"\bfit\b.*\b(shaking|jerking)\b",
+        ],
+        "steps": [
+            "Move hard or sharp objects away; cushion their head.",
+            "Do not hold them down and do not put anything in their mouth.",
+            "Time the seizure.",
+            "When the shaking stops, roll them onto their side.",
+            f"Call {EMERGENCY_NUMBER} if it lasts over 5 minutes, repeats, or they are injured or pregnant.",
+        ],
+    },
+    "poisoning": {
+        "title": "Poisoning or overdose",
+        "patterns": [
+            r"\b(poison(ed|ing)?|overdos(e|ed|ing))\b",
+            r"\b(swallowed|drank|ate) (bleach|pills|medicine|chemicals?|detergent)\b",
+        ],
+        "steps": [
+            f"If they are unresponsive, having trouble breathing or seizing, call {EMERGENCY_NUMBER}.",
+            "Otherwise call Poison Control: 1-800-222-1222.",
+            "Do not make them vomit unless told to by Poison Control.",
+            "Keep the container or pills to show responders.",
+            "If an opioid overdose is suspected and naloxone is available, give it.",
+        ],
+    },
+    "drowning": {
+        "title": "Drowning",
+        "patterns": [
+            r"\bdrown(ed|ing)?\b",
+            r"\bpulled (him|her|them) out of the (water|pool)\b",
+        ],
+        "steps": [
+            f"Call {EMERGENCY_NUMBER}.",
+            "Get them out of the water only if it is safe for you.",
+            "If they are not breathing, start CPR, beginning with 2 rescue breaths if trained.",
+            "If breathing, roll them onto their side and keep them warm.",
+        ],
+    },
+    "severe_burn": {
+        "title": "Serious burn",
+        "patterns": [
+            r"\b(on fire|caught fire)\b",
+            r"\b(bad|severe|serious|third.degree|chemical|electrical) burns?\b",
+        ],
+        "steps": [
+            f"Call {EMERGENCY_NUMBER} for large, deep, chemical or electrical burns.",
+            "Stop the burning: stop, drop and roll, or remove from the source if safe.",
+            "Cool the burn with cool running water for at least 10 minutes.",
+            "Do not use ice, butter or ointments; do not break blisters.",
+            "Cover loosely with a clean, dry cloth or cling film.",
+        ],
+    },
+}
+
+# Tiny linear classifier: is this happening now, or a general question?
+_URGENT_FEATURES = [
+    (re.compile(r"\b(help|hurry|quick|urgent|emergency|please)\b", re.I), 1.2),
+    (re.compile(r"\b(now|right now|just|currently|suddenly)\b", re.I), 1.0),
+    (re.compile(r"\b(my|our|someone|somebody|a man|a woman|he|she|they)\b", re.I), 0.9),
+    (re.compile(r"\b(is|isn'?t|are|aren'?t|won'?t|can'?t)\b", re.I), 0.4),
+    (re.compile(r"!"), 0.6),
+]
+_INFORMATIONAL_FEATURES = [
+    (re.compile(r"\b(learn|course|class|certif|training|history)\w*", re.I), -2.0),
+    (
+        re.compile(r"\b(what is|what are|define|definition|explain|why do)\b", re.I),
+        -1.2,
+    ),
+    (re.compile(r"\b(prevent|avoid|risk|causes?|statistics)\b", re.I), -1.0),
+    (re.compile(r"\b(in general|usually|typically)\b", re.I), -0.8),
+]
+_BIAS = 0.3
+
+
+def _render(protocol: dict) -> str:
+    lines = [protocol["title"].upper(), ""]
+    lines += [f"{i}. {step}" for i, step in enumerate(protocol["steps"], 1)]
+    return "\n".join(lines)
+
+
+# Compiled once at import: regexes and fully rendered answers
+_COMPILED = [
+    (intent, [re.compile(p, re.IGNORECASE) for p in protocol["patterns"]])
+    for intent, protocol in EMERGENCY_PROTOCOLS.items()
+]
+_RENDERED = {
+    intent: {
+        "intent": intent,
+        "title": protocol["title"],
+        "steps": protocol["steps"],
+        "answer": _render(protocol),
+        "call_emergency_services": True,
+        "emergency_number": EMERGENCY_NUMBER,
+    }
+    for intent, protocol in EMERGENCY_PROTOCOLS.items()
+}
+
+
+def urgency_score(query: str) -> float:
+    """Probability-like score that the message describes a live emergency"""
+    logit = _BIAS
+    for pattern, weight in _URGENT_FEATURES + _INFORMATIONAL_FEATURES:
+        if pattern.search(query):
+            logit += weight
+    return 1.0 / (1.0 + math.exp(-logit))
+
+
+class EmergencyIntentDetector:
+    """Keyword/regex intent matcher plus urgency classifier"""
+
+    def __init__(self, threshold: float = None):
+        """
+        Initialize detector
+
+        Args:
+            threshold: Minimum urgency score to take the fast path
+                (defaults to Config.EMERGENCY_URGENCY_THRESHOLD)
+        """
+        self.threshold = (
+            threshold if threshold is not None else Config.EMERGENCY_URGENCY_THRESHOLD
+        )
+
+    def detect(self, query: str) -> Optional[dict]:
+        """
+        Detect an emergency and return its pre-rendered instructions
+
+        Args:
+            query: User's message
+
+        Returns:
+            Copy of the rendered response dict (with intent, urgency and
+            detection time), or None when this is not an emergency
+        """
+        started = time.perf_counter()
+
+        intent = next(
+            (
+                name
+                for name, patterns in _COMPILED
+                if any(p.search(query) for p in patterns)
+            ),
+            None,
+        )
+        if intent is None:
+            return None
+
+        urgency = urgency_score(query)
+        if urgency < self.threshold:
+            return None
+
+        response = dict(_RENDERED[intent])
+        response["urgency"] = round(urgency, 3)
+        response["detection_ms"] = round((time.perf_counter() - started) * 1000, 3)
+        logger.info(f"Emergency intent '{intent}' detected (urgency {urgency:.2f})")
+        return response
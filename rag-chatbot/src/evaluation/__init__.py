@@ -0,0 +1 @@
+# Evaluation package
@@ -0,0 +1,122 @@
+"""
+Retrieval quality metrics over a labelled question set
+Each question names the source document and an exact evidence passage from
+it; a retrieved chunk counts as relevant when it comes from that source and
+its character span (from the splitter's start_index) overlaps the evidence.
+"""
+
+import json
+import os
+from pathlib import Path
+from typing import Dict, List, Sequence
+import numpy as np
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+def load_dataset(path: str, documents_path: str) -> List[dict]:
+    """
+    Load labelled questions and locate their evidence in the source documents
+
+    Args:
+        path: JSON Lines file of {"question", "source", "evidence"}
+        documents_path: Directory the sources are relative to
+
+    Returns:
+        List of dicts with "question", "source" and "span" (start, end)
+    """
+    texts = {}
+    dataset = []
+    with open(path, encoding="utf-8") as f:
+        for line_number, line in enumerate(f, 1):
+            if not line.strip():
+                continue
+            item = json.loads(line)
+            source = item["source"]
+            if source not in texts:
+                texts[source] = Path(documents_path, source).read_text(encoding="utf-8")
+            start = texts[source].find(item["evidence"])
+            if start == -1:
+                raise ValueError(
+                    f"{path}:{line_number}: evidence not found in {source}"
+                )
+            dataset.append(
+                {
+                    "question": item["question"],
+                    "source": source,
+                    "span": (start, start + len(item["evidence"])),
+                }
+            )
+    logger.info(f"✓ Loaded {len(dataset)} labelled questions from {path}")
+    return dataset
+
+
+def is_relevant(doc, item: dict) -> bool:
+    """Whether a retrieved chunk overlaps the evidence of a labelled question"""
+    metadata = doc.metadata or {}
+    if os.path.basename(metadata.get("source", "")) != os.path.basename(item["source"]):
+        return False
+    start = metadata.get("start_index")
+    if start is None or start < 0:
+        return False
+    evidence_start, evidence_end = item["span"]
+    return start < evidence_end and evidence_start < start + len(doc.page_content)
+
+
+def relevant_chunk_count(chunks: Sequence, item: dict) -> int:
+    """Number of ingested chunks that overlap the evidence (recall denominator)"""
+    return sum(1 for chunk in chunks if is_relevant(chunk, item))
+
+
+def score_results(docs: Sequence, item: dict, total_relevant: int) -> dict:
+    """
+    Score one ranked result list
+
+    Args:
+        docs: Retrieved Documents, best first
+        item: Labelled question
+        total_relevant: Relevant chunks in the collection
+
+    Returns:
+        Dict with "recall", "hit" and "reciprocal_rank"
+    """
+    ranks = [rank for rank, doc in enumerate(docs, 1) if is_relevant(doc, item)]
+    return {
+        "recall": len(ranks) / total_relevant if total_relevant else 0.0,
+        "hit": 1.0 if ranks else 0.0,
+        "reciprocal_rank": 1.0 / ranks[0] if ranks else 0.0,
+    }
+
+
+def summarize(scores: List[dict], latencies_ms: List[float]) -> Dict[str, float]:
+    """
+    Aggregate per-question scores and latencies
+
+    Returns:
+        Dict with recall, hit_rate, mrr and latency p50/p95/mean in ms
+    """
+    latencies = np.asarray(latencies_ms, dtype=np.float64)
+    return {
+        "recall": round(float(np.mean([s["recall"] for s in scores])), 4),
+        "hit_rate": round(float(np.mean([s["hit"] for s in scores])), 4),
+        "mrr": round(float(np.mean([s["reciprocal_rank"] for s in scores])), 4),
+        "latency_p50_ms": round(float(np.percentile(latencies, 50)), 2),
+        "latency_p95_ms": round(float(np.percentile(latencies, 95)), 2),
+        "latency_mean_ms": round(float(latencies.mean()), 2),
+    }
+
+
+def select_fastest(
+    results: List[dict], recall_floor: float, latency_key: str = "latency_p95_ms"
+):
+    """
+    Pick the fastest configuration whose recall meets the floor
+
+    Returns:
+        The chosen result, or None when no configuration meets the floor
+    """
+    eligible = [result for result in results if result["recall"] >= recall_floor]
+    if not eligible:
+        return None
+    return min(eligible, key=lambda result: (result[latency_key], -result["recall"]))
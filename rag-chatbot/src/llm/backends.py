@@ -0,0 +1,280 @@
+"""
+LLM backends behind a common interface
+Groq models, any OpenAI-compatible endpoint, and a local stub for tests
+"""
+
+import threading
+import time
+from typing import Callable, Dict, List, Optional
+from src.llm.prompts import count_tokens, usage_from_response
+from src.llm.scheduler import CallCancelled, PRIORITY_NORMAL, get_scheduler
+from src.utils.config import Config
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class LLMBackend:
+    """Base class: one provider + model"""
+
+    name = "backend"
+
+    def complete(
+        self,
+        messages: List[Dict[str, str]],
+        priority: int = PRIORITY_NORMAL,
+        on_first_token: Optional[Callable[[], None]] = None,
+        cancelled: Optional[threading.Event] = None,
+    ):
+        """
+        Generate a completion for chat messages
+
+        Args:
+            messages: List of {"role", "content"} message dicts
+            priority: Scheduler priority (lower runs first)
+            on_first_token: Called once when the first token arrives; when
+                given, the backend streams so the router can measure it
+            cancelled: Set by the router once another backend has answered;
+                the backend then closes its stream and raises CallCancelled
+
+        Returns:
+            Tuple (answer text, provider usage dict)
+        """
+        raise NotImplementedError
+
+
+class GroqBackend(LLMBackend):
+    """Groq chat model via LangChain, rate limited by the shared scheduler"""
+
+    def __init__(self, model_name: str = None, scheduler=None):
+        """
+        Initialize Groq backend
+
+        Args:
+            model_name: Name of the Groq model to use
+            scheduler: LLMScheduler (defaults to the process-wide scheduler)
+        """
+        import httpx
+        from langchain_groq import ChatGroq
+
+        self.model_name = model_name or Config.LLM_MODEL
+        self.name = f"groq:{self.model_name}"
+        self.scheduler = scheduler or get_scheduler()
+
+        # Retries are owned by the scheduler, which also reads the
+        # rate-limit headers of every response through the event hook
+        self.llm = ChatGroq(
+            api_key=Config.GROQ_API_KEY,
+            model=self.model_name,
+            temperature=0.7,
+            max_tokens=Config.LLM_MAX_TOKENS,
+            max_retries=0,
+            http_client=httpx.Client(
+                event_hooks={"response": [self.scheduler.observe_response]}
+            ),
+        )
+
+    def complete(
+        self, messages, priority=PRIORITY_NORMAL, on_first_token=None, cancelled=None
+    ):
+        def call():
+            _check_cancelled(cancelled, self.name)
+            if on_first_token is None:
+                response = self.llm.invoke(messages)
+                return response.content, usage_from_response(response)
+
+            # Chunks add up to one message carrying the streamed usage
+            message = None
+            stream = self.llm.stream(messages)
+            try:
+                for chunk in stream:
+                    _check_cancelled(cancelled, self.name)
+                    if message is None:
+                        on_first_token()
+                    message = chunk if message is None else message + chunk
+            finally:
+                # Closes the HTTP response when the stream is abandoned
+                stream.close()
+            if message is None:
+                return "", {}
+            return message.content, usage_from_response(message)
+
+        return self.scheduler.submit(
+            call, priority=priority, estimated_tokens=_estimated_tokens(messages)
+        )
+
+
+class OpenAICompatibleBackend(LLMBackend):
+    """Any endpoint speaking the OpenAI chat completions API, with its own scheduler"""
+
+    def __init__(
+        self,
+        model_name: str,
+        base_url: str = None,
+        api_key: str = None,
+        scheduler=None,
+    ):
+        """
+        Initialize OpenAI-compatible backend
+
+        Args:
+            model_name: Model name understood by the endpoint
+            base_url: API base URL (defaults to Config.OPENAI_COMPAT_BASE_URL)
+            api_key: API key (defaults to Config.OPENAI_COMPAT_API_KEY)
+            scheduler: LLMScheduler (defaults to the endpoint's process-wide
+                scheduler, separate from Groq's quota)
+        """
+        import httpx
+        from openai import OpenAI
+
+        base_url = base_url or Config.OPENAI_COMPAT_BASE_URL
+        self.model_name = model_name
+        self.name = f"openai:{model_name}"
+        self.scheduler = scheduler or get_scheduler(f"openai:{base_url}")
+
+        # Retries are owned by the scheduler, as for Groq
+        self.client = OpenAI(
+            base_url=base_url,
+            api_key=api_key or Config.OPENAI_COMPAT_API_KEY,
+            max_retries=0,
+            http_client=httpx.Client(
+                event_hooks={"response": [self.scheduler.observe_response]}
+            ),
+        )
+
+    def complete(
+        self, messages, priority=PRIORITY_NORMAL, on_first_token=None, cancelled=None
+    ):
+        def call():
+            _check_cancelled(cancelled, self.name)
+            if on_first_token is None:
+                response = self.client.chat.completions.create(
+                    model=self.model_name,
+                    messages=messages,
+                    temperature=0.7,
+                    max_tokens=Config.LLM_MAX_TOKENS,
+                )
+                return response.choices[0].message.content, usage_from_response(
+                    response
+                )
+
+            parts = []
+            usage = {}
+            stream = self.client.chat.completions.create(
+                model=self.model_name,
+                messages=messages,
+                temperature=0.7,
+                max_tokens=Config.LLM_MAX_TOKENS,
+                stream=True,
+                # The final chunk carries the usage and no choices
+                stream_options={"include_usage": True},
+            )
+            try:
+                for chunk in stream:
+                    _check_cancelled(cancelled, self.name)
+                    if getattr(chunk, "usage", None) is not None:
+                        usage = usage_from_response(chunk)
+                    if not chunk.choices:
+                        continue
+                    delta = chunk.choices[0].delta.content or ""
+                    if delta and not parts:
+                        on_first_token()
+                    parts.append(delta)
+            finally:
+                # Closes the HTTP response when the stream is abandoned
+                stream.close()
+            return "".join(parts), usage
+
+        return self.scheduler.submit(
+            call, priority=priority, estimated_tokens=_estimated_tokens(messages)
+        )
+
+
+class StubBackend(LLMBackend):
+    """Local backend with a canned answer, for tests and offline runs"""
+
+    def __init__(
+        self,
+        answer: str = "This is a stub answer.",
+        name: str = "stub",
+        first_token_delay: float = 0.0,
+        total_delay: float = 0.0,
+        error: Exception = None,
+    ):
+        """
+        Initialize stub backend
+
+        Args:
+            answer: Text returned by every call
+            name: Backend name used in routing stats
+            first_token_delay: Seconds before the first token
+            total_delay: Seconds before the call returns
+            error: Exception to raise instead of answering
+        """
+        self.answer = answer
+        self.name = name
+        self.first_token_delay = first_token_delay
+        self.total_delay = max(total_delay, first_token_delay)
+        self.error = error
+        self.cancelled_calls = 0
+
+    def complete(
+        self, messages, priority=PRIORITY_NORMAL, on_first_token=None, cancelled=None
+    ):
+        self._sleep(self.first_token_delay, cancelled)
+        if self.error is not None:
+            raise self.error
+        if on_first_token is not None:
+            on_first_token()
+        self._sleep(self.total_delay - self.first_token_delay, cancelled)
+        return self.answer, {"completion_tokens": count_tokens(self.answer)}
+
+    def _sleep(self, seconds: float, cancelled: Optional[threading.Event]):
+        if cancelled is None:
+            time.sleep(seconds)
+        elif cancelled.wait(seconds):
+            self.cancelled_calls += 1
+            raise CallCancelled(self.name)
+
+
+def _check_cancelled(cancelled: Optional[threading.Event], name: str):
+    if cancelled is not None and cancelled.is_set():
+        raise CallCancelled(name)
+
+
+def _estimated_tokens(messages: List[Dict[str, str]]) -> int:
+    """Prompt plus maximum completion tokens, charged against the quota"""
+    return sum(count_tokens(m["content"]) for m in messages) + Config.LLM_MAX_TOKENS
+
+
+def build_backends(spec: str = None) -> List[LLMBackend]:
+    """
+    Build backends from a comma-separated spec
+
+    Entries look like "groq:<model>", "openai:<model>" or "stub[:<answer>]".
+
+    Args:
+        spec: Backend spec (defaults to Config.LLM_BACKENDS)
+
+    Returns:
+        List of LLMBackend instances, in preference order
+    """
+    spec = spec or Config.LLM_BACKENDS
+    backends = []
+
+    for entry in filter(None, (part.strip() for part in spec.split(","))):
+        kind, _, model = entry.partition(":")
+        if kind == "groq":
+            backends.append(GroqBackend(model or None))
+        elif kind == "openai":
+            backends.append(OpenAICompatibleBackend(model))
+        elif kind == "stub":
+            backends.append(StubBackend(model or "This is a stub answer."))
+        else:
+            raise ValueError(f"Unknown LLM backend: {entry}")
+
+    if not backends:
+        raise ValueError("LLM_BACKENDS is empty")
+
+    logger.info(f"✓ LLM backends: {', '.join(b.name for b in backends)}")
+    return backends
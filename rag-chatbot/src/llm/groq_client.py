@@ -1,80 +1,141 @@
-from langchain_groq import ChatGroq
-from langchain.prompts import ChatPromptTemplate
+from src.llm.backends import GroqBackend, build_backends
+from src.llm.prompts import PROMPTS
+from src.llm.router import LLMRouter
+from src.llm.scheduler import PRIORITY_BACKGROUND, PRIORITY_NORMAL
 from src.utils.config import Config
+from src.utils.tracing import span
 import logging
 
 logger = logging.getLogger(__name__)
 
 
 class GroqClient:
-    """Groq LLM client for answer generation"""
+    """LLM client for answer generation (Groq first, with failover backends)"""
 
-    def __init__(self, model_name: str = None):
+    def __init__(self, model_name: str = None, router: LLMRouter = None):
         """
-        Initialize Groq client
+        Initialize LLM client
 
         Args:
-            model_name: Name of the Groq model to use
+            model_name: Use only this Groq model instead of Config.LLM_BACKENDS
+            router: Prebuilt LLMRouter (e.g. with stub backends for tests)
         """
         self.model_name = model_name or Config.LLM_MODEL
-        self.llm = None
-        self._initialize_llm()
+        self.router = router
+        if self.router is None:
+            self._initialize_llm(model_name)
 
-    def _initialize_llm(self):
-        """Initialize the Groq LLM"""
+    def _initialize_llm(self, model_name: str = None):
+        """Initialize the LLM backends and router"""
         try:
-            logger.info(f"Initializing Groq LLM: {self.model_name}")
+            logger.info("Initializing LLM backends...")
 
-            self.llm = ChatGroq(
-                api_key=Config.GROQ_API_KEY,
-                model=self.model_name,
-                temperature=0.7,
-                max_tokens=1024,
-            )
+            backends = [GroqBackend(model_name)] if model_name else build_backends()
+            self.router = LLMRouter(backends)
 
-            logger.info("✓ Groq LLM initialized successfully")
+            logger.info("✓ LLM router initialized successfully")
 
         except Exception as e:
-            logger.error(f"Failed to initialize Groq LLM: {str(e)}")
+            logger.error(f"Failed to initialize LLM backends: {str(e)}")
             raise
 
-    def generate_answer(self, query: str, context: str) -> str:
+    def generate_answer(
+        self,
+        query: str,
+        context: str,
+        priority: int = PRIORITY_NORMAL,
+        history: str = None,
+    ) -> str:
         """
         Generate an answer using the LLM
 
         Args:
             query: User's question
             context: Retrieved context from documents
+            priority: Scheduler priority (lower runs first)
+            history: Conversation summary and recent turns, if any
 
         Returns:
             Generated answer as string
         """
-        try:
-            # Create prompt template
-            prompt_template = ChatPromptTemplate.from_template(
-                """You are a helpful AI assistant. Answer the question based on the context provided.
-If the answer cannot be found in the context, say "I don't have enough information to answer that question."
+        answer, _ = self.generate_answer_with_usage(query, context, priority, history)
+        return answer
+
+    def generate_answer_with_usage(
+        self,
+        query: str,
+        context: str,
+        priority: int = PRIORITY_NORMAL,
+        history: str = None,
+    ):
+        """
+        Generate an answer and report prompt token counts
 
-Context:
-{context}
+        Args:
+            query: User's question
+            context: Retrieved context from documents
+            priority: Scheduler priority (lower runs first)
+            history: Conversation summary and recent turns, if any
 
-Question: {question}
+        Returns:
+            Tuple (answer, usage dict)
 
-Answer:"""
+        Raises:
+            LLMOverloadedError: When every backend sheds the request
+        """
+        try:
+            # Static instructions and per-request context go in separate messages
+            if history:
+                prompt = PROMPTS.get("rag_answer_conversational")
+                messages = prompt.render(
+                    history=history, context=context, question=query
+                )
+            else:
+                prompt = PROMPTS.get("rag_answer")
+                messages = prompt.render(context=context, question=query)
+            usage = prompt.token_counts(messages)
+
+            # Route to the healthiest backend (retries/rate limits per backend)
+            with span(
+                "GroqClient.generate_answer",
+                **{
+                    "llm.prompt": prompt.name,
+                    "llm.prompt_version": prompt.version,
+                    "llm.priority": priority,
+                },
+            ) as llm_span:
+                answer, provider_usage = self.router.complete(
+                    messages, priority=priority
+                )
+                usage.update(provider_usage)
+                llm_span.set_attribute("llm.backend", usage["backend"])
+
+            logger.info(
+                f"✓ Answer generated successfully by {usage['backend']} "
+                f"(prompt tokens: {usage['static_prompt_tokens']} static + "
+                f"{usage['dynamic_prompt_tokens']} per-request)"
             )
-
-            # Format the prompt
-            formatted_prompt = prompt_template.format(context=context, question=query)
-
-            # Generate response
-            response = self.llm.invoke(formatted_prompt)
-
-            # Extract the text content
-            answer = response.content if hasattr(response, "content") else str(response)
-
-            logger.info("✓ Answer generated successfully")
-            return answer
+            return answer, usage
 
         except Exception as e:
             logger.error(f"Error generating answer: {str(e)}")
             raise
+
+    def summarize_conversation(self, summary: str, turns: list) -> str:
+        """
+        Fold conversation turns into a running summary
+
+        Args:
+            summary: Existing summary (may be empty)
+            turns: List of {"question", "answer"} dicts to merge
+
+        Returns:
+            Updated summary, at most Config.CONVERSATION_SUMMARY_CHARS long
+        """
+        prompt = PROMPTS.get("conversation_summary")
+        turns_text = "\n".join(
+            f"User: {turn['question']}\nAssistant: {turn['answer']}" for turn in turns
+        )
+        messages = prompt.render(summary=summary or "(none)", turns=turns_text)
+        text, _ = self.router.complete(messages, priority=PRIORITY_BACKGROUND)
+        return text.strip()[: Config.CONVERSATION_SUMMARY_CHARS]
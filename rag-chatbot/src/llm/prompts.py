@@ -0,0 +1,186 @@
+"""
+Prompt registry with templates compiled once at import time
+Static instructions go in the system message and per-request content in the
+user message, so providers can reuse the cached system-prompt prefix
+"""
+
+import hashlib
+from string import Formatter
+from typing import Dict, List
+import logging
+
+logger = logging.getLogger(__name__)
+
+try:
+    import tiktoken
+
+    _encoding = tiktoken.get_encoding("cl100k_base")
+except Exception:  # tiktoken is optional
+    _encoding = None
+
+
+def count_tokens(text: str) -> int:
+    """
+    Count prompt tokens (approximate for non-OpenAI models)
+
+    Uses tiktoken when installed, otherwise ~4 characters per token.
+    """
+    if _encoding is not None:
+        return len(_encoding.encode(text))
+    return max(1, len(text) // 4) if text else 0
+
+
+class PromptTemplate:
+    """A static system message plus a per-request user message template"""
+
+    def __init__(self, name: str, system: str, user_template: str):
+        """
+        Compile a prompt template
+
+        Args:
+            name: Registry name
+            system: Static system instructions (identical across requests)
+            user_template: str.format template for per-request content
+        """
+        self.name = name
+        self.system = system
+        self.user_template = user_template
+        self.fields = {
+            field for _, field, _, _ in Formatter().parse(user_template) if field
+        }
+        self.system_tokens = count_tokens(system)
+        # Content hash, changes whenever the wording does (traces/metrics label)
+        self.version = hashlib.sha1(
+            f"{system}\0{user_template}".encode("utf-8")
+        ).hexdigest()[:8]
+
+    def render(self, **variables) -> List[Dict[str, str]]:
+        """
+        Build chat messages for one request
+
+        Returns:
+            List of {"role", "content"} message dicts
+        """
+        missing = self.fields - variables.keys()
+        if missing:
+            raise KeyError(f"Prompt '{self.name}' missing variables: {sorted(missing)}")
+
+        return [
+            {"role": "system", "content": self.system},
+            {"role": "user", "content": self.user_template.format(**variables)},
+        ]
+
+    def token_counts(self, messages: List[Dict[str, str]]) -> dict:
+        """Static, per-request and total prompt tokens for rendered messages"""
+        dynamic = count_tokens(messages[-1]["content"])
+        return {
+            "static_prompt_tokens": self.system_tokens,
+            "dynamic_prompt_tokens": dynamic,
+            "prompt_tokens": self.system_tokens + dynamic,
+        }
+
+
+class PromptRegistry:
+    """Named, precompiled prompt templates"""
+
+    def __init__(self):
+        self._prompts: Dict[str, PromptTemplate] = {}
+
+    def register(self, name: str, system: str, user_template: str) -> PromptTemplate:
+        """Compile and store a template under name (replaces an older version)"""
+        prompt = PromptTemplate(name, system, user_template)
+        self._prompts[name] = prompt
+        logger.info(
+            f"✓ Registered prompt '{name}' v{prompt.version} "
+            f"({prompt.system_tokens} static tokens)"
+        )
+        return prompt
+
+    def get(self, name: str) -> PromptTemplate:
+        """Look up a registered template"""
+        return self._prompts[name]
+
+
+def usage_from_response(response) -> dict:
+    """
+    Extract provider-reported token usage from a Groq or LangChain response
+
+    Returns:
+        Dictionary with prompt/completion token counts (empty if unavailable)
+    """
+    usage = getattr(response, "usage", None)
+    if usage is not None:
+        return {
+            "provider_prompt_tokens": getattr(usage, "prompt_tokens", None),
+            "completion_tokens": getattr(usage, "completion_tokens", None),
+        }
+
+    usage = getattr(response, "usage_metadata", None)
+    if usage:
+        return {
+            "provider_prompt_tokens": usage.get("input_tokens"),
+            "completion_tokens": usage.get("output_tokens"),
+        }
+
+    return {}
+
+
+PROMPTS = PromptRegistry()
+
+PROMPTS.register(
+    "rag_answer",
+    system=(
+        "You are a helpful AI assistant. Answer the question based on the context provided.\n"
+        "If the answer cannot be found in the context, say \"I don't have enough "
+        'information to answer that question."'
+    ),
+    user_template="""Context:
+{context}
+
+Question: {question}
+
+Answer:""",
+)
+
+PROMPTS.register(
+    "rag_answer_conversational",
+    system=PROMPTS.get("rag_answer").system
+    + "\nUse the conversation so far to resolve follow-up questions.",
+    user_template="""Conversation so far:
+{history}
+
+Context:
+{context}
+
+Question: {question}
+
+Answer:""",
+)
+
+PROMPTS.register(
+    "conversation_summary",
+    system=(
+        "You maintain a running summary of a first aid chat. Merge the new turns "
+        "into the existing summary. Keep the situation, the people involved (age, "
+        "condition) and advice already given. Reply with the summary only, in at "
+        "most 120 words."
+    ),
+    user_template="""Existing summary:
+{summary}
+
+New turns:
+{turns}""",
+)
+
+PROMPTS.register(
+    "condense_question",
+    system=(
+        "Rewrite the user's follow-up question as a standalone search query for a "
+        "first aid knowledge base, using the conversation for missing details. "
+        "Reply with the query only, on one line."
+    ),
+    user_template="""Conversation:
+{history}
+
+Follow-up question: {question}""",
+)
@@ -0,0 +1,268 @@
+"""
+Health-weighted routing, failover and hedged requests across LLM backends
+"""
+
+import random
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import List
+from src.llm.backends import LLMBackend
+from src.llm.scheduler import CallCancelled, PRIORITY_NORMAL
+from src.utils.config import Config
+from src.utils.tracing import span, wrap_context
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class BackendHealth:
+    """Rolling latency and success statistics for one backend"""
+
+    def __init__(self, window: int = 200, alpha: float = 0.2):
+        self.alpha = alpha
+        self.latency = None
+        self.success_rate = 1.0
+        self.consecutive_failures = 0
+        self.open_until = 0.0
+        self.first_token_times = deque(maxlen=window)
+        self.calls = 0
+        self.failures = 0
+        self._lock = threading.Lock()
+
+    def record_success(self, latency: float, first_token: float = None):
+        with self._lock:
+            self.calls += 1
+            self.consecutive_failures = 0
+            self.success_rate += self.alpha * (1.0 - self.success_rate)
+            self.latency = (
+                latency
+                if self.latency is None
+                else self.latency + self.alpha * (latency - self.latency)
+            )
+            self.first_token_times.append(first_token or latency)
+
+    def record_failure(self):
+        with self._lock:
+            self.calls += 1
+            self.failures += 1
+            self.consecutive_failures += 1
+            self.success_rate -= self.alpha * self.success_rate
+            if self.consecutive_failures >= Config.LLM_FAILURES_TO_OPEN:
+                # Circuit open: skip this backend while others are available
+                self.open_until = time.monotonic() + Config.LLM_OPEN_SECONDS
+
+    def weight(self) -> float:
+        """Routing weight: high success rate and low latency win"""
+        if time.monotonic() < self.open_until:
+            return 0.0
+        return max(self.success_rate, 0.01) / max(self.latency or 1.0, 0.05)
+
+    def p95_first_token(self):
+        """95th percentile time to first token, or None without enough samples"""
+        with self._lock:
+            if len(self.first_token_times) < Config.LLM_HEDGE_MIN_SAMPLES:
+                return None
+            samples = sorted(self.first_token_times)
+        return samples[min(len(samples) - 1, int(len(samples) * 0.95))]
+
+    def snapshot(self) -> dict:
+        return {
+            "calls": self.calls,
+            "failures": self.failures,
+            "success_rate": round(self.success_rate, 3),
+            "latency": round(self.latency, 3) if self.latency is not None else None,
+            "p95_first_token": self.p95_first_token(),
+            "open": time.monotonic() < self.open_until,
+        }
+
+
+class LLMRouter:
+    """Routes completions across backends with failover and optional hedging"""
+
+    def __init__(self, backends: List[LLMBackend], hedging: bool = None):
+        """
+        Initialize router
+
+        Args:
+            backends: Backends in preference order
+            hedging: Fire a second request when the first is slow to start
+                (defaults to Config.LLM_HEDGING)
+        """
+        if not backends:
+            raise ValueError("LLMRouter needs at least one backend")
+
+        self.backends = list(backends)
+        self.hedging = Config.LLM_HEDGING if hedging is None else hedging
+        self.health = {backend.name: BackendHealth() for backend in self.backends}
+        self.hedges_fired = 0
+        self.hedges_won = 0
+        self.hedges_cancelled = 0
+        self._executor = None
+        self._executor_lock = threading.Lock()
+
+    def complete(self, messages, priority: int = PRIORITY_NORMAL):
+        """
+        Generate a completion from the healthiest available backend
+
+        Args:
+            messages: List of {"role", "content"} message dicts
+            priority: Scheduler priority (lower runs first)
+
+        Returns:
+            Tuple (answer text, usage dict including the serving backend)
+        """
+        order = self._ranked()
+
+        if self.hedging and len(order) > 1:
+            return self._complete_hedged(order, messages, priority)
+
+        last_error = None
+        for backend in order:
+            try:
+                return self._call(backend, messages, priority)
+            except Exception as e:
+                last_error = e
+                logger.warning(f"LLM backend {backend.name} failed: {str(e)}")
+        raise last_error
+
+    def stats(self) -> dict:
+        return {
+            "backends": {name: h.snapshot() for name, h in self.health.items()},
+            "hedging": self.hedging,
+            "hedges_fired": self.hedges_fired,
+            "hedges_won": self.hedges_won,
+            "hedges_cancelled": self.hedges_cancelled,
+        }
+
+    def _ranked(self) -> List[LLMBackend]:
+        """Weighted random order; open circuits go last"""
+        weights = {b.name: self.health[b.name].weight() for b in self.backends}
+        available = [b for b in self.backends if weights[b.name] > 0]
+        unavailable = [b for b in self.backends if weights[b.name] <= 0]
+
+        # Weighted sampling without replacement (Efraimidis-Spirakis keys)
+        available.sort(
+            key=lambda b: random.random() ** (1.0 / weights[b.name]), reverse=True
+        )
+        unavailable.sort(key=lambda b: self.health[b.name].open_until)
+        return available + unavailable
+
+    def _call(
+        self,
+        backend: LLMBackend,
+        messages,
+        priority,
+        on_first_token=None,
+        cancelled: threading.Event = None,
+    ):
+        """Call one backend and record its health (cancelled calls are not recorded)"""
+        health = self.health[backend.name]
+        started = time.monotonic()
+        first_token = []
+
+        def mark_first_token():
+            first_token.append(time.monotonic() - started)
+            if on_first_token is not None:
+                on_first_token()
+
+        try:
+            with span("llm.backend", **{"llm.backend": backend.name}) as call_span:
+                answer, usage = backend.complete(
+                    messages,
+                    priority=priority,
+                    on_first_token=mark_first_token if on_first_token else None,
+                    cancelled=cancelled,
+                )
+                if first_token:
+                    call_span.set_attribute(
+                        "llm.first_token_ms", round(first_token[0] * 1000, 1)
+                    )
+        except CallCancelled:
+            raise
+        except Exception:
+            health.record_failure()
+            raise
+
+        health.record_success(
+            time.monotonic() - started, first_token[0] if first_token else None
+        )
+        usage = dict(usage)
+        usage["backend"] = backend.name
+        return answer, usage
+
+    def _complete_hedged(self, order, messages, priority):
+        """Start the best backend; add the next one if it has not started in time"""
+        primary, fallbacks = order[0], list(order[1:])
+        executor = self._get_executor()
+        delay = self.health[primary.name].p95_first_token() or Config.LLM_HEDGE_DELAY
+
+        started = threading.Event()
+        cancelled = threading.Event()
+        primary_future = executor.submit(
+            wrap_context(self._call),
+            primary,
+            messages,
+            priority,
+            started.set,
+            cancelled,
+        )
+        primary_future.add_done_callback(lambda _: started.set())
+        pending = {primary_future: primary}
+
+        if not started.wait(delay):
+            hedge = fallbacks.pop(0)
+            self.hedges_fired += 1
+            logger.info(
+                f"No token from {primary.name} after {delay:.2f}s, hedging to {hedge.name}"
+            )
+            hedge_future = executor.submit(
+                wrap_context(self._call),
+                hedge,
+                messages,
+                priority,
+                lambda: None,
+                cancelled,
+            )
+            pending[hedge_future] = hedge
+
+        last_error = None
+        while pending:
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                backend = pending.pop(future)
+                try:
+                    result = future.result()
+                except Exception as e:
+                    last_error = e
+                    logger.warning(f"LLM backend {backend.name} failed: {str(e)}")
+                    continue
+                if backend is not primary:
+                    self.hedges_won += 1
+                if pending:
+                    # Stop the loser instead of paying for its full answer
+                    cancelled.set()
+                    for loser in pending:
+                        loser.cancel()
+                    self.hedges_cancelled += 1
+                return result
+
+        # Every in-flight attempt failed; fall back through the rest in order
+        for backend in fallbacks:
+            try:
+                return self._call(backend, messages, priority)
+            except Exception as e:
+                last_error = e
+                logger.warning(f"LLM backend {backend.name} failed: {str(e)}")
+        raise last_error
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        # Created on first use so gunicorn's preload fork never copies its threads
+        with self._executor_lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=Config.LLM_HEDGE_WORKERS,
+                    thread_name_prefix="llm-hedge",
+                )
+        return self._executor
@@ -0,0 +1,343 @@
+"""
+Client-side scheduler for rate-limited LLM providers
+Tracks request/token quotas from response headers, orders waiting calls by
+priority, retries transient failures with jittered backoff and sheds load
+early instead of letting workers hang until they time out
+"""
+
+import heapq
+import itertools
+import random
+import re
+import threading
+import time
+from typing import Callable, Optional
+from src.utils.config import Config
+import logging
+
+logger = logging.getLogger(__name__)
+
+PRIORITY_EMERGENCY = 0
+PRIORITY_NORMAL = 10
+PRIORITY_BACKGROUND = 20
+
+_RETRYABLE_STATUS = {429, 500, 502, 503, 504}
+_DURATION_PART = re.compile(r"(\d+(?:\.\d+)?)(ms|h|m|s)")
+
+
+class LLMOverloadedError(Exception):
+    """Raised when an LLM call is shed instead of queued or retried"""
+
+    def __init__(self, message: str, retry_after: float = 1.0):
+        super().__init__(message)
+        self.retry_after = max(1, int(retry_after + 0.999))
+
+
+class CallCancelled(Exception):
+    """Raised inside a call its caller no longer needs (a losing hedge)"""
+
+
+def parse_duration(value) -> Optional[float]:
+    """
+    Parse provider reset durations such as "7.66s", "2m59.56s" or "250ms"
+
+    Returns:
+        Seconds as float, or None if the value is missing/unparseable
+    """
+    if value is None:
+        return None
+    value = str(value).strip()
+    try:
+        return float(value)
+    except ValueError:
+        pass
+
+    units = {"h": 3600.0, "m": 60.0, "s": 1.0, "ms": 0.001}
+    parts = _DURATION_PART.findall(value)
+    if not parts:
+        return None
+    return sum(float(amount) * units[unit] for amount, unit in parts)
+
+
+class LLMScheduler:
+    """Priority queue, quota tracking and retry policy for one API key"""
+
+    def __init__(
+        self,
+        max_concurrency: int = None,
+        max_queue: int = None,
+        max_wait: float = None,
+        max_retries: int = None,
+        backoff_base: float = None,
+        backoff_max: float = None,
+    ):
+        """
+        Initialize scheduler (defaults come from Config)
+
+        Args:
+            max_concurrency: Calls allowed in flight at once
+            max_queue: Calls allowed to wait; more are rejected immediately
+            max_wait: Seconds a call may spend queued, waiting on quota or retrying
+            max_retries: Retries after the first attempt
+            backoff_base: First backoff ceiling in seconds
+            backoff_max: Largest backoff ceiling in seconds
+        """
+        self.max_concurrency = max_concurrency or Config.LLM_MAX_CONCURRENCY
+        self.max_queue = max_queue if max_queue is not None else Config.LLM_MAX_QUEUE
+        self.max_wait = max_wait or Config.LLM_MAX_WAIT
+        self.max_retries = (
+            max_retries if max_retries is not None else Config.LLM_MAX_RETRIES
+        )
+        self.backoff_base = backoff_base or Config.LLM_BACKOFF_BASE
+        self.backoff_max = backoff_max or Config.LLM_BACKOFF_MAX
+
+        self._cond = threading.Condition()
+        self._waiting = []
+        self._sequence = itertools.count()
+        self._active = 0
+
+        # Quota snapshot from the latest response headers
+        self._remaining_requests = None
+        self._remaining_tokens = None
+        self._requests_reset_at = 0.0
+        self._tokens_reset_at = 0.0
+        self._retry_after_until = 0.0
+
+        self.counters = {
+            "submitted": 0,
+            "completed": 0,
+            "failed": 0,
+            "cancelled": 0,
+            "shed": 0,
+            "retries": 0,
+            "rate_limited": 0,
+        }
+
+    def observe_headers(self, headers):
+        """
+        Update quota state from provider response headers
+
+        Args:
+            headers: Mapping of response headers (case-insensitive keys)
+        """
+        now = time.monotonic()
+        lowered = {str(k).lower(): v for k, v in dict(headers).items()}
+
+        with self._cond:
+            if "x-ratelimit-remaining-requests" in lowered:
+                self._remaining_requests = int(
+                    float(lowered["x-ratelimit-remaining-requests"])
+                )
+            if "x-ratelimit-remaining-tokens" in lowered:
+                self._remaining_tokens = int(
+                    float(lowered["x-ratelimit-remaining-tokens"])
+                )
+
+            reset = parse_duration(lowered.get("x-ratelimit-reset-requests"))
+            if reset is not None:
+                self._requests_reset_at = now + reset
+            reset = parse_duration(lowered.get("x-ratelimit-reset-tokens"))
+            if reset is not None:
+                self._tokens_reset_at = now + reset
+            retry_after = parse_duration(lowered.get("retry-after"))
+            if retry_after is not None:
+                self._retry_after_until = now + retry_after
+
+    def observe_response(self, response):
+        """httpx response event hook"""
+        self.observe_headers(response.headers)
+
+    def submit(
+        self,
+        fn: Callable,
+        priority: int = PRIORITY_NORMAL,
+        estimated_tokens: int = 0,
+    ):
+        """
+        Run an LLM call under the scheduler
+
+        Args:
+            fn: Zero-argument callable performing the provider request
+            priority: Lower runs first (PRIORITY_EMERGENCY before PRIORITY_NORMAL)
+            estimated_tokens: Prompt + completion tokens the call may consume
+
+        Returns:
+            Whatever fn returns
+
+        Raises:
+            LLMOverloadedError: When the call is shed
+        """
+        deadline = time.monotonic() + self.max_wait
+        self.counters["submitted"] += 1
+
+        self._acquire(priority, deadline)
+        try:
+            attempt = 0
+            while True:
+                self._wait_for_quota(estimated_tokens, deadline)
+                try:
+                    result = fn()
+                    self.counters["completed"] += 1
+                    return result
+                except CallCancelled:
+                    self.counters["cancelled"] += 1
+                    raise
+                except Exception as e:
+                    status = _status_code(e)
+                    if not _is_retryable(e, status):
+                        self.counters["failed"] += 1
+                        raise
+
+                    if status == 429:
+                        self.counters["rate_limited"] += 1
+                        response = getattr(e, "response", None)
+                        if response is not None:
+                            self.observe_headers(response.headers)
+
+                    if attempt >= self.max_retries:
+                        self._shed(
+                            f"LLM provider still unavailable after {attempt + 1} attempts",
+                            self._backoff(attempt),
+                        )
+
+                    delay = max(self._backoff(attempt), self._quota_delay(0))
+                    if time.monotonic() + delay > deadline:
+                        self._shed("LLM provider is rate limiting requests", delay)
+
+                    attempt += 1
+                    self.counters["retries"] += 1
+                    logger.warning(
+                        f"LLM call failed ({status or type(e).__name__}), "
+                        f"retry {attempt}/{self.max_retries} in {delay:.2f}s"
+                    )
+                    time.sleep(delay)
+        finally:
+            self._release()
+
+    def stats(self) -> dict:
+        """Queue depth, quota snapshot and counters"""
+        with self._cond:
+            return {
+                "active": self._active,
+                "queued": len(self._waiting),
+                "remaining_requests": self._remaining_requests,
+                "remaining_tokens": self._remaining_tokens,
+                **self.counters,
+            }
+
+    def _acquire(self, priority: int, deadline: float):
+        """Wait for a concurrency slot, highest priority first"""
+        with self._cond:
+            if len(self._waiting) >= self.max_queue:
+                self._shed("LLM request queue is full", self._quota_delay(0) or 1.0)
+
+            ticket = (priority, next(self._sequence))
+            heapq.heappush(self._waiting, ticket)
+            try:
+                while (
+                    self._active >= self.max_concurrency or self._waiting[0] != ticket
+                ):
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        self._shed("Timed out waiting for LLM capacity", 1.0)
+                    self._cond.wait(remaining)
+            except BaseException:
+                self._waiting.remove(ticket)
+                heapq.heapify(self._waiting)
+                self._cond.notify_all()
+                raise
+
+            heapq.heappop(self._waiting)
+            self._active += 1
+            self._cond.notify_all()
+
+    def _release(self):
+        with self._cond:
+            self._active -= 1
+            self._cond.notify_all()
+
+    def _quota_delay(self, estimated_tokens: int) -> float:
+        """Seconds until the tracked quota admits another call"""
+        now = time.monotonic()
+        delay = max(self._retry_after_until - now, 0.0)
+
+        if self._remaining_requests is not None and self._remaining_requests <= 0:
+            delay = max(delay, self._requests_reset_at - now)
+        if (
+            self._remaining_tokens is not None
+            and self._remaining_tokens < estimated_tokens
+        ):
+            delay = max(delay, self._tokens_reset_at - now)
+
+        return max(delay, 0.0)
+
+    def _wait_for_quota(self, estimated_tokens: int, deadline: float):
+        """Sleep until quota resets, or shed if that would miss the deadline"""
+        with self._cond:
+            delay = self._quota_delay(estimated_tokens)
+        if delay <= 0:
+            self._reserve(estimated_tokens)
+            return
+        if time.monotonic() + delay > deadline:
+            self._shed("LLM quota exhausted", delay)
+
+        logger.info(f"LLM quota exhausted, waiting {delay:.2f}s for reset")
+        time.sleep(delay)
+        with self._cond:
+            # The reset has passed; fresh numbers arrive with the next response
+            self._remaining_requests = None
+            self._remaining_tokens = None
+        self._reserve(estimated_tokens)
+
+    def _reserve(self, estimated_tokens: int):
+        """Optimistically charge a call against the quota snapshot"""
+        with self._cond:
+            if self._remaining_requests is not None:
+                self._remaining_requests -= 1
+            if self._remaining_tokens is not None:
+                self._remaining_tokens -= estimated_tokens
+
+    def _backoff(self, attempt: int) -> float:
+        """Full-jitter exponential backoff"""
+        ceiling = min(self.backoff_max, self.backoff_base * (2**attempt))
+        return random.uniform(0, ceiling)
+
+    def _shed(self, message: str, retry_after: float):
+        self.counters["shed"] += 1
+        logger.warning(f"Shedding LLM call: {message}")
+        raise LLMOverloadedError(message, retry_after=retry_after)
+
+
+def _status_code(error: Exception) -> Optional[int]:
+    status = getattr(error, "status_code", None)
+    if status is None:
+        response = getattr(error, "response", None)
+        status = getattr(response, "status_code", None)
+    return status
+
+
+def _is_retryable(error: Exception, status: Optional[int]) -> bool:
+    if status is not None:
+        return status in _RETRYABLE_STATUS
+    name = type(error).__name__
+    return "Connection" in name or "Timeout" in name
+
+
+_schedulers = {}
+_scheduler_lock = threading.Lock()
+
+
+def get_scheduler(provider: str = "groq") -> LLMScheduler:
+    """
+    Process-wide scheduler shared by every client using the same API key
+
+    Args:
+        provider: Quota owner; each provider's limits are tracked separately
+
+    Returns:
+        LLMScheduler for that provider
+    """
+    with _scheduler_lock:
+        if provider not in _schedulers:
+            _schedulers[provider] = LLMScheduler()
+    return _schedulers[provider]
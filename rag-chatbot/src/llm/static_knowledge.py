@@ -0,0 +1,138 @@
+"""
+Built-in first aid knowledge for the minimal (no vector store) profile
+The whole knowledge base is the static system prompt, so providers can reuse
+the cached prefix and only the question varies per request
+"""
+
+from src.llm.prompts import PROMPTS
+
+FIRST_AID_KNOWLEDGE = """
+COMPREHENSIVE FIRST AID GUIDE
+
+=== EMERGENCY PROCEDURES ===
+
+1. CPR (Cardiopulmonary Resuscitation):
+- Check for responsiveness (tap shoulders, shout "Are you OK?")
+- Call 911 immediately
+- Place heel of hand on center of chest, between nipples
+- Push hard and fast at least 2 inches deep
+- 30 chest compressions at 100-120 per minute
+- Tilt head back, lift chin, give 2 rescue breaths
+- Continue cycles until help arrives
+
+2. Choking (Heimlich Maneuver):
+- Ask "Are you choking?" 
+- If conscious: 5 back blows between shoulder blades
+- If still choking: 5 abdominal thrusts (hands below ribcage, thrust upward)
+- Alternate back blows and abdominal thrusts
+- If unconscious: begin CPR
+
+3. Severe Bleeding:
+- Apply direct pressure with clean cloth
+- Elevate injured area above heart level if possible
+- Don't remove embedded objects
+- Apply pressure around the object
+- Call 911 for severe bleeding
+
+4. Burns:
+- Cool with running water for 10-20 minutes
+- Remove from heat source immediately
+- Do NOT use ice, butter, or oils
+- Cover with clean, dry cloth
+- For severe burns (3rd degree): Call 911
+
+5. Shock:
+- Lay person down, elevate legs 12 inches
+- Keep warm with blankets
+- Don't give food or water
+- Monitor breathing and pulse
+- Call 911
+
+=== COMMON INJURIES ===
+
+6. Sprains and Strains:
+- R.I.C.E method: Rest, Ice, Compression, Elevation
+- Ice for 15-20 minutes every 2-3 hours
+- Wrap with elastic bandage (not too tight)
+- Elevate above heart level
+
+7. Cuts and Scrapes:
+- Clean hands before treating wound
+- Stop bleeding with direct pressure
+- Clean wound with water
+- Apply antibiotic ointment if available
+- Cover with sterile bandage
+
+8. Nosebleeds:
+- Sit upright, lean slightly forward
+- Pinch soft part of nose for 10-15 minutes
+- Breathe through mouth
+- Don't tilt head back or lie down
+
+9. Eye Injuries:
+- Don't rub the eye
+- Flush with clean water for 15 minutes
+- Cover both eyes to prevent movement
+- Seek medical attention immediately
+
+=== MEDICAL EMERGENCIES ===
+
+10. Heart Attack Signs:
+- Chest pain or pressure
+- Pain in arm, neck, jaw, back
+- Shortness of breath, nausea
+- Call 911 immediately
+- Give aspirin if not allergic
+
+11. Stroke Signs (F.A.S.T.):
+- Face: Drooping on one side
+- Arms: Weakness in one arm
+- Speech: Slurred or strange
+- Time: Call 911 immediately
+
+12. Seizures:
+- Don't restrain the person
+- Clear area of dangerous objects
+- Time the seizure
+- Turn on side when seizure ends
+- Call 911 if seizure lasts over 5 minutes
+
+13. Allergic Reactions:
+- Remove or avoid allergen
+- Use EpiPen if available
+- Call 911 for severe reactions
+- Monitor breathing
+
+=== EMERGENCY NUMBERS ===
+- Emergency: 911
+- Poison Control: 1-800-222-1222
+
+=== BASIC FIRST AID KIT ===
+- Bandages (various sizes)
+- Gauze pads and tape
+- Antiseptic wipes
+- Thermometer
+- Instant cold packs
+- Elastic bandages
+- Scissors and tweezers
+- Emergency contact numbers
+"""
+
+STATIC_PROMPT = PROMPTS.register(
+    "first_aid_static",
+    system=f"""You are an expert first aid assistant. Use the comprehensive knowledge base below to answer first aid and medical emergency questions.
+
+KNOWLEDGE BASE:
+{FIRST_AID_KNOWLEDGE}
+
+INSTRUCTIONS:
+- Provide clear, step-by-step first aid instructions
+- Always emphasize calling 911 for serious emergencies
+- Be specific and practical
+- If the question isn't about first aid, still try to help but mention your specialty
+- Keep responses under 300 words but be thorough
+- Use bullet points for steps when appropriate""",
+    user_template="""USER QUESTION: {question}
+
+RESPONSE:""",
+)
@@ -0,0 +1,355 @@
+"""
+Precomputed answers for the most frequent questions
+Answers are generated offline through RAGRetriever and stored with the IDs
+and sources of the chunks they were built from, so an incoming question that
+is a near neighbour of a banked one is answered without retrieval or an LLM
+call, and entries are regenerated when any of their sources is re-ingested
+"""
+
+import json
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Iterable, List, Optional
+import numpy as np
+from src.llm.scheduler import PRIORITY_BACKGROUND
+from src.utils.config import Config
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class AnswerBank:
+    """On-disk bank of question/answer pairs with a nearest-neighbour lookup"""
+
+    def __init__(self, path: str = None, min_similarity: float = None):
+        """
+        Initialize answer bank and load it from disk if present
+
+        Args:
+            path: .npz file (defaults to Config.ANSWER_BANK_PATH)
+            min_similarity: Cosine similarity needed to serve a banked answer
+                (defaults to Config.ANSWER_BANK_MIN_SIMILARITY)
+        """
+        self.path = path or Config.ANSWER_BANK_PATH
+        self.min_similarity = (
+            min_similarity
+            if min_similarity is not None
+            else Config.ANSWER_BANK_MIN_SIMILARITY
+        )
+
+        # (entries, normalized float32 matrix) swapped as one tuple
+        self._state = ([], np.zeros((0, 0), dtype=np.float32))
+        self.source_versions = {}
+        self._mtime = None
+        self._checked_at = 0.0
+        self._stale = (0.0, set())
+        # _lock guards _state and is only held briefly; _refresh_lock keeps
+        # one build/refresh at a time while answers are generated unlocked
+        self._lock = threading.Lock()
+        self._refresh_lock = threading.Lock()
+        self._invalidated = None
+        self.counters = {"lookups": 0, "hits": 0}
+
+        self.load()
+
+    def __len__(self):
+        return len(self._state[0])
+
+    def load(self) -> bool:
+        """Load the bank written by save(); returns False when there is none"""
+        try:
+            mtime = os.stat(self.path).st_mtime_ns
+        except OSError:
+            return False
+
+        try:
+            with np.load(self.path) as data:
+                payload = json.loads(str(data["payload"]))
+                matrix = data["embeddings"].astype(np.float32)
+        except Exception as e:
+            logger.warning(f"Could not load answer bank: {str(e)}")
+            return False
+
+        self._state = (payload["entries"], matrix)
+        self.source_versions = payload["source_versions"]
+        self._mtime = mtime
+        self._stale = (0.0, set())
+        logger.info(f"✓ Loaded answer bank with {len(self)} entries")
+        return True
+
+    def save(self):
+        """Atomically write the bank (float16 embeddings + JSON payload)"""
+        entries, matrix = self._state
+        payload = json.dumps(
+            {"entries": entries, "source_versions": self.source_versions}
+        )
+
+        Path(self.path).parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = f"{self.path}.{os.getpid()}.tmp"
+        with open(tmp_path, "wb") as f:
+            np.savez(f, payload=np.array(payload), embeddings=matrix.astype(np.float16))
+        os.replace(tmp_path, self.path)
+        self._mtime = os.stat(self.path).st_mtime_ns
+        logger.info(f"✓ Answer bank saved to {self.path} ({len(entries)} entries)")
+
+    def lookup(self, embedding, vector_store=None) -> Optional[dict]:
+        """
+        Find the banked answer for a query embedding
+
+        Entries being regenerated are skipped, and so are entries whose
+        sources changed since they were generated (e.g. re-ingested by the
+        CLI, which does not call invalidate()).
+
+        Args:
+            embedding: Query embedding
+            vector_store: ChromaStore to check source versions against
+                (checked every ANSWER_BANK_RELOAD_INTERVAL seconds)
+
+        Returns:
+            Copy of the closest servable entry with its "similarity", or None
+            when no servable entry is close enough
+        """
+        self._maybe_reload()
+        entries, matrix = self._state
+        self.counters["lookups"] += 1
+        if not entries:
+            return None
+
+        query = np.asarray(embedding, dtype=np.float32)
+        norm = np.linalg.norm(query)
+        if norm == 0:
+            return None
+        similarities = matrix @ (query / norm)
+
+        stale_sources = (
+            self._cached_stale_sources(vector_store) if vector_store else set()
+        )
+        for row, entry in enumerate(entries):
+            if entry.get("stale") or stale_sources & set(entry["sources"]):
+                similarities[row] = -np.inf
+
+        best = int(np.argmax(similarities))
+        similarity = float(similarities[best])
+        if similarity < self.min_similarity:
+            return None
+
+        self.counters["hits"] += 1
+        return {**entries[best], "similarity": round(similarity, 4)}
+
+    def invalidate(self, sources: Iterable[str]) -> int:
+        """
+        Stop serving entries built from any of the given sources
+
+        The entries keep their questions so refresh() can regenerate them.
+
+        Returns:
+            Number of entries invalidated
+        """
+        sources = set(sources)
+        with self._lock:
+            if self._invalidated is not None:
+                # A refresh is generating answers: its results may be stale too
+                self._invalidated |= sources
+            entries, matrix = self._state
+            changed = 0
+            for entry in entries:
+                if not entry.get("stale") and sources & set(entry["sources"]):
+                    entry["stale"] = True
+                    changed += 1
+            if changed:
+                self.save()
+        if changed:
+            logger.info(f"Invalidated {changed} banked answers")
+        return changed
+
+    def stale_sources(self, vector_store) -> set:
+        """Sources whose chunks changed since their entries were generated"""
+        current = vector_store.source_versions(list(self.source_versions))
+        return {
+            source
+            for source, version in self.source_versions.items()
+            if current.get(source) != version
+        }
+
+    def build(self, rag_retriever, questions: List[str]):
+        """
+        Generate answers for every question and replace the bank
+
+        Args:
+            rag_retriever: RAGRetriever used to answer the questions
+            questions: Questions to bank
+        """
+        with self._refresh_lock:
+            generated = self._generate(rag_retriever, _unique(questions))
+            with self._lock:
+                self._state = ([], np.zeros((0, 0), dtype=np.float32))
+                self.source_versions = {}
+                self._append(*generated)
+                self.save()
+
+    def refresh(self, rag_retriever, questions: List[str] = None) -> int:
+        """
+        Regenerate entries whose sources were re-ingested
+
+        Args:
+            rag_retriever: RAGRetriever used to answer the questions
+            questions: Questions that should be in the bank; missing ones are
+                added and banked ones not in the list are dropped (None keeps
+                the current question set)
+
+        Answers are generated without holding the lock lookup() and
+        invalidate() need; entries invalidated meanwhile stay stale.
+
+        Returns:
+            Number of entries (re)generated
+        """
+        with self._refresh_lock:
+            with self._lock:
+                self.load()
+                entries, _ = self._state
+            stale_sources = self.stale_sources(rag_retriever.vector_store)
+
+            keep = {
+                entry["question"]
+                for entry in entries
+                if not entry.get("stale") and not stale_sources & set(entry["sources"])
+            }
+            wanted = _unique(
+                questions
+                if questions is not None
+                else [entry["question"] for entry in entries]
+            )
+            todo = [question for question in wanted if question not in keep]
+            keep &= set(wanted)
+            if not todo and len(keep) == len(entries):
+                logger.info("Answer bank is up to date")
+                return 0
+
+            logger.info(f"Regenerating {len(todo)} banked answers...")
+            with self._lock:
+                self._invalidated = set()
+            try:
+                generated = self._generate(rag_retriever, todo)
+            finally:
+                with self._lock:
+                    invalidated, self._invalidated = self._invalidated, None
+
+            with self._lock:
+                # Re-read: invalidate() may have marked kept entries meanwhile
+                entries, matrix = self._state
+                rows = [
+                    row
+                    for row, entry in enumerate(entries)
+                    if entry["question"] in keep
+                ]
+                self._state = ([entries[row] for row in rows], matrix[rows])
+                for source in stale_sources:
+                    self.source_versions.pop(source, None)
+                for entry in generated[0]:
+                    if invalidated & set(entry["sources"]):
+                        entry["stale"] = True
+                self._append(*generated)
+                self.save()
+            return len(todo)
+
+    def stats(self) -> dict:
+        entries, _ = self._state
+        return {
+            "entries": len(entries),
+            "stale": sum(1 for entry in entries if entry.get("stale")),
+            **self.counters,
+        }
+
+    def _generate(self, rag_retriever, questions: List[str]) -> tuple:
+        """
+        Answer questions through the RAG pipeline (slow; leaves _state alone)
+
+        Returns:
+            Tuple (new entries, their normalized embeddings, source versions)
+        """
+        if not questions:
+            return [], None, {}
+        vector_store = rag_retriever.vector_store
+
+        new_entries = []
+        for question in questions:
+            result = rag_retriever.generate_answer(
+                question, priority=PRIORITY_BACKGROUND
+            )
+            if not result["source_ids"]:
+                logger.warning(f"No sources for '{question[:60]}', not banking it")
+                continue
+            chunk_sources = vector_store.get_chunk_sources(result["source_ids"])
+            new_entries.append(
+                {
+                    "question": question,
+                    "answer": result["answer"],
+                    "sources": sorted(set(chunk_sources.values())),
+                    "source_ids": result["source_ids"],
+                    "source_labels": result["sources"],
+                    "context": result["context"],
+                    "generated_at": time.time(),
+                }
+            )
+
+        if not new_entries:
+            return [], None, {}
+
+        vectors = np.asarray(
+            vector_store.embeddings.embed_documents(
+                [entry["question"] for entry in new_entries]
+            ),
+            dtype=np.float32,
+        )
+        vectors /= np.maximum(np.linalg.norm(vectors, axis=1, keepdims=True), 1e-12)
+
+        new_sources = sorted({s for entry in new_entries for s in entry["sources"]})
+        return new_entries, vectors, vector_store.source_versions(new_sources)
+
+    def _append(self, new_entries: List[dict], vectors, versions: dict):
+        """Append generated entries to _state (caller holds _lock)"""
+        if not new_entries:
+            return
+        entries, matrix = self._state
+        if len(entries):
+            vectors = np.vstack([matrix, vectors])
+        self.source_versions.update(versions)
+        self._state = (entries + new_entries, vectors)
+        self._stale = (0.0, set())
+
+    def _cached_stale_sources(self, vector_store) -> set:
+        """stale_sources(), recomputed every ANSWER_BANK_RELOAD_INTERVAL seconds"""
+        checked_at, stale = self._stale
+        now = time.monotonic()
+        if now - checked_at >= Config.ANSWER_BANK_RELOAD_INTERVAL:
+            try:
+                stale = self.stale_sources(vector_store)
+            except Exception as e:
+                logger.warning(f"Could not check answer bank sources: {str(e)}")
+            self._stale = (now, stale)
+        return stale
+
+    def _maybe_reload(self):
+        """Pick up a bank rewritten by another process (checked periodically)"""
+        now = time.monotonic()
+        if now - self._checked_at < Config.ANSWER_BANK_RELOAD_INTERVAL:
+            return
+        self._checked_at = now
+        try:
+            mtime = os.stat(self.path).st_mtime_ns
+        except OSError:
+            return
+        if mtime != self._mtime:
+            self.load()
+
+
+def _unique(questions: Iterable[str]) -> List[str]:
+    """Strip and de-duplicate questions, keeping their order"""
+    seen = {}
+    for question in questions:
+        question = question.strip()
+        if question:
+            seen.setdefault(question.lower(), question)
+    return list(seen.values())
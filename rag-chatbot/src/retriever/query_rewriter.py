@@ -0,0 +1,119 @@
+"""
+Condense follow-up questions into standalone search queries
+"""
+
+import re
+from src.llm.prompts import PROMPTS
+from src.llm.scheduler import PRIORITY_NORMAL
+from src.utils.config import Config
+import logging
+
+logger = logging.getLogger(__name__)
+
+_CONNECTIVE = re.compile(
+    r"^\s*(and|but|also|so|then|what about|how about|what if|same)\b",
+    re.IGNORECASE,
+)
+# Pronouns standing in for an earlier topic ("how long does it last")
+_REFERENCE = re.compile(
+    r"\b(it|its|they|them|their|he|she|him|her|these|those)\b"
+    r"|\b(which|this|that|the other) one\b",
+    re.IGNORECASE,
+)
+# "this"/"that" as a pronoun, not a determiner ("what is this rash"): the
+# subject of a yes/no question, the last word, or followed by a verb
+_DEMONSTRATIVE = re.compile(
+    r"^\s*(is|are|was|were|does|do|did|can|could|will|would|should)\s+(this|that)\b"
+    r"|\b(this|that)\W*$"
+    r"|\b(this|that)\s+(is|was|does|did|can|could|will|would|should|means?"
+    r"|lasts?|works?|helps?|hurts?|happens?)\b",
+    re.IGNORECASE,
+)
+# "Is it normal to ..." has a dummy "it" that refers to nothing
+_DUMMY_IT = re.compile(
+    r"\bis it (normal|ok|okay|safe|possible|common|true|bad|necessary|better"
+    r"|worse|dangerous) (to|for|if|when)\b",
+    re.IGNORECASE,
+)
+# Longer questions carry their own topic even when they contain a pronoun
+_MAX_FOLLOW_UP_WORDS = 8
+_MAX_QUERY_CHARS = 300
+
+
+def looks_like_follow_up(query: str) -> bool:
+    """Very short questions, or short ones leaning on a connective or pronoun"""
+    words = query.split()
+    if len(words) <= 3 or _CONNECTIVE.search(query):
+        return True
+    if len(words) > _MAX_FOLLOW_UP_WORDS or _DUMMY_IT.search(query):
+        return False
+    return bool(_REFERENCE.search(query) or _DEMONSTRATIVE.search(query))
+
+
+class QueryRewriter:
+    """Turns a follow-up into a standalone query for retrieval"""
+
+    def __init__(self, mode: str = None):
+        """
+        Initialize query rewriter
+
+        Args:
+            mode: "rule" (regex heuristics), "llm" (small Groq model with rule
+                fallback) or "off" (defaults to Config.QUERY_REWRITE_MODE)
+        """
+        self.mode = (mode or Config.QUERY_REWRITE_MODE).lower()
+        self._router = None
+
+    def rewrite(self, query: str, conversation) -> str:
+        """
+        Produce a standalone search query
+
+        Args:
+            query: User's latest question
+            conversation: Conversation with summary, turns and past retrievals
+
+        Returns:
+            Search query (the original query when no rewrite is needed)
+        """
+        if self.mode == "off" or not (conversation.turns or conversation.summary):
+            return query
+        if not looks_like_follow_up(query):
+            return query
+
+        if self.mode == "llm":
+            try:
+                return self._rewrite_llm(query, conversation)
+            except Exception as e:
+                logger.warning(f"LLM query rewrite failed, using rules: {str(e)}")
+
+        return self._rewrite_rule(query, conversation)
+
+    def _rewrite_rule(self, query: str, conversation) -> str:
+        """Prefix the follow-up with the previous standalone query"""
+        if conversation.retrievals:
+            previous = conversation.retrievals[-1]["query"]
+        elif conversation.turns:
+            previous = conversation.turns[-1]["question"]
+        else:
+            return query
+        return f"{previous} {query}"[-_MAX_QUERY_CHARS:]
+
+    def _rewrite_llm(self, query: str, conversation) -> str:
+        """Ask the small model for a standalone question"""
+        prompt = PROMPTS.get("condense_question")
+        messages = prompt.render(
+            history=conversation.history_text(answer_chars=200), question=query
+        )
+        text, _ = self._get_router().complete(messages, priority=PRIORITY_NORMAL)
+        rewritten = text.strip().strip('"').splitlines()[0] if text.strip() else ""
+        return rewritten[:_MAX_QUERY_CHARS] or query
+
+    def _get_router(self):
+        if self._router is None:
+            from src.llm.backends import GroqBackend
+            from src.llm.router import LLMRouter
+
+            self._router = LLMRouter(
+                [GroqBackend(Config.QUERY_REWRITE_MODEL)], hedging=False
+            )
+        return self._router
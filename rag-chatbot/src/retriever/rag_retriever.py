@@ -1,6 +1,12 @@
+from langchain_core.documents import Document
 from src.vectorstore.chroma_store import ChromaStore
 from src.llm.groq_client import GroqClient
+from src.llm.scheduler import PRIORITY_NORMAL
+from src.retriever.query_rewriter import QueryRewriter
 from src.utils.config import Config
+from src.vectorstore.parent_store import expand_to_parents
+from src.utils.single_flight import flight_key, get_single_flight, normalize_query
+from src.utils.tracing import traced
 import logging
 
 logger = logging.getLogger(__name__)
@@ -9,35 +15,66 @@ logger = logging.getLogger(__name__)
 class RAGRetriever:
     """RAG system that combines document retrieval with LLM generation"""
 
-    def __init__(self, vector_store: ChromaStore, llm_client: GroqClient):
+    def __init__(
+        self,
+        vector_store: ChromaStore,
+        llm_client: GroqClient,
+        query_rewriter: QueryRewriter = None,
+        single_flight=None,
+    ):
         """
         Initialize RAG retriever
 
         Args:
             vector_store: ChromaStore instance
             llm_client: GroqClient instance
+            query_rewriter: Condenses follow-ups (defaults to Config mode)
+            single_flight: SingleFlight used to coalesce identical questions
+                (defaults to the shared one when SINGLE_FLIGHT_ENABLED)
         """
         self.vector_store = vector_store
         self.llm_client = llm_client
+        self.query_rewriter = query_rewriter or QueryRewriter()
+        self.single_flight = single_flight
+        if single_flight is None and Config.SINGLE_FLIGHT_ENABLED:
+            self.single_flight = get_single_flight()
         logger.info("✓ RAG Retriever initialized")
 
-    def retrieve_documents(self, query: str, k: int = None):
+    def retrieve_documents(self, query: str, k: int = None, embedding=None):
         """
         Retrieve relevant documents for a query
 
+        With parent retrieval, ``k`` counts parent sections: more chunks are
+        searched and replaced by their deduplicated parents.
+
         Args:
             query: User's question
             k: Number of documents to retrieve
+            embedding: Precomputed query embedding, if any
 
         Returns:
             List of tuples (Document, score)
         """
+        parent_store = self.vector_store.parent_store
+        if parent_store is not None:
+            parent_k = k or Config.PARENT_K
+            k = parent_k * Config.PARENT_CHILD_FACTOR
         k = k or Config.RETRIEVAL_K
 
         logger.info(f"Retrieving documents for query: {query[:50]}...")
 
         # Use similarity search with scores
-        results = self.vector_store.similarity_search_with_score(query, k=k)
+        if Config.RETRIEVAL_MODE == "adaptive":
+            results = self.vector_store.adaptive_similarity_search(
+                query, k=k, embedding=embedding
+            )
+        else:
+            results = self.vector_store.similarity_search_with_score(
+                query, k=k, embedding=embedding
+            )
+
+        if parent_store is not None:
+            results = expand_to_parents(results, parent_store, parent_k)
 
         if not results:
             logger.warning("No relevant documents found")
@@ -46,45 +83,177 @@ class RAGRetriever:
 
         return results
 
-    def generate_answer(self, query: str) -> dict:
+    def retrieve_for_conversation(self, query: str, conversation, query_embedding=None):
+        """
+        Retrieve for a turn of a conversation
+
+        Follow-ups are rewritten into a standalone search query. When that
+        query's embedding is close to a recent one in the session, the cached
+        results are reused and the vector store is skipped entirely.
+
+        Args:
+            query: User's latest question
+            conversation: Conversation (its retrieval cache is updated in place)
+            query_embedding: Embedding of ``query``, used when no rewrite happens
+
+        Returns:
+            Tuple (list of (Document, score), search query, reused flag)
+        """
+        search_query = self.query_rewriter.rewrite(query, conversation)
+        if search_query != query:
+            logger.info(f"Rewrote follow-up as: {search_query[:80]}...")
+
+        if query_embedding is not None and search_query == query:
+            embedding = query_embedding
+        else:
+            embedding = self.vector_store.embeddings.embed_query(search_query)
+
+        cached = conversation.find_retrieval(
+            embedding, Config.RETRIEVAL_REUSE_SIMILARITY
+        )
+        if cached is not None and self.vector_store.tombstones.ids() & {
+            r.get("id") for r in cached
+        }:
+            # Some of the cached chunks were deleted since, search again
+            cached = None
+        if cached is not None:
+            logger.info("Reusing cached retrieval from this session")
+            results = [
+                (
+                    Document(
+                        id=r.get("id"),
+                        page_content=r["page_content"],
+                        metadata=r["metadata"],
+                    ),
+                    r["score"],
+                )
+                for r in cached
+            ]
+            return results, search_query, True
+
+        results = self.retrieve_documents(search_query, embedding=embedding)
+        conversation.remember_retrieval(
+            search_query,
+            embedding,
+            [
+                {
+                    "id": getattr(doc, "id", None),
+                    "page_content": doc.page_content,
+                    "metadata": doc.metadata,
+                    "score": score,
+                }
+                for doc, score in results
+            ],
+            limit=Config.RETRIEVAL_REUSE_ENTRIES,
+        )
+        return results, search_query, False
+
+    @traced("RAGRetriever.generate_answer")
+    def generate_answer(
+        self,
+        query: str,
+        priority: int = PRIORITY_NORMAL,
+        conversation=None,
+        query_embedding=None,
+    ) -> dict:
         """
         Generate an answer for the query using RAG
 
+        Concurrent calls for the same standalone question (no conversation
+        history) share a single pipeline run, also across workers. Callers
+        served that way get "coalesced": True, and their conversation's
+        retrieval cache is not updated.
+
         Args:
             query: User's question
+            priority: LLM scheduler priority (PRIORITY_EMERGENCY runs first)
+            conversation: Conversation for multi-turn sessions, if any
+            query_embedding: Precomputed embedding of ``query``, if any
 
         Returns:
-            Dictionary with answer and sources
+            Dictionary with answer, sources and the IDs of the chunks used
         """
+        standalone = conversation is None or not (
+            conversation.turns or conversation.summary
+        )
+        if self.single_flight is None or not standalone:
+            return self._generate_answer(query, priority, conversation, query_embedding)
+
+        key = flight_key(
+            query=normalize_query(query),
+            priority=priority,
+            collection=self.vector_store.collection_name,
+            k=Config.RETRIEVAL_K,
+            mode=Config.RETRIEVAL_MODE,
+            threshold=Config.SIMILARITY_THRESHOLD,
+            parents=Config.PARENT_RETRIEVAL,
+        )
+        result, shared = self.single_flight.do(
+            key,
+            lambda: self._generate_answer(
+                query, priority, conversation, query_embedding
+            ),
+        )
+        if shared:
+            logger.info("Served by an identical in-flight request")
+            return {**result, "coalesced": True}
+        return result
+
+    def _generate_answer(
+        self, query: str, priority: int, conversation, query_embedding
+    ) -> dict:
+        """Run retrieval and generation for one question"""
         try:
             # Retrieve relevant documents
-            results = self.retrieve_documents(query)
+            history = None
+            if conversation is not None:
+                history = conversation.history_text()
+                results, search_query, reused = self.retrieve_for_conversation(
+                    query, conversation, query_embedding=query_embedding
+                )
+            else:
+                results = self.retrieve_documents(query, embedding=query_embedding)
+                search_query, reused = query, False
 
             if not results:
                 return {
                     "answer": "I don't have enough information to answer that question.",
                     "sources": [],
+                    "source_ids": [],
                     "context": "",
+                    "search_query": search_query,
+                    "retrieval_reused": reused,
                 }
 
             # Prepare context from retrieved documents
             context_parts = []
             sources = []
+            source_ids = []
 
             for doc, score in results:
                 context_parts.append(doc.page_content)
+                if "child_ids" in doc.metadata:
+                    source_ids.extend(doc.metadata["child_ids"])
+                elif getattr(doc, "id", None):
+                    source_ids.append(doc.id)
                 source = doc.metadata.get("source", "Unknown")
                 sources.append(f"{source} (relevance: {score:.2f})")
 
             context = "\n\n---\n\n".join(context_parts)
 
             # Generate answer using LLM
-            answer = self.llm_client.generate_answer(query, context)
+            answer, usage = self.llm_client.generate_answer_with_usage(
+                query, context, priority=priority, history=history
+            )
 
             return {
                 "answer": answer,
                 "sources": sources,
+                "source_ids": source_ids,
                 "context": context[:500] + "..." if len(context) > 500 else context,
+                "usage": usage,
+                "search_query": search_query,
+                "retrieval_reused": reused,
             }
 
         except Exception as e:
@@ -0,0 +1,337 @@
+"""
+Admission control for the query pipeline
+A worker runs at most ADMISSION_MAX_CONCURRENCY pipelines and lets at most
+ADMISSION_MAX_QUEUE more wait. Queue delay is managed CoDel-style: while the
+shortest delay seen in an interval stays above the target, the worker is
+overloaded and requests that cannot start within the target are shed at once.
+Per-client token buckets cap how fast one client can spend that capacity.
+Rejections are fast 429/503 responses with Retry-After, not a 30s timeout.
+
+Time a request spent in the router and the listen backlog (X-Request-Start,
+set by Heroku, Render or nginx) counts as queue delay, so sync workers, which
+never queue inside the app, still shed requests that waited too long upstream.
+"""
+
+import heapq
+import itertools
+import math
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import Optional
+from src.utils.config import Config
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class AdmissionRejected(Exception):
+    """Raised when a request is rate limited (429) or shed (503)"""
+
+    def __init__(self, message: str, status: int, retry_after: float = 1.0):
+        super().__init__(message)
+        self.status = status
+        self.retry_after = max(1, int(retry_after + 0.999))
+
+
+def request_queue_time(headers, now: float = None) -> float:
+    """
+    Seconds a request waited before reaching the app
+
+    Args:
+        headers: Request headers; X-Request-Start may be "t=<epoch>" or a bare
+            epoch in seconds, milliseconds or microseconds
+
+    Returns:
+        Upstream queue time, 0.0 when the header is missing or unparseable
+    """
+    value = headers.get("X-Request-Start")
+    if not value:
+        return 0.0
+    try:
+        started = float(value.strip().removeprefix("t="))
+    except ValueError:
+        return 0.0
+
+    # Pick the unit from the magnitude of the epoch
+    if started > 1e14:
+        started /= 1e6
+    elif started > 1e11:
+        started /= 1e3
+    now = time.time() if now is None else now
+    return min(max(now - started, 0.0), 3600.0)
+
+
+def client_id(request) -> str:
+    """
+    Client address used for rate limiting
+
+    The rightmost ADMISSION_TRUSTED_PROXIES entries of X-Forwarded-For were
+    appended by our own proxies; the entry before them is the client (entries
+    further left are client-supplied and could be spoofed).
+    """
+    proxies = Config.ADMISSION_TRUSTED_PROXIES
+    forwarded = request.headers.get("X-Forwarded-For", "")
+    hops = [hop.strip() for hop in forwarded.split(",") if hop.strip()]
+    if proxies and hops:
+        return hops[-min(proxies, len(hops))]
+    return request.remote_addr or "unknown"
+
+
+class TokenBuckets:
+    """Per-client token buckets (per worker process)"""
+
+    def __init__(self, rate: float, burst: float, max_clients: int = 10000):
+        """
+        Args:
+            rate: Tokens added per second (0 disables rate limiting)
+            burst: Bucket capacity
+            max_clients: Least recently seen clients beyond this are forgotten
+        """
+        self.rate = rate
+        self.burst = max(burst, 1.0)
+        self.max_clients = max_clients
+        self._buckets = OrderedDict()
+        self._lock = threading.Lock()
+
+    def take(self, client: str) -> float:
+        """
+        Spend one token
+
+        Returns:
+            0.0 when a token was taken, otherwise seconds until one is available
+        """
+        if self.rate <= 0:
+            return 0.0
+        now = time.monotonic()
+        with self._lock:
+            tokens, updated = self._buckets.pop(client, (self.burst, now))
+            tokens = min(self.burst, tokens + (now - updated) * self.rate)
+            wait = 0.0
+            if tokens >= 1.0:
+                tokens -= 1.0
+            else:
+                wait = (1.0 - tokens) / self.rate
+            self._buckets[client] = (tokens, now)
+            while len(self._buckets) > self.max_clients:
+                self._buckets.popitem(last=False)
+        return wait
+
+    def __len__(self):
+        return len(self._buckets)
+
+
+class AdmissionController:
+    """Concurrency limit, bounded priority queue and CoDel-style shedding"""
+
+    def __init__(
+        self,
+        max_concurrency: int = None,
+        max_queue: int = None,
+        max_wait: float = None,
+        target_delay: float = None,
+        interval: float = None,
+        rate_per_minute: float = None,
+        burst: int = None,
+    ):
+        """
+        Initialize controller (defaults come from Config)
+
+        Args:
+            max_concurrency: Pipelines running at once in this worker
+            max_queue: Requests allowed to wait; more get 503 immediately
+            max_wait: Seconds a request may wait while the worker is healthy
+            target_delay: Acceptable standing queue delay (CoDel target)
+            interval: Seconds the delay must stay above target before the
+                worker sheds (CoDel interval)
+            rate_per_minute: Sustained requests per client (0 disables)
+            burst: Requests a client may send at once
+        """
+        self.max_concurrency = max_concurrency or Config.ADMISSION_MAX_CONCURRENCY
+        self.max_queue = (
+            max_queue if max_queue is not None else Config.ADMISSION_MAX_QUEUE
+        )
+        self.max_wait = max_wait or Config.ADMISSION_MAX_WAIT
+        self.target_delay = target_delay or Config.ADMISSION_TARGET_DELAY
+        self.interval = interval or Config.ADMISSION_INTERVAL
+        rate_per_minute = (
+            rate_per_minute
+            if rate_per_minute is not None
+            else Config.RATE_LIMIT_PER_MINUTE
+        )
+        self.buckets = TokenBuckets(
+            rate_per_minute / 60.0, burst or Config.RATE_LIMIT_BURST
+        )
+
+        self._cond = threading.Condition()
+        self._waiting = []
+        self._sequence = itertools.count()
+        self._active = 0
+
+        # CoDel state: minimum delay in the current interval
+        self._window_end = time.monotonic() + self.interval
+        self._window_min = math.inf
+        self._overloaded = False
+
+        # Smoothed pipeline duration, for Retry-After estimates
+        self._service_time = None
+
+        self.counters = {
+            "admitted": 0,
+            "completed": 0,
+            "rate_limited": 0,
+            "rejected_queue_full": 0,
+            "shed_overload": 0,
+            "shed_timeout": 0,
+        }
+
+    @contextmanager
+    def admit(self, client: str, priority: int = 0, queued: float = 0.0):
+        """
+        Hold a pipeline slot for the duration of the block
+
+        Args:
+            client: Client identity for the token bucket (see client_id())
+            priority: Lower is served first when requests wait
+            queued: Seconds already spent queueing upstream
+                (see request_queue_time())
+
+        Raises:
+            AdmissionRejected: 429 when the client is over its rate, 503 when
+                the worker is overloaded
+        """
+        wait = self.buckets.take(client)
+        if wait > 0:
+            self.counters["rate_limited"] += 1
+            raise AdmissionRejected("Too many requests from this client", 429, wait)
+
+        self._acquire(priority, queued)
+        started = time.monotonic()
+        try:
+            yield
+        finally:
+            self._release(time.monotonic() - started)
+
+    def stats(self) -> dict:
+        """Current load, CoDel state and counters"""
+        with self._cond:
+            return {
+                "active": self._active,
+                "queued": len(self._waiting),
+                "max_concurrency": self.max_concurrency,
+                "max_queue": self.max_queue,
+                "overloaded": self._overloaded,
+                "service_time_s": (
+                    round(self._service_time, 3)
+                    if self._service_time is not None
+                    else None
+                ),
+                "rate_limited_clients": len(self.buckets),
+                **self.counters,
+            }
+
+    def _acquire(self, priority: int, queued: float):
+        """Wait for a slot, highest priority first, or shed"""
+        enqueued = time.monotonic() - queued
+        with self._cond:
+            if self._active < self.max_concurrency and not self._waiting:
+                self._record_delay(queued)
+                if self._overloaded and queued > self.target_delay:
+                    self._shed("shed_overload", "Request queued too long upstream")
+                self._admit()
+                return
+
+            if len(self._waiting) >= self.max_queue:
+                self._shed("rejected_queue_full", "Request queue is full")
+
+            # Overloaded: only admit what can start within the target delay
+            budget = self.target_delay if self._overloaded else self.max_wait
+            deadline = enqueued + budget
+            if time.monotonic() >= deadline:
+                self._shed("shed_overload", "Request queued too long upstream")
+
+            ticket = (priority, next(self._sequence))
+            heapq.heappush(self._waiting, ticket)
+            try:
+                while (
+                    self._active >= self.max_concurrency or self._waiting[0] != ticket
+                ):
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        self._shed("shed_timeout", "Timed out waiting for capacity")
+                    self._cond.wait(remaining)
+            except BaseException:
+                self._waiting.remove(ticket)
+                heapq.heapify(self._waiting)
+                self._cond.notify_all()
+                raise
+
+            heapq.heappop(self._waiting)
+            self._record_delay(time.monotonic() - enqueued)
+            self._admit()
+            self._cond.notify_all()
+
+    def _admit(self):
+        self._active += 1
+        self.counters["admitted"] += 1
+
+    def _release(self, duration: float):
+        with self._cond:
+            self._active -= 1
+            self.counters["completed"] += 1
+            self._service_time = (
+                duration
+                if self._service_time is None
+                else 0.8 * self._service_time + 0.2 * duration
+            )
+            self._cond.notify_all()
+
+    def _record_delay(self, delay: float):
+        """
+        Track the minimum queue delay per interval (called with the lock held)
+
+        A good queue drains at least once per interval, so a minimum above the
+        target means a standing queue: switch to overloaded until an interval
+        sees a delay below the target again.
+        """
+        now = time.monotonic()
+        self._window_min = min(self._window_min, delay)
+        if now < self._window_end:
+            return
+        overloaded = self._window_min > self.target_delay
+        if overloaded != self._overloaded:
+            logger.warning(
+                f"Admission {'overloaded' if overloaded else 'recovered'}: "
+                f"minimum queue delay {self._window_min:.3f}s "
+                f"(target {self.target_delay}s)"
+            )
+        self._overloaded = overloaded
+        self._window_min = math.inf
+        self._window_end = now + self.interval
+
+    def _retry_after(self) -> float:
+        """Time for the current backlog to drain"""
+        service_time = self._service_time or 1.0
+        backlog = len(self._waiting) + self._active
+        return max(1.0, backlog * service_time / self.max_concurrency)
+
+    def _shed(self, counter: str, message: str):
+        self.counters[counter] += 1
+        logger.warning(f"Shedding request: {message}")
+        raise AdmissionRejected(message, 503, self._retry_after())
+
+
+_controller = None
+_controller_lock = threading.Lock()
+
+
+def get_admission() -> Optional[AdmissionController]:
+    """Process-wide admission controller (None when ADMISSION_ENABLED is off)"""
+    global _controller
+    if not Config.ADMISSION_ENABLED:
+        return None
+    with _controller_lock:
+        if _controller is None:
+            _controller = AdmissionController()
+    return _controller
@@ -0,0 +1,122 @@
+"""
+Deployment profiles for the app factory and gunicorn
+A profile fixes the performance tradeoffs of one deployment: embedding
+backend, vector store, eager or lazy initialization, caches and the worker
+model. Any field can be overridden with an APP_<FIELD> environment variable,
+e.g. APP_EAGER_INIT=false or APP_WORKERS=2.
+"""
+
+import os
+from src.utils.config import Config
+
+PROFILES = {
+    # Local sentence-transformers model loaded before the fork and shared by
+    # several workers; every cache and conversation memory enabled
+    "full": {
+        "embeddings": "huggingface",
+        "vector_store": True,
+        "eager_init": True,
+        "answer_bank": True,
+        "conversations": True,
+        "emergency_fast_path": True,
+        "workers": 4,
+        "worker_class": "sync",
+        "timeout": 30,
+        "keepalive": 60,
+        "backlog": 2048,
+        "preload_app": True,
+        "worker_tmp_dir": "",
+        "log_level": "info",
+    },
+    # API embeddings (or the smallest local model), components built on the
+    # first request that needs them, one worker for 512MB instances
+    "lite": {
+        "embeddings": "lightweight",
+        "vector_store": True,
+        "eager_init": False,
+        "answer_bank": False,
+        "conversations": False,
+        "emergency_fast_path": True,
+        "workers": 1,
+        "worker_class": "sync",
+        "timeout": 60,
+        "keepalive": 30,
+        "backlog": 512,
+        "preload_app": True,
+        "worker_tmp_dir": "/dev/shm",
+        "log_level": "warning",
+    },
+    # No embeddings or vector store: the Groq SDK answers from a built-in
+    # knowledge base in the system prompt
+    "minimal": {
+        "embeddings": "none",
+        "vector_store": False,
+        "eager_init": False,
+        "answer_bank": False,
+        "conversations": False,
+        "emergency_fast_path": True,
+        "workers": 1,
+        "worker_class": "sync",
+        "timeout": 60,
+        "keepalive": 30,
+        "backlog": 512,
+        "preload_app": False,
+        "worker_tmp_dir": "/dev/shm",
+        "log_level": "warning",
+    },
+}
+
+
+class AppProfile:
+    """Resolved profile settings (profile defaults plus APP_* overrides)"""
+
+    def __init__(self, name: str, settings: dict):
+        self.name = name
+        self.settings = settings
+        for key, value in settings.items():
+            setattr(self, key, value)
+
+    def as_dict(self) -> dict:
+        return {"name": self.name, **self.settings}
+
+
+def get_profile(name: str = None) -> AppProfile:
+    """
+    Resolve a profile
+
+    Args:
+        name: Profile name (defaults to Config.APP_PROFILE)
+
+    Returns:
+        AppProfile with environment overrides applied
+    """
+    name = (name or Config.APP_PROFILE).lower()
+    if name not in PROFILES:
+        raise ValueError(
+            f"Unknown APP_PROFILE {name!r}, expected one of {list(PROFILES)}"
+        )
+
+    settings = {}
+    for key, default in PROFILES[name].items():
+        value = os.getenv(f"APP_{key.upper()}")
+        if key == "workers" and value is None:
+            value = os.getenv("WEB_CONCURRENCY")
+        settings[key] = default if value is None else _parse(value, default)
+
+    if settings["embeddings"] == "none":
+        settings["vector_store"] = False
+    if not settings["vector_store"]:
+        settings["answer_bank"] = False
+    settings["answer_bank"] = settings["answer_bank"] and Config.ANSWER_BANK_ENABLED
+    settings["emergency_fast_path"] = (
+        settings["emergency_fast_path"] and Config.EMERGENCY_FAST_PATH
+    )
+    return AppProfile(name, settings)
+
+
+def _parse(value: str, default):
+    if isinstance(default, bool):
+        return value.strip().lower() == "true"
+    if isinstance(default, int):
+        return int(value)
+    return value.strip()
@@ -17,6 +17,39 @@ class Config:
         "EMBEDDING_MODEL", "sentence-transformers/all-MiniLM-L6-v2"
     )
     LLM_MODEL = os.getenv("LLM_MODEL", "llama-3.3-70b-versatile")
+    LLM_MAX_TOKENS = int(os.getenv("LLM_MAX_TOKENS", "1024"))
+
+    # LLM backends in preference order: "groq:<model>", "openai:<model>", "stub"
+    LLM_BACKENDS = os.getenv("LLM_BACKENDS", f"groq:{LLM_MODEL}")
+    OPENAI_COMPAT_BASE_URL = os.getenv("OPENAI_COMPAT_BASE_URL")
+    OPENAI_COMPAT_API_KEY = os.getenv("OPENAI_COMPAT_API_KEY")
+    LLM_FAILURES_TO_OPEN = int(os.getenv("LLM_FAILURES_TO_OPEN", "3"))
+    LLM_OPEN_SECONDS = float(os.getenv("LLM_OPEN_SECONDS", "30"))
+
+    # Hedged requests: fire a second backend when the first is slow to start
+    LLM_HEDGING = os.getenv("LLM_HEDGING", "false").lower() == "true"
+    LLM_HEDGE_DELAY = float(os.getenv("LLM_HEDGE_DELAY", "2.0"))
+    LLM_HEDGE_MIN_SAMPLES = int(os.getenv("LLM_HEDGE_MIN_SAMPLES", "20"))
+    LLM_HEDGE_WORKERS = int(os.getenv("LLM_HEDGE_WORKERS", "8"))
+
+    # LLM scheduler (per worker process)
+    LLM_MAX_CONCURRENCY = int(os.getenv("LLM_MAX_CONCURRENCY", "4"))
+    LLM_MAX_QUEUE = int(os.getenv("LLM_MAX_QUEUE", "16"))
+    LLM_MAX_WAIT = float(os.getenv("LLM_MAX_WAIT", "10"))
+    LLM_MAX_RETRIES = int(os.getenv("LLM_MAX_RETRIES", "3"))
+    LLM_BACKOFF_BASE = float(os.getenv("LLM_BACKOFF_BASE", "0.5"))
+    LLM_BACKOFF_MAX = float(os.getenv("LLM_BACKOFF_MAX", "8"))
+
+    # Admission control for /query (per worker process)
+    ADMISSION_ENABLED = os.getenv("ADMISSION_ENABLED", "true").lower() == "true"
+    ADMISSION_MAX_CONCURRENCY = int(os.getenv("ADMISSION_MAX_CONCURRENCY", "4"))
+    ADMISSION_MAX_QUEUE = int(os.getenv("ADMISSION_MAX_QUEUE", "8"))
+    ADMISSION_MAX_WAIT = float(os.getenv("ADMISSION_MAX_WAIT", "5"))
+    ADMISSION_TARGET_DELAY = float(os.getenv("ADMISSION_TARGET_DELAY", "0.5"))
+    ADMISSION_INTERVAL = float(os.getenv("ADMISSION_INTERVAL", "2"))
+    ADMISSION_TRUSTED_PROXIES = int(os.getenv("ADMISSION_TRUSTED_PROXIES", "1"))
+    RATE_LIMIT_PER_MINUTE = float(os.getenv("RATE_LIMIT_PER_MINUTE", "30"))
+    RATE_LIMIT_BURST = int(os.getenv("RATE_LIMIT_BURST", "10"))
 
     # ChromaDB Cloud Configuration (Trychroma)
     CHROMA_CLOUD_TENANT = os.getenv("CHROMA_CLOUD_TENANT")
@@ -27,6 +60,9 @@ class Config:
     # Local ChromaDB fallback
     CHROMA_DB_PATH = os.getenv("CHROMA_DB_PATH", "./chroma_db")
 
+    # Snapshot of the built local collection, restored at boot when set
+    VECTOR_SNAPSHOT_PATH = os.getenv("VECTOR_SNAPSHOT_PATH")
+
     # Paths
     DOCUMENTS_PATH = os.getenv("DOCUMENTS_PATH", "./data/documents")
 
@@ -38,6 +74,154 @@ class Config:
     RETRIEVAL_K = int(os.getenv("RETRIEVAL_K", "3"))
     SIMILARITY_THRESHOLD = float(os.getenv("SIMILARITY_THRESHOLD", "0.7"))
 
+    # Adaptive retrieval ("fixed" keeps the plain top-k + threshold behaviour)
+    RETRIEVAL_MODE = os.getenv("RETRIEVAL_MODE", "fixed").lower()
+    RETRIEVAL_MAX_K = int(os.getenv("RETRIEVAL_MAX_K", "8"))
+    RETRIEVAL_MIN_RELEVANCE = float(os.getenv("RETRIEVAL_MIN_RELEVANCE", "0.3"))
+    RETRIEVAL_RELEVANCE_MASS = float(os.getenv("RETRIEVAL_RELEVANCE_MASS", "0.8"))
+    RETRIEVAL_SCORE_DROP = float(os.getenv("RETRIEVAL_SCORE_DROP", "0.15"))
+
+    # Parent-document retrieval: small chunks are searched, their parent
+    # sections (from a local docstore) are sent to the LLM; re-ingest after enabling
+    PARENT_RETRIEVAL = os.getenv("PARENT_RETRIEVAL", "false").lower() == "true"
+    PARENT_CHUNK_SIZE = int(os.getenv("PARENT_CHUNK_SIZE", "2000"))
+    PARENT_K = int(os.getenv("PARENT_K", "2"))
+    PARENT_CHILD_FACTOR = int(os.getenv("PARENT_CHILD_FACTOR", "3"))
+    PARENT_DOCSTORE_PATH = os.getenv(
+        "PARENT_DOCSTORE_PATH", "./chroma_db/parents.sqlite3"
+    )
+
+    # Near-duplicate detection at ingest ("off", "skip" or "merge")
+    DEDUP_MODE = os.getenv("DEDUP_MODE", "skip").lower()
+    DEDUP_THRESHOLD = float(os.getenv("DEDUP_THRESHOLD", "0.9"))
+    DEDUP_NUM_PERM = int(os.getenv("DEDUP_NUM_PERM", "128"))
+    DEDUP_SHINGLE_WORDS = int(os.getenv("DEDUP_SHINGLE_WORDS", "3"))
+    DEDUP_INDEX_PATH = os.getenv("DEDUP_INDEX_PATH", "./chroma_db/dedup_index.sqlite3")
+
+    # Deletes are tombstoned and compacted once TOMBSTONE_COMPACT_THRESHOLD
+    # are pending or the oldest is TOMBSTONE_COMPACT_INTERVAL seconds old
+    TOMBSTONE_DB_PATH = os.getenv("TOMBSTONE_DB_PATH", "./chroma_db/tombstones.sqlite3")
+    TOMBSTONE_COMPACT_THRESHOLD = int(os.getenv("TOMBSTONE_COMPACT_THRESHOLD", "200"))
+    TOMBSTONE_COMPACT_INTERVAL = float(os.getenv("TOMBSTONE_COMPACT_INTERVAL", "3600"))
+
+    # Watch mode (ingest_documents.py --watch): changes are ingested once
+    # INGEST_WATCH_DEBOUNCE seconds pass without another; the manifest holds
+    # the digest of every ingested file
+    INGEST_WATCH_DEBOUNCE = float(os.getenv("INGEST_WATCH_DEBOUNCE", "2.0"))
+    INGEST_POLL_INTERVAL = float(os.getenv("INGEST_POLL_INTERVAL", "1.0"))
+    INGEST_MANIFEST_PATH = os.getenv(
+        "INGEST_MANIFEST_PATH", "./chroma_db/ingest_manifest.json"
+    )
+
+    # Bulk ingests embed and upsert INGEST_BATCH_SIZE chunks at a time, each
+    # batch written to the write-ahead log first so a failed run can resume
+    INGEST_BATCH_SIZE = int(os.getenv("INGEST_BATCH_SIZE", "128"))
+    INGEST_LOG_PATH = os.getenv("INGEST_LOG_PATH", "./chroma_db/ingest.wal")
+
+    # Vector compression ("none", "float16", "int8" or "pq")
+    VECTOR_COMPRESSION = os.getenv("VECTOR_COMPRESSION", "none").lower()
+    COMPRESSED_INDEX_PATH = os.getenv(
+        "COMPRESSED_INDEX_PATH", "./chroma_db/compressed_index.npz"
+    )
+    PQ_SUBVECTORS = int(os.getenv("PQ_SUBVECTORS", "48"))
+    PQ_CENTROIDS = int(os.getenv("PQ_CENTROIDS", "256"))
+    COMPRESSION_RERANK_FACTOR = int(os.getenv("COMPRESSION_RERANK_FACTOR", "4"))
+
+    # Conversation memory (SQLite file shared by all workers on a host)
+    CONVERSATION_DB_PATH = os.getenv(
+        "CONVERSATION_DB_PATH", "./chroma_db/conversations.sqlite3"
+    )
+    CONVERSATION_TTL = float(os.getenv("CONVERSATION_TTL", "1800"))
+    CONVERSATION_MAX_SESSIONS = int(os.getenv("CONVERSATION_MAX_SESSIONS", "10000"))
+    CONVERSATION_RECENT_TURNS = int(os.getenv("CONVERSATION_RECENT_TURNS", "3"))
+    CONVERSATION_SUMMARY_CHARS = int(os.getenv("CONVERSATION_SUMMARY_CHARS", "1200"))
+    # "extractive" folds inside the request; "llm" folds in a background thread
+    CONVERSATION_SUMMARIZER = os.getenv("CONVERSATION_SUMMARIZER", "extractive").lower()
+    # Normalized questions kept for mining frequent ones (build_answer_bank.py)
+    CONVERSATION_QUESTION_RETENTION = float(
+        os.getenv("CONVERSATION_QUESTION_RETENTION", "2592000")
+    )
+    CONVERSATION_MAX_QUESTIONS = int(os.getenv("CONVERSATION_MAX_QUESTIONS", "50000"))
+
+    # Follow-up query rewriting ("rule", "llm" or "off") and retrieval reuse
+    QUERY_REWRITE_MODE = os.getenv("QUERY_REWRITE_MODE", "rule").lower()
+    QUERY_REWRITE_MODEL = os.getenv("QUERY_REWRITE_MODEL", "llama-3.1-8b-instant")
+    RETRIEVAL_REUSE_SIMILARITY = float(os.getenv("RETRIEVAL_REUSE_SIMILARITY", "0.92"))
+    RETRIEVAL_REUSE_ENTRIES = int(os.getenv("RETRIEVAL_REUSE_ENTRIES", "3"))
+
+    # Single-flight: identical in-flight questions share one pipeline run
+    SINGLE_FLIGHT_ENABLED = os.getenv("SINGLE_FLIGHT_ENABLED", "true").lower() == "true"
+    SINGLE_FLIGHT_DB_PATH = os.getenv(
+        "SINGLE_FLIGHT_DB_PATH", "./chroma_db/single_flight.sqlite3"
+    )
+    SINGLE_FLIGHT_WAIT_TIMEOUT = float(os.getenv("SINGLE_FLIGHT_WAIT_TIMEOUT", "30"))
+    SINGLE_FLIGHT_RESULT_TTL = float(os.getenv("SINGLE_FLIGHT_RESULT_TTL", "2"))
+    SINGLE_FLIGHT_POLL_INTERVAL = float(
+        os.getenv("SINGLE_FLIGHT_POLL_INTERVAL", "0.05")
+    )
+
+    # Emergency fast path (vetted instructions before the RAG answer)
+    EMERGENCY_FAST_PATH = os.getenv("EMERGENCY_FAST_PATH", "true").lower() == "true"
+    EMERGENCY_URGENCY_THRESHOLD = float(os.getenv("EMERGENCY_URGENCY_THRESHOLD", "0.6"))
+
+    # Precomputed answers for frequent questions (build with build_answer_bank.py)
+    ANSWER_BANK_ENABLED = os.getenv("ANSWER_BANK_ENABLED", "true").lower() == "true"
+    ANSWER_BANK_PATH = os.getenv("ANSWER_BANK_PATH", "./chroma_db/answer_bank.npz")
+    ANSWER_BANK_QUESTIONS = os.getenv(
+        "ANSWER_BANK_QUESTIONS", "./data/top_questions.txt"
+    )
+    ANSWER_BANK_MIN_SIMILARITY = float(os.getenv("ANSWER_BANK_MIN_SIMILARITY", "0.9"))
+    ANSWER_BANK_RELOAD_INTERVAL = float(os.getenv("ANSWER_BANK_RELOAD_INTERVAL", "5"))
+
+    # Response compression (brotli when installed, else gzip) for larger bodies
+    RESPONSE_COMPRESSION = os.getenv("RESPONSE_COMPRESSION", "true").lower() == "true"
+    RESPONSE_COMPRESSION_MIN_BYTES = int(
+        os.getenv("RESPONSE_COMPRESSION_MIN_BYTES", "500")
+    )
+    RESPONSE_GZIP_LEVEL = int(os.getenv("RESPONSE_GZIP_LEVEL", "6"))
+    RESPONSE_BROTLI_QUALITY = int(os.getenv("RESPONSE_BROTLI_QUALITY", "5"))
+
+    # Memory governor: workers are recycled only above the budget (0 = never),
+    # compared with private memory, not pages shared with the preloaded master
+    MEMORY_RSS_BUDGET_MB = float(os.getenv("MEMORY_RSS_BUDGET_MB", "450"))
+    MEMORY_SAMPLE_EVERY = int(os.getenv("MEMORY_SAMPLE_EVERY", "10"))
+    MEMORY_GC_THRESHOLDS = os.getenv("MEMORY_GC_THRESHOLDS", "10000,20,20")
+    MEMORY_TRACEMALLOC = os.getenv("MEMORY_TRACEMALLOC", "false").lower() == "true"
+    MEMORY_TRACEMALLOC_FRAMES = int(os.getenv("MEMORY_TRACEMALLOC_FRAMES", "1"))
+    MEMORY_REPORT_TOP = int(os.getenv("MEMORY_REPORT_TOP", "10"))
+
+    # Torch/BLAS threads per gunicorn worker (0 = cores / workers); with
+    # CPU_PINNING each worker is pinned to its own block of cores
+    TORCH_INTRA_OP_THREADS = int(os.getenv("TORCH_INTRA_OP_THREADS", "0"))
+    TORCH_INTER_OP_THREADS = int(os.getenv("TORCH_INTER_OP_THREADS", "1"))
+    CPU_PINNING = os.getenv("CPU_PINNING", "false").lower() == "true"
+
+    # Health probes: served from a snapshot refreshed in the background
+    HEALTH_REFRESH_INTERVAL = float(os.getenv("HEALTH_REFRESH_INTERVAL", "30"))
+    HEALTH_MAX_STALENESS = float(os.getenv("HEALTH_MAX_STALENESS", "120"))
+
+    # Admin-only sampling profiler (off unless enabled and ADMIN_TOKEN is set);
+    # ADMIN_TOKEN also guards deletes, replacing ingests and /stats allocation
+    # snapshots
+    ADMIN_TOKEN = os.getenv("ADMIN_TOKEN")
+    PROFILING_ENABLED = os.getenv("PROFILING_ENABLED", "false").lower() == "true"
+    PROFILE_DIR = os.getenv("PROFILE_DIR", "/tmp/rag-chatbot-profiles")
+    PROFILE_INTERVAL_MS = float(os.getenv("PROFILE_INTERVAL_MS", "5"))
+    PROFILE_MAX_SECONDS = float(os.getenv("PROFILE_MAX_SECONDS", "60"))
+
+    # Tracing: spans exported as JSON lines to stdout or TRACING_FILE
+    TRACING_ENABLED = os.getenv("TRACING_ENABLED", "false").lower() == "true"
+    TRACING_EXPORTER = os.getenv("TRACING_EXPORTER", "stdout").lower()
+    TRACING_FILE = os.getenv("TRACING_FILE", "./traces.jsonl")
+    TRACING_SAMPLE_RATIO = float(os.getenv("TRACING_SAMPLE_RATIO", "1.0"))
+    TRACING_SERVICE_NAME = os.getenv("TRACING_SERVICE_NAME", "rag-chatbot")
+
+    # Deployment profile for create_app() and gunicorn: full, lite or minimal
+    # (individual settings can be overridden with APP_<FIELD>, see app_profiles.py)
+    APP_PROFILE = os.getenv("APP_PROFILE", "full").lower()
+    STATIC_LLM_MODEL = os.getenv("STATIC_LLM_MODEL", "llama-3.1-8b-instant")
+    STATIC_LLM_MAX_TOKENS = int(os.getenv("STATIC_LLM_MAX_TOKENS", "400"))
+
     # Flask Configuration
     FLASK_PORT = int(os.getenv("FLASK_PORT", "5000"))
     FLASK_DEBUG = os.getenv("FLASK_DEBUG", "false").lower() == "true"
@@ -0,0 +1,137 @@
+"""
+Torch and BLAS thread settings per gunicorn worker
+Left alone, the PyTorch, OpenMP and MKL pools of every worker size themselves
+to all cores, so four workers embedding at once on four vCPUs run sixteen
+compute threads and p99 latency suffers. Each worker instead gets
+cores / workers intra-op threads, a small inter-op pool and, with CPU
+pinning, its own block of cores. benchmark_threads.py measures which split
+works best on a given machine.
+"""
+
+import os
+import sys
+from typing import Iterable, List, Optional
+from src.utils.config import Config
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Read by OpenMP, MKL, OpenBLAS, Accelerate and numexpr when they start
+THREAD_ENV_VARS = (
+    "OMP_NUM_THREADS",
+    "MKL_NUM_THREADS",
+    "OPENBLAS_NUM_THREADS",
+    "VECLIB_MAXIMUM_THREADS",
+    "NUMEXPR_NUM_THREADS",
+)
+
+
+def available_cpus() -> List[int]:
+    """CPUs this process may run on"""
+    try:
+        return sorted(os.sched_getaffinity(0))
+    except AttributeError:
+        # No affinity API (macOS, Windows)
+        return list(range(os.cpu_count() or 1))
+
+
+def threads_per_worker(workers: int, cpus: Optional[List[int]] = None) -> int:
+    """Intra-op threads per worker (TORCH_INTRA_OP_THREADS, or cores / workers)"""
+    if Config.TORCH_INTRA_OP_THREADS > 0:
+        return Config.TORCH_INTRA_OP_THREADS
+    cpus = cpus if cpus is not None else available_cpus()
+    return max(1, len(cpus) // max(1, workers))
+
+
+def configure_thread_env(threads: int):
+    """
+    Size the native thread pools before torch or numpy is imported
+
+    Variables already set in the environment are left alone. Must run in the
+    gunicorn master before the app is preloaded (gunicorn.conf.py does this).
+    """
+    for name in THREAD_ENV_VARS:
+        os.environ.setdefault(name, str(threads))
+    # The Rust tokenizers pool is not fork-safe and would add its own threads
+    os.environ.setdefault("TOKENIZERS_PARALLELISM", "false")
+
+
+def free_slot(used: Iterable[Optional[int]], workers: int) -> int:
+    """Lowest worker slot not held by a live worker"""
+    used = set(used)
+    for slot in range(max(1, workers)):
+        if slot not in used:
+            return slot
+    return 0
+
+
+def slot_cpus(slot: int, workers: int, cpus: Optional[List[int]] = None) -> List[int]:
+    """
+    Block of CPUs for one worker slot
+
+    With at least as many CPUs as workers each slot gets its own contiguous
+    block (leftover CPUs go to the first slots); otherwise slots share CPUs
+    round-robin.
+    """
+    cpus = cpus if cpus is not None else available_cpus()
+    workers = max(1, workers)
+    if len(cpus) < workers:
+        return [cpus[slot % len(cpus)]]
+    per_slot, extra = divmod(len(cpus), workers)
+    start = slot * per_slot + min(slot, extra)
+    return cpus[start : start + per_slot + (1 if slot < extra else 0)]
+
+
+def apply_thread_settings(
+    intra_op: int, inter_op: int, cpus: Optional[List[int]] = None
+) -> dict:
+    """
+    Set this process's torch threads and, when cpus is given, pin it
+
+    torch is only configured if it is already imported (the preloaded full
+    profile); lazily loading workers pick up the OMP/MKL variables instead.
+    The inter-op pool can only be sized before its first use, so that
+    setting is skipped with a warning when it is too late.
+
+    Returns:
+        The settings that took effect
+    """
+    applied = {}
+    torch = sys.modules.get("torch")
+    if torch is not None:
+        torch.set_num_threads(intra_op)
+        applied["intra_op"] = torch.get_num_threads()
+        try:
+            torch.set_num_interop_threads(inter_op)
+        except RuntimeError as e:
+            logger.warning(f"Could not set inter-op threads: {str(e)}")
+        applied["inter_op"] = torch.get_num_interop_threads()
+
+    if cpus:
+        try:
+            os.sched_setaffinity(0, cpus)
+            applied["cpus"] = sorted(os.sched_getaffinity(0))
+        except (AttributeError, OSError) as e:
+            logger.warning(f"Could not pin to CPUs {cpus}: {str(e)}")
+    return applied
+
+
+def configure_worker(slot: int, workers: int) -> dict:
+    """
+    Apply TORCH_*_THREADS and CPU_PINNING to a freshly forked worker
+
+    Args:
+        slot: Worker slot, 0 to workers - 1 (see free_slot())
+        workers: Number of workers sharing the machine
+
+    Returns:
+        The settings that took effect
+    """
+    cpus = available_cpus()
+    applied = apply_thread_settings(
+        threads_per_worker(workers, cpus),
+        Config.TORCH_INTER_OP_THREADS,
+        slot_cpus(slot, workers, cpus) if Config.CPU_PINNING else None,
+    )
+    logger.info(f"✓ Worker slot {slot} threads: {applied or 'environment only'}")
+    return applied
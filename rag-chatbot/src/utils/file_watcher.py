@@ -0,0 +1,196 @@
+"""
+Directory watching for continuous ingestion
+Uses Linux inotify through libc (no extra dependency) and falls back to
+polling file modification times elsewhere. Events are debounced, so an
+editor's save, or a copy of many files, is handled as one batch.
+"""
+
+import ctypes
+import ctypes.util
+import os
+import select
+import struct
+import time
+from typing import Dict, Iterator, Set, Tuple
+import logging
+
+logger = logging.getLogger(__name__)
+
+_IN_CLOSE_WRITE = 0x00000008
+_IN_MOVED_FROM = 0x00000040
+_IN_MOVED_TO = 0x00000080
+_IN_CREATE = 0x00000100
+_IN_DELETE = 0x00000200
+_IN_DELETE_SELF = 0x00000400
+_IN_Q_OVERFLOW = 0x00004000
+_IN_IGNORED = 0x00008000
+_IN_ISDIR = 0x40000000
+_IN_CLOEXEC = 0o2000000
+
+_WATCH_MASK = (
+    _IN_CLOSE_WRITE
+    | _IN_MOVED_FROM
+    | _IN_MOVED_TO
+    | _IN_CREATE
+    | _IN_DELETE
+    | _IN_DELETE_SELF
+)
+_EVENT_HEADER = struct.Struct("iIII")
+
+
+def scan(root: str, suffixes: Tuple[str, ...]) -> Dict[str, Tuple[int, int]]:
+    """Map every matching file under root to (mtime_ns, size)"""
+    files = {}
+    for directory, _, names in os.walk(root):
+        for name in names:
+            if name.endswith(suffixes):
+                path = os.path.join(directory, name)
+                try:
+                    stat = os.stat(path)
+                except OSError:
+                    continue
+                files[path] = (stat.st_mtime_ns, stat.st_size)
+    return files
+
+
+class PollingWatcher:
+    """Detects changes by comparing directory scans"""
+
+    def __init__(self, root: str, suffixes: Tuple[str, ...], interval: float = 1.0):
+        self.root = root
+        self.suffixes = suffixes
+        self.interval = interval
+        self._files = scan(root, suffixes)
+
+    def poll(self, timeout: float) -> Set[str]:
+        """Paths added, modified or removed within ``timeout`` seconds"""
+        time.sleep(min(timeout, self.interval))
+        files = scan(self.root, self.suffixes)
+        changed = {
+            path
+            for path in files.keys() | self._files.keys()
+            if files.get(path) != self._files.get(path)
+        }
+        self._files = files
+        return changed
+
+    def close(self):
+        pass
+
+
+class InotifyWatcher:
+    """Recursive inotify watch (Linux only)"""
+
+    def __init__(self, root: str, suffixes: Tuple[str, ...]):
+        self.root = root
+        self.suffixes = suffixes
+        self._libc = ctypes.CDLL(ctypes.util.find_library("c"), use_errno=True)
+        self._fd = self._libc.inotify_init1(_IN_CLOEXEC)
+        if self._fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        self._dirs = {}
+        for directory, _, _ in os.walk(root):
+            self._add_watch(directory)
+
+    def poll(self, timeout: float) -> Set[str]:
+        """Paths created, written, moved or removed within ``timeout`` seconds"""
+        ready, _, _ = select.select([self._fd], [], [], timeout)
+        if not ready:
+            return set()
+
+        data = os.read(self._fd, 64 * 1024)
+        changed = set()
+        offset = 0
+        while offset < len(data):
+            wd, mask, _, length = _EVENT_HEADER.unpack_from(data, offset)
+            offset += _EVENT_HEADER.size
+            name = (
+                data[offset : offset + length].rstrip(b"\0").decode("utf-8", "replace")
+            )
+            offset += length
+
+            if mask & _IN_Q_OVERFLOW:
+                # Events were lost: report every file so the caller re-checks
+                logger.warning("inotify queue overflowed, rescanning")
+                changed.update(scan(self.root, self.suffixes))
+                continue
+            if mask & _IN_IGNORED:
+                self._dirs.pop(wd, None)
+                continue
+
+            directory = self._dirs.get(wd)
+            if directory is None or not name:
+                continue
+            path = os.path.join(directory, name)
+
+            if mask & _IN_ISDIR:
+                if mask & (_IN_CREATE | _IN_MOVED_TO):
+                    # Files may land before the watch exists: report them all
+                    for subdirectory, _, _ in os.walk(path):
+                        self._add_watch(subdirectory)
+                    changed.update(scan(path, self.suffixes))
+                elif mask & (_IN_DELETE | _IN_MOVED_FROM):
+                    changed.add(path + os.sep)
+                continue
+
+            if name.endswith(self.suffixes) and mask & (
+                _IN_CLOSE_WRITE | _IN_MOVED_TO | _IN_DELETE | _IN_MOVED_FROM
+            ):
+                changed.add(path)
+        return changed
+
+    def close(self):
+        os.close(self._fd)
+
+    def _add_watch(self, directory: str):
+        wd = self._libc.inotify_add_watch(self._fd, os.fsencode(directory), _WATCH_MASK)
+        if wd < 0:
+            logger.warning(
+                f"Cannot watch {directory}: {os.strerror(ctypes.get_errno())}"
+            )
+            return
+        self._dirs[wd] = directory
+
+
+def create_watcher(
+    root: str, suffixes: Tuple[str, ...], poll_interval: float, polling: bool = False
+):
+    """inotify watcher where available, polling watcher otherwise"""
+    if not polling:
+        try:
+            watcher = InotifyWatcher(root, suffixes)
+            logger.info(f"✓ Watching {root} with inotify")
+            return watcher
+        except (OSError, AttributeError, TypeError) as e:
+            logger.info(f"inotify unavailable ({str(e)}), falling back to polling")
+    logger.info(f"✓ Polling {root} every {poll_interval}s")
+    return PollingWatcher(root, suffixes, poll_interval)
+
+
+def debounced_changes(
+    watcher, debounce: float, max_delay: float = None
+) -> Iterator[Set[str]]:
+    """
+    Yield batches of changed paths
+
+    A batch is emitted once no new change arrived for ``debounce`` seconds,
+    or ``max_delay`` seconds after its first change during a steady stream.
+    A path ending in os.sep stands for a removed directory.
+    """
+    max_delay = max_delay or debounce * 10
+    pending = set()
+    first_change = last_change = None
+    while True:
+        timeout = debounce if pending else 3600.0
+        changes = watcher.poll(timeout)
+        now = time.monotonic()
+        if changes:
+            pending |= changes
+            last_change = now
+            first_change = first_change or now
+        if pending and (
+            now - last_change >= debounce or now - first_change >= max_delay
+        ):
+            yield pending
+            pending = set()
+            first_change = last_change = None
@@ -0,0 +1,181 @@
+"""
+Liveness and readiness probes served from a cached status snapshot
+Dependency checks (collection counts, client setup) run in a background
+thread every HEALTH_REFRESH_INTERVAL seconds, so a load balancer probe only
+reads memory: it never costs an external call or a model load.
+"""
+
+import os
+import threading
+import time
+from typing import Callable, Dict
+from flask import jsonify
+from src.utils.config import Config
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class HealthMonitor:
+    """Named dependency checks with last-success timestamps"""
+
+    def __init__(self, refresh_interval: float = None, max_staleness: float = None):
+        """
+        Initialize monitor (defaults come from Config)
+
+        Args:
+            refresh_interval: Seconds between background refreshes
+            max_staleness: Seconds a check may go without succeeding before
+                the process is reported as not ready
+        """
+        self.refresh_interval = refresh_interval or Config.HEALTH_REFRESH_INTERVAL
+        self.max_staleness = max_staleness or Config.HEALTH_MAX_STALENESS
+        self.started_at = time.time()
+        self._checks: Dict[str, Callable[[], dict]] = {}
+        self._status = {}
+        self._lock = threading.Lock()
+        self._thread_pid = None
+
+    def add_check(self, name: str, check: Callable[[], dict]):
+        """
+        Register a check
+
+        Args:
+            name: Check name shown in the snapshot
+            check: Callable returning a dict of details; raising marks the
+                check as failed. It must stay cheap for lazily loaded apps
+                (report "loaded": False rather than loading anything).
+        """
+        self._checks[name] = check
+        self._status[name] = {
+            "ok": False,
+            "details": {},
+            "last_success": None,
+            "last_error": None,
+            "checked_at": None,
+        }
+
+    def refresh(self):
+        """Run every check once and update the snapshot"""
+        for name, check in self._checks.items():
+            started = time.time()
+            try:
+                details = check() or {}
+                update = {
+                    "ok": True,
+                    "details": details,
+                    "last_success": started,
+                    "duration_ms": round((time.time() - started) * 1000, 1),
+                }
+            except Exception as e:
+                update = {"ok": False, "last_error": str(e)[:300]}
+                logger.warning(f"Health check '{name}' failed: {str(e)}")
+            with self._lock:
+                self._status[name] = {
+                    **self._status[name],
+                    **update,
+                    "checked_at": started,
+                }
+
+    def start(self):
+        """Start the refresh thread in this process (no-op if running)"""
+        pid = os.getpid()
+        if self._thread_pid == pid:
+            return
+        with self._lock:
+            if self._thread_pid == pid:
+                return
+            # Threads do not survive fork, so each worker starts its own
+            self._thread_pid = pid
+        threading.Thread(target=self._run, name="health-refresh", daemon=True).start()
+
+    def snapshot(self) -> dict:
+        """
+        Current status without running any check
+
+        Returns:
+            Dict with "ready", per-check status and the snapshot age
+        """
+        self.start()
+        now = time.time()
+        with self._lock:
+            checks = {name: dict(status) for name, status in self._status.items()}
+
+        ready = True
+        for status in checks.values():
+            last_success = status["last_success"]
+            fresh = (
+                last_success is not None and now - last_success <= self.max_staleness
+            )
+            status["ready"] = fresh
+            ready = ready and fresh
+            for key in ("last_success", "checked_at"):
+                if status[key] is not None:
+                    status[f"{key}_age_s"] = round(now - status[key], 1)
+
+        return {
+            "ready": ready,
+            "pid": os.getpid(),
+            "uptime_s": round(now - self.started_at, 1),
+            "checks": checks,
+        }
+
+    def _run(self):
+        while True:
+            try:
+                self.refresh()
+            except Exception as e:
+                logger.error(f"Health refresh failed: {str(e)}")
+            time.sleep(self.refresh_interval)
+
+
+def init_health(app, monitor: HealthMonitor, **info):
+    """
+    Register probe endpoints
+
+    Endpoints:
+        GET /health/live
+            Always 200 while the process can serve requests.
+        GET /health/ready
+            200 when every check succeeded recently, 503 otherwise.
+        GET /health
+            Readiness plus ``info`` and the cached check details (503 when
+            not ready), for dashboards and the frontend.
+
+    Args:
+        app: Flask app
+        monitor: HealthMonitor holding the checks
+        info: Static fields added to the /health payload
+    """
+
+    @app.route("/health/live", methods=["GET"])
+    def liveness():
+        return jsonify(
+            {
+                "status": "alive",
+                "pid": os.getpid(),
+                "uptime_s": round(time.time() - monitor.started_at, 1),
+            }
+        )
+
+    @app.route("/health/ready", methods=["GET"])
+    def readiness():
+        snapshot = monitor.snapshot()
+        status = "ready" if snapshot["ready"] else "not_ready"
+        return jsonify({"status": status, **snapshot}), (
+            200 if snapshot["ready"] else 503
+        )
+
+    @app.route("/health", methods=["GET"])
+    def health():
+        snapshot = monitor.snapshot()
+        details = {}
+        for status in snapshot["checks"].values():
+            details.update(status["details"])
+        payload = {
+            "status": "healthy" if snapshot["ready"] else "unhealthy",
+            **info,
+            **details,
+            **snapshot,
+        }
+        return jsonify(payload), 200 if snapshot["ready"] else 503
@@ -0,0 +1,265 @@
+"""
+Per-worker memory governor
+Tunes the garbage collector, freezes objects loaded before the fork, samples
+memory (and optionally tracemalloc) every few requests and asks gunicorn to
+recycle a worker only once its private memory crosses the configured budget.
+RSS is not compared: it counts the model pages a worker shares copy-on-write
+with the preloaded master, which a recycled worker would map again anyway.
+"""
+
+import gc
+import os
+import resource
+import threading
+import time
+import tracemalloc
+from typing import List, Optional
+from src.utils.config import Config
+import logging
+
+logger = logging.getLogger(__name__)
+
+_MB = 1024 * 1024
+
+
+def rss_bytes() -> int:
+    """Current resident set size of this process"""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        pass
+    try:
+        import psutil
+
+        return psutil.Process().memory_info().rss
+    except ImportError:
+        # Peak rather than current RSS, in KiB on Linux and bytes on macOS
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak if peak > 1 << 32 else peak * 1024
+
+
+def private_bytes(path: str = "/proc/self/smaps_rollup") -> int:
+    """
+    Unique set size (memory no other process shares) of this process
+
+    Read from smaps_rollup on Linux; elsewhere resident minus shared pages
+    from statm, or RSS when neither is available.
+    """
+    try:
+        total = 0
+        with open(path) as f:
+            for line in f:
+                if line.startswith(("Private_Clean:", "Private_Dirty:")):
+                    total += int(line.split()[1]) * 1024
+        return total
+    except (OSError, ValueError, IndexError):
+        pass
+    try:
+        with open("/proc/self/statm") as f:
+            fields = f.read().split()
+        return (int(fields[1]) - int(fields[2])) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        return rss_bytes()
+
+
+def parse_thresholds(value: str) -> Optional[tuple]:
+    """Parse "gen0,gen1,gen2" GC thresholds (empty keeps Python's defaults)"""
+    if not value or not value.strip():
+        return None
+    thresholds = tuple(int(part) for part in value.split(","))
+    if not 1 <= len(thresholds) <= 3:
+        raise ValueError(f"Expected 1-3 GC thresholds, got {value!r}")
+    return thresholds
+
+
+class MemoryGovernor:
+    """GC tuning, memory sampling and budget-based worker recycling"""
+
+    def __init__(
+        self,
+        rss_budget_mb: float = None,
+        sample_every: int = None,
+        gc_thresholds: str = None,
+        trace_allocations: bool = None,
+    ):
+        """
+        Initialize governor (defaults come from Config)
+
+        Args:
+            rss_budget_mb: Recycle the worker above this much private memory
+                (0 disables); a worker that starts above it is recycled only
+                once it has grown by the budget
+            sample_every: Requests between memory samples
+            gc_thresholds: "gen0,gen1,gen2" collector thresholds
+            trace_allocations: Track allocation sites with tracemalloc
+        """
+        self.rss_budget = (
+            rss_budget_mb if rss_budget_mb is not None else Config.MEMORY_RSS_BUDGET_MB
+        ) * _MB
+        self.sample_every = max(1, sample_every or Config.MEMORY_SAMPLE_EVERY)
+        self.gc_thresholds = parse_thresholds(
+            gc_thresholds if gc_thresholds is not None else Config.MEMORY_GC_THRESHOLDS
+        )
+        self.trace_allocations = (
+            trace_allocations
+            if trace_allocations is not None
+            else Config.MEMORY_TRACEMALLOC
+        )
+
+        self._lock = threading.Lock()
+        self._baseline = None
+        self.requests = 0
+        self.rss = 0
+        self.private = 0
+        self.peak_private = 0
+        self.started_private = 0
+        self.limit = self.rss_budget
+        self.sampled_at = None
+        self.growth = []
+
+    def configure_gc(self):
+        """Apply the configured collector thresholds"""
+        if self.gc_thresholds:
+            gc.set_threshold(*self.gc_thresholds)
+            logger.info(f"✓ GC thresholds set to {gc.get_threshold()}")
+
+    def freeze(self):
+        """
+        Collect once, then move every surviving object to the permanent
+        generation so later collections skip it
+
+        Called in the gunicorn master after preload_app (workers then share
+        those pages instead of dirtying them with GC bookkeeping), and once a
+        lazily initialized worker has loaded all its components.
+        """
+        gc.collect()
+        gc.freeze()
+        logger.info(f"✓ Froze {gc.get_freeze_count()} objects out of the GC")
+
+    def start_worker(self):
+        """Reset per-worker state after fork and take the baseline sample"""
+        self.configure_gc()
+        self.requests = 0
+        self.growth = []
+        if self.trace_allocations and not tracemalloc.is_tracing():
+            tracemalloc.start(Config.MEMORY_TRACEMALLOC_FRAMES)
+        self.started_private = self.sample()
+        self.limit = self.rss_budget
+        if self.rss_budget and self.started_private > self.rss_budget:
+            # Recycling cannot help: a fresh worker would start just as large
+            self.limit = self.started_private + self.rss_budget
+            logger.warning(
+                f"Worker {os.getpid()} starts with {self.started_private / _MB:.0f} MB "
+                f"private memory, above MEMORY_RSS_BUDGET_MB; recycling it above "
+                f"{self.limit / _MB:.0f} MB"
+            )
+        if self.trace_allocations:
+            self._baseline = tracemalloc.take_snapshot()
+
+    def after_request(self) -> bool:
+        """
+        Count a request and sample memory every ``sample_every`` requests
+
+        Returns:
+            True when the worker is over its memory budget and should be
+            recycled
+        """
+        with self._lock:
+            self.requests += 1
+            if self.requests % self.sample_every:
+                return False
+
+        private = self.sample()
+        if not self.limit or private <= self.limit:
+            return False
+
+        logger.warning(
+            f"Worker {os.getpid()} private memory {private / _MB:.0f} MB exceeds "
+            f"{self.limit / _MB:.0f} MB after {self.requests} requests, recycling"
+        )
+        for site in self.allocation_growth():
+            logger.warning(
+                f"  +{site['size_diff_kb']:.0f} KB ({site['count_diff']:+d} blocks) "
+                f"at {site['site']}"
+            )
+        return True
+
+    def sample(self) -> int:
+        """Record current RSS and private memory; returns the private memory"""
+        self.rss = rss_bytes()
+        self.private = private_bytes()
+        self.peak_private = max(self.peak_private, self.private)
+        self.sampled_at = time.time()
+        return self.private
+
+    def allocation_growth(self, limit: int = None) -> List[dict]:
+        """
+        Allocation sites that grew most since the worker started
+
+        Returns:
+            List of {"site", "size_diff_kb", "count_diff"} (empty when
+            tracemalloc is off)
+        """
+        if self._baseline is None or not tracemalloc.is_tracing():
+            return []
+
+        snapshot = tracemalloc.take_snapshot().filter_traces(
+            [tracemalloc.Filter(False, tracemalloc.__file__)]
+        )
+        stats = [
+            stat
+            for stat in snapshot.compare_to(self._baseline, "lineno")
+            if stat.size_diff >= 1024
+        ]
+        self.growth = [
+            {
+                "site": str(stat.traceback[0]),
+                "size_diff_kb": round(stat.size_diff / 1024, 1),
+                "count_diff": stat.count_diff,
+            }
+            for stat in stats[: limit or Config.MEMORY_REPORT_TOP]
+        ]
+        return self.growth
+
+    def stats(self, allocations: bool = False) -> dict:
+        """
+        Memory report for /stats
+
+        Args:
+            allocations: Take a tracemalloc snapshot for fresh allocation
+                growth; otherwise the last computed growth is reported
+
+        Returns:
+            Dictionary of memory, GC and allocation figures
+        """
+        self.sample()
+        return {
+            "pid": os.getpid(),
+            "rss_mb": round(self.rss / _MB, 1),
+            "private_mb": round(self.private / _MB, 1),
+            "peak_private_mb": round(self.peak_private / _MB, 1),
+            "started_private_mb": round(self.started_private / _MB, 1),
+            "rss_budget_mb": round(self.rss_budget / _MB, 1),
+            "recycle_above_mb": round(self.limit / _MB, 1),
+            "requests": self.requests,
+            "gc_thresholds": gc.get_threshold(),
+            "gc_counts": gc.get_count(),
+            "gc_frozen": gc.get_freeze_count(),
+            "allocation_growth": (
+                self.allocation_growth() if allocations else self.growth
+            ),
+        }
+
+
+_governor = None
+_governor_lock = threading.Lock()
+
+
+def get_governor() -> MemoryGovernor:
+    """Process-wide governor (inherited by workers across fork)"""
+    global _governor
+    with _governor_lock:
+        if _governor is None:
+            _governor = MemoryGovernor()
+    return _governor
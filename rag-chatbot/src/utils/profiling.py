@@ -0,0 +1,357 @@
+"""
+On-demand sampling profiler for the Flask apps
+Admin-only and opt-in: nothing is registered unless PROFILING_ENABLED is set
+together with ADMIN_TOKEN, so a disabled profiler costs nothing per request.
+Profiles are written as speedscope JSON or collapsed stacks (flamegraph.pl)
+to a directory shared by every worker on the host.
+"""
+
+import hmac
+import json
+import os
+import sys
+import threading
+import time
+import uuid
+from collections import Counter
+from typing import Iterable
+from flask import jsonify, request, send_file
+from src.utils.config import Config
+import logging
+
+logger = logging.getLogger(__name__)
+
+PROFILE_FORMATS = {
+    "speedscope": ("speedscope.json", "application/json"),
+    "collapsed": ("collapsed.txt", "text/plain"),
+}
+
+# Innermost project package on a stack decides where the time is attributed
+_COMPONENTS = {
+    f"{os.sep}src{os.sep}{package}{os.sep}": package
+    for package in (
+        "retriever",
+        "embeddings",
+        "vectorstore",
+        "llm",
+        "conversation",
+        "emergency",
+        "utils",
+    )
+}
+
+
+class SamplingProfiler:
+    """Wall-clock stack sampler built on sys._current_frames()"""
+
+    def __init__(self, interval: float = None, thread_ids: Iterable[int] = None):
+        """
+        Initialize profiler
+
+        Args:
+            interval: Seconds between samples (defaults to PROFILE_INTERVAL_MS)
+            thread_ids: Only sample these threads (None samples all others)
+        """
+        self.interval = interval or Config.PROFILE_INTERVAL_MS / 1000.0
+        self.thread_ids = set(thread_ids) if thread_ids else None
+        self.stacks = Counter()
+        self.samples = 0
+        self.started_at = None
+        self.duration = 0.0
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        self.started_at = time.perf_counter()
+        self._thread = threading.Thread(
+            target=self._run, name="sampling-profiler", daemon=True
+        )
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+        self.duration = time.perf_counter() - self.started_at
+        return self
+
+    def run_for(self, seconds: float):
+        """Profile for a fixed time, blocking the caller"""
+        self.start()
+        time.sleep(seconds)
+        return self.stop()
+
+    def _run(self):
+        own_id = threading.get_ident()
+        while not self._stop.wait(self.interval):
+            names = {t.ident: t.name for t in threading.enumerate()}
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id == own_id:
+                    continue
+                if self.thread_ids is not None and thread_id not in self.thread_ids:
+                    continue
+                stack = []
+                while frame is not None:
+                    code = frame.f_code
+                    stack.append((code.co_name, code.co_filename, code.co_firstlineno))
+                    frame = frame.f_back
+                stack.reverse()
+                self.stacks[(names.get(thread_id, str(thread_id)), tuple(stack))] += 1
+            self.samples += 1
+
+    def component_breakdown(self) -> dict:
+        """Share of samples per project package (retriever, embeddings, ...)"""
+        totals = Counter()
+        for (_, stack), count in self.stacks.items():
+            component = "other"
+            for _, filename, _ in reversed(stack):
+                match = next(
+                    (
+                        name
+                        for marker, name in _COMPONENTS.items()
+                        if marker in filename
+                    ),
+                    None,
+                )
+                if match:
+                    component = match
+                    break
+            totals[component] += count
+        total = sum(totals.values()) or 1
+        return {name: round(count / total, 3) for name, count in totals.most_common()}
+
+    def to_collapsed(self) -> str:
+        """Brendan Gregg's folded-stack format, one line per unique stack"""
+        lines = []
+        for (thread_name, stack), count in self.stacks.most_common():
+            frames = [thread_name] + [
+                f"{name} ({_short(filename)}:{line})" for name, filename, line in stack
+            ]
+            lines.append(f"{';'.join(frames)} {count}")
+        return "\n".join(lines) + "\n"
+
+    def to_speedscope(self, name: str = "rag-chatbot") -> dict:
+        """speedscope file with one sampled profile per thread"""
+        frame_index = {}
+        frames = []
+        by_thread = {}
+
+        for (thread_name, stack), count in self.stacks.items():
+            indices = []
+            for frame in stack:
+                if frame not in frame_index:
+                    frame_index[frame] = len(frames)
+                    frames.append(
+                        {"name": frame[0], "file": _short(frame[1]), "line": frame[2]}
+                    )
+                indices.append(frame_index[frame])
+            profile = by_thread.setdefault(thread_name, {"samples": [], "weights": []})
+            profile["samples"].append(indices)
+            profile["weights"].append(count * self.interval)
+
+        profiles = [
+            {
+                "type": "sampled",
+                "name": thread_name,
+                "unit": "seconds",
+                "startValue": 0,
+                "endValue": sum(profile["weights"]),
+                "samples": profile["samples"],
+                "weights": profile["weights"],
+            }
+            for thread_name, profile in sorted(by_thread.items())
+        ]
+        return {
+            "$schema": "https://www.speedscope.app/file-format-schema.json",
+            "name": name,
+            "exporter": "rag-chatbot sampling profiler",
+            "activeProfileIndex": 0,
+            "shared": {"frames": frames},
+            "profiles": profiles,
+        }
+
+    def save(self, profile_id: str, fmt: str, name: str) -> str:
+        """Write the profile (plus a small summary) to PROFILE_DIR"""
+        suffix, _ = PROFILE_FORMATS[fmt]
+        os.makedirs(Config.PROFILE_DIR, exist_ok=True)
+        path = os.path.join(Config.PROFILE_DIR, f"{profile_id}.{suffix}")
+
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            if fmt == "speedscope":
+                json.dump(self.to_speedscope(name), f)
+            else:
+                f.write(self.to_collapsed())
+        os.replace(tmp_path, path)
+
+        with open(_summary_path(profile_id), "w", encoding="utf-8") as f:
+            json.dump(self.summary(profile_id, fmt, name), f)
+        return path
+
+    def summary(self, profile_id: str, fmt: str, name: str) -> dict:
+        return {
+            "profile_id": profile_id,
+            "name": name,
+            "format": fmt,
+            "pid": os.getpid(),
+            "duration_s": round(self.duration, 3),
+            "samples": self.samples,
+            "components": self.component_breakdown(),
+        }
+
+
+def init_profiling(app):
+    """
+    Register admin profiling endpoints and the per-request header hook
+
+    Does nothing unless Config.PROFILING_ENABLED and Config.ADMIN_TOKEN are
+    both set, so a disabled profiler adds no per-request work.
+
+    Endpoints (all need an "X-Admin-Token" header):
+        POST /admin/profile?seconds=10&format=speedscope[&wait=true]
+            Sample this worker for a while. Returns 202 with a profile ID, or
+            the profile itself when wait=true.
+        GET /admin/profile/<profile_id>
+            Download a finished profile (served by any worker on the host).
+
+    Per request: send "X-Profile: speedscope" (or "collapsed") with the admin
+    token; the response carries "X-Profile-Id" for the download endpoint.
+    """
+    if not Config.PROFILING_ENABLED:
+        return
+    if not Config.ADMIN_TOKEN:
+        logger.warning("PROFILING_ENABLED is set but ADMIN_TOKEN is empty, skipping")
+        return
+
+    @app.route("/admin/profile", methods=["POST"])
+    def start_profile():
+        if not is_admin():
+            return jsonify({"error": "Forbidden"}), 403
+
+        fmt = request.args.get("format", "speedscope")
+        if fmt not in PROFILE_FORMATS:
+            return jsonify({"error": f"Unknown format: {fmt}"}), 400
+        try:
+            seconds = float(request.args.get("seconds", "10"))
+        except ValueError:
+            return jsonify({"error": "'seconds' must be a number"}), 400
+        seconds = min(max(seconds, 0.1), Config.PROFILE_MAX_SECONDS)
+
+        profile_id = uuid.uuid4().hex
+        name = f"worker {os.getpid()} ({seconds:g}s)"
+
+        # The requesting thread only sleeps, so leave it out of the profile
+        others = [
+            t.ident for t in threading.enumerate() if t.ident != threading.get_ident()
+        ]
+
+        if request.args.get("wait", "false").lower() == "true":
+            SamplingProfiler(thread_ids=others).run_for(seconds).save(
+                profile_id, fmt, name
+            )
+            return _send_profile(profile_id)
+
+        def run():
+            try:
+                SamplingProfiler().run_for(seconds).save(profile_id, fmt, name)
+            except Exception as e:
+                logger.error(f"Profile {profile_id} failed: {str(e)}")
+
+        threading.Thread(target=run, name="profile-runner", daemon=True).start()
+        return (
+            jsonify(
+                {
+                    "profile_id": profile_id,
+                    "pid": os.getpid(),
+                    "seconds": seconds,
+                    "format": fmt,
+                    "download": f"/admin/profile/{profile_id}",
+                }
+            ),
+            202,
+        )
+
+    @app.route("/admin/profile/<profile_id>", methods=["GET"])
+    def get_profile(profile_id):
+        if not is_admin():
+            return jsonify({"error": "Forbidden"}), 403
+        if not profile_id.isalnum():
+            return jsonify({"error": "Invalid profile id"}), 400
+        return _send_profile(profile_id)
+
+    @app.before_request
+    def start_request_profile():
+        fmt = request.headers.get("X-Profile")
+        if not fmt or fmt not in PROFILE_FORMATS or not is_admin():
+            return
+        request.environ["rag.profiler"] = (
+            SamplingProfiler(thread_ids=[threading.get_ident()]).start(),
+            fmt,
+        )
+
+    @app.after_request
+    def finish_request_profile(response):
+        active = request.environ.pop("rag.profiler", None)
+        if active is None:
+            return response
+
+        profiler, fmt = active
+        profiler.stop()
+        profile_id = uuid.uuid4().hex
+        try:
+            profiler.save(profile_id, fmt, f"{request.method} {request.path}")
+            response.headers["X-Profile-Id"] = profile_id
+        except Exception as e:
+            logger.error(f"Could not save request profile: {str(e)}")
+        return response
+
+    logger.warning("⚠ Profiling endpoints enabled at /admin/profile")
+
+
+def is_admin() -> bool:
+    """Whether the request carries ADMIN_TOKEN in its X-Admin-Token header"""
+    token = request.headers.get("X-Admin-Token", "")
+    # compare_digest only accepts ASCII str, so compare the UTF-8 bytes
+    return (
+        bool(token)
+        and bool(Config.ADMIN_TOKEN)
+        and hmac.compare_digest(
+            token.encode("utf-8"), Config.ADMIN_TOKEN.encode("utf-8")
+        )
+    )
+
+
+def _send_profile(profile_id: str):
+    """Send a finished profile, or report that it is still running"""
+    summary_path = _summary_path(profile_id)
+    if not os.path.exists(summary_path):
+        return jsonify({"profile_id": profile_id, "status": "pending"}), 404
+
+    with open(summary_path, encoding="utf-8") as f:
+        summary = json.load(f)
+    suffix, mimetype = PROFILE_FORMATS[summary["format"]]
+    response = send_file(
+        os.path.join(Config.PROFILE_DIR, f"{profile_id}.{suffix}"),
+        mimetype=mimetype,
+        as_attachment=True,
+        download_name=f"{profile_id}.{suffix}",
+    )
+    response.headers["X-Profile-Summary"] = json.dumps(
+        {"duration_s": summary["duration_s"], "components": summary["components"]}
+    )
+    return response
+
+
+def _summary_path(profile_id: str) -> str:
+    return os.path.join(Config.PROFILE_DIR, f"{profile_id}.summary.json")
+
+
+def _short(filename: str) -> str:
+    """Trim site-packages/project prefixes from frame file names"""
+    for marker in ("site-packages" + os.sep, f"{os.sep}src{os.sep}"):
+        position = filename.rfind(marker)
+        if position != -1:
+            prefix = "src" + os.sep if marker.endswith(f"src{os.sep}") else ""
+            return prefix + filename[position + len(marker) :]
+    return filename
@@ -0,0 +1,136 @@
+"""
+Lean API responses: fast JSON encoding, field masks and compression
+"""
+
+import gzip
+from typing import Iterable, Optional
+from flask import request
+from flask.json.provider import DefaultJSONProvider
+from src.utils.config import Config
+import logging
+
+logger = logging.getLogger(__name__)
+
+try:
+    import orjson
+except ImportError:  # orjson is optional
+    orjson = None
+
+try:
+    import brotli
+except ImportError:  # brotli is optional
+    brotli = None
+
+_COMPRESSIBLE_TYPES = ("application/json", "application/x-ndjson", "text/")
+
+
+class FastJSONProvider(DefaultJSONProvider):
+    """Flask JSON provider using orjson when installed"""
+
+    # Key order carries no meaning for clients and sorting costs CPU
+    sort_keys = False
+
+    def dumps(self, obj, **kwargs) -> str:
+        if orjson is not None and not kwargs.get("indent"):
+            try:
+                return orjson.dumps(
+                    obj,
+                    default=self.default,
+                    option=orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS,
+                ).decode("utf-8")
+            except TypeError:
+                pass  # Fall back to the stdlib encoder for exotic types
+        return super().dumps(obj, **kwargs)
+
+
+def apply_field_mask(
+    payload: dict,
+    fields: Optional[Iterable[str]] = None,
+    exclude: Optional[Iterable[str]] = None,
+) -> dict:
+    """
+    Keep only the requested top-level fields of a response payload
+
+    Args:
+        payload: Response dict
+        fields: Fields to keep (None keeps all)
+        exclude: Fields to drop
+
+    Returns:
+        New dict with the mask applied
+    """
+    if fields:
+        fields = set(fields)
+        payload = {key: value for key, value in payload.items() if key in fields}
+    if exclude:
+        exclude = set(exclude)
+        payload = {key: value for key, value in payload.items() if key not in exclude}
+    return payload
+
+
+def requested_field_mask(data: Optional[dict] = None):
+    """
+    Read a field mask from the JSON body or query string
+
+    Both accept "fields" and "exclude", as lists or comma-separated strings.
+
+    Returns:
+        Tuple (fields, exclude), each a list or None
+
+    Raises:
+        ValueError: When a mask is neither a string nor a list of strings
+    """
+    data = data or {}
+
+    def read(name):
+        value = data.get(name, request.args.get(name))
+        if not value:
+            return None
+        if isinstance(value, str):
+            value = value.split(",")
+        if not isinstance(value, list) or not all(
+            isinstance(field, str) for field in value
+        ):
+            raise ValueError(f"'{name}' must be a list of field names or a string")
+        return [field.strip() for field in value if field.strip()]
+
+    return read("fields"), read("exclude")
+
+
+def init_compression(app):
+    """Compress eligible responses with brotli or gzip (per Accept-Encoding)"""
+    if not Config.RESPONSE_COMPRESSION:
+        return
+
+    @app.after_request
+    def compress_response(response):
+        if (
+            response.direct_passthrough
+            or response.is_streamed
+            or response.status_code < 200
+            or response.status_code in (204, 304)
+            or "Content-Encoding" in response.headers
+            or not (response.mimetype or "").startswith(_COMPRESSIBLE_TYPES)
+        ):
+            return response
+
+        response.vary.add("Accept-Encoding")
+        body = response.get_data()
+        if len(body) < Config.RESPONSE_COMPRESSION_MIN_BYTES:
+            return response
+
+        accepted = request.accept_encodings
+        if brotli is not None and accepted["br"]:
+            encoding = "br"
+            body = brotli.compress(body, quality=Config.RESPONSE_BROTLI_QUALITY)
+        elif accepted["gzip"]:
+            encoding = "gzip"
+            body = gzip.compress(body, compresslevel=Config.RESPONSE_GZIP_LEVEL)
+        else:
+            return response
+
+        response.set_data(body)
+        response.headers["Content-Encoding"] = encoding
+        return response
+
+    logger.info(f"✓ Response compression enabled ({'br, ' if brotli else ''}gzip)")
@@ -0,0 +1,252 @@
+"""
+Single-flight coalescing of identical in-flight work
+The first caller for a key runs the work; concurrent callers with the same
+key wait for its result instead of repeating it. Threads of one worker meet
+on an in-memory call table, and workers on the same host meet on a small
+SQLite table that holds the claim and, briefly, the JSON-encoded result.
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Callable, Tuple
+from src.utils.config import Config
+from src.utils.sqlite import thread_connection
+import logging
+
+logger = logging.getLogger(__name__)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS flights (
+    key TEXT PRIMARY KEY,
+    owner_pid INTEGER NOT NULL,
+    started_at REAL NOT NULL,
+    finished_at REAL,
+    result TEXT
+);
+"""
+
+
+def normalize_query(query: str) -> str:
+    """Case-fold, collapse whitespace and drop trailing punctuation"""
+    return " ".join(query.lower().split()).rstrip("?!. ")
+
+
+def flight_key(**parts) -> str:
+    """Stable key for the given parts (query, filters, ...)"""
+    payload = json.dumps(parts, sort_keys=True, default=str)
+    return hashlib.sha1(payload.encode("utf-8")).hexdigest()
+
+
+class _Call:
+    """One in-process execution that other threads can wait on"""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    """Coalesces concurrent calls with the same key, within and across workers"""
+
+    def __init__(
+        self,
+        path: str = None,
+        wait_timeout: float = None,
+        result_ttl: float = None,
+        poll_interval: float = None,
+    ):
+        """
+        Initialize single-flight group (defaults come from Config)
+
+        Args:
+            path: SQLite file shared by the workers on a host (None or empty
+                coalesces within this process only)
+            wait_timeout: Seconds to wait for another caller before running
+                the work anyway
+            result_ttl: Seconds a finished result stays available to callers
+                that arrive just after it completed
+            poll_interval: Seconds between checks for another worker's result
+        """
+        self.path = path if path is not None else Config.SINGLE_FLIGHT_DB_PATH
+        self.wait_timeout = wait_timeout or Config.SINGLE_FLIGHT_WAIT_TIMEOUT
+        self.result_ttl = (
+            result_ttl if result_ttl is not None else Config.SINGLE_FLIGHT_RESULT_TTL
+        )
+        self.poll_interval = poll_interval or Config.SINGLE_FLIGHT_POLL_INTERVAL
+
+        self._calls = {}
+        self._lock = threading.Lock()
+        self.counters = {"executed": 0, "shared_local": 0, "shared_remote": 0}
+
+        if self.path:
+            directory = os.path.dirname(os.path.abspath(self.path))
+            os.makedirs(directory, exist_ok=True)
+            self._connection().executescript(_SCHEMA)
+            logger.info(f"✓ Single-flight store at {self.path}")
+
+    def do(self, key: str, fn: Callable[[], dict]) -> Tuple[dict, bool]:
+        """
+        Run fn once for all concurrent callers with the same key
+
+        Args:
+            key: Coalescing key (see flight_key())
+            fn: Work to run; its result must be JSON-serializable to be
+                shared with other workers
+
+        Returns:
+            Tuple (result, shared), where shared is True when the result came
+            from another caller's execution
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+
+        if not leader:
+            if not call.done.wait(self.wait_timeout):
+                logger.warning("Timed out waiting for an identical request, running it")
+                return self._execute(fn), False
+            if call.error is not None:
+                raise call.error
+            self.counters["shared_local"] += 1
+            return call.result, True
+
+        try:
+            call.result, shared = self._do_across_workers(key, fn)
+            return call.result, shared
+        except Exception as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                self._calls.pop(key, None)
+            call.done.set()
+
+    def stats(self) -> dict:
+        return {"in_flight": len(self._calls), **self.counters}
+
+    def _do_across_workers(self, key: str, fn: Callable[[], dict]):
+        if not self.path:
+            return self._execute(fn), False
+
+        deadline = time.monotonic() + self.wait_timeout
+        while True:
+            try:
+                claimed, row = self._claim(key)
+            except sqlite3.Error as e:
+                logger.warning(f"Single-flight store unavailable: {str(e)}")
+                return self._execute(fn), False
+
+            if claimed:
+                return self._run_claimed(key, fn), False
+
+            owner_pid, result = row
+            if result is not None:
+                self.counters["shared_remote"] += 1
+                return json.loads(result), True
+            if not _pid_alive(owner_pid) or time.monotonic() > deadline:
+                # The owner died or is too slow; run it without sharing
+                self._release(key, owner_pid)
+                return self._execute(fn), False
+            time.sleep(self.poll_interval)
+
+    def _claim(self, key: str):
+        """
+        Try to become the worker that runs this key
+
+        Returns:
+            Tuple (claimed, (owner_pid, result) of the existing row or None)
+        """
+        now = time.time()
+        connection = self._connection()
+        with connection:
+            connection.execute(
+                "DELETE FROM flights WHERE finished_at < ? OR started_at < ?",
+                (now - self.result_ttl, now - 2 * self.wait_timeout),
+            )
+            claimed = connection.execute(
+                "INSERT OR IGNORE INTO flights (key, owner_pid, started_at) "
+                "VALUES (?, ?, ?)",
+                (key, os.getpid(), now),
+            ).rowcount
+            if claimed:
+                return True, None
+            row = connection.execute(
+                "SELECT owner_pid, result FROM flights WHERE key = ?", (key,)
+            ).fetchone()
+        # The row may have expired between the insert and the select
+        return (False, row) if row else self._claim(key)
+
+    def _run_claimed(self, key: str, fn: Callable[[], dict]) -> dict:
+        try:
+            result = self._execute(fn)
+        except Exception:
+            # Let waiting workers run the query themselves
+            self._release(key, os.getpid())
+            raise
+
+        try:
+            encoded = json.dumps(result)
+        except (TypeError, ValueError):
+            self._release(key, os.getpid())
+            return result
+
+        try:
+            connection = self._connection()
+            with connection:
+                connection.execute(
+                    "UPDATE flights SET result = ?, finished_at = ? "
+                    "WHERE key = ? AND owner_pid = ?",
+                    (encoded, time.time(), key, os.getpid()),
+                )
+        except sqlite3.Error as e:
+            logger.warning(f"Could not publish single-flight result: {str(e)}")
+        return result
+
+    def _release(self, key: str, owner_pid: int):
+        try:
+            connection = self._connection()
+            with connection:
+                connection.execute(
+                    "DELETE FROM flights WHERE key = ? AND owner_pid = ? "
+                    "AND result IS NULL",
+                    (key, owner_pid),
+                )
+        except sqlite3.Error as e:
+            logger.warning(f"Could not release single-flight claim: {str(e)}")
+
+    def _execute(self, fn: Callable[[], dict]) -> dict:
+        self.counters["executed"] += 1
+        return fn()
+
+    def _connection(self) -> sqlite3.Connection:
+        return thread_connection(self.path)
+
+
+def _pid_alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
+
+
+_single_flight = None
+_single_flight_lock = threading.Lock()
+
+
+def get_single_flight() -> SingleFlight:
+    """Process-wide single-flight group"""
+    global _single_flight
+    with _single_flight_lock:
+        if _single_flight is None:
+            _single_flight = SingleFlight()
+    return _single_flight
@@ -0,0 +1,38 @@
+"""
+Per-thread SQLite connections for the stores shared by all workers on a host
+A connection may not cross threads, and one inherited through gunicorn's fork
+would share the parent's file locks, so every thread of every process opens
+its own. WAL mode lets readers run alongside the single writer.
+"""
+
+import os
+import sqlite3
+import threading
+
+_local = threading.local()
+
+
+def thread_connection(path: str) -> sqlite3.Connection:
+    """
+    Connection to the SQLite file at path for the calling thread
+
+    Opened on first use in each thread, and again after a fork.
+
+    Args:
+        path: SQLite file
+
+    Returns:
+        sqlite3.Connection owned by this thread
+    """
+    pid = os.getpid()
+    if getattr(_local, "pid", None) != pid:
+        _local.connections = {}
+        _local.pid = pid
+
+    connection = _local.connections.get(path)
+    if connection is None:
+        connection = sqlite3.connect(path, timeout=5)
+        connection.execute("PRAGMA journal_mode=WAL")
+        connection.execute("PRAGMA synchronous=NORMAL")
+        _local.connections[path] = connection
+    return connection
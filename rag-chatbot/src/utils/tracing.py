@@ -0,0 +1,274 @@
+"""
+Lightweight OpenTelemetry-style tracing with W3C trace-context propagation
+Spans cover the Flask request, embedding, Chroma search and LLM calls and are
+exported as one JSON object per line (OTLP-like field names) to stdout or a
+local file, so traces can be inspected offline. Disabled tracing hands out a
+shared no-op span and costs a single attribute check.
+"""
+
+import contextvars
+import functools
+import json
+import os
+import random
+import re
+import sys
+import threading
+import time
+from typing import Optional
+from src.utils.config import Config
+import logging
+
+logger = logging.getLogger(__name__)
+
+_TRACEPARENT = re.compile(
+    r"^([0-9a-f]{2})-([0-9a-f]{32})-([0-9a-f]{16})-([0-9a-f]{2})$"
+)
+_current_span = contextvars.ContextVar("current_span", default=None)
+
+
+class Span:
+    """One timed operation within a trace"""
+
+    def __init__(
+        self,
+        name: str,
+        trace_id: str,
+        parent_id: Optional[str] = None,
+        kind: str = "internal",
+        attributes: dict = None,
+        recording: bool = True,
+    ):
+        self.name = name
+        self.trace_id = trace_id
+        self.span_id = _random_hex(16)
+        self.parent_id = parent_id
+        self.kind = kind
+        self.attributes = dict(attributes or {})
+        self.recording = recording
+        self.status = "OK"
+        self.status_message = None
+        self.start_ns = time.time_ns()
+        self._start = time.perf_counter()
+        self._token = None
+
+    def set_attribute(self, key: str, value):
+        self.attributes[key] = value
+
+    def record_exception(self, error: BaseException):
+        self.status = "ERROR"
+        self.status_message = str(error)[:500]
+        self.attributes["exception.type"] = type(error).__name__
+
+    def traceparent(self) -> str:
+        return f"00-{self.trace_id}-{self.span_id}-{'01' if self.recording else '00'}"
+
+    def __enter__(self):
+        self._token = _current_span.set(self)
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc is not None:
+            self.record_exception(exc)
+        self.end()
+        return False
+
+    def end(self):
+        if self._token is not None:
+            _current_span.reset(self._token)
+            self._token = None
+        if not self.recording:
+            return
+        duration = time.perf_counter() - self._start
+        _get_exporter().export(
+            {
+                "trace_id": self.trace_id,
+                "span_id": self.span_id,
+                "parent_span_id": self.parent_id,
+                "name": self.name,
+                "kind": self.kind,
+                "start_time_unix_nano": self.start_ns,
+                "end_time_unix_nano": self.start_ns + int(duration * 1e9),
+                "duration_ms": round(duration * 1000, 3),
+                "attributes": self.attributes,
+                "status": {"code": self.status, "message": self.status_message},
+                "resource": {
+                    "service.name": Config.TRACING_SERVICE_NAME,
+                    "process.pid": os.getpid(),
+                },
+            }
+        )
+
+
+class _NoopSpan:
+    """Shared stand-in used when tracing is off or the trace is not sampled"""
+
+    recording = False
+
+    def set_attribute(self, key, value):
+        pass
+
+    def record_exception(self, error):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+
+NOOP_SPAN = _NoopSpan()
+
+
+def span(name: str, kind: str = "internal", **attributes):
+    """
+    Start a child span of the current one (use as a context manager)
+
+    Returns the shared no-op span when tracing is disabled, when there is no
+    sampled parent and the root is not sampled, so callers never branch.
+    """
+    if not Config.TRACING_ENABLED:
+        return NOOP_SPAN
+
+    parent = _current_span.get()
+    if parent is None:
+        return Span(
+            name,
+            _random_hex(32),
+            kind=kind,
+            attributes=attributes,
+            recording=random.random() < Config.TRACING_SAMPLE_RATIO,
+        )
+    if not parent.recording:
+        return NOOP_SPAN
+    return Span(name, parent.trace_id, parent.span_id, kind, attributes)
+
+
+def traced(name: str = None, **attributes):
+    """Decorator wrapping a function in a span"""
+
+    def decorator(fn):
+        span_name = name or fn.__qualname__
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            if not Config.TRACING_ENABLED:
+                return fn(*args, **kwargs)
+            with span(span_name, **attributes):
+                return fn(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
+
+
+def parse_traceparent(header: str):
+    """
+    Parse a W3C traceparent header
+
+    Returns:
+        Tuple (trace_id, parent_span_id, sampled), or None if invalid
+    """
+    match = _TRACEPARENT.match((header or "").strip().lower())
+    if not match:
+        return None
+    version, trace_id, parent_id, flags = match.groups()
+    if version == "ff" or trace_id == "0" * 32 or parent_id == "0" * 16:
+        return None
+    return trace_id, parent_id, bool(int(flags, 16) & 1)
+
+
+def start_server_span(name: str, traceparent: str = None, **attributes) -> Span:
+    """Start the root span of an incoming request, continuing a remote trace"""
+    parent = parse_traceparent(traceparent)
+    if parent is None:
+        return span(name, kind="server", **attributes)
+    trace_id, parent_id, sampled = parent
+    return Span(name, trace_id, parent_id, "server", attributes, recording=sampled)
+
+
+def init_tracing(app):
+    """Trace every Flask request (no hooks are registered when disabled)"""
+    if not Config.TRACING_ENABLED:
+        return
+
+    from flask import g, request
+
+    @app.before_request
+    def start_request_span():
+        request_span = start_server_span(
+            f"{request.method} {request.url_rule or request.path}",
+            request.headers.get("traceparent"),
+            **{
+                "http.method": request.method,
+                "http.target": request.path,
+                "http.user_agent": request.user_agent.string[:200],
+            },
+        )
+        g.trace_span = request_span.__enter__()
+
+    @app.after_request
+    def add_trace_headers(response):
+        request_span = g.get("trace_span")
+        if request_span is not None and request_span is not NOOP_SPAN:
+            request_span.set_attribute("http.status_code", response.status_code)
+            if response.status_code >= 500:
+                request_span.status = "ERROR"
+            response.headers["traceresponse"] = request_span.traceparent()
+        return response
+
+    @app.teardown_request
+    def end_request_span(error=None):
+        request_span = g.pop("trace_span", None)
+        if request_span is not None:
+            request_span.__exit__(type(error) if error else None, error, None)
+
+    logger.info(f"✓ Tracing enabled ({Config.TRACING_EXPORTER} exporter)")
+
+
+def wrap_context(fn):
+    """Bind fn to the caller's context so spans nest across threads"""
+    return functools.partial(contextvars.copy_context().run, fn)
+
+
+class _LineExporter:
+    """Writes finished spans as JSON lines to stdout or a file"""
+
+    def __init__(self, target: str, path: str = None):
+        self.target = target
+        self.path = path
+        self._lock = threading.Lock()
+        self._file = None
+        self._pid = None
+
+    def export(self, record: dict):
+        line = json.dumps(record, default=str) + "\n"
+        with self._lock:
+            if self.target == "stdout":
+                sys.stdout.write(line)
+                sys.stdout.flush()
+                return
+            if self._pid != os.getpid():
+                # Reopen after fork so each worker appends with its own handle
+                directory = os.path.dirname(os.path.abspath(self.path))
+                os.makedirs(directory, exist_ok=True)
+                self._file = open(self.path, "a", encoding="utf-8", buffering=1)
+                self._pid = os.getpid()
+            self._file.write(line)
+
+
+_exporter = None
+
+
+def _get_exporter() -> _LineExporter:
+    global _exporter
+    if _exporter is None:
+        if Config.TRACING_EXPORTER not in ("stdout", "file"):
+            raise ValueError(f"Unknown TRACING_EXPORTER: {Config.TRACING_EXPORTER}")
+        _exporter = _LineExporter(Config.TRACING_EXPORTER, Config.TRACING_FILE)
+    return _exporter
+
+
+def _random_hex(length: int) -> str:
+    return f"{random.getrandbits(length * 4):0{length}x}"
@@ -1,12 +1,45 @@
 import chromadb
+import hashlib
 from chromadb.config import Settings
 from langchain_chroma import Chroma
+from langchain_core.documents import Document
 from src.utils.config import Config
-from typing import List, Optional
+from src.vectorstore.compressed_index import CompressedIndex
+from src.vectorstore.dedup import DuplicateIndex, add_duplicate_source
+from src.vectorstore.ingest_log import IngestLog
+from src.vectorstore.parent_store import ParentStore
+from src.vectorstore.snapshot import VectorSnapshot, index_path
+from src.vectorstore.tombstones import TombstoneLog
+from src.utils.tracing import span
+from typing import List, Optional, Tuple
 import logging
+import os
+import time
+from contextlib import contextmanager
+from pathlib import Path
+
+try:
+    import fcntl
+except ImportError:  # fcntl is POSIX-only
+    fcntl = None
 
 logger = logging.getLogger(__name__)
 
+# Extra candidates per requested result fetched while tombstones are pending
+_TOMBSTONE_OVERFETCH = 2
+
+
+def chunk_id(document) -> str:
+    """Content-derived chunk ID, stable across ingest runs"""
+    key = "\n".join(
+        [
+            str(document.metadata.get("source", "Unknown")),
+            str(document.metadata.get("start_index", "")),
+            document.page_content,
+        ]
+    )
+    return hashlib.sha1(key.encode("utf-8")).hexdigest()
+
 
 class ChromaStore:
     """Manages ChromaDB vector store (Cloud or Local)"""
@@ -23,7 +56,16 @@ class ChromaStore:
         self.collection_name = collection_name or Config.CHROMA_COLLECTION_NAME
         self.client = None
         self.vector_store = None
+        self.compressed_index = None
+        self._compressed_index_stale = False
+        self._compressed_index_mtime = None
+        self.tombstones = TombstoneLog(self.collection_name)
+        self.parent_store = ParentStore() if Config.PARENT_RETRIEVAL else None
+        self.duplicate_index = (
+            DuplicateIndex(self.collection_name) if Config.DEDUP_MODE != "off" else None
+        )
         self._initialize_client()
+        self._load_compressed_index()
 
     def _initialize_client(self):
         """Initialize ChromaDB client (Cloud or Local)"""
@@ -50,12 +92,21 @@ class ChromaStore:
                 )
                 logger.info("✓ Local ChromaDB initialized successfully")
 
-            # Initialize LangChain Chroma wrapper
-            self.vector_store = Chroma(
-                client=self.client,
-                collection_name=self.collection_name,
-                embedding_function=self.embeddings,
-            )
+            if (
+                not Config.is_cloud_mode()
+                and Config.VECTOR_SNAPSHOT_PATH
+                and os.path.exists(Config.VECTOR_SNAPSHOT_PATH)
+            ):
+                # Workers that initialize lazily get here concurrently: the
+                # first one restores, the others wait and find it filled
+                with _file_lock(
+                    os.path.join(Config.CHROMA_DB_PATH, "snapshot_restore.lock")
+                ):
+                    self._create_vector_store()
+                    if self.vector_store._collection.count() == 0:
+                        self.restore_snapshot(Config.VECTOR_SNAPSHOT_PATH)
+            else:
+                self._create_vector_store()
 
             logger.info(f"✓ Using collection: {self.collection_name}")
 
@@ -63,29 +114,266 @@ class ChromaStore:
             logger.error(f"Failed to initialize ChromaDB: {str(e)}")
             raise
 
-    def add_documents(self, documents: List, ids: Optional[List[str]] = None):
+    def _create_vector_store(self, collection_metadata: Optional[dict] = None):
+        """Initialize the LangChain Chroma wrapper (get or create the collection)"""
+        self.vector_store = Chroma(
+            client=self.client,
+            collection_name=self.collection_name,
+            embedding_function=self.embeddings,
+            collection_metadata=collection_metadata,
+        )
+
+    def add_documents(
+        self,
+        documents: List,
+        ids: Optional[List[str]] = None,
+        parents: Optional[List] = None,
+        replaces: Optional[List[str]] = None,
+        log: Optional[IngestLog] = None,
+    ):
         """
         Add documents to the vector store
 
+        Near-duplicates of stored chunks (or of earlier documents in the same
+        call) are not added when DEDUP_MODE is "skip" or "merge".
+
+        With an ingest log the documents get content-derived IDs and are
+        embedded and upserted in batches of INGEST_BATCH_SIZE, each logged with
+        its embeddings first. Uncommitted batches of an earlier, interrupted
+        run are upserted from the log, and documents already in the log are
+        not embedded again, so rerunning a failed ingest resumes it.
+
         Args:
             documents: List of LangChain Document objects
             ids: Optional list of document IDs
+            parents: Parent sections of the documents (see split_with_parents),
+                stored in the parent docstore before the chunks are added
+            replaces: IDs of stored chunks these documents replace; they do
+                not count as duplicates
+            log: Ingest write-ahead log for resumable bulk loads
 
         Returns:
-            List of document IDs
+            List of IDs of the documents actually added (with a log, including
+            those added by the interrupted run)
         """
         try:
             logger.info(f"Adding {len(documents)} documents to ChromaDB...")
 
-            result_ids = self.vector_store.add_documents(documents=documents, ids=ids)
+            resumed = []
+            if log is not None:
+                self.replay_log(log)
+                ids = ids or [chunk_id(doc) for doc in documents]
+                logged = log.logged_ids()
+                resumed = [i for i in ids if i in logged]
+                if resumed:
+                    logger.info(f"Skipping {len(resumed)} chunks already logged")
+                    kept = [i for i, doc_id in enumerate(ids) if doc_id not in logged]
+                    documents = [documents[i] for i in kept]
+                    ids = [ids[i] for i in kept]
+                if not documents:
+                    return resumed
+
+            if parents:
+                if self.parent_store is None:
+                    raise ValueError(
+                        "Parent sections given but PARENT_RETRIEVAL is off"
+                    )
+                self.parent_store.add_parents(parents)
+
+            signatures = None
+            if self.duplicate_index is not None:
+                documents, ids, signatures = self._drop_duplicates(
+                    documents, ids, replaces
+                )
+                if not documents:
+                    logger.info("✓ Every document was a near-duplicate, nothing added")
+                    return []
+
+            if log is not None:
+                result_ids = self._add_logged(documents, ids, signatures, log)
+            else:
+                result_ids = self.vector_store.add_documents(
+                    documents=documents, ids=ids
+                )
+                if ids:
+                    # Caller-chosen IDs may belong to deleted chunks
+                    self.tombstones.remove(ids)
+                if signatures is not None:
+                    self.duplicate_index.add(
+                        result_ids,
+                        [doc.metadata.get("source", "Unknown") for doc in documents],
+                        signatures,
+                    )
+
+            if self.compressed_index is not None:
+                self._compressed_index_stale = True
 
             logger.info(f"✓ Successfully added {len(result_ids)} documents")
-            return result_ids
+            return resumed + result_ids
 
         except Exception as e:
             logger.error(f"Error adding documents: {str(e)}")
             raise
 
+    def _add_logged(
+        self, documents: List, ids: List[str], signatures: Optional[List], log
+    ) -> List[str]:
+        """Embed, log, upsert and commit documents batch by batch"""
+        batch_size = Config.INGEST_BATCH_SIZE
+        for start in range(0, len(documents), batch_size):
+            end = start + batch_size
+            texts = [doc.page_content for doc in documents[start:end]]
+            metadatas = [doc.metadata for doc in documents[start:end]]
+            embeddings = self.embeddings.embed_documents(texts)
+
+            batch = log.append(ids[start:end], texts, metadatas, embeddings)
+            self._upsert_batch(
+                ids[start:end],
+                texts,
+                metadatas,
+                embeddings,
+                signatures[start:end] if signatures is not None else None,
+            )
+            log.commit(batch)
+            logger.info(f"✓ Committed batch {batch} ({len(texts)} chunks)")
+        return list(ids)
+
+    def replay_log(self, log: IngestLog) -> int:
+        """
+        Upsert the uncommitted batches of an interrupted ingest
+
+        The logged embeddings are reused; upserts are idempotent, so a batch
+        that reached Chroma before the crash is simply written again.
+
+        Returns:
+            Number of chunks replayed
+        """
+        replayed = 0
+        for batch in log.pending():
+            model = batch.get("embedding_model")
+            if model and model != Config.EMBEDDING_MODEL:
+                raise ValueError(
+                    f"Ingest log was written with {model}, "
+                    f"but EMBEDDING_MODEL is {Config.EMBEDDING_MODEL}"
+                )
+            signatures = None
+            if self.duplicate_index is not None:
+                # The batch may already be indexed: drop it before re-adding
+                self.duplicate_index.remove(batch["ids"])
+                signatures = [
+                    self.duplicate_index.hasher.signature(text)
+                    for text in batch["documents"]
+                ]
+            self._upsert_batch(
+                batch["ids"],
+                batch["documents"],
+                batch["metadatas"],
+                batch["embeddings"],
+                signatures,
+            )
+            log.commit(batch["batch"])
+            replayed += len(batch["ids"])
+
+        if replayed:
+            self._compressed_index_stale = self.compressed_index is not None
+            logger.info(f"✓ Replayed {replayed} chunks from the ingest log")
+        return replayed
+
+    def _upsert_batch(self, ids, texts, metadatas, embeddings, signatures):
+        self.vector_store._collection.upsert(
+            ids=list(ids),
+            embeddings=embeddings,
+            documents=list(texts),
+            metadatas=list(metadatas),
+        )
+        # Chunk IDs are content-derived: re-adding deleted text revives its
+        # IDs, which must not stay hidden or be removed by compaction
+        self.tombstones.remove(ids)
+        if signatures is not None:
+            self.duplicate_index.add(
+                list(ids),
+                [(metadata or {}).get("source", "Unknown") for metadata in metadatas],
+                signatures,
+            )
+
+    def _drop_duplicates(
+        self, documents: List, ids: Optional[List[str]], replaces: Optional[List[str]]
+    ):
+        """
+        Remove near-duplicates before they are embedded and stored
+
+        In merge mode the source of a dropped chunk is recorded in the
+        "duplicate_sources" metadata of the chunk it duplicates.
+
+        Returns:
+            Tuple (documents, ids, signatures) of the documents to add
+        """
+        index = self.duplicate_index
+        if len(index) == 0 and self.vector_store._collection.count() > len(
+            self.tombstones
+        ):
+            # Collection built before deduplication was enabled
+            self.rebuild_duplicate_index()
+
+        signatures, matches = index.find_duplicates(documents, exclude=replaces)
+        kept, kept_ids, kept_signatures = [], [], []
+        merged = {}
+        for i, (doc, signature, match) in enumerate(
+            zip(documents, signatures, matches)
+        ):
+            if match is None:
+                kept.append(doc)
+                kept_signatures.append(signature)
+                if ids:
+                    kept_ids.append(ids[i])
+                continue
+
+            target, _ = match
+            if Config.DEDUP_MODE == "merge":
+                source = doc.metadata.get("source", "Unknown")
+                if target.startswith("#"):
+                    add_duplicate_source(documents[int(target[1:])].metadata, source)
+                else:
+                    merged.setdefault(target, set()).add(source)
+
+        if merged:
+            self._merge_duplicate_sources(merged)
+
+        skipped = len(documents) - len(kept)
+        if skipped:
+            logger.info(
+                f"Skipped {skipped}/{len(documents)} near-duplicate chunks "
+                f"(dedup ratio {skipped / len(documents):.1%})"
+            )
+        return kept, (kept_ids if ids else None), kept_signatures
+
+    def _merge_duplicate_sources(self, sources_by_id: dict):
+        """Add duplicate sources to the metadata of stored chunks"""
+        collection = self.vector_store._collection
+        data = collection.get(ids=list(sources_by_id), include=["metadatas"])
+        metadatas = []
+        for chunk_id, metadata in zip(data["ids"], data["metadatas"]):
+            metadata = dict(metadata or {})
+            for source in sorted(sources_by_id[chunk_id]):
+                add_duplicate_source(metadata, source)
+            metadatas.append(metadata)
+        if data["ids"]:
+            collection.update(ids=data["ids"], metadatas=metadatas)
+
+    def rebuild_duplicate_index(self):
+        """Index the MinHash signatures of every live chunk in the collection"""
+        data = self.vector_store._collection.get(include=["documents", "metadatas"])
+        deleted = self.tombstones.ids()
+        ids, documents, sources = [], [], []
+        for chunk_id, document, metadata in zip(
+            data["ids"], data["documents"], data["metadatas"]
+        ):
+            if chunk_id not in deleted:
+                ids.append(chunk_id)
+                documents.append(document)
+                sources.append((metadata or {}).get("source", "Unknown"))
+        self.duplicate_index.rebuild(ids, documents, sources)
+
     def similarity_search(self, query: str, k: int = None):
         """
         Search for similar documents
@@ -109,13 +397,16 @@ class ChromaStore:
             logger.error(f"Error in similarity search: {str(e)}")
             raise
 
-    def similarity_search_with_score(self, query: str, k: int = None):
+    def similarity_search_with_score(
+        self, query: str, k: int = None, embedding: List[float] = None
+    ):
         """
         Search for similar documents with relevance scores
 
         Args:
             query: Search query text
             k: Number of results to return
+            embedding: Precomputed query embedding (skips embedding the query)
 
         Returns:
             List of tuples (Document, relevance_score)
@@ -123,16 +414,18 @@ class ChromaStore:
         k = k or Config.RETRIEVAL_K
 
         try:
-            results = self.vector_store.similarity_search_with_relevance_scores(
-                query=query, k=k
-            )
+            with span(
+                "ChromaStore.similarity_search_with_score", **self._span_attributes(k)
+            ) as search_span:
+                results = self._scored_candidates(query, k, embedding)
 
-            # Filter by similarity threshold
-            filtered_results = [
-                (doc, score)
-                for doc, score in results
-                if score >= Config.SIMILARITY_THRESHOLD
-            ]
+                # Filter by similarity threshold
+                filtered_results = [
+                    (doc, score)
+                    for doc, score in results
+                    if score >= Config.SIMILARITY_THRESHOLD
+                ]
+                search_span.set_attribute("db.results", len(filtered_results))
 
             logger.info(
                 f"Found {len(results)} documents, "
@@ -145,6 +438,571 @@ class ChromaStore:
             logger.error(f"Error in similarity search with scores: {str(e)}")
             raise
 
+    def adaptive_similarity_search(
+        self,
+        query: str,
+        k: int = None,
+        max_k: int = None,
+        embedding: List[float] = None,
+    ):
+        """
+        Search with an adaptive result count in a single round trip
+
+        Fetches up to ``max_k`` candidates in one query, then keeps expanding
+        past ``k`` while results stay above the similarity threshold, stops
+        once the requested share of relevance mass is covered, and cuts the
+        list at the first sharp drop in scores. Candidates below
+        ``Config.RETRIEVAL_MIN_RELEVANCE`` are never returned, but weaker
+        matches above that floor are kept when nothing clears the threshold.
+
+        Args:
+            query: Search query text
+            k: Number of results to aim for
+            max_k: Maximum number of candidates to fetch
+            embedding: Precomputed query embedding (skips embedding the query)
+
+        Returns:
+            List of tuples (Document, relevance_score)
+        """
+        k = k or Config.RETRIEVAL_K
+        max_k = max(max_k or Config.RETRIEVAL_MAX_K, k)
+
+        try:
+            # Chroma has no distance predicate, so the cutoff is applied to the
+            # raw distances of this single query before any further work.
+            with span(
+                "ChromaStore.adaptive_similarity_search",
+                **self._span_attributes(max_k),
+            ):
+                results = self._scored_candidates(query, max_k, embedding)
+            candidates = [
+                (doc, score)
+                for doc, score in results
+                if score >= Config.RETRIEVAL_MIN_RELEVANCE
+            ]
+
+            selected = select_adaptive(
+                candidates,
+                k=k,
+                threshold=Config.SIMILARITY_THRESHOLD,
+                relevance_mass=Config.RETRIEVAL_RELEVANCE_MASS,
+                score_drop=Config.RETRIEVAL_SCORE_DROP,
+            )
+
+            logger.info(
+                f"Adaptive search fetched {len(results)} candidates, "
+                f"{len(candidates)} above floor {Config.RETRIEVAL_MIN_RELEVANCE}, "
+                f"kept {len(selected)}"
+            )
+
+            return selected
+
+        except Exception as e:
+            logger.error(f"Error in adaptive similarity search: {str(e)}")
+            raise
+
+    def _scored_candidates(self, query: str, k: int, embedding: List[float] = None):
+        """
+        Run one nearest-neighbour query, skipping tombstoned chunks
+
+        Over-fetches by at most _TOMBSTONE_OVERFETCH * k candidates, and
+        widens the query only when too many of them are tombstoned, so a
+        large compaction backlog does not inflate every search.
+
+        Returns:
+            List of tuples (Document, relevance_score), best first
+        """
+        deleted = self.tombstones.ids()
+        if not deleted:
+            return self._nearest(query, k, embedding)
+
+        # k + len(deleted) candidates always hold k live ones (if they exist)
+        limit = k + len(deleted)
+        fetch = k + min(len(deleted), _TOMBSTONE_OVERFETCH * k)
+        while True:
+            results = self._nearest(query, fetch, embedding)
+            live = [(doc, score) for doc, score in results if doc.id not in deleted]
+            if len(live) >= k or len(results) < fetch or fetch >= limit:
+                return live[:k]
+            fetch = min(fetch * 2, limit)
+
+    def _nearest(self, query: str, k: int, embedding: List[float] = None):
+        """
+        Run one nearest-neighbour query and convert distances to relevance
+
+        Uses the compressed index when one is enabled, Chroma otherwise.
+
+        Returns:
+            List of tuples (Document, relevance_score), best first
+        """
+        relevance_fn = self.vector_store._select_relevance_score_fn()
+
+        if Config.VECTOR_COMPRESSION != "none":
+            index = self.get_compressed_index()
+            if embedding is None:
+                embedding = self.embeddings.embed_query(query)
+            hits = index.search(
+                embedding,
+                k,
+                rerank_factor=Config.COMPRESSION_RERANK_FACTOR,
+                fetch_exact=self._fetch_embeddings,
+            )
+            space = (self.vector_store._collection.metadata or {}).get(
+                "hnsw:space", "l2"
+            )
+            documents = self._fetch_documents([index.ids[row] for row, _ in hits])
+            return [
+                (
+                    documents[index.ids[row]],
+                    relevance_fn(_distance_from_inner_product(inner, space)),
+                )
+                for row, inner in hits
+                if index.ids[row] in documents
+            ]
+
+        if embedding is not None:
+            # Despite its name this returns raw distances, like the call below
+            results = (
+                self.vector_store.similarity_search_by_vector_with_relevance_scores(
+                    embedding=embedding, k=k
+                )
+            )
+        else:
+            results = self.vector_store.similarity_search_with_score(query=query, k=k)
+        return [(doc, relevance_fn(distance)) for doc, distance in results]
+
+    def _span_attributes(self, k: int) -> dict:
+        return {
+            "db.system": "chroma",
+            "db.chroma.mode": "cloud" if Config.is_cloud_mode() else "local",
+            "db.collection": self.collection_name,
+            "db.k": k,
+            "db.compressed": self.compressed_index is not None,
+        }
+
+    def get_compressed_index(self):
+        """Return the compressed index, (re)building it when missing or stale"""
+        if self.compressed_index is not None and not self._compressed_index_stale:
+            # Another process rebuilt it (after an ingest or a compaction)
+            mtime = _mtime(Config.COMPRESSED_INDEX_PATH)
+            if mtime is not None and mtime != self._compressed_index_mtime:
+                self._load_compressed_index()
+        if self.compressed_index is None or self._compressed_index_stale:
+            self.build_compressed_index()
+        return self.compressed_index
+
+    def build_compressed_index(self, mode: str = None, save: bool = True):
+        """
+        Build a compressed copy of every embedding in the collection
+
+        Args:
+            mode: Compression mode (defaults to Config.VECTOR_COMPRESSION)
+            save: Whether to write the index to Config.COMPRESSED_INDEX_PATH
+
+        Returns:
+            Tuple (CompressedIndex, float32 embedding matrix)
+        """
+        mode = mode or Config.VECTOR_COMPRESSION
+
+        try:
+            data = self.vector_store._collection.get(include=["embeddings"])
+            index = CompressedIndex.build(
+                mode,
+                data["ids"],
+                data["embeddings"],
+                pq_subvectors=Config.PQ_SUBVECTORS,
+                pq_centroids=Config.PQ_CENTROIDS,
+            )
+
+            if save:
+                Path(Config.COMPRESSED_INDEX_PATH).parent.mkdir(
+                    parents=True, exist_ok=True
+                )
+                index.save(Config.COMPRESSED_INDEX_PATH)
+                self._compressed_index_mtime = _mtime(Config.COMPRESSED_INDEX_PATH)
+
+            self.compressed_index = index
+            self._compressed_index_stale = False
+            return index, data["embeddings"]
+
+        except Exception as e:
+            logger.error(f"Error building compressed index: {str(e)}")
+            raise
+
+    def refresh_compressed_index(self):
+        """
+        Rebuild and save the compressed index after chunks were added
+
+        Other workers reload the saved file when its mtime changes, so chunks
+        stored by this process become searchable everywhere. Does nothing when
+        VECTOR_COMPRESSION is "none".
+        """
+        if Config.VECTOR_COMPRESSION != "none":
+            self.build_compressed_index()
+
+    def _load_compressed_index(self):
+        """Load a previously saved compressed index if compression is enabled"""
+        if Config.VECTOR_COMPRESSION == "none":
+            return
+        if not os.path.exists(Config.COMPRESSED_INDEX_PATH):
+            logger.info("No compressed index on disk, it will be built on first search")
+            return
+
+        try:
+            mtime = _mtime(Config.COMPRESSED_INDEX_PATH)
+            index = CompressedIndex.load(Config.COMPRESSED_INDEX_PATH)
+            if index.mode == Config.VECTOR_COMPRESSION:
+                self.compressed_index = index
+                self._compressed_index_mtime = mtime
+            else:
+                logger.warning(
+                    f"Compressed index mode {index.mode} does not match "
+                    f"VECTOR_COMPRESSION={Config.VECTOR_COMPRESSION}, rebuilding"
+                )
+        except Exception as e:
+            logger.warning(f"Could not load compressed index: {str(e)}")
+
+    def _fetch_embeddings(self, ids: List[str]) -> dict:
+        """
+        Fetch exact float32 embeddings by ID
+
+        IDs no longer in Chroma (the collection was recreated, cleared or
+        compacted by another process) are left out, and the compressed index
+        is rebuilt before the next search.
+        """
+        data = self.vector_store._collection.get(ids=ids, include=["embeddings"])
+        by_id = dict(zip(data["ids"], data["embeddings"]))
+        if len(by_id) < len(set(ids)):
+            logger.warning(
+                f"{len(set(ids)) - len(by_id)} compressed index entries are no "
+                "longer in the collection, rebuilding the index"
+            )
+            self._compressed_index_stale = True
+        return by_id
+
+    def _fetch_documents(self, ids: List[str]) -> dict:
+        """Fetch the final results of a compressed search as Documents, by ID"""
+        if not ids:
+            return {}
+        data = self.vector_store._collection.get(
+            ids=ids, include=["documents", "metadatas"]
+        )
+        return {
+            doc_id: Document(page_content=text, metadata=metadata or {}, id=doc_id)
+            for doc_id, text, metadata in zip(
+                data["ids"], data["documents"], data["metadatas"]
+            )
+        }
+
+    def get_chunk_sources(self, ids: List[str]) -> dict:
+        """Map chunk IDs to their metadata "source" (missing IDs are skipped)"""
+        if not ids:
+            return {}
+        data = self.vector_store._collection.get(ids=list(ids), include=["metadatas"])
+        return {
+            doc_id: (metadata or {}).get("source", "Unknown")
+            for doc_id, metadata in zip(data["ids"], data["metadatas"])
+        }
+
+    def source_versions(self, sources: List[str]) -> dict:
+        """
+        Fingerprint the set of chunk IDs stored for each source
+
+        The fingerprint changes whenever chunks of a source are added or
+        removed, so re-ingesting a document is detectable from any process.
+
+        Returns:
+            Dict mapping source to a short hash of its sorted chunk IDs
+        """
+        collection = self.vector_store._collection
+        deleted = self.tombstones.ids()
+        versions = {}
+        for source in sources:
+            ids = collection.get(where={"source": source}, include=[])["ids"]
+            ids = [chunk_id for chunk_id in ids if chunk_id not in deleted]
+            versions[source] = hashlib.sha1(
+                "\n".join(sorted(ids)).encode("utf-8")
+            ).hexdigest()[:16]
+        return versions
+
+    def delete_documents(
+        self, ids: Optional[List[str]] = None, source: str = None
+    ) -> dict:
+        """
+        Delete chunks by ID or every chunk of a source
+
+        The chunks are tombstoned: searches skip them immediately and
+        compaction removes them from Chroma and the parent docstore later.
+        They leave the duplicate index at once, so a corrected copy is not
+        mistaken for a duplicate of the text it replaces.
+
+        Args:
+            ids: Chunk IDs to delete
+            source: Source (metadata "source") whose chunks are deleted
+
+        Returns:
+            Dict mapping each affected source to its number of deleted chunks
+        """
+        if not ids and source is None:
+            raise ValueError("Give chunk IDs or a source to delete")
+
+        try:
+            chunk_ids, metadatas = self._live_chunks(ids=ids, source=source)
+            if not chunk_ids:
+                return {}
+
+            self.tombstones.add(chunk_ids, metadatas)
+            if self.duplicate_index is not None:
+                self.duplicate_index.remove(chunk_ids)
+
+            deleted = {}
+            for metadata in metadatas:
+                name = (metadata or {}).get("source", "Unknown")
+                deleted[name] = deleted.get(name, 0) + 1
+            logger.info(f"✓ Tombstoned {len(chunk_ids)} chunks from {sorted(deleted)}")
+
+            self.maybe_compact()
+            return deleted
+
+        except Exception as e:
+            logger.error(f"Error deleting documents: {str(e)}")
+            raise
+
+    def replace_documents(
+        self, source: str, documents: List, parents: Optional[List] = None
+    ):
+        """
+        Replace every chunk of a source with new chunks
+
+        The new chunks are added before the old ones are tombstoned, so
+        searches never see the source missing.
+
+        Args:
+            source: Source being corrected
+            documents: New chunks of the source
+            parents: Parent sections of the new chunks, if any
+
+        Returns:
+            Tuple (IDs of the chunks added, number of chunks replaced)
+        """
+        try:
+            old_ids, old_metadatas = self._live_chunks(source=source)
+            new_ids = self.add_documents(documents, parents=parents, replaces=old_ids)
+
+            if old_ids:
+                self.tombstones.add(old_ids, old_metadatas)
+                if self.duplicate_index is not None:
+                    self.duplicate_index.remove(old_ids)
+            logger.info(
+                f"✓ Replaced {len(old_ids)} chunks of {source} with {len(new_ids)}"
+            )
+
+            self.maybe_compact()
+            return new_ids, len(old_ids)
+
+        except Exception as e:
+            logger.error(f"Error replacing documents: {str(e)}")
+            raise
+
+    def maybe_compact(self):
+        """Compact once enough deletes are pending or the oldest is old enough"""
+        pending = len(self.tombstones)
+        if pending and (
+            pending >= Config.TOMBSTONE_COMPACT_THRESHOLD
+            or self.tombstones.oldest_age() >= Config.TOMBSTONE_COMPACT_INTERVAL
+        ):
+            self.compact()
+
+    def compact(self, batch_size: int = 500) -> int:
+        """
+        Remove tombstoned chunks from Chroma and the auxiliary indexes
+
+        Parents no live chunk refers to are dropped from the docstore, and
+        the compressed index is rebuilt once (other workers reload it).
+
+        Args:
+            batch_size: IDs deleted per request
+
+        Returns:
+            Number of chunks removed
+        """
+        try:
+            pending = self.tombstones.pending()
+            if not pending:
+                return 0
+
+            chunk_ids = [chunk_id for chunk_id, _ in pending]
+            collection = self.vector_store._collection
+            for start in range(0, len(chunk_ids), batch_size):
+                collection.delete(ids=chunk_ids[start : start + batch_size])
+
+            if self.parent_store is not None:
+                parent_ids = {parent_id for _, parent_id in pending if parent_id}
+                orphaned = [
+                    parent_id
+                    for parent_id in parent_ids
+                    if not collection.get(
+                        where={"parent_id": parent_id}, limit=1, include=[]
+                    )["ids"]
+                ]
+                self.parent_store.delete_parents(orphaned)
+
+            if self.compressed_index is not None:
+                # Rebuilt before the tombstones go, so no worker serves them again
+                self.build_compressed_index()
+
+            self.tombstones.remove(chunk_ids)
+            logger.info(f"✓ Compacted {len(chunk_ids)} deleted chunks")
+            return len(chunk_ids)
+
+        except Exception as e:
+            logger.error(f"Error compacting deleted chunks: {str(e)}")
+            raise
+
+    def _live_chunks(self, ids: Optional[List[str]] = None, source: str = None):
+        """IDs and metadata of stored, not yet deleted chunks"""
+        collection = self.vector_store._collection
+        if source is not None:
+            data = collection.get(where={"source": source}, include=["metadatas"])
+        else:
+            data = collection.get(ids=list(ids), include=["metadatas"])
+        deleted = self.tombstones.ids()
+        live = [
+            (chunk_id, metadata)
+            for chunk_id, metadata in zip(data["ids"], data["metadatas"])
+            if chunk_id not in deleted
+        ]
+        return [chunk_id for chunk_id, _ in live], [metadata for _, metadata in live]
+
+    def export_snapshot(self, path: str = None):
+        """
+        Export the collection (embeddings, documents, metadata) to one file
+
+        With vector compression on, the compressed index is saved next to
+        the snapshot (see snapshot.index_path) so restoring skips rebuilding
+        it.
+
+        Args:
+            path: Destination file (defaults to Config.VECTOR_SNAPSHOT_PATH)
+
+        Returns:
+            Number of vectors written
+        """
+        path = path or Config.VECTOR_SNAPSHOT_PATH
+        if not path:
+            raise ValueError("No snapshot path given and VECTOR_SNAPSHOT_PATH is unset")
+
+        try:
+            collection = self.vector_store._collection
+            data = collection.get(include=["embeddings", "documents", "metadatas"])
+            Path(path).parent.mkdir(parents=True, exist_ok=True)
+            VectorSnapshot.write(
+                path,
+                data["ids"],
+                data["documents"],
+                data["metadatas"],
+                data["embeddings"],
+                collection_name=self.collection_name,
+                embedding_model=Config.EMBEDDING_MODEL,
+                collection_metadata=collection.metadata or {},
+            )
+
+            sidecar = index_path(path)
+            if Config.VECTOR_COMPRESSION != "none":
+                index = self.get_compressed_index()
+                if set(index.ids) != set(data["ids"]):
+                    index, _ = self.build_compressed_index()
+                index.save(sidecar)
+            elif os.path.exists(sidecar):
+                os.remove(sidecar)
+            return len(data["ids"])
+
+        except Exception as e:
+            logger.error(f"Error exporting snapshot: {str(e)}")
+            raise
+
+    def restore_snapshot(self, path: str = None, batch_size: int = 1000):
+        """
+        Load a snapshot into the collection without re-embedding anything
+
+        Chroma rebuilds its HNSW graph as the vectors are upserted, which is
+        most of the restore time; a compressed index saved with the snapshot
+        is reused when restoring into an empty collection.
+
+        Args:
+            path: Snapshot file (defaults to Config.VECTOR_SNAPSHOT_PATH)
+            batch_size: Vectors upserted per request
+
+        Returns:
+            Number of vectors restored
+        """
+        path = path or Config.VECTOR_SNAPSHOT_PATH
+
+        try:
+            snapshot = VectorSnapshot.load(path)
+            model = snapshot.header.get("embedding_model")
+            if model and model != Config.EMBEDDING_MODEL:
+                raise ValueError(
+                    f"Snapshot was built with {model}, "
+                    f"but EMBEDDING_MODEL is {Config.EMBEDDING_MODEL}"
+                )
+
+            logger.info(f"Restoring {len(snapshot)} vectors from snapshot {path}...")
+            started = time.perf_counter()
+            collection = self.vector_store._collection
+            was_empty = collection.count() == 0
+            metadata = snapshot.header.get("collection_metadata") or None
+            if (
+                metadata
+                and collection.count() == 0
+                and (collection.metadata or {}) != metadata
+            ):
+                # The distance space is fixed when a collection is created
+                self.client.delete_collection(name=self.collection_name)
+                self._create_vector_store(collection_metadata=metadata)
+                collection = self.vector_store._collection
+
+            for start in range(0, len(snapshot), batch_size):
+                end = start + batch_size
+                collection.upsert(
+                    ids=snapshot.ids[start:end],
+                    embeddings=snapshot.embeddings[start:end],
+                    documents=snapshot.documents[start:end],
+                    metadatas=snapshot.metadatas[start:end],
+                )
+
+            self._compressed_index_stale = self.compressed_index is not None
+            if was_empty:
+                self._restore_compressed_index(index_path(path), snapshot.ids)
+            logger.info(
+                f"✓ Restored {len(snapshot)} vectors from snapshot "
+                f"in {time.perf_counter() - started:.1f}s"
+            )
+            return len(snapshot)
+
+        except Exception as e:
+            logger.error(f"Error restoring snapshot: {str(e)}")
+            raise
+
+    def _restore_compressed_index(self, path: str, ids: List[str]):
+        """Adopt the compressed index saved with a snapshot if it still fits"""
+        if Config.VECTOR_COMPRESSION == "none" or not os.path.exists(path):
+            return
+        try:
+            index = CompressedIndex.load(path)
+        except Exception as e:
+            logger.warning(f"Could not load snapshot compressed index: {str(e)}")
+            return
+        if index.mode != Config.VECTOR_COMPRESSION or set(index.ids) != set(ids):
+            logger.info("Snapshot compressed index does not match, rebuilding it")
+            return
+
+        Path(Config.COMPRESSED_INDEX_PATH).parent.mkdir(parents=True, exist_ok=True)
+        index.save(Config.COMPRESSED_INDEX_PATH)
+        self.compressed_index = index
+        self._compressed_index_stale = False
+        self._compressed_index_mtime = _mtime(Config.COMPRESSED_INDEX_PATH)
+
     def get_collection_count(self):
         """Get the number of documents in the collection"""
         try:
@@ -175,3 +1033,70 @@ class ChromaStore:
         except Exception as e:
             logger.error(f"Error checking collection existence: {str(e)}")
             return False
+
+
+@contextmanager
+def _file_lock(path: str):
+    """Exclusive lock across processes (a no-op where fcntl is unavailable)"""
+    Path(path).parent.mkdir(parents=True, exist_ok=True)
+    with open(path, "a") as lock_file:
+        if fcntl is not None:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            if fcntl is not None:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+
+def select_adaptive(
+    candidates: List[Tuple],
+    k: int,
+    threshold: float,
+    relevance_mass: float,
+    score_drop: float,
+):
+    """
+    Choose how many ranked candidates to keep
+
+    Args:
+        candidates: List of tuples (Document, relevance_score), best first
+        k: Number of results to aim for
+        threshold: Relevance needed to expand beyond ``k`` results
+        relevance_mass: Share of the candidates' total relevance to cover
+        score_drop: Score gap between neighbours that ends the list
+
+    Returns:
+        List of tuples (Document, relevance_score)
+    """
+    total_mass = sum(score for _, score in candidates)
+    selected = []
+    covered = 0.0
+
+    for doc, score in candidates:
+        if selected and selected[-1][1] - score > score_drop:
+            break
+        if len(selected) >= k and score < threshold:
+            break
+
+        selected.append((doc, score))
+        covered += score
+
+        if len(selected) >= k and covered >= relevance_mass * total_mass:
+            break
+
+    return selected
+
+
+def _mtime(path: str) -> Optional[int]:
+    try:
+        return os.stat(path).st_mtime_ns
+    except OSError:
+        return None
+
+
+def _distance_from_inner_product(inner_product: float, space: str) -> float:
+    """Convert an inner product of normalized vectors to a Chroma distance"""
+    if space == "l2":
+        return max(2.0 - 2.0 * inner_product, 0.0)
+    return 1.0 - inner_product
@@ -0,0 +1,304 @@
+"""
+Compressed in-memory copy of the collection's embeddings
+Stores vectors as float16, scalar int8 or product-quantized codes, keyed by
+Chroma ID. Chunk texts and metadata stay in Chroma and are fetched for the
+final results only.
+"""
+
+import json
+import numpy as np
+from typing import Callable, Dict, List, Optional
+import logging
+
+logger = logging.getLogger(__name__)
+
+COMPRESSION_MODES = ("float16", "int8", "pq")
+
+
+class CompressedIndex:
+    """Brute-force vector index over compressed embeddings"""
+
+    def __init__(
+        self,
+        mode: str,
+        ids: List[str],
+        codes: np.ndarray,
+        params: dict,
+    ):
+        """
+        Initialize compressed index (use CompressedIndex.build to create one)
+
+        Args:
+            mode: One of COMPRESSION_MODES
+            ids: Chroma IDs, one per row of codes
+            codes: Compressed vectors
+            params: Codec parameters (int8 offsets/scales, PQ codebooks)
+        """
+        if mode not in COMPRESSION_MODES:
+            raise ValueError(f"Unknown compression mode: {mode}")
+
+        self.mode = mode
+        self.ids = list(ids)
+        self.codes = codes
+        self.params = params
+
+    @classmethod
+    def build(
+        cls,
+        mode: str,
+        ids: List[str],
+        embeddings,
+        pq_subvectors: int = 8,
+        pq_centroids: int = 256,
+    ):
+        """
+        Compress a float32 embedding matrix
+
+        Args:
+            mode: One of COMPRESSION_MODES
+            ids: Chroma IDs, one per row of embeddings
+            embeddings: Array-like of shape (n, dim)
+            pq_subvectors: Number of PQ sub-spaces (must divide dim)
+            pq_centroids: Number of centroids per sub-space (at most 256)
+
+        Returns:
+            CompressedIndex instance
+        """
+        if not len(ids):
+            # Fresh or emptied collection: nothing to quantize or train on
+            codes = np.zeros(
+                (0, 0), dtype=np.float16 if mode == "float16" else np.uint8
+            )
+            logger.info(f"No vectors to compress with {mode}, index is empty")
+            return cls(mode, [], codes, {})
+
+        vectors = np.asarray(embeddings, dtype=np.float32)
+        params = {}
+
+        if mode == "float16":
+            codes = vectors.astype(np.float16)
+        elif mode == "int8":
+            low = vectors.min(axis=0)
+            scale = (vectors.max(axis=0) - low) / 255.0
+            scale[scale == 0] = 1.0
+            codes = np.round((vectors - low) / scale).astype(np.uint8)
+            params = {"low": low, "scale": scale}
+        elif mode == "pq":
+            codebooks, codes = _train_pq(vectors, pq_subvectors, pq_centroids)
+            params = {"codebooks": codebooks}
+        else:
+            raise ValueError(f"Unknown compression mode: {mode}")
+
+        index = cls(mode, ids, codes, params)
+        logger.info(
+            f"✓ Compressed {len(vectors)} vectors with {mode}: "
+            f"{vectors.nbytes} -> {index.nbytes} bytes"
+        )
+        return index
+
+    def __len__(self):
+        return len(self.ids)
+
+    @property
+    def nbytes(self) -> int:
+        """Bytes used by codes, codec parameters and IDs"""
+        return (
+            self.codes.nbytes
+            + sum(p.nbytes for p in self.params.values())
+            + sum(len(doc_id.encode("utf-8")) for doc_id in self.ids)
+        )
+
+    def approximate_scores(self, query_embedding) -> np.ndarray:
+        """
+        Inner-product scores between a float32 query and every stored code
+
+        The query is never quantized (asymmetric distance computation).
+
+        Args:
+            query_embedding: Query vector
+
+        Returns:
+            Array of shape (n,) with approximate inner products
+        """
+        query = np.asarray(query_embedding, dtype=np.float32)
+
+        if self.mode == "float16":
+            return self.codes.astype(np.float32) @ query
+        if self.mode == "int8":
+            weighted = query * self.params["scale"]
+            return self.codes.astype(np.float32) @ weighted + float(
+                query @ self.params["low"]
+            )
+
+        codebooks = self.params["codebooks"]
+        subvectors, _, sub_dim = codebooks.shape
+        # Lookup table of query-subvector x centroid inner products
+        table = np.einsum("msd,md->ms", codebooks, query.reshape(subvectors, sub_dim))
+        return table[np.arange(subvectors), self.codes].sum(axis=1)
+
+    def search(
+        self,
+        query_embedding,
+        k: int,
+        rerank_factor: int = 4,
+        fetch_exact: Optional[Callable[[List[str]], Dict[str, list]]] = None,
+    ):
+        """
+        Top-k search with optional exact re-scoring
+
+        Args:
+            query_embedding: Query vector
+            k: Number of results to return
+            rerank_factor: Candidates per result passed to the exact re-score
+            fetch_exact: Callable mapping a list of IDs to their float32
+                vectors; IDs it leaves out (chunks deleted since the index was
+                built) are dropped from the results
+
+        Returns:
+            List of tuples (row_index, inner_product), best first
+        """
+        if not len(self):
+            return []
+
+        scores = self.approximate_scores(query_embedding)
+        n_candidates = min(len(scores), k * max(rerank_factor, 1))
+        candidates = _top_indices(scores, n_candidates)
+
+        if fetch_exact is not None and rerank_factor > 0:
+            exact = fetch_exact([self.ids[i] for i in candidates])
+            candidates = np.array(
+                [i for i in candidates if self.ids[i] in exact], dtype=np.int64
+            )
+            if not len(candidates):
+                return []
+            vectors = np.asarray(
+                [exact[self.ids[i]] for i in candidates], dtype=np.float32
+            )
+            candidate_scores = vectors @ np.asarray(query_embedding, dtype=np.float32)
+        else:
+            candidate_scores = scores[candidates]
+
+        order = np.argsort(-candidate_scores)[:k]
+        return [(int(candidates[i]), float(candidate_scores[i])) for i in order]
+
+    def recall_report(self, exact_embeddings, query_embeddings, k: int = 10) -> dict:
+        """
+        Compare compressed search against the uncompressed baseline
+
+        Args:
+            exact_embeddings: Original float32 vectors, aligned with self.ids
+            query_embeddings: Query vectors to evaluate
+            k: Cut-off for recall@k
+
+        Returns:
+            Dictionary with recall (approximate and re-scored) and sizes
+        """
+        exact = np.asarray(exact_embeddings, dtype=np.float32)
+        queries = np.asarray(query_embeddings, dtype=np.float32)
+        positions = {doc_id: i for i, doc_id in enumerate(self.ids)}
+
+        def fetch_exact(ids):
+            return {doc_id: exact[positions[doc_id]] for doc_id in ids}
+
+        approx_hits = 0
+        rescored_hits = 0
+        for query in queries:
+            truth = set(_top_indices(exact @ query, k).tolist())
+            approx = self.search(query, k, rerank_factor=1)
+            rescored = self.search(query, k, fetch_exact=fetch_exact)
+            approx_hits += len(truth & {i for i, _ in approx})
+            rescored_hits += len(truth & {i for i, _ in rescored})
+
+        total = max(len(queries) * min(k, len(self)), 1)
+        return {
+            "mode": self.mode,
+            "vectors": len(self),
+            "k": k,
+            "queries": len(queries),
+            "recall_approximate": approx_hits / total,
+            "recall_rescored": rescored_hits / total,
+            "uncompressed_bytes": exact.nbytes,
+            "compressed_bytes": self.nbytes,
+            "bytes_saved": exact.nbytes - self.nbytes,
+        }
+
+    def save(self, path: str):
+        """Save the index to a .npz file"""
+        np.savez(
+            path,
+            mode=np.array(self.mode),
+            ids=np.array(json.dumps(self.ids)),
+            codes=self.codes,
+            **{f"param_{name}": value for name, value in self.params.items()},
+        )
+        logger.info(f"✓ Compressed index saved to {path}")
+
+    @classmethod
+    def load(cls, path: str):
+        """Load an index written by save()"""
+        with np.load(path) as data:
+            params = {
+                name[len("param_") :]: data[name]
+                for name in data.files
+                if name.startswith("param_")
+            }
+            index = cls(
+                str(data["mode"]), json.loads(str(data["ids"])), data["codes"], params
+            )
+        logger.info(f"✓ Loaded {index.mode} compressed index with {len(index)} vectors")
+        return index
+
+
+def _top_indices(scores: np.ndarray, k: int) -> np.ndarray:
+    """Indices of the k highest scores, best first"""
+    k = min(k, len(scores))
+    if k == len(scores):
+        return np.argsort(-scores)
+    top = np.argpartition(-scores, k - 1)[:k]
+    return top[np.argsort(-scores[top])]
+
+
+def _train_pq(
+    vectors: np.ndarray, subvectors: int, centroids: int, iterations: int = 20
+):
+    """
+    Train product-quantization codebooks with k-means per sub-space
+
+    Returns:
+        Tuple (codebooks of shape (m, ksub, sub_dim), codes of shape (n, m))
+    """
+    n, dim = vectors.shape
+    if dim % subvectors:
+        raise ValueError(f"PQ subvectors ({subvectors}) must divide dimension {dim}")
+
+    sub_dim = dim // subvectors
+    ksub = min(centroids, 256, n)
+    rng = np.random.default_rng(0)
+    codebooks = np.zeros((subvectors, ksub, sub_dim), dtype=np.float32)
+    codes = np.zeros((n, subvectors), dtype=np.uint8)
+
+    for m in range(subvectors):
+        block = vectors[:, m * sub_dim : (m + 1) * sub_dim]
+        centers = block[rng.choice(n, ksub, replace=False)].copy()
+
+        for _ in range(iterations):
+            assignment = _nearest_centers(block, centers)
+            for c in range(ksub):
+                members = block[assignment == c]
+                if len(members):
+                    centers[c] = members.mean(axis=0)
+
+        codebooks[m] = centers
+        codes[:, m] = _nearest_centers(block, centers)
+
+    return codebooks, codes
+
+
+def _nearest_centers(block: np.ndarray, centers: np.ndarray) -> np.ndarray:
+    """Index of the closest center (squared L2) for every row of block"""
+    distances = (
+        (block**2).sum(axis=1, keepdims=True)
+        - 2 * block @ centers.T
+        + (centers**2).sum(axis=1)
+    )
+    return distances.argmin(axis=1)
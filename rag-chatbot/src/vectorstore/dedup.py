@@ -0,0 +1,302 @@
+"""
+Near-duplicate detection for ingested chunks with MinHash and LSH
+Each chunk gets a MinHash signature over its word shingles. Signatures are
+split into bands; chunks sharing a band bucket are candidates, and a
+candidate whose estimated Jaccard similarity reaches the threshold is a
+near-duplicate. Signatures and buckets live in a SQLite index next to the
+collection, so duplicates are caught across ingest runs and workers.
+"""
+
+import os
+import re
+import sqlite3
+import zlib
+from typing import Dict, List, Optional, Tuple
+import numpy as np
+from src.utils.config import Config
+from src.utils.sqlite import thread_connection
+import logging
+
+logger = logging.getLogger(__name__)
+
+_MERSENNE_PRIME = np.uint64((1 << 61) - 1)
+_MAX_HASH = np.uint64((1 << 32) - 1)
+_WORD = re.compile(r"\w+")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS signatures (
+    collection TEXT NOT NULL,
+    chunk_id TEXT NOT NULL,
+    source TEXT NOT NULL,
+    signature BLOB NOT NULL,
+    PRIMARY KEY (collection, chunk_id)
+);
+CREATE TABLE IF NOT EXISTS buckets (
+    collection TEXT NOT NULL,
+    band INTEGER NOT NULL,
+    bucket BLOB NOT NULL,
+    chunk_id TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS buckets_lookup ON buckets (collection, band, bucket);
+CREATE INDEX IF NOT EXISTS buckets_chunk ON buckets (collection, chunk_id);
+"""
+
+
+class MinHasher:
+    """MinHash signatures over word shingles (deterministic across processes)"""
+
+    def __init__(self, num_perm: int = 128, shingle_words: int = 3, seed: int = 1):
+        self.num_perm = num_perm
+        self.shingle_words = shingle_words
+        generator = np.random.RandomState(seed)
+        self._a = generator.randint(1, 1 << 61, size=num_perm, dtype=np.uint64)
+        self._b = generator.randint(0, 1 << 61, size=num_perm, dtype=np.uint64)
+
+    def shingles(self, text: str) -> set:
+        words = _WORD.findall(text.lower())
+        if len(words) <= self.shingle_words:
+            return {" ".join(words)}
+        return {
+            " ".join(words[i : i + self.shingle_words])
+            for i in range(len(words) - self.shingle_words + 1)
+        }
+
+    def signature(self, text: str) -> np.ndarray:
+        """uint32 signature of length num_perm"""
+        hashes = np.array(
+            [zlib.crc32(s.encode("utf-8")) for s in self.shingles(text)],
+            dtype=np.uint64,
+        )
+        # Universal hashing; uint64 products wrap, which keeps them well mixed
+        with np.errstate(over="ignore"):
+            permuted = (np.outer(hashes, self._a) + self._b) % _MERSENNE_PRIME
+        return (permuted & _MAX_HASH).min(axis=0).astype(np.uint32)
+
+
+def lsh_bands(threshold: float, num_perm: int) -> Tuple[int, int]:
+    """
+    Pick (bands, rows) for a similarity threshold
+
+    The LSH curve crosses 50% at about (1 / bands) ** (1 / rows); the largest
+    such point at or below the threshold keeps recall high, and the exact
+    signature comparison removes the extra candidates.
+    """
+    best = (num_perm, 1)
+    for rows in range(1, num_perm + 1):
+        if num_perm % rows:
+            continue
+        bands = num_perm // rows
+        if (1.0 / bands) ** (1.0 / rows) <= threshold:
+            best = (bands, rows)
+    return best
+
+
+def similarity(a: np.ndarray, b: np.ndarray) -> float:
+    """Estimated Jaccard similarity of two signatures"""
+    return float(np.mean(a == b))
+
+
+class DuplicateIndex:
+    """Persistent MinHash LSH index for one collection"""
+
+    def __init__(
+        self,
+        collection: str,
+        path: str = None,
+        threshold: float = None,
+        num_perm: int = None,
+        shingle_words: int = None,
+    ):
+        """
+        Initialize index (defaults come from Config)
+
+        Args:
+            collection: Collection the chunks belong to
+            path: SQLite file
+            threshold: Estimated Jaccard similarity at which a chunk is a
+                near-duplicate
+            num_perm: Signature length
+            shingle_words: Words per shingle
+        """
+        self.collection = collection
+        self.path = path or Config.DEDUP_INDEX_PATH
+        self.threshold = threshold or Config.DEDUP_THRESHOLD
+        self.hasher = MinHasher(
+            num_perm or Config.DEDUP_NUM_PERM,
+            shingle_words or Config.DEDUP_SHINGLE_WORDS,
+        )
+        self.bands, self.rows = lsh_bands(self.threshold, self.hasher.num_perm)
+        self.counters = {"checked": 0, "duplicates": 0}
+
+        directory = os.path.dirname(os.path.abspath(self.path))
+        os.makedirs(directory, exist_ok=True)
+        self._connection().executescript(_SCHEMA)
+        logger.info(
+            f"✓ Duplicate index at {self.path} "
+            f"({self.bands} bands x {self.rows} rows, threshold {self.threshold})"
+        )
+
+    def find_duplicates(
+        self, documents: List, exclude: Optional[List[str]] = None
+    ) -> Tuple[List[np.ndarray], List[Optional[Tuple[str, float]]]]:
+        """
+        Check documents against the index and against each other
+
+        Args:
+            documents: LangChain Documents about to be added
+            exclude: Indexed chunk IDs to ignore (chunks being replaced)
+
+        Returns:
+            Tuple (signatures, matches). matches[i] is (chunk_id, similarity)
+            of an indexed chunk, or ("#<j>", similarity) of an earlier
+            document j in this batch, or None when document i is new.
+        """
+        signatures = [self.hasher.signature(doc.page_content) for doc in documents]
+        matches = []
+        batch_buckets: Dict[Tuple[int, bytes], List[int]] = {}
+        exclude = set(exclude or ())
+
+        for i, signature in enumerate(signatures):
+            buckets = self._buckets(signature)
+            match = self._best_indexed(signature, buckets, exclude)
+
+            for key in buckets:
+                for j in batch_buckets.get(key, ()):
+                    score = similarity(signature, signatures[j])
+                    if score >= self.threshold and (match is None or score > match[1]):
+                        match = (f"#{j}", score)
+
+            matches.append(match)
+            if match is None:
+                for key in buckets:
+                    batch_buckets.setdefault(key, []).append(i)
+
+        self.counters["checked"] += len(documents)
+        self.counters["duplicates"] += sum(match is not None for match in matches)
+        return signatures, matches
+
+    def add(self, chunk_ids: List[str], sources: List[str], signatures: List):
+        """Index the signatures of chunks stored under chunk_ids"""
+        signature_rows, bucket_rows = [], []
+        for chunk_id, source, signature in zip(chunk_ids, sources, signatures):
+            signature_rows.append(
+                (self.collection, chunk_id, source, signature.tobytes())
+            )
+            bucket_rows.extend(
+                (self.collection, band, bucket, chunk_id)
+                for band, bucket in self._buckets(signature)
+            )
+
+        connection = self._connection()
+        with connection:
+            connection.executemany(
+                "INSERT OR REPLACE INTO signatures "
+                "(collection, chunk_id, source, signature) VALUES (?, ?, ?, ?)",
+                signature_rows,
+            )
+            connection.executemany(
+                "INSERT INTO buckets (collection, band, bucket, chunk_id) "
+                "VALUES (?, ?, ?, ?)",
+                bucket_rows,
+            )
+
+    def remove(self, chunk_ids: List[str]):
+        """Drop deleted chunks so corrected copies are not skipped as duplicates"""
+        rows = [(self.collection, chunk_id) for chunk_id in chunk_ids]
+        connection = self._connection()
+        with connection:
+            connection.executemany(
+                "DELETE FROM signatures WHERE collection = ? AND chunk_id = ?", rows
+            )
+            connection.executemany(
+                "DELETE FROM buckets WHERE collection = ? AND chunk_id = ?", rows
+            )
+
+    def rebuild(self, chunk_ids: List[str], documents: List[str], sources: List[str]):
+        """Replace the index with signatures of the given chunks"""
+        self.clear()
+        signatures = [self.hasher.signature(text or "") for text in documents]
+        self.add(chunk_ids, sources, signatures)
+        logger.info(f"✓ Indexed {len(chunk_ids)} chunk signatures")
+
+    def clear(self):
+        connection = self._connection()
+        with connection:
+            connection.execute(
+                "DELETE FROM signatures WHERE collection = ?", (self.collection,)
+            )
+            connection.execute(
+                "DELETE FROM buckets WHERE collection = ?", (self.collection,)
+            )
+
+    def stats(self) -> dict:
+        checked = self.counters["checked"]
+        return {
+            "indexed": len(self),
+            "threshold": self.threshold,
+            **self.counters,
+            "dedup_ratio": (
+                round(self.counters["duplicates"] / checked, 4) if checked else 0.0
+            ),
+        }
+
+    def __len__(self):
+        return (
+            self._connection()
+            .execute(
+                "SELECT COUNT(*) FROM signatures WHERE collection = ?",
+                (self.collection,),
+            )
+            .fetchone()[0]
+        )
+
+    def _buckets(self, signature: np.ndarray) -> List[Tuple[int, bytes]]:
+        return [
+            (band, signature[band * self.rows : (band + 1) * self.rows].tobytes())
+            for band in range(self.bands)
+        ]
+
+    def _best_indexed(
+        self, signature: np.ndarray, buckets, exclude: set
+    ) -> Optional[tuple]:
+        """Most similar indexed chunk at or above the threshold"""
+        connection = self._connection()
+        candidates = set()
+        for band, bucket in buckets:
+            candidates.update(
+                row[0]
+                for row in connection.execute(
+                    "SELECT chunk_id FROM buckets "
+                    "WHERE collection = ? AND band = ? AND bucket = ?",
+                    (self.collection, band, bucket),
+                )
+            )
+        candidates -= exclude
+        if not candidates:
+            return None
+
+        best = None
+        placeholders = ",".join("?" * len(candidates))
+        for chunk_id, stored in connection.execute(
+            "SELECT chunk_id, signature FROM signatures "
+            f"WHERE collection = ? AND chunk_id IN ({placeholders})",
+            [self.collection, *candidates],
+        ):
+            score = similarity(signature, np.frombuffer(stored, dtype=np.uint32))
+            if score >= self.threshold and (best is None or score > best[1]):
+                best = (chunk_id, score)
+        return best
+
+    def _connection(self) -> sqlite3.Connection:
+        return thread_connection(self.path)
+
+
+def add_duplicate_source(metadata: dict, source: str):
+    """Record that ``source`` also contains this chunk (merge mode)"""
+    if source == metadata.get("source"):
+        return
+    sources = [s for s in metadata.get("duplicate_sources", "").split(",") if s]
+    if source not in sources:
+        sources.append(source)
+        # Chroma metadata values must be scalars
+        metadata["duplicate_sources"] = ",".join(sources)
@@ -0,0 +1,152 @@
+"""
+Write-ahead log for bulk ingestion
+Every batch of chunks is appended here with its embeddings before it is
+upserted, and a commit record follows once the upsert succeeded. After a
+crash (or a network error talking to Chroma Cloud) the next run upserts the
+uncommitted batches from the log, skips the chunks already logged, and never
+embeds the same chunk twice.
+
+Layout: a sequence of records, each a fixed header (kind, crc32, header
+length, embedding bytes), a JSON header and raw float32 embeddings. A torn
+record at the end of the file (a crash mid-append) is discarded.
+"""
+
+import json
+import os
+import struct
+import zlib
+from typing import List, Set
+import numpy as np
+from src.utils.config import Config
+import logging
+
+logger = logging.getLogger(__name__)
+
+_RECORD = struct.Struct("<cIIQ")
+_BATCH = b"B"
+_COMMIT = b"C"
+
+
+class IngestLog:
+    """Append-only log of pending and committed ingest batches"""
+
+    def __init__(self, path: str = None):
+        """
+        Open the log, dropping a torn record left by a crash
+
+        Args:
+            path: Log file (defaults to Config.INGEST_LOG_PATH)
+        """
+        self.path = path or Config.INGEST_LOG_PATH
+        directory = os.path.dirname(os.path.abspath(self.path))
+        os.makedirs(directory, exist_ok=True)
+
+        self._batches = {}
+        self._committed = set()
+        valid_length = self._read()
+        if os.path.exists(self.path) and os.path.getsize(self.path) > valid_length:
+            logger.warning(f"Discarding torn record at the end of {self.path}")
+            os.truncate(self.path, valid_length)
+
+        pending = len(self.pending())
+        if pending:
+            logger.info(f"Ingest log {self.path} has {pending} uncommitted batches")
+
+    def append(
+        self, ids: List[str], documents: List[str], metadatas: List[dict], embeddings
+    ) -> int:
+        """
+        Durably record a batch before it is upserted
+
+        Args:
+            ids: Chunk IDs
+            documents: Chunk texts
+            metadatas: Chunk metadata
+            embeddings: Array-like of shape (n, dim)
+
+        Returns:
+            Batch number, to pass to commit()
+        """
+        batch = len(self._batches)
+        vectors = np.ascontiguousarray(embeddings, dtype=np.float32)
+        header = {
+            "batch": batch,
+            "embedding_model": Config.EMBEDDING_MODEL,
+            "dim": int(vectors.shape[1]) if vectors.ndim == 2 else 0,
+            "ids": list(ids),
+            "documents": list(documents),
+            "metadatas": list(metadatas),
+        }
+        self._write(_BATCH, header, vectors.tobytes())
+        self._batches[batch] = header | {"embeddings": vectors}
+        return batch
+
+    def commit(self, batch: int):
+        """Record that a batch reached the vector store"""
+        self._write(_COMMIT, {"batch": batch}, b"")
+        self._committed.add(batch)
+
+    def pending(self) -> List[dict]:
+        """Uncommitted batches in log order (ids, documents, metadatas, embeddings)"""
+        return [
+            header
+            for batch, header in sorted(self._batches.items())
+            if batch not in self._committed
+        ]
+
+    def logged_ids(self) -> Set[str]:
+        """IDs of every chunk in the log, committed or not"""
+        return {
+            chunk_id for header in self._batches.values() for chunk_id in header["ids"]
+        }
+
+    def clear(self):
+        """Forget every batch once the whole ingest finished"""
+        if os.path.exists(self.path):
+            os.remove(self.path)
+        self._batches = {}
+        self._committed = set()
+
+    def __len__(self):
+        return len(self._batches)
+
+    def _write(self, kind: bytes, header: dict, payload: bytes):
+        header_bytes = json.dumps(header).encode("utf-8")
+        crc = zlib.crc32(payload, zlib.crc32(header_bytes))
+        with open(self.path, "ab") as f:
+            f.write(_RECORD.pack(kind, crc, len(header_bytes), len(payload)))
+            f.write(header_bytes)
+            f.write(payload)
+            f.flush()
+            os.fsync(f.fileno())
+
+    def _read(self) -> int:
+        """Load every intact record; returns the length of the intact prefix"""
+        if not os.path.exists(self.path):
+            return 0
+
+        offset = 0
+        with open(self.path, "rb") as f:
+            while True:
+                prefix = f.read(_RECORD.size)
+                if len(prefix) < _RECORD.size:
+                    return offset
+                kind, crc, header_len, payload_len = _RECORD.unpack(prefix)
+                header_bytes = f.read(header_len)
+                payload = f.read(payload_len)
+                if (
+                    len(header_bytes) < header_len
+                    or len(payload) < payload_len
+                    or zlib.crc32(payload, zlib.crc32(header_bytes)) != crc
+                ):
+                    return offset
+
+                header = json.loads(header_bytes.decode("utf-8"))
+                if kind == _BATCH:
+                    header["embeddings"] = np.frombuffer(
+                        payload, dtype=np.float32
+                    ).reshape(len(header["ids"]), header["dim"])
+                    self._batches[header["batch"]] = header
+                elif kind == _COMMIT:
+                    self._committed.add(header["batch"])
+                offset += _RECORD.size + header_len + payload_len
@@ -0,0 +1,225 @@
+"""
+Parent-document (small-to-big) retrieval
+Documents are split into parent sections, and each parent into the small
+child chunks that are embedded. Search runs on the children; the retriever
+then swaps each hit for its parent section, fetched by parent ID from a local
+SQLite docstore, so the LLM sees whole procedures instead of fragments.
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+from typing import Dict, List, Tuple
+from langchain_core.documents import Document
+from src.utils.config import Config
+from src.utils.sqlite import thread_connection
+import logging
+
+logger = logging.getLogger(__name__)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS parents (
+    parent_id TEXT PRIMARY KEY,
+    source TEXT NOT NULL,
+    content TEXT NOT NULL,
+    metadata TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS parents_source ON parents (source);
+"""
+
+
+def parent_id(source: str, content: str) -> str:
+    """Content-addressed parent ID (identical sections share one entry)"""
+    digest = hashlib.sha1(f"{source}\n{content}".encode("utf-8")).hexdigest()
+    return digest[:20]
+
+
+def split_with_parents(
+    documents: List[Document],
+    chunk_size: int = None,
+    chunk_overlap: int = None,
+    parent_chunk_size: int = None,
+) -> Tuple[List[Document], List[Document]]:
+    """
+    Split documents into parent sections and child chunks
+
+    Parents break at markdown headings first, so a section (one procedure)
+    stays together unless it exceeds ``parent_chunk_size``. Children carry
+    the "parent_id" of their section and a document-level "start_index".
+
+    Args:
+        documents: List of Document objects
+        chunk_size: Child chunk size (defaults to Config.CHUNK_SIZE)
+        chunk_overlap: Child overlap (defaults to Config.CHUNK_OVERLAP)
+        parent_chunk_size: Largest parent section (Config.PARENT_CHUNK_SIZE)
+
+    Returns:
+        Tuple (parents, children)
+    """
+    from langchain.text_splitter import Language, RecursiveCharacterTextSplitter
+
+    chunk_size = chunk_size or Config.CHUNK_SIZE
+    if chunk_overlap is None:
+        chunk_overlap = Config.CHUNK_OVERLAP
+
+    # from_language marks the heading separators as regexes
+    parent_splitter = RecursiveCharacterTextSplitter.from_language(
+        Language.MARKDOWN,
+        chunk_size=parent_chunk_size or Config.PARENT_CHUNK_SIZE,
+        chunk_overlap=0,
+        length_function=len,
+        add_start_index=True,
+    )
+    child_splitter = RecursiveCharacterTextSplitter(
+        chunk_size=chunk_size,
+        chunk_overlap=chunk_overlap,
+        length_function=len,
+        add_start_index=True,
+    )
+
+    parents = parent_splitter.split_documents(documents)
+    children = []
+    for parent in parents:
+        source = parent.metadata.get("source", "Unknown")
+        parent.metadata["parent_id"] = parent_id(source, parent.page_content)
+        parent_start = parent.metadata.get("start_index", 0)
+        for child in child_splitter.split_documents([parent]):
+            child.metadata["start_index"] += parent_start
+            children.append(child)
+
+    logger.info(
+        f"Created {len(children)} chunks in {len(parents)} parent sections "
+        f"from {len(documents)} documents"
+    )
+    return parents, children
+
+
+class ParentStore:
+    """Parent sections keyed by parent ID, shared by all workers on a host"""
+
+    def __init__(self, path: str = None):
+        """
+        Initialize docstore
+
+        Args:
+            path: SQLite file (defaults to Config.PARENT_DOCSTORE_PATH)
+        """
+        self.path = path or Config.PARENT_DOCSTORE_PATH
+        directory = os.path.dirname(os.path.abspath(self.path))
+        os.makedirs(directory, exist_ok=True)
+        self._connection().executescript(_SCHEMA)
+        logger.info(f"✓ Parent docstore at {self.path}")
+
+    def add_parents(self, parents: List[Document]) -> int:
+        """
+        Store parent sections (existing IDs are overwritten)
+
+        Args:
+            parents: Documents with a "parent_id" metadata field
+
+        Returns:
+            Number of parents written
+        """
+        rows = [
+            (
+                parent.metadata["parent_id"],
+                parent.metadata.get("source", "Unknown"),
+                parent.page_content,
+                json.dumps(parent.metadata),
+            )
+            for parent in parents
+        ]
+        connection = self._connection()
+        with connection:
+            connection.executemany(
+                "INSERT OR REPLACE INTO parents (parent_id, source, content, metadata) "
+                "VALUES (?, ?, ?, ?)",
+                rows,
+            )
+        return len(rows)
+
+    def get_parents(self, parent_ids: List[str]) -> Dict[str, Document]:
+        """Fetch parents by ID (missing IDs are skipped)"""
+        if not parent_ids:
+            return {}
+        placeholders = ",".join("?" * len(parent_ids))
+        rows = (
+            self._connection()
+            .execute(
+                "SELECT parent_id, content, metadata FROM parents "
+                f"WHERE parent_id IN ({placeholders})",
+                list(parent_ids),
+            )
+            .fetchall()
+        )
+        return {
+            pid: Document(page_content=content, metadata=json.loads(metadata))
+            for pid, content, metadata in rows
+        }
+
+    def delete_parents(self, parent_ids: List[str]) -> int:
+        """Remove parents that no stored chunk refers to any more"""
+        connection = self._connection()
+        with connection:
+            deleted = connection.executemany(
+                "DELETE FROM parents WHERE parent_id = ?",
+                [(pid,) for pid in parent_ids],
+            ).rowcount
+        return deleted
+
+    def __len__(self):
+        return self._connection().execute("SELECT COUNT(*) FROM parents").fetchone()[0]
+
+    def _connection(self) -> sqlite3.Connection:
+        return thread_connection(self.path)
+
+
+def expand_to_parents(
+    results: List[Tuple[Document, float]], parent_store: ParentStore, k: int
+) -> List[Tuple[Document, float]]:
+    """
+    Replace ranked child hits with their deduplicated parent sections
+
+    Each parent takes the score of its best child and the IDs of all of its
+    children that were hit ("child_ids"). Children without a parent (ingested
+    before parent retrieval was enabled, or missing from the docstore) are
+    returned as they are.
+
+    Args:
+        results: List of tuples (Document, relevance_score), best first
+        parent_store: Docstore holding the parent sections
+        k: Number of parents to return
+
+    Returns:
+        List of tuples (Document, relevance_score), best first
+    """
+    wanted = {
+        doc.metadata["parent_id"] for doc, _ in results if doc.metadata.get("parent_id")
+    }
+    parents = parent_store.get_parents(list(wanted))
+
+    expanded = []
+    by_parent = {}
+    for doc, score in results:
+        pid = doc.metadata.get("parent_id")
+        child_id = getattr(doc, "id", None)
+        if pid in by_parent:
+            if child_id:
+                by_parent[pid].metadata["child_ids"].append(child_id)
+            continue
+        if len(expanded) >= k:
+            continue
+        parent = parents.get(pid)
+        if parent is None:
+            expanded.append((doc, score))
+            continue
+        parent = Document(
+            page_content=parent.page_content,
+            metadata={**parent.metadata, "child_ids": [child_id] if child_id else []},
+        )
+        by_parent[pid] = parent
+        expanded.append((parent, score))
+
+    logger.info(f"Expanded {len(results)} chunks into {len(expanded)} parent sections")
+    return expanded
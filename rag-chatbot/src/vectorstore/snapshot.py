@@ -0,0 +1,130 @@
+"""
+Snapshots of a built collection
+Layout: magic, header length, JSON header, padding, raw float32 embeddings.
+With vector compression on, the compressed index is saved next to it
+(index_path()) so a restored instance does not rebuild or retrain it.
+Chroma's HNSW graph is not part of the snapshot: restoring re-inserts the
+vectors, which rebuilds it.
+"""
+
+import json
+import os
+import struct
+import numpy as np
+import logging
+
+logger = logging.getLogger(__name__)
+
+SNAPSHOT_MAGIC = b"HLXSNAP1"
+_ALIGNMENT = 64
+
+
+def index_path(path: str) -> str:
+    """Compressed index file stored alongside the snapshot at path"""
+    return f"{path}.index.npz"
+
+
+class VectorSnapshot:
+    """Memory-mapped view of a collection snapshot"""
+
+    def __init__(self, header: dict, embeddings: np.ndarray):
+        """
+        Initialize snapshot (use VectorSnapshot.load to open a file)
+
+        Args:
+            header: Decoded JSON header (ids, documents, metadatas, ...)
+            embeddings: Embedding matrix, usually a read-only memmap
+        """
+        self.header = header
+        self.embeddings = embeddings
+
+    @property
+    def ids(self):
+        return self.header["ids"]
+
+    @property
+    def documents(self):
+        return self.header["documents"]
+
+    @property
+    def metadatas(self):
+        return self.header["metadatas"]
+
+    def __len__(self):
+        return len(self.header["ids"])
+
+    @staticmethod
+    def write(path: str, ids, documents, metadatas, embeddings, **info):
+        """
+        Write a snapshot file atomically
+
+        Args:
+            path: Destination file
+            ids: Chroma IDs
+            documents: Chunk texts
+            metadatas: Chunk metadata
+            embeddings: Array-like of shape (n, dim)
+            **info: Extra header fields (collection name, model, space, ...)
+        """
+        vectors = np.ascontiguousarray(embeddings, dtype=np.float32)
+        if vectors.ndim != 2:
+            vectors = vectors.reshape(len(ids), -1 if len(ids) else 0)
+
+        header = dict(info)
+        header.update(
+            {
+                "count": len(ids),
+                "dim": int(vectors.shape[1]) if len(ids) else 0,
+                "dtype": "float32",
+                "ids": list(ids),
+                "documents": list(documents),
+                "metadatas": list(metadatas),
+            }
+        )
+        header_bytes = json.dumps(header).encode("utf-8")
+        prefix_len = len(SNAPSHOT_MAGIC) + 8 + len(header_bytes)
+        padding = (-prefix_len) % _ALIGNMENT
+
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(SNAPSHOT_MAGIC)
+            f.write(struct.pack("<Q", len(header_bytes)))
+            f.write(header_bytes)
+            f.write(b"\0" * padding)
+            f.write(vectors.tobytes())
+        os.replace(tmp_path, path)
+
+        logger.info(f"✓ Snapshot of {len(ids)} vectors written to {path}")
+
+    @classmethod
+    def load(cls, path: str):
+        """
+        Open a snapshot, memory-mapping the embedding matrix
+
+        Args:
+            path: Snapshot file
+
+        Returns:
+            VectorSnapshot instance
+        """
+        with open(path, "rb") as f:
+            if f.read(len(SNAPSHOT_MAGIC)) != SNAPSHOT_MAGIC:
+                raise ValueError(f"{path} is not a vector snapshot")
+            (header_len,) = struct.unpack("<Q", f.read(8))
+            header = json.loads(f.read(header_len).decode("utf-8"))
+
+        prefix_len = len(SNAPSHOT_MAGIC) + 8 + header_len
+        offset = prefix_len + (-prefix_len) % _ALIGNMENT
+
+        if header["count"]:
+            embeddings = np.memmap(
+                path,
+                dtype=header["dtype"],
+                mode="r",
+                offset=offset,
+                shape=(header["count"], header["dim"]),
+            )
+        else:
+            embeddings = np.zeros((0, 0), dtype=np.float32)
+
+        return cls(header, embeddings)
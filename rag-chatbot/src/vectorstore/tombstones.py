@@ -0,0 +1,140 @@
+"""
+Tombstones for deleted chunks
+A delete only records the chunk IDs here; searches drop tombstoned results
+at once, and compaction later removes the vectors from Chroma and the
+auxiliary indexes in one batch. Deletes stay cheap on Chroma Cloud and the
+compressed index is rebuilt once per compaction, not once per delete.
+"""
+
+import os
+import sqlite3
+import threading
+import time
+from typing import Iterable, List, Set
+from src.utils.config import Config
+from src.utils.sqlite import thread_connection
+import logging
+
+logger = logging.getLogger(__name__)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS tombstones (
+    collection TEXT NOT NULL,
+    chunk_id TEXT NOT NULL,
+    source TEXT NOT NULL,
+    parent_id TEXT,
+    deleted_at REAL NOT NULL,
+    PRIMARY KEY (collection, chunk_id)
+);
+"""
+
+
+class TombstoneLog:
+    """Deleted-but-not-compacted chunk IDs of one collection, shared by workers"""
+
+    def __init__(self, collection: str, path: str = None):
+        """
+        Initialize log
+
+        Args:
+            collection: Collection the chunks belong to
+            path: SQLite file (defaults to Config.TOMBSTONE_DB_PATH)
+        """
+        self.collection = collection
+        self.path = path or Config.TOMBSTONE_DB_PATH
+        self._local = threading.local()
+
+        directory = os.path.dirname(os.path.abspath(self.path))
+        os.makedirs(directory, exist_ok=True)
+        self._connection().executescript(_SCHEMA)
+
+    def add(self, chunk_ids: List[str], metadatas: List[dict]):
+        """Tombstone chunks (metadatas give their source and parent)"""
+        now = time.time()
+        rows = [
+            (
+                self.collection,
+                chunk_id,
+                (metadata or {}).get("source", "Unknown"),
+                (metadata or {}).get("parent_id"),
+                now,
+            )
+            for chunk_id, metadata in zip(chunk_ids, metadatas)
+        ]
+        connection = self._connection()
+        with connection:
+            connection.executemany(
+                "INSERT OR IGNORE INTO tombstones "
+                "(collection, chunk_id, source, parent_id, deleted_at) "
+                "VALUES (?, ?, ?, ?, ?)",
+                rows,
+            )
+        self._local.cached = None
+
+    def ids(self) -> Set[str]:
+        """
+        Tombstoned chunk IDs
+
+        Re-read only when another connection committed since the last call
+        (PRAGMA data_version) or this thread's connection, which other logs
+        on the same file share, wrote (total_changes), so the per-search cost
+        is one cheap pragma. The cache is per thread, like the connections.
+        """
+        connection = self._connection()
+        version = (
+            connection,
+            connection.execute("PRAGMA data_version").fetchone()[0],
+            connection.total_changes,
+        )
+        cached = getattr(self._local, "cached", None)
+        if cached is not None and cached[0] == version:
+            return cached[1]
+        ids = frozenset(
+            row[0]
+            for row in connection.execute(
+                "SELECT chunk_id FROM tombstones WHERE collection = ?",
+                (self.collection,),
+            )
+        )
+        self._local.cached = (version, ids)
+        return ids
+
+    def pending(self, limit: int = None) -> List[tuple]:
+        """Oldest tombstones as (chunk_id, parent_id) tuples"""
+        query = (
+            "SELECT chunk_id, parent_id FROM tombstones WHERE collection = ? "
+            "ORDER BY deleted_at"
+        )
+        params = [self.collection]
+        if limit:
+            query += " LIMIT ?"
+            params.append(limit)
+        return self._connection().execute(query, params).fetchall()
+
+    def oldest_age(self) -> float:
+        """Seconds since the oldest pending delete (0.0 when there is none)"""
+        row = (
+            self._connection()
+            .execute(
+                "SELECT MIN(deleted_at) FROM tombstones WHERE collection = ?",
+                (self.collection,),
+            )
+            .fetchone()
+        )
+        return time.time() - row[0] if row and row[0] is not None else 0.0
+
+    def remove(self, chunk_ids: Iterable[str]):
+        """Forget compacted chunks"""
+        connection = self._connection()
+        with connection:
+            connection.executemany(
+                "DELETE FROM tombstones WHERE collection = ? AND chunk_id = ?",
+                [(self.collection, chunk_id) for chunk_id in chunk_ids],
+            )
+        self._local.cached = None
+
+    def __len__(self):
+        return len(self.ids())
+
+    def _connection(self) -> sqlite3.Connection:
+        return thread_connection(self.path)
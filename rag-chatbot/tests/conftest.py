@@ -0,0 +1,88 @@
+"""
+Shared test fixtures
+Tests run against a local ChromaDB in a temporary directory with a small
+deterministic embedding function, so no model download or API key is needed.
+"""
+
+import os
+import sys
+import tempfile
+import zlib
+import numpy as np
+import pytest
+
+# Local mode and scratch paths must be set before Config is imported
+_SCRATCH = tempfile.mkdtemp(prefix="rag-chatbot-tests-")
+for _name in ("CHROMA_CLOUD_TENANT", "CHROMA_CLOUD_DATABASE", "CHROMA_CLOUD_API_KEY"):
+    os.environ[_name] = ""
+os.environ["CHROMA_DB_PATH"] = os.path.join(_SCRATCH, "chroma_db")
+os.environ["DOCUMENTS_PATH"] = os.path.join(_SCRATCH, "documents")
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.utils.config import Config
+
+
+class HashEmbeddings:
+    """Bag-of-words embeddings: texts sharing words get similar vectors"""
+
+    def __init__(self, dim: int = 64):
+        self.dim = dim
+        self.calls = 0
+
+    def embed_documents(self, texts):
+        self.calls += len(texts)
+        return [self._embed(text) for text in texts]
+
+    def embed_query(self, text):
+        return self._embed(text)
+
+    def _embed(self, text):
+        vector = np.zeros(self.dim, dtype=np.float32)
+        for word in text.lower().split():
+            vector[zlib.crc32(word.encode("utf-8")) % self.dim] += 1.0
+        norm = np.linalg.norm(vector)
+        return (vector / norm if norm else vector).tolist()
+
+
+@pytest.fixture
+def embeddings():
+    return HashEmbeddings()
+
+
+@pytest.fixture
+def store_config(tmp_path, monkeypatch):
+    """Point every on-disk store at tmp_path"""
+    values = {
+        "CHROMA_DB_PATH": str(tmp_path / "chroma_db"),
+        "VECTOR_SNAPSHOT_PATH": None,
+        "VECTOR_COMPRESSION": "none",
+        "COMPRESSED_INDEX_PATH": str(tmp_path / "compressed_index.npz"),
+        "TOMBSTONE_DB_PATH": str(tmp_path / "tombstones.sqlite3"),
+        "DEDUP_INDEX_PATH": str(tmp_path / "dedup_index.sqlite3"),
+        "PARENT_DOCSTORE_PATH": str(tmp_path / "parents.sqlite3"),
+        "INGEST_LOG_PATH": str(tmp_path / "ingest.wal"),
+        "DEDUP_MODE": "skip",
+        "PARENT_RETRIEVAL": False,
+        "SIMILARITY_THRESHOLD": 0.0,
+    }
+    for name, value in values.items():
+        monkeypatch.setattr(Config, name, value)
+    return tmp_path
+
+
+@pytest.fixture
+def store(store_config, embeddings):
+    from src.vectorstore.chroma_store import ChromaStore
+
+    return ChromaStore(embeddings=embeddings, collection_name="test_collection")
+
+
+def make_documents(texts, source="doc.md"):
+    """Chunks of one source with distinct start indexes"""
+    from langchain_core.documents import Document
+
+    return [
+        Document(page_content=text, metadata={"source": source, "start_index": i * 100})
+        for i, text in enumerate(texts)
+    ]
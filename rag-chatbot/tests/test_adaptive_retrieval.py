@@ -0,0 +1,47 @@
+"""Tests for adaptive-k candidate selection"""
+
+from src.vectorstore.chroma_store import select_adaptive
+
+
+def ranked(*scores):
+    return [(f"doc{i}", score) for i, score in enumerate(scores)]
+
+
+def select(candidates, k=3, threshold=0.7, relevance_mass=0.9, score_drop=0.2):
+    return [
+        doc
+        for doc, _ in select_adaptive(
+            candidates,
+            k=k,
+            threshold=threshold,
+            relevance_mass=relevance_mass,
+            score_drop=score_drop,
+        )
+    ]
+
+
+def test_expands_past_k_while_above_threshold():
+    candidates = ranked(0.9, 0.88, 0.86, 0.84, 0.82, 0.5)
+    assert select(candidates, relevance_mass=1.0) == [f"doc{i}" for i in range(5)]
+
+
+def test_stops_at_k_below_threshold():
+    candidates = ranked(0.6, 0.58, 0.56, 0.54)
+    assert select(candidates, relevance_mass=1.0) == ["doc0", "doc1", "doc2"]
+
+
+def test_keeps_weak_matches_up_to_k_when_nothing_clears_threshold():
+    assert select(ranked(0.45, 0.4)) == ["doc0", "doc1"]
+
+
+def test_sharp_score_drop_ends_the_list_before_k():
+    assert select(ranked(0.9, 0.85, 0.4, 0.38)) == ["doc0", "doc1"]
+
+
+def test_stops_once_relevance_mass_is_covered():
+    candidates = ranked(0.9, 0.89, 0.88, 0.87, 0.86, 0.85)
+    assert len(select(candidates, relevance_mass=0.5)) == 3
+
+
+def test_empty_candidates():
+    assert select([]) == []
@@ -0,0 +1,136 @@
+"""Tests for admission control: CoDel overload detection and shedding"""
+
+import time
+import pytest
+from types import SimpleNamespace
+from src.utils.admission import (
+    AdmissionController,
+    AdmissionRejected,
+    client_id,
+    request_queue_time,
+)
+from src.utils.config import Config
+
+INTERVAL = 0.05
+TARGET = 0.1
+
+
+def make_controller(**overrides):
+    settings = dict(
+        max_concurrency=2,
+        max_queue=4,
+        max_wait=1.0,
+        target_delay=TARGET,
+        interval=INTERVAL,
+        rate_per_minute=0,
+    )
+    settings.update(overrides)
+    return AdmissionController(**settings)
+
+
+def admit(controller, queued=0.0, client="client"):
+    with controller.admit(client, queued=queued):
+        pass
+
+
+def next_interval():
+    time.sleep(INTERVAL * 1.2)
+
+
+def test_standing_delay_switches_to_overloaded_and_sheds():
+    controller = make_controller()
+
+    # A slow first interval is tolerated: CoDel waits for the interval to end
+    admit(controller, queued=0.5)
+    assert not controller.stats()["overloaded"]
+
+    next_interval()
+    with pytest.raises(AdmissionRejected) as excinfo:
+        admit(controller, queued=0.5)
+
+    assert excinfo.value.status == 503
+    assert excinfo.value.retry_after >= 1
+    stats = controller.stats()
+    assert stats["overloaded"]
+    assert stats["shed_overload"] == 1
+
+
+def test_overloaded_worker_admits_fresh_requests_and_recovers():
+    controller = make_controller()
+    admit(controller, queued=0.5)
+    next_interval()
+    with pytest.raises(AdmissionRejected):
+        admit(controller, queued=0.5)
+
+    # Requests that can start within the target are still served
+    admit(controller, queued=0.0)
+    assert controller.stats()["overloaded"]
+
+    # An interval whose minimum delay is below the target ends the overload
+    next_interval()
+    admit(controller, queued=0.0)
+    assert not controller.stats()["overloaded"]
+    admit(controller, queued=0.5)
+
+
+def test_full_queue_is_rejected_immediately():
+    controller = make_controller(max_concurrency=1, max_queue=0)
+
+    with controller.admit("a"):
+        started = time.monotonic()
+        with pytest.raises(AdmissionRejected):
+            admit(controller, client="b")
+        assert time.monotonic() - started < INTERVAL
+
+    assert controller.stats()["rejected_queue_full"] == 1
+
+
+def test_waiting_past_max_wait_is_shed():
+    controller = make_controller(max_concurrency=1, max_queue=1, max_wait=0.05)
+
+    with controller.admit("a"):
+        with pytest.raises(AdmissionRejected):
+            admit(controller, client="b")
+
+    stats = controller.stats()
+    assert stats["shed_timeout"] == 1
+    assert (stats["active"], stats["queued"]) == (0, 0)
+
+
+def test_client_over_its_rate_gets_429():
+    controller = make_controller(rate_per_minute=60, burst=1)
+    admit(controller, client="greedy")
+
+    with pytest.raises(AdmissionRejected) as excinfo:
+        admit(controller, client="greedy")
+    admit(controller, client="polite")
+
+    assert excinfo.value.status == 429
+    assert controller.stats()["rate_limited"] == 1
+
+
+@pytest.mark.parametrize(
+    "value, expected",
+    [
+        ("t=1700000000.0", 2.0),
+        ("1700000000000", 2.0),
+        ("t=1700000000000000", 2.0),
+        ("1700000005", 0.0),
+        ("garbage", 0.0),
+        ("", 0.0),
+    ],
+)
+def test_request_queue_time_units(value, expected):
+    headers = {"X-Request-Start": value}
+    assert request_queue_time(headers, now=1700000002.0) == pytest.approx(expected)
+
+
+def test_client_id_skips_trusted_proxies(monkeypatch):
+    request = SimpleNamespace(
+        headers={"X-Forwarded-For": "6.6.6.6, 1.2.3.4, 10.0.0.1"},
+        remote_addr="10.0.0.2",
+    )
+    monkeypatch.setattr(Config, "ADMISSION_TRUSTED_PROXIES", 2)
+    assert client_id(request) == "1.2.3.4"
+    monkeypatch.setattr(Config, "ADMISSION_TRUSTED_PROXIES", 0)
+    assert client_id(request) == "10.0.0.2"
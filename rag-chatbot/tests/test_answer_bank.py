@@ -0,0 +1,98 @@
+"""Tests for the precomputed answer bank"""
+
+import threading
+import pytest
+from conftest import make_documents
+from src.retriever.answer_bank import AnswerBank
+from src.utils.config import Config
+
+FLU = "flu symptoms include fever cough and aches"
+BURN = "minor burns should be cooled under running water"
+
+
+class BankRetriever:
+    """Answers with the nearest chunk, optionally waiting on a gate first"""
+
+    def __init__(self, vector_store, gate: threading.Event = None):
+        self.vector_store = vector_store
+        self.gate = gate
+        self.started = threading.Event()
+        self.calls = 0
+
+    def generate_answer(self, question, priority=None):
+        self.calls += 1
+        self.started.set()
+        if self.gate is not None:
+            assert self.gate.wait(5)
+        doc, _ = self.vector_store.similarity_search_with_score(question, k=1)[0]
+        return {
+            "answer": f"About {doc.metadata['source']}",
+            "source_ids": [doc.id],
+            "sources": [doc.metadata["source"]],
+            "context": doc.page_content,
+        }
+
+
+@pytest.fixture
+def bank_store(store, monkeypatch):
+    monkeypatch.setattr(Config, "ANSWER_BANK_RELOAD_INTERVAL", 0.0)
+    store.add_documents(make_documents([FLU], source="flu.md"))
+    store.add_documents(make_documents([BURN], source="burns.md"))
+    return store
+
+
+def lookup(bank, store, text):
+    return bank.lookup(store.embeddings.embed_query(text), vector_store=store)
+
+
+def test_invalidated_answers_are_not_served_until_refreshed(bank_store, tmp_path):
+    bank = AnswerBank(str(tmp_path / "bank.npz"), min_similarity=0.9)
+    retriever = BankRetriever(bank_store)
+    bank.build(retriever, [FLU, BURN])
+    assert lookup(bank, bank_store, FLU)["answer"] == "About flu.md"
+
+    assert bank.invalidate(["flu.md"]) == 1
+    assert lookup(bank, bank_store, FLU) is None
+    assert lookup(bank, bank_store, BURN)["answer"] == "About burns.md"
+    assert AnswerBank(bank.path).stats()["stale"] == 1
+
+    assert bank.refresh(retriever) == 1
+    assert lookup(bank, bank_store, FLU)["answer"] == "About flu.md"
+    assert bank.stats()["stale"] == 0
+
+
+def test_answers_from_reingested_sources_are_skipped(bank_store, tmp_path):
+    bank = AnswerBank(str(tmp_path / "bank.npz"), min_similarity=0.9)
+    bank.build(BankRetriever(bank_store), [FLU, BURN])
+
+    # A CLI ingest changes the source without calling invalidate()
+    bank_store.add_documents(
+        make_documents(["flu vaccines are updated every year"], source="flu.md")
+    )
+
+    assert lookup(bank, bank_store, FLU) is None
+    assert bank.lookup(bank_store.embeddings.embed_query(FLU)) is not None
+    assert lookup(bank, bank_store, BURN) is not None
+
+
+def test_invalidate_does_not_wait_for_a_running_refresh(bank_store, tmp_path):
+    bank = AnswerBank(str(tmp_path / "bank.npz"), min_similarity=0.9)
+    bank.build(BankRetriever(bank_store), [FLU, BURN])
+    bank.invalidate(["flu.md"])
+
+    gate = threading.Event()
+    retriever = BankRetriever(bank_store, gate=gate)
+    refresh = threading.Thread(target=bank.refresh, args=(retriever,))
+    refresh.start()
+    assert retriever.started.wait(5)
+
+    # Returns while the refresh is still generating answers
+    assert bank.invalidate(["burns.md"]) == 1
+    assert refresh.is_alive()
+    assert lookup(bank, bank_store, BURN) is None
+
+    gate.set()
+    refresh.join(5)
+    # The flu answer was generated before its source was invalidated again
+    assert lookup(bank, bank_store, FLU) is not None
+    assert bank.stats()["stale"] == 1
@@ -0,0 +1,94 @@
+"""Tests for the app factory's profile behavior"""
+
+import pytest
+import src.app_factory as app_factory
+
+
+@pytest.fixture
+def lite_app(store_config, monkeypatch):
+    monkeypatch.setattr(app_factory, "get_admission", lambda: None)
+    return app_factory.create_app("lite")
+
+
+def test_stats_does_not_load_lazy_components(lite_app):
+    response = lite_app.test_client().get("/stats")
+
+    assert response.status_code == 200
+    payload = response.get_json()
+    assert payload["vector_store_loaded"] is False
+    assert payload["documents_count"] is None
+    assert lite_app.extensions["rag"].loaded("vector_store") is None
+
+
+def test_delete_documents_requires_admin_token(lite_app, monkeypatch):
+    client = lite_app.test_client()
+    monkeypatch.setattr(app_factory.Config, "ADMIN_TOKEN", "secret")
+
+    response = client.delete("/documents", json={"source": "doc.md"})
+    assert response.status_code == 403
+
+    response = client.delete(
+        "/documents", json=["doc.md"], headers={"X-Admin-Token": "secret"}
+    )
+    assert response.status_code == 400
+    assert lite_app.extensions["rag"].loaded("vector_store") is None
+
+
+def test_replacing_ingest_requires_admin_token(lite_app, monkeypatch):
+    monkeypatch.setattr(app_factory.Config, "ADMIN_TOKEN", "secret")
+
+    response = lite_app.test_client().post(
+        "/ingest",
+        json={"text": "New text", "metadata": {"source": "doc.md"}, "replace": True},
+    )
+
+    assert response.status_code == 403
+    assert lite_app.extensions["rag"].loaded("vector_store") is None
+
+
+class RecordingScheduler:
+    """Scheduler stand-in answering every call with a canned completion"""
+
+    def __init__(self):
+        self.priorities = []
+
+    def submit(self, fn, priority, estimated_tokens=0):
+        from types import SimpleNamespace
+
+        self.priorities.append(priority)
+        message = SimpleNamespace(content="Full answer")
+        return SimpleNamespace(choices=[SimpleNamespace(message=message)], usage=None)
+
+    def stats(self):
+        return {}
+
+
+@pytest.fixture
+def minimal_app(store_config, monkeypatch):
+    scheduler = RecordingScheduler()
+    monkeypatch.setattr(app_factory, "get_admission", lambda: None)
+    monkeypatch.setattr(app_factory, "get_scheduler", lambda *args: scheduler)
+    monkeypatch.setattr(
+        app_factory.Components, "_build_groq_client", lambda self: object()
+    )
+    app = app_factory.create_app("minimal")
+    app.scheduler = scheduler
+    return app
+
+
+def test_full_answer_after_the_fast_path_keeps_emergency_priority(minimal_app):
+    client = minimal_app.test_client()
+    query = "My dad is not breathing, help!"
+
+    fast = client.post("/query", json={"query": query}).get_json()
+    assert fast["full_answer_pending"] is True
+    assert minimal_app.scheduler.priorities == []
+
+    full = client.post("/query", json={"query": query, "skip_fast_path": True})
+    assert full.get_json()["answer"] == "Full answer"
+
+    client.post("/query", json={"query": "How do I treat a mild sunburn?"})
+    assert minimal_app.scheduler.priorities == [
+        app_factory.PRIORITY_EMERGENCY,
+        app_factory.PRIORITY_NORMAL,
+    ]
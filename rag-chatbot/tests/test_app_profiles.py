@@ -0,0 +1,123 @@
+"""Tests for deployment profiles and the components they select"""
+
+import pytest
+from src.app_factory import Components
+from src.utils.app_profiles import PROFILES, get_profile
+from src.utils.config import Config
+
+
+@pytest.fixture(autouse=True)
+def clean_environment(monkeypatch):
+    for key in PROFILES["full"]:
+        monkeypatch.delenv(f"APP_{key.upper()}", raising=False)
+    monkeypatch.delenv("WEB_CONCURRENCY", raising=False)
+    monkeypatch.setattr(Config, "ANSWER_BANK_ENABLED", True)
+    monkeypatch.setattr(Config, "EMERGENCY_FAST_PATH", True)
+
+
+def test_profile_defaults():
+    full, lite, minimal = (get_profile(name) for name in ("full", "lite", "minimal"))
+
+    assert (full.embeddings, full.eager_init, full.answer_bank) == (
+        "huggingface",
+        True,
+        True,
+    )
+    assert (lite.embeddings, lite.eager_init, lite.answer_bank) == (
+        "lightweight",
+        False,
+        False,
+    )
+    assert minimal.vector_store is False
+    assert minimal.as_dict()["name"] == "minimal"
+
+
+def test_name_defaults_to_config_and_is_case_insensitive(monkeypatch):
+    monkeypatch.setattr(Config, "APP_PROFILE", "lite")
+
+    assert get_profile().name == "lite"
+    assert get_profile("FULL").name == "full"
+    with pytest.raises(ValueError, match="Unknown APP_PROFILE"):
+        get_profile("huge")
+
+
+def test_environment_overrides_are_typed(monkeypatch):
+    monkeypatch.setenv("APP_EAGER_INIT", "false")
+    monkeypatch.setenv("APP_WORKERS", "2")
+    monkeypatch.setenv("APP_LOG_LEVEL", " debug ")
+
+    profile = get_profile("full")
+
+    assert profile.eager_init is False
+    assert profile.workers == 2
+    assert profile.log_level == "debug"
+
+
+def test_web_concurrency_sets_workers_unless_app_workers_does(monkeypatch):
+    monkeypatch.setenv("WEB_CONCURRENCY", "3")
+    assert get_profile("full").workers == 3
+
+    monkeypatch.setenv("APP_WORKERS", "5")
+    assert get_profile("full").workers == 5
+
+
+def test_no_embeddings_disables_the_vector_store_and_answer_bank(monkeypatch):
+    monkeypatch.setenv("APP_EMBEDDINGS", "none")
+
+    profile = get_profile("full")
+
+    assert profile.vector_store is False
+    assert profile.answer_bank is False
+
+
+def test_global_switches_win_over_the_profile(monkeypatch):
+    monkeypatch.setattr(Config, "ANSWER_BANK_ENABLED", False)
+    monkeypatch.setattr(Config, "EMERGENCY_FAST_PATH", False)
+
+    profile = get_profile("full")
+
+    assert profile.answer_bank is False
+    assert profile.emergency_fast_path is False
+
+
+def test_components_follow_the_profile():
+    assert Components(get_profile("full")).profile_components() == [
+        "embeddings",
+        "vector_store",
+        "llm_client",
+        "rag_retriever",
+        "conversation_store",
+        "answer_bank",
+        "emergency_detector",
+    ]
+    assert Components(get_profile("minimal")).profile_components() == [
+        "groq_client",
+        "emergency_detector",
+    ]
+
+
+def test_disabled_components_build_as_none(monkeypatch):
+    monkeypatch.setattr(Config, "EMERGENCY_FAST_PATH", False)
+    components = Components(get_profile("lite"))
+
+    assert components.answer_bank is None
+    assert components.conversation_store is None
+    assert components.emergency_detector is None
+    assert components.loaded("vector_store") is None
+    with pytest.raises(AttributeError):
+        components.not_a_component
+
+
+def test_components_are_built_once(monkeypatch):
+    builds = []
+    monkeypatch.setattr(
+        Components, "_build_groq_client", lambda self: builds.append(1) or object()
+    )
+    components = Components(get_profile("minimal"))
+
+    assert components.loaded("groq_client") is None
+    client = components.groq_client
+
+    assert components.get("groq_client") is client
+    assert components.loaded("groq_client") is client
+    assert len(builds) == 1
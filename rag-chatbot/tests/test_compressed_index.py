@@ -0,0 +1,100 @@
+"""Tests for the compressed vector index behind ChromaStore"""
+
+import numpy as np
+import pytest
+from conftest import make_documents
+from src.utils.config import Config
+from src.vectorstore.chroma_store import ChromaStore
+from src.vectorstore.compressed_index import CompressedIndex
+
+TEXTS = [
+    "apply pressure to stop bleeding from a wound",
+    "cool a burn under running water for twenty minutes",
+    "call emergency services for chest pain",
+    "give chest compressions during cpr",
+    "rest and fluids help recovery from flu",
+    "elevate a sprained ankle and apply ice",
+]
+
+
+@pytest.fixture
+def compressed_config(store_config, monkeypatch):
+    monkeypatch.setattr(Config, "VECTOR_COMPRESSION", "int8")
+    return store_config
+
+
+def test_ingest_refresh_is_visible_to_other_workers(compressed_config, embeddings):
+    writer = ChromaStore(embeddings=embeddings, collection_name="shared")
+    writer.add_documents(make_documents(TEXTS[:3], source="first.md"))
+    writer.refresh_compressed_index()
+
+    reader = ChromaStore(embeddings=embeddings, collection_name="shared")
+    assert len(reader.get_compressed_index()) == 3
+
+    writer.add_documents(make_documents(TEXTS[3:], source="second.md"))
+    writer.refresh_compressed_index()
+
+    # An existing worker reloads the saved file, a new one loads it at start
+    assert len(reader.get_compressed_index()) == 6
+    fresh = ChromaStore(embeddings=embeddings, collection_name="shared")
+    assert len(fresh.compressed_index) == 6
+
+
+def test_chunks_missing_from_chroma_are_skipped(
+    compressed_config, embeddings, monkeypatch
+):
+    monkeypatch.setattr(Config, "SIMILARITY_THRESHOLD", -10.0)
+    store = ChromaStore(embeddings=embeddings, collection_name="missing")
+    store.add_documents(make_documents(TEXTS))
+    store.refresh_compressed_index()
+
+    # Another process removed two chunks without rebuilding the index
+    ids = store.compressed_index.ids
+    store.vector_store._collection.delete(ids=ids[:2])
+
+    results = store.similarity_search_with_score(TEXTS[0], k=6)
+    assert {doc.id for doc, _ in results} == set(ids[2:])
+    assert len(store.get_compressed_index()) == 4
+
+
+@pytest.mark.parametrize("mode", ["float16", "int8", "pq"])
+def test_recall_against_exact_search(mode):
+    rng = np.random.default_rng(0)
+    vectors = rng.standard_normal((300, 32)).astype(np.float32)
+    vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+    ids = [f"chunk-{i}" for i in range(len(vectors))]
+
+    index = CompressedIndex.build(mode, ids, vectors, pq_subvectors=8)
+    report = index.recall_report(vectors, vectors[:50], k=10)
+
+    assert report["recall_rescored"] >= 0.95
+    assert report["recall_approximate"] >= (0.9 if mode != "pq" else 0.3)
+    assert 0 < report["compressed_bytes"] < report["uncompressed_bytes"]
+    assert report["bytes_saved"] == (
+        report["uncompressed_bytes"] - report["compressed_bytes"]
+    )
+
+
+def test_saved_index_holds_only_ids_and_codes(tmp_path):
+    vectors = np.random.default_rng(1).standard_normal((20, 16)).astype(np.float32)
+    index = CompressedIndex.build("int8", [f"id-{i}" for i in range(20)], vectors)
+    path = str(tmp_path / "index.npz")
+    index.save(path)
+
+    with np.load(path) as data:
+        assert set(data.files) == {"mode", "ids", "codes", "param_low", "param_scale"}
+    loaded = CompressedIndex.load(path)
+    assert loaded.ids == index.ids
+    np.testing.assert_array_equal(loaded.codes, index.codes)
+
+
+@pytest.mark.parametrize("mode", ["float16", "int8", "pq"])
+def test_empty_collection_builds_an_empty_index(compressed_config, embeddings, mode):
+    store = ChromaStore(embeddings=embeddings, collection_name="empty")
+
+    index, _ = store.build_compressed_index(mode=mode)
+
+    assert len(index) == 0
+    assert index.search(embeddings.embed_query(TEXTS[0]), 3) == []
+    assert len(CompressedIndex.load(Config.COMPRESSED_INDEX_PATH)) == 0
+    assert store.similarity_search_with_score(TEXTS[0], k=3) == []
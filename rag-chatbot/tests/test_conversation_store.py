@@ -0,0 +1,92 @@
+"""Tests for session-scoped conversation memory"""
+
+import threading
+import time
+import pytest
+from src.conversation.conversation_store import ConversationStore
+from src.utils.config import Config
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    return str(tmp_path / "conversations.db")
+
+
+def wait_until(condition, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "timed out"
+        time.sleep(0.01)
+
+
+def test_overflow_turns_fold_into_the_summary(db_path):
+    store = ConversationStore(db_path, recent_turns=2)
+    for i in range(3):
+        store.append_turn("s", f"question {i}", f"Answer {i}. More detail.")
+
+    conversation = store.get("s")
+    assert [turn["question"] for turn in conversation.turns] == [
+        "question 1",
+        "question 2",
+    ]
+    assert conversation.summary == "User asked: question 0 Assistant: Answer 0."
+    assert "Summary of earlier conversation" in conversation.history_text()
+
+
+def test_llm_fold_runs_in_the_background(db_path):
+    release = threading.Event()
+
+    def summarizer(summary, turns):
+        assert release.wait(5)
+        return f"{summary}+{len(turns)}"
+
+    store = ConversationStore(db_path, recent_turns=1, summarizer=summarizer)
+    store.append_turn("s", "q0", "a0")
+    store.append_turn("s", "q1", "a1")
+
+    # The request returned before the summary; the turn is still verbatim
+    conversation = store.get("s")
+    assert conversation.summary == ""
+    assert [turn["question"] for turn in conversation.turns] == ["q0", "q1"]
+
+    store.append_turn("s", "q2", "a2")
+    release.set()
+    wait_until(lambda: store.get("s").summary == "+1")
+    assert [turn["question"] for turn in store.get("s").turns] == ["q1", "q2"]
+
+
+def test_failed_llm_fold_falls_back_to_extractive(db_path):
+    def summarizer(summary, turns):
+        raise RuntimeError("provider down")
+
+    store = ConversationStore(db_path, recent_turns=1, summarizer=summarizer)
+    store.append_turn("s", "q0", "a0")
+    store.append_turn("s", "q1", "a1")
+
+    wait_until(lambda: store.get("s").summary == "User asked: q0 Assistant: a0.")
+
+
+def test_expired_sessions_are_empty_and_evicted(db_path):
+    store = ConversationStore(db_path, ttl=0.05, max_sessions=2)
+    store.append_turn("old", "q", "a")
+    time.sleep(0.1)
+    assert store.get("old").turns == []
+
+    store.append_turn("a", "q", "a")
+    store.append_turn("b", "q", "a")
+    store.append_turn("c", "q", "a")
+    assert store.count() == 2
+    assert store.get("a").turns == []
+
+
+def test_question_counts_are_pruned(db_path, monkeypatch):
+    monkeypatch.setattr(Config, "CONVERSATION_MAX_QUESTIONS", 2)
+    store = ConversationStore(db_path)
+    for question in ["What is flu?", "what is  FLU?", "burns", "sprains"]:
+        store.append_turn("s", question, "answer")
+
+    assert store.frequent_questions(min_count=1) == ["sprains", "burns"]
+
+    monkeypatch.setattr(Config, "CONVERSATION_QUESTION_RETENTION", -1.0)
+    store.evict()
+    assert store.frequent_questions(min_count=1) == []
@@ -0,0 +1,51 @@
+"""Tests for per-worker thread and CPU pinning settings"""
+
+import os
+from src.utils import cpu_threads
+from src.utils.cpu_threads import (
+    configure_thread_env,
+    free_slot,
+    slot_cpus,
+    threads_per_worker,
+)
+
+
+def test_free_slot_reuses_the_lowest_free_slot():
+    assert free_slot([], 4) == 0
+    assert free_slot([0, 1, 3], 4) == 2
+    assert free_slot([None, 0], 2) == 1
+    # More live workers than slots (during a reload): share slot 0
+    assert free_slot([0, 1], 2) == 0
+
+
+def test_slot_cpus_partitions_cpus_into_blocks():
+    cpus = list(range(8))
+    blocks = [slot_cpus(slot, 3, cpus) for slot in range(3)]
+
+    assert blocks == [[0, 1, 2], [3, 4, 5], [6, 7]]
+    assert sorted(sum(blocks, [])) == cpus
+    assert slot_cpus(1, 4, [2, 3, 6, 7]) == [3]
+
+
+def test_slot_cpus_shares_cpus_round_robin_when_workers_outnumber_them():
+    assert [slot_cpus(slot, 4, [0, 1]) for slot in range(4)] == [[0], [1], [0], [1]]
+
+
+def test_threads_per_worker(monkeypatch):
+    monkeypatch.setattr(cpu_threads.Config, "TORCH_INTRA_OP_THREADS", 0)
+    assert threads_per_worker(4, list(range(8))) == 2
+    assert threads_per_worker(8, [0, 1]) == 1
+
+    monkeypatch.setattr(cpu_threads.Config, "TORCH_INTRA_OP_THREADS", 3)
+    assert threads_per_worker(4, list(range(8))) == 3
+
+
+def test_configure_thread_env_keeps_explicit_settings(monkeypatch):
+    for name in (*cpu_threads.THREAD_ENV_VARS, "TOKENIZERS_PARALLELISM"):
+        monkeypatch.delenv(name, raising=False)
+    monkeypatch.setenv("MKL_NUM_THREADS", "4")
+
+    configure_thread_env(2)
+
+    assert os.environ["OMP_NUM_THREADS"] == "2"
+    assert os.environ["MKL_NUM_THREADS"] == "4"
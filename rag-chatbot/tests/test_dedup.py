@@ -0,0 +1,89 @@
+"""Tests for MinHash LSH near-duplicate detection"""
+
+import numpy as np
+import pytest
+from conftest import make_documents
+from src.vectorstore.dedup import (
+    DuplicateIndex,
+    MinHasher,
+    add_duplicate_source,
+    lsh_bands,
+    similarity,
+)
+
+BASE = (
+    "To treat a minor burn, cool the area under cool running water for at "
+    "least ten minutes, remove rings or tight items before swelling starts, "
+    "and cover the burn loosely with a sterile non-stick dressing."
+)
+NEAR_COPY = BASE.replace("dressing", "bandage")
+UNRELATED = (
+    "For a sprained ankle, rest the joint, apply ice wrapped in a cloth for "
+    "twenty minutes at a time, use a compression bandage and keep it raised."
+)
+
+
+@pytest.fixture
+def index(tmp_path):
+    return DuplicateIndex(
+        "docs", str(tmp_path / "dedup.db"), threshold=0.8, num_perm=128
+    )
+
+
+def test_signatures_are_deterministic_and_estimate_jaccard():
+    hasher = MinHasher(num_perm=128)
+    np.testing.assert_array_equal(
+        hasher.signature(BASE), MinHasher(num_perm=128).signature(BASE)
+    )
+    assert similarity(hasher.signature(BASE), hasher.signature(NEAR_COPY)) > 0.8
+    assert similarity(hasher.signature(BASE), hasher.signature(UNRELATED)) < 0.2
+
+
+def test_lsh_bands_cover_the_threshold():
+    bands, rows = lsh_bands(0.8, 128)
+    assert bands * rows == 128
+    assert (1.0 / bands) ** (1.0 / rows) <= 0.8
+
+
+def test_finds_indexed_near_duplicates(index):
+    signatures, matches = index.find_duplicates(make_documents([BASE]))
+    assert matches == [None]
+    index.add(["base"], ["burns.md"], signatures)
+
+    _, matches = index.find_duplicates(make_documents([NEAR_COPY, UNRELATED]))
+
+    assert matches[0][0] == "base"
+    assert matches[0][1] >= 0.8
+    assert matches[1] is None
+    assert index.stats()["duplicates"] == 1
+
+
+def test_finds_duplicates_within_a_batch(index):
+    _, matches = index.find_duplicates(
+        make_documents([BASE, UNRELATED, NEAR_COPY, BASE])
+    )
+
+    assert matches[0] is None and matches[1] is None
+    assert matches[2][0] == "#0"
+    assert matches[3] == ("#0", 1.0)
+
+
+def test_excluded_and_removed_chunks_are_not_matches(index):
+    signatures, _ = index.find_duplicates(make_documents([BASE]))
+    index.add(["base"], ["burns.md"], signatures)
+
+    _, matches = index.find_duplicates(make_documents([BASE]), exclude=["base"])
+    assert matches == [None]
+
+    index.remove(["base"])
+    assert len(index) == 0
+    assert index.find_duplicates(make_documents([BASE]))[1] == [None]
+
+
+def test_add_duplicate_source():
+    metadata = {"source": "a.md"}
+    add_duplicate_source(metadata, "a.md")
+    add_duplicate_source(metadata, "b.md")
+    add_duplicate_source(metadata, "b.md")
+    add_duplicate_source(metadata, "c.md")
+    assert metadata["duplicate_sources"] == "b.md,c.md"
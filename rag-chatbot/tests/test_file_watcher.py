@@ -0,0 +1,151 @@
+"""Tests for the document directory watchers and debouncing"""
+
+import os
+import shutil
+import pytest
+from src.utils import file_watcher
+from src.utils.file_watcher import (
+    InotifyWatcher,
+    PollingWatcher,
+    debounced_changes,
+    scan,
+)
+
+SUFFIXES = (".md", ".txt")
+
+
+def write(path, text):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(text)
+
+
+@pytest.fixture
+def docs(tmp_path):
+    root = tmp_path / "documents"
+    write(str(root / "burns.md"), "Cool the burn")
+    write(str(root / "guides" / "cpr.txt"), "Push hard and fast")
+    write(str(root / "notes.pdf"), "ignored")
+    return str(root)
+
+
+@pytest.fixture
+def inotify_watcher(docs):
+    try:
+        watcher = InotifyWatcher(docs, SUFFIXES)
+    except (OSError, AttributeError, TypeError):
+        pytest.skip("inotify is not available")
+    yield watcher
+    watcher.close()
+
+
+def test_scan_is_recursive_and_filters_suffixes(docs):
+    files = scan(docs, SUFFIXES)
+
+    assert set(files) == {
+        os.path.join(docs, "burns.md"),
+        os.path.join(docs, "guides", "cpr.txt"),
+    }
+    assert files[os.path.join(docs, "burns.md")][1] == len("Cool the burn")
+
+
+def test_polling_reports_added_modified_and_removed_files(docs):
+    watcher = PollingWatcher(docs, SUFFIXES, interval=0)
+    assert watcher.poll(0) == set()
+
+    write(os.path.join(docs, "burns.md"), "Cool the burn for twenty minutes")
+    write(os.path.join(docs, "choking.md"), "Back blows")
+    write(os.path.join(docs, "scan.pdf"), "still ignored")
+    os.remove(os.path.join(docs, "guides", "cpr.txt"))
+
+    assert watcher.poll(0) == {
+        os.path.join(docs, "burns.md"),
+        os.path.join(docs, "choking.md"),
+        os.path.join(docs, "guides", "cpr.txt"),
+    }
+    assert watcher.poll(0) == set()
+
+
+def test_inotify_reports_written_and_removed_files(docs, inotify_watcher):
+    path = os.path.join(docs, "guides", "choking.md")
+    write(path, "Back blows")
+    write(os.path.join(docs, "scan.pdf"), "ignored")
+
+    assert inotify_watcher.poll(1) == {path}
+
+    os.remove(path)
+    assert inotify_watcher.poll(1) == {path}
+
+
+def test_inotify_reports_new_and_removed_directories(docs, inotify_watcher):
+    directory = os.path.join(docs, "new")
+    os.makedirs(directory)
+    assert inotify_watcher.poll(1) == set()
+
+    # Files in a directory created after the watch started are still seen
+    path = os.path.join(directory, "stroke.md")
+    write(path, "Act fast")
+    assert inotify_watcher.poll(1) == {path}
+
+    shutil.rmtree(os.path.join(docs, "guides"))
+    changed = set()
+    while True:
+        events = inotify_watcher.poll(0.2)
+        if not events:
+            break
+        changed |= events
+    assert os.path.join(docs, "guides") + os.sep in changed
+
+
+class Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class ScriptedWatcher:
+    """Returns scripted changes, advancing the clock by each step's delay"""
+
+    def __init__(self, clock, steps):
+        self.clock = clock
+        self.steps = list(steps)
+        self.timeouts = []
+
+    def poll(self, timeout):
+        self.timeouts.append(timeout)
+        delay, changes = self.steps.pop(0)
+        self.clock.now += min(delay, timeout)
+        return changes
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(file_watcher.time, "monotonic", clock)
+    return clock
+
+
+def test_changes_are_batched_until_quiet(clock):
+    watcher = ScriptedWatcher(
+        clock,
+        [(5.0, {"a.md"}), (0.5, {"b.md"}), (0.6, {"a.md"}), (1.0, set())],
+    )
+
+    batch = next(debounced_changes(watcher, debounce=1.0))
+
+    assert batch == {"a.md", "b.md"}
+    assert clock.now == pytest.approx(7.1)
+    # Idle until the first change, then wake up after the debounce interval
+    assert watcher.timeouts == [3600.0, 1.0, 1.0, 1.0]
+
+
+def test_steady_stream_is_flushed_after_max_delay(clock):
+    watcher = ScriptedWatcher(
+        clock, [(0.5, {f"{i}.md"}) for i in range(10)] + [(1.0, set())]
+    )
+    batches = debounced_changes(watcher, debounce=1.0, max_delay=2.0)
+
+    assert next(batches) == {"0.md", "1.md", "2.md", "3.md", "4.md"}
+    assert next(batches) == {"5.md", "6.md", "7.md", "8.md", "9.md"}
@@ -0,0 +1,103 @@
+"""Tests for the cached health and readiness probes"""
+
+import os
+import time
+import pytest
+from flask import Flask
+from src.utils import health
+from src.utils.health import HealthMonitor, init_health
+
+
+class Clock:
+    """Replaces time.time in the health module"""
+
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(health.time, "time", clock)
+    return clock
+
+
+def make_client(monitor):
+    # Pretend the refresh thread already runs so tests drive refresh() directly
+    monitor._thread_pid = os.getpid()
+    app = Flask(__name__)
+    init_health(app, monitor, profile="test")
+    return app.test_client()
+
+
+def test_probes_read_the_snapshot_without_running_checks(clock):
+    calls = []
+    monitor = HealthMonitor(refresh_interval=30, max_staleness=90)
+    monitor.add_check("store", lambda: calls.append(1) or {"documents_count": 3})
+    client = make_client(monitor)
+    monitor.refresh()
+
+    for _ in range(5):
+        assert client.get("/health/ready").status_code == 200
+    response = client.get("/health")
+
+    assert len(calls) == 1
+    assert response.status_code == 200
+    assert response.json["documents_count"] == 3
+    assert response.json["profile"] == "test"
+
+
+def test_not_ready_until_the_first_success(clock):
+    monitor = HealthMonitor(refresh_interval=30, max_staleness=90)
+    monitor.add_check("store", lambda: {})
+    client = make_client(monitor)
+
+    assert client.get("/health/ready").status_code == 503
+    monitor.refresh()
+    assert client.get("/health/ready").status_code == 200
+
+
+def test_failing_check_turns_unready_after_max_staleness(clock):
+    healthy = [True]
+
+    def check():
+        if not healthy[0]:
+            raise RuntimeError("store unreachable")
+        return {}
+
+    monitor = HealthMonitor(refresh_interval=30, max_staleness=90)
+    monitor.add_check("store", check)
+    client = make_client(monitor)
+    monitor.refresh()
+
+    healthy[0] = False
+    clock.now += 60
+    monitor.refresh()
+    ready = client.get("/health/ready")
+    assert ready.status_code == 200
+    assert ready.json["checks"]["store"]["last_error"] == "store unreachable"
+    assert ready.json["checks"]["store"]["last_success_age_s"] == 60
+
+    clock.now += 31
+    assert client.get("/health/ready").status_code == 503
+    assert client.get("/health").json["status"] == "unhealthy"
+    # Liveness never depends on the checks
+    assert client.get("/health/live").status_code == 200
+
+
+def test_background_thread_refreshes_the_snapshot():
+    calls = []
+    monitor = HealthMonitor(refresh_interval=0.01, max_staleness=90)
+    monitor.add_check("store", lambda: calls.append(1) or {})
+
+    monitor.start()
+    monitor.start()
+    deadline = time.monotonic() + 2
+    while len(calls) < 3 and time.monotonic() < deadline:
+        time.sleep(0.01)
+
+    assert len(calls) >= 3
+    assert monitor.snapshot()["ready"]
@@ -0,0 +1,74 @@
+"""Tests for the resumable ingest write-ahead log"""
+
+import os
+import numpy as np
+from conftest import make_documents
+from src.vectorstore.chroma_store import chunk_id
+from src.vectorstore.ingest_log import IngestLog
+
+TEXTS = [
+    "flu symptoms include fever cough and aches",
+    "a migraine is a severe throbbing headache",
+    "sprained ankles need rest ice and compression",
+]
+
+
+def log_batch(log, documents, embeddings):
+    return log.append(
+        [chunk_id(doc) for doc in documents],
+        [doc.page_content for doc in documents],
+        [doc.metadata for doc in documents],
+        embeddings.embed_documents([doc.page_content for doc in documents]),
+    )
+
+
+def test_reopened_log_drops_a_torn_record(tmp_path, embeddings):
+    path = str(tmp_path / "ingest.wal")
+    documents = make_documents(TEXTS)
+    log = IngestLog(path)
+    log.commit(log_batch(log, documents[:2], embeddings))
+    log_batch(log, documents[2:], embeddings)
+    intact = os.path.getsize(path)
+    log_batch(log, documents[:1], embeddings)
+    # Crash in the middle of the last append
+    os.truncate(path, os.path.getsize(path) - 10)
+
+    reopened = IngestLog(path)
+
+    assert os.path.getsize(path) == intact
+    assert len(reopened) == 2
+    [pending] = reopened.pending()
+    assert pending["ids"] == [chunk_id(documents[2])]
+    np.testing.assert_allclose(
+        pending["embeddings"][0], embeddings.embed_query(TEXTS[2]), rtol=1e-6
+    )
+    assert reopened.logged_ids() == {chunk_id(doc) for doc in documents}
+
+
+def test_interrupted_ingest_is_replayed_without_embedding(store, embeddings):
+    log = IngestLog()
+    documents = make_documents(TEXTS)
+    log_batch(log, documents, embeddings)
+    calls = embeddings.calls
+
+    ids = store.add_documents(documents, log=IngestLog())
+
+    assert sorted(ids) == sorted(chunk_id(doc) for doc in documents)
+    assert embeddings.calls == calls
+    assert store.get_collection_count() == 3
+    assert IngestLog().pending() == []
+
+
+def test_readded_chunks_are_not_hidden_by_pending_deletes(store):
+    documents = make_documents(TEXTS, source="notes.md")
+    store.add_documents(documents, log=IngestLog())
+    store.delete_documents(source="notes.md")
+    IngestLog().clear()
+
+    store.add_documents(make_documents(TEXTS, source="notes.md"), log=IngestLog())
+
+    assert len(store.tombstones) == 0
+    results = store.similarity_search_with_score(TEXTS[0], k=1)
+    assert results[0][0].page_content == TEXTS[0]
+    store.compact()
+    assert store.get_collection_count() == 3
@@ -0,0 +1,67 @@
+"""Tests for the emergency intent detector"""
+
+import pytest
+from src.emergency.intent_detector import (
+    EMERGENCY_PROTOCOLS,
+    EmergencyIntentDetector,
+    urgency_score,
+)
+
+
+@pytest.fixture
+def detector():
+    return EmergencyIntentDetector(threshold=0.6)
+
+
+@pytest.mark.parametrize(
+    "query, intent",
+    [
+        ("My dad is not breathing, help!", "not_breathing"),
+        ("he is choking right now", "choking"),
+        ("he is bleeding a lot", "severe_bleeding"),
+        ("my friend is having a seizure", "seizure"),
+        ("she swallowed bleach", "poisoning"),
+        (
+            "my throat is swelling after an allergic reaction, please help",
+            "anaphylaxis",
+        ),
+    ],
+)
+def test_live_emergencies_get_their_protocol(detector, query, intent):
+    response = detector.detect(query)
+
+    assert response["intent"] == intent
+    assert response["urgency"] >= detector.threshold
+    assert response["steps"] == EMERGENCY_PROTOCOLS[intent]["steps"]
+    assert response["call_emergency_services"] is True
+
+
+@pytest.mark.parametrize(
+    "query",
+    ["What is CPR?", "How do I learn CPR in a course?", "what causes a stroke"],
+)
+def test_informational_questions_skip_the_fast_path(detector, query):
+    assert urgency_score(query) < detector.threshold
+    assert detector.detect(query) is None
+
+
+def test_no_matching_intent_is_never_an_emergency():
+    query = "How do I treat a small paper cut?"
+
+    assert EmergencyIntentDetector(threshold=0.0).detect(query) is None
+
+
+def test_threshold_decides_borderline_messages():
+    query = "Chest pain"
+    score = urgency_score(query)
+
+    assert EmergencyIntentDetector(threshold=score + 0.01).detect(query) is None
+    response = EmergencyIntentDetector(threshold=score - 0.01).detect(query)
+    assert response["intent"] == "heart_attack"
+
+
+def test_responses_are_copies(detector):
+    first = detector.detect("he is choking right now")
+    first["steps"] = []
+
+    assert detector.detect("he is choking right now")["steps"]
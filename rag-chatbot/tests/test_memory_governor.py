@@ -0,0 +1,100 @@
+"""Tests for the memory governor and lazy component freezing"""
+
+import tracemalloc
+import pytest
+from src.app_factory import Components
+from src.utils.app_profiles import get_profile
+from src.utils import memory_governor
+from src.utils.memory_governor import MemoryGovernor, parse_thresholds, private_bytes
+
+
+@pytest.fixture
+def governor():
+    governor = MemoryGovernor(rss_budget_mb=0, sample_every=1, gc_thresholds="")
+    yield governor
+    if tracemalloc.is_tracing():
+        tracemalloc.stop()
+
+
+def test_stats_takes_allocation_snapshots_only_on_demand(governor, monkeypatch):
+    governor.trace_allocations = True
+    governor.start_worker()
+    snapshots = []
+    take_snapshot = tracemalloc.take_snapshot
+
+    def counting_snapshot():
+        snapshots.append(1)
+        return take_snapshot()
+
+    monkeypatch.setattr(tracemalloc, "take_snapshot", counting_snapshot)
+
+    governor.stats()
+    governor.stats()
+    assert snapshots == []
+
+    report = governor.stats(allocations=True)
+    assert snapshots == [1]
+    assert isinstance(report["allocation_growth"], list)
+
+
+def test_lazy_components_freeze_once_after_warm_up(monkeypatch):
+    components = Components(get_profile("minimal"))
+    governor = MemoryGovernor(gc_thresholds="")
+    freezes = []
+    monkeypatch.setattr(governor, "freeze", lambda: freezes.append(1))
+    monkeypatch.setattr("src.app_factory.get_governor", lambda: governor)
+    monkeypatch.setattr(Components, "_build_groq_client", lambda self: object())
+
+    components.get("emergency_detector")
+    assert freezes == []
+    components.get("groq_client")
+    components.get("groq_client")
+    components.get("emergency_detector")
+    assert freezes == [1]
+    assert components.warmed_up()
+
+
+@pytest.mark.parametrize(
+    "value, expected",
+    [("", None), ("10000,20,20", (10000, 20, 20)), ("700", (700,))],
+)
+def test_parse_thresholds(value, expected):
+    assert parse_thresholds(value) == expected
+
+
+def test_private_bytes_reads_smaps_rollup(tmp_path):
+    rollup = tmp_path / "smaps_rollup"
+    rollup.write_text(
+        "Rss:              900000 kB\n"
+        "Shared_Clean:     700000 kB\n"
+        "Private_Clean:      1000 kB\n"
+        "Private_Dirty:    199000 kB\n"
+    )
+    assert private_bytes(str(rollup)) == 200000 * 1024
+
+
+def test_worker_starting_above_budget_is_not_recycled_at_once(monkeypatch):
+    governor = MemoryGovernor(rss_budget_mb=450, sample_every=1, gc_thresholds="")
+    usage = [600]
+    monkeypatch.setattr(
+        memory_governor, "private_bytes", lambda: usage[0] * 1024 * 1024
+    )
+
+    governor.start_worker()
+    assert governor.after_request() is False
+
+    usage[0] = 1000
+    assert governor.after_request() is False
+    usage[0] = 1100
+    assert governor.after_request() is True
+
+
+def test_budget_ignores_pages_shared_with_the_master(monkeypatch):
+    governor = MemoryGovernor(rss_budget_mb=450, sample_every=1, gc_thresholds="")
+    monkeypatch.setattr(memory_governor, "rss_bytes", lambda: 900 * 1024 * 1024)
+    monkeypatch.setattr(memory_governor, "private_bytes", lambda: 50 * 1024 * 1024)
+
+    governor.start_worker()
+
+    assert governor.after_request() is False
+    assert governor.stats()["private_mb"] == 50.0
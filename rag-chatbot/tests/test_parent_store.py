@@ -0,0 +1,151 @@
+"""Tests for parent-document (small-to-big) retrieval"""
+
+import pytest
+from langchain_core.documents import Document
+from src.retriever.rag_retriever import RAGRetriever
+from src.utils.config import Config
+from src.vectorstore.chroma_store import ChromaStore
+from src.vectorstore.parent_store import (
+    ParentStore,
+    expand_to_parents,
+    parent_id,
+    split_with_parents,
+)
+
+GUIDE = """# Burns
+
+Cool the burn under cool running water for twenty minutes.
+Remove rings and tight clothing before the area swells.
+Cover the burn loosely with cling film or a clean dressing.
+
+# Nosebleeds
+
+Sit upright and lean the head forward, not back.
+Pinch the soft part of the nose for ten minutes.
+Seek help if bleeding lasts longer than thirty minutes.
+"""
+
+
+@pytest.fixture
+def parent_store(store_config):
+    return ParentStore()
+
+
+def split_guide():
+    pytest.importorskip("langchain.text_splitter")
+    document = Document(page_content=GUIDE, metadata={"source": "guide.md"})
+    return split_with_parents(
+        [document], chunk_size=70, chunk_overlap=0, parent_chunk_size=250
+    )
+
+
+def guide_sections():
+    """Parent sections and their line-sized children, split by hand"""
+    parents, children = [], []
+    for section in GUIDE.split("\n\n# "):
+        content = section if section.startswith("# ") else f"# {section}"
+        pid = parent_id("guide.md", content)
+        parents.append(
+            Document(
+                page_content=content,
+                metadata={"source": "guide.md", "parent_id": pid},
+            )
+        )
+        for line in content.splitlines()[1:]:
+            if line:
+                metadata = {"source": "guide.md", "parent_id": pid}
+                children.append(Document(page_content=line, metadata=metadata))
+    return parents, children
+
+
+def child(text, parent_id, doc_id):
+    return Document(page_content=text, metadata={"parent_id": parent_id}, id=doc_id)
+
+
+def test_parents_break_at_headings_and_children_point_back():
+    parents, children = split_guide()
+
+    assert [p.page_content.splitlines()[0] for p in parents] == [
+        "# Burns",
+        "# Nosebleeds",
+    ]
+    assert len(children) > len(parents)
+    parent_ids = {p.metadata["parent_id"] for p in parents}
+    assert {c.metadata["parent_id"] for c in children} == parent_ids
+    for c in children:
+        start = c.metadata["start_index"]
+        # Child offsets are relative to the whole document
+        assert GUIDE[start : start + len(c.page_content)] == c.page_content
+
+
+def test_parent_ids_are_content_addressed(parent_store):
+    first, _ = guide_sections()
+    second, _ = guide_sections()
+
+    assert parent_id("guide.md", "text") != parent_id("other.md", "text")
+    parent_store.add_parents(first)
+    parent_store.add_parents(second)
+    assert len(parent_store) == 2
+    pid = first[0].metadata["parent_id"]
+    assert parent_store.get_parents([pid, "missing"]).keys() == {pid}
+    assert parent_store.delete_parents([pid]) == 1
+    assert len(parent_store) == 1
+
+
+def test_expansion_dedupes_parents_and_keeps_child_ids(parent_store):
+    parents, _ = guide_sections()
+    parent_store.add_parents(parents)
+    burns, nosebleeds = (p.metadata["parent_id"] for p in parents)
+    results = [
+        (child("cool water", burns, "c1"), 0.9),
+        (child("pinch the nose", nosebleeds, "c2"), 0.8),
+        (child("cling film", burns, "c3"), 0.7),
+    ]
+
+    expanded = expand_to_parents(results, parent_store, k=2)
+
+    assert [doc.page_content for doc, _ in expanded] == [
+        p.page_content for p in parents
+    ]
+    assert [score for _, score in expanded] == [0.9, 0.8]
+    assert expanded[0][0].metadata["child_ids"] == ["c1", "c3"]
+    assert expanded[1][0].metadata["child_ids"] == ["c2"]
+
+
+def test_expansion_stops_at_k_and_keeps_orphan_chunks(parent_store):
+    parents, _ = guide_sections()
+    parent_store.add_parents(parents[:1])
+    burns, nosebleeds = (p.metadata["parent_id"] for p in parents)
+    orphan = Document(page_content="old chunk", metadata={"source": "old.md"})
+    results = [
+        (orphan, 0.95),
+        (child("pinch the nose", nosebleeds, "c2"), 0.9),
+        (child("cool water", burns, "c1"), 0.8),
+    ]
+
+    expanded = expand_to_parents(results, parent_store, k=2)
+
+    # The nosebleed parent is missing from the docstore, so its chunk stays
+    assert [doc.page_content for doc, _ in expanded] == ["old chunk", "pinch the nose"]
+
+
+def test_retriever_returns_parent_sections(store_config, embeddings, monkeypatch):
+    monkeypatch.setattr(Config, "PARENT_RETRIEVAL", True)
+    monkeypatch.setattr(Config, "SINGLE_FLIGHT_ENABLED", False)
+    monkeypatch.setattr(Config, "RETRIEVAL_MODE", "fixed")
+    monkeypatch.setattr(Config, "SIMILARITY_THRESHOLD", -10.0)
+    parents, children = guide_sections()
+    store = ChromaStore(embeddings=embeddings, collection_name="parents")
+    store.add_documents(children, parents=parents)
+    retriever = RAGRetriever(vector_store=store, llm_client=None)
+
+    results = retriever.retrieve_documents("pinch the soft part of the nose", k=1)
+
+    assert len(results) == 1
+    section, _ = results[0]
+    assert section.page_content.startswith("# Nosebleeds")
+    stored = store.vector_store._collection.get(ids=section.metadata["child_ids"])
+    assert stored["ids"] and all(
+        meta["parent_id"] == section.metadata["parent_id"]
+        for meta in stored["metadatas"]
+    )
@@ -0,0 +1,28 @@
+"""Tests for the admin token check guarding the profiler"""
+
+import pytest
+from flask import Flask
+from src.utils.config import Config
+from src.utils.profiling import is_admin
+
+app = Flask(__name__)
+
+
+@pytest.mark.parametrize(
+    "admin_token, header, expected",
+    [
+        ("secret", "secret", True),
+        ("secret", "wrong", False),
+        ("secret", None, False),
+        ("secret", "sécret", False),
+        ("sécret", "sécret", True),
+        (None, "secret", False),
+        ("", "", False),
+    ],
+)
+def test_is_admin(monkeypatch, admin_token, header, expected):
+    monkeypatch.setattr(Config, "ADMIN_TOKEN", admin_token)
+    headers = {"X-Admin-Token": header} if header is not None else {}
+
+    with app.test_request_context(headers=headers):
+        assert is_admin() is expected
@@ -0,0 +1,63 @@
+"""Tests for the prompt registry"""
+
+import pytest
+from src.llm.prompts import PROMPTS, PromptRegistry, count_tokens
+
+
+def test_registered_prompts_are_looked_up_by_name():
+    prompt = PROMPTS.get("rag_answer")
+
+    assert prompt.name == "rag_answer"
+    assert prompt.fields == {"context", "question"}
+    assert PROMPTS.get("rag_answer_conversational").fields == {
+        "history",
+        "context",
+        "question",
+    }
+    with pytest.raises(KeyError):
+        PROMPTS.get("no_such_prompt")
+
+
+def test_system_message_is_identical_across_requests():
+    prompt = PROMPTS.get("rag_answer")
+
+    first = prompt.render(context="Apply pressure.", question="How to stop bleeding?")
+    second = prompt.render(context="Cool the burn.", question="How to treat a burn?")
+
+    assert [m["role"] for m in first] == ["system", "user"]
+    assert first[0] == second[0]
+    assert first[0]["content"] is prompt.system
+    assert "How to stop bleeding?" in first[1]["content"]
+    assert "Cool the burn." in second[1]["content"]
+
+
+def test_missing_variables_are_reported():
+    prompt = PROMPTS.get("rag_answer_conversational")
+
+    with pytest.raises(KeyError, match="history"):
+        prompt.render(context="...", question="and for a child?")
+
+
+def test_token_counts_split_static_and_dynamic():
+    prompt = PROMPTS.get("condense_question")
+    messages = prompt.render(history="user: my son burned his hand", question="why?")
+
+    counts = prompt.token_counts(messages)
+
+    assert counts["static_prompt_tokens"] == count_tokens(prompt.system)
+    assert counts["dynamic_prompt_tokens"] == count_tokens(messages[1]["content"])
+    assert counts["prompt_tokens"] == (
+        counts["static_prompt_tokens"] + counts["dynamic_prompt_tokens"]
+    )
+
+
+def test_reregistering_replaces_and_bumps_version():
+    registry = PromptRegistry()
+    original = registry.register("answer", "Be brief.", "Q: {question}")
+    same = PromptRegistry().register("answer", "Be brief.", "Q: {question}")
+
+    updated = registry.register("answer", "Be very brief.", "Q: {question}")
+
+    assert same.version == original.version
+    assert updated.version != original.version
+    assert registry.get("answer") is updated
@@ -0,0 +1,83 @@
+"""Tests for follow-up detection and rule-based query rewriting"""
+
+import pytest
+from src.conversation.conversation_store import Conversation
+from src.retriever.query_rewriter import QueryRewriter, looks_like_follow_up
+
+
+@pytest.mark.parametrize(
+    "query",
+    [
+        "Is it contagious?",
+        "How long does it last?",
+        "What about children?",
+        "And for adults?",
+        "Can they spread to others?",
+        "How do I treat that?",
+        "Is that dangerous for kids?",
+        "How long does this last?",
+        "Which one is better?",
+        "Should I see a doctor about it?",
+    ],
+)
+def test_follow_ups(query):
+    assert looks_like_follow_up(query)
+
+
+@pytest.mark.parametrize(
+    "query",
+    [
+        "What is this rash?",
+        "Which one is worse, a burn or a scald?",
+        "Is it normal to have a fever after a vaccine?",
+        "Is it safe to take ibuprofen daily?",
+        "How do I know if this cut needs stitches?",
+        "What are the symptoms of the flu?",
+        "If I have a fever should I stay home from work?",
+        "What should I do when someone has a nosebleed?",
+    ],
+)
+def test_standalone_questions(query):
+    assert not looks_like_follow_up(query)
+
+
+def conversation_about(question):
+    return Conversation("s", turns=[{"question": question, "answer": "..."}])
+
+
+def test_rule_rewrite_prefixes_the_previous_search():
+    rewriter = QueryRewriter(mode="rule")
+    conversation = conversation_about("What are flu symptoms?")
+
+    assert (
+        rewriter.rewrite("How long does it last?", conversation)
+        == "What are flu symptoms? How long does it last?"
+    )
+    conversation.retrievals = [{"query": "flu symptoms fever", "embedding": []}]
+    assert (
+        rewriter.rewrite("Is it contagious?", conversation)
+        == "flu symptoms fever Is it contagious?"
+    )
+
+
+def test_standalone_and_first_questions_are_not_rewritten():
+    rewriter = QueryRewriter(mode="rule")
+    conversation = conversation_about("What are flu symptoms?")
+
+    assert rewriter.rewrite("What is this rash?", conversation) == "What is this rash?"
+    assert rewriter.rewrite("Is it contagious?", Conversation("s")) == (
+        "Is it contagious?"
+    )
+    assert QueryRewriter(mode="off").rewrite("Is it contagious?", conversation) == (
+        "Is it contagious?"
+    )
+
+
+def test_recent_retrievals_are_reused_for_close_queries():
+    conversation = Conversation("s")
+    for i, embedding in enumerate([[1.0, 0.0], [0.0, 1.0], [0.7, 0.7]]):
+        conversation.remember_retrieval(f"q{i}", embedding, [{"id": i}], limit=2)
+
+    assert [entry["query"] for entry in conversation.retrievals] == ["q1", "q2"]
+    assert conversation.find_retrieval([0.1, 1.0], 0.95) == [{"id": 1}]
+    assert conversation.find_retrieval([1.0, 0.0], 0.95) is None
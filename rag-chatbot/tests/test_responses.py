@@ -0,0 +1,53 @@
+"""Tests for response field masks"""
+
+import pytest
+from flask import Flask
+from src.utils.responses import apply_field_mask, requested_field_mask
+
+app = Flask(__name__)
+
+
+@pytest.mark.parametrize(
+    "data, query_string, expected",
+    [
+        ({"fields": ["answer", " session_id "]}, "", (["answer", "session_id"], None)),
+        (
+            {"exclude": "sources,context_preview"},
+            "",
+            (None, ["sources", "context_preview"]),
+        ),
+        ({}, "fields=answer&exclude=sources", (["answer"], ["sources"])),
+        ({"fields": []}, "", (None, None)),
+    ],
+)
+def test_requested_field_mask(data, query_string, expected):
+    with app.test_request_context(query_string=query_string):
+        assert requested_field_mask(data) == expected
+
+
+@pytest.mark.parametrize("value", [5, {"answer": True}, ["answer", 3], [["answer"]]])
+def test_invalid_field_mask_is_rejected(value):
+    with app.test_request_context():
+        with pytest.raises(ValueError):
+            requested_field_mask({"fields": value})
+
+
+def test_query_with_invalid_fields_returns_400(monkeypatch):
+    import src.app_factory as app_factory
+
+    monkeypatch.setattr(app_factory, "get_admission", lambda: None)
+    client = app_factory.create_app("minimal").test_client()
+
+    response = client.post("/query", json={"query": "hello", "fields": 5})
+
+    assert response.status_code == 400
+    assert "fields" in response.get_json()["error"]
+
+
+def test_apply_field_mask():
+    payload = {"answer": "a", "sources": [], "session_id": "s"}
+    assert apply_field_mask(payload, ["answer", "missing"], None) == {"answer": "a"}
+    assert apply_field_mask(payload, None, ["sources"]) == {
+        "answer": "a",
+        "session_id": "s",
+    }
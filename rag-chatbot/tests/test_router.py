@@ -0,0 +1,112 @@
+"""Tests for LLM routing: failover, circuit breaking and hedged requests"""
+
+import time
+import pytest
+from src.llm.backends import StubBackend
+from src.llm.router import LLMRouter
+from src.utils.config import Config
+
+MESSAGES = [{"role": "user", "content": "how do I treat a burn"}]
+
+
+@pytest.fixture(autouse=True)
+def router_config(monkeypatch):
+    monkeypatch.setattr(Config, "LLM_FAILURES_TO_OPEN", 2)
+    monkeypatch.setattr(Config, "LLM_OPEN_SECONDS", 60.0)
+    monkeypatch.setattr(Config, "LLM_HEDGE_DELAY", 0.05)
+    monkeypatch.setattr(Config, "LLM_HEDGE_MIN_SAMPLES", 1000)
+
+
+def in_order(router, *backends):
+    """Pin the routing order, which is otherwise weighted-random"""
+    router._ranked = lambda: list(backends)
+
+
+def test_failover_to_next_backend():
+    broken = StubBackend(name="broken", error=RuntimeError("down"))
+    healthy = StubBackend("fallback answer", name="healthy")
+    router = LLMRouter([broken, healthy], hedging=False)
+    in_order(router, broken, healthy)
+
+    answer, usage = router.complete(MESSAGES)
+
+    assert answer == "fallback answer"
+    assert usage["backend"] == "healthy"
+    assert router.stats()["backends"]["broken"]["failures"] == 1
+
+
+def test_all_backends_failing_raises_last_error():
+    router = LLMRouter(
+        [
+            StubBackend(name="a", error=RuntimeError("a down")),
+            StubBackend(name="b", error=RuntimeError("b down")),
+        ],
+        hedging=False,
+    )
+
+    with pytest.raises(RuntimeError):
+        router.complete(MESSAGES)
+
+
+def test_open_circuit_moves_backend_last():
+    broken = StubBackend(name="broken", error=RuntimeError("down"))
+    healthy = StubBackend(name="healthy")
+    router = LLMRouter([broken, healthy], hedging=False)
+
+    for _ in range(Config.LLM_FAILURES_TO_OPEN):
+        router.health["broken"].record_failure()
+
+    assert router.stats()["backends"]["broken"]["open"]
+    assert [b.name for b in router._ranked()] == ["healthy", "broken"]
+    assert router.complete(MESSAGES)[1]["backend"] == "healthy"
+
+
+def test_fast_primary_is_not_hedged():
+    primary = StubBackend("primary answer", name="primary")
+    secondary = StubBackend(name="secondary")
+    router = LLMRouter([primary, secondary], hedging=True)
+    in_order(router, primary, secondary)
+
+    answer, usage = router.complete(MESSAGES)
+
+    assert answer == "primary answer"
+    assert router.hedges_fired == 0
+
+
+def test_slow_primary_is_hedged_and_cancelled():
+    slow = StubBackend("slow answer", name="slow", first_token_delay=5.0)
+    fast = StubBackend("fast answer", name="fast")
+    router = LLMRouter([slow, fast], hedging=True)
+    in_order(router, slow, fast)
+
+    started = time.monotonic()
+    answer, usage = router.complete(MESSAGES)
+
+    assert time.monotonic() - started < 1.0
+    assert answer == "fast answer"
+    assert usage["backend"] == "fast"
+    assert usage["completion_tokens"] > 0
+    assert (router.hedges_fired, router.hedges_won) == (1, 1)
+    assert router.hedges_cancelled == 1
+
+    # The losing call stops early and does not count as a failure
+    deadline = time.monotonic() + 1.0
+    while not slow.cancelled_calls and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert slow.cancelled_calls == 1
+    assert router.stats()["backends"]["slow"]["failures"] == 0
+
+
+def test_hedged_failures_fall_back_to_remaining_backends():
+    slow_broken = StubBackend(
+        name="slow_broken", first_token_delay=0.1, error=RuntimeError("down")
+    )
+    broken = StubBackend(name="broken", error=RuntimeError("down"))
+    last = StubBackend("last resort", name="last")
+    router = LLMRouter([slow_broken, broken, last], hedging=True)
+    in_order(router, slow_broken, broken, last)
+
+    answer, usage = router.complete(MESSAGES)
+
+    assert answer == "last resort"
+    assert usage["backend"] == "last"
@@ -0,0 +1,186 @@
+"""Tests for the LLM scheduler: priority order, retries and load shedding"""
+
+import threading
+import time
+import pytest
+from types import SimpleNamespace
+from src.llm.scheduler import (
+    LLMOverloadedError,
+    LLMScheduler,
+    PRIORITY_EMERGENCY,
+    PRIORITY_NORMAL,
+    parse_duration,
+)
+
+
+class ProviderError(Exception):
+    def __init__(self, status_code: int):
+        super().__init__(f"HTTP {status_code}")
+        self.status_code = status_code
+
+
+def make_scheduler(**overrides):
+    settings = dict(
+        max_concurrency=1,
+        max_queue=10,
+        max_wait=5.0,
+        max_retries=2,
+        backoff_base=0.001,
+        backoff_max=0.001,
+    )
+    settings.update(overrides)
+    return LLMScheduler(**settings)
+
+
+def wait_until(condition, timeout: float = 2.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "condition not reached"
+        time.sleep(0.005)
+
+
+def hold_slot(scheduler):
+    """Occupy the only concurrency slot until the returned event is set"""
+    release = threading.Event()
+    holder = threading.Thread(target=scheduler.submit, args=(release.wait,))
+    holder.start()
+    wait_until(lambda: scheduler.stats()["active"] == 1)
+    return release, holder
+
+
+def test_emergency_calls_run_before_queued_normal_calls():
+    scheduler = make_scheduler()
+    release, holder = hold_slot(scheduler)
+    order = []
+
+    def submit(name, priority):
+        scheduler.submit(lambda: order.append(name), priority=priority)
+
+    waiters = []
+    for name, priority in [
+        ("normal", PRIORITY_NORMAL),
+        ("emergency", PRIORITY_EMERGENCY),
+    ]:
+        waiter = threading.Thread(target=submit, args=(name, priority))
+        waiter.start()
+        waiters.append(waiter)
+        wait_until(lambda: scheduler.stats()["queued"] == len(waiters))
+
+    release.set()
+    for thread in [holder] + waiters:
+        thread.join()
+
+    assert order == ["emergency", "normal"]
+
+
+def test_full_queue_sheds_immediately():
+    scheduler = make_scheduler(max_queue=1)
+    release, holder = hold_slot(scheduler)
+    waiter = threading.Thread(target=scheduler.submit, args=(lambda: None,))
+    waiter.start()
+    wait_until(lambda: scheduler.stats()["queued"] == 1)
+
+    with pytest.raises(LLMOverloadedError) as excinfo:
+        scheduler.submit(lambda: None)
+
+    release.set()
+    holder.join()
+    waiter.join()
+    assert excinfo.value.retry_after >= 1
+    assert scheduler.stats()["shed"] == 1
+
+
+def test_retryable_errors_are_retried_then_shed():
+    scheduler = make_scheduler()
+    calls = []
+
+    def failing():
+        calls.append(1)
+        raise ProviderError(503)
+
+    with pytest.raises(LLMOverloadedError):
+        scheduler.submit(failing)
+
+    assert len(calls) == 3
+    assert scheduler.stats()["retries"] == 2
+    assert scheduler.stats()["active"] == 0
+
+
+def test_retry_succeeds_after_rate_limit():
+    scheduler = make_scheduler()
+    responses = iter([ProviderError(429), "answer"])
+
+    def flaky():
+        result = next(responses)
+        if isinstance(result, Exception):
+            raise result
+        return result
+
+    assert scheduler.submit(flaky) == "answer"
+    assert scheduler.stats()["rate_limited"] == 1
+
+
+def test_non_retryable_errors_propagate():
+    scheduler = make_scheduler()
+
+    with pytest.raises(ProviderError):
+        scheduler.submit(lambda: (_ for _ in ()).throw(ProviderError(400)))
+
+    assert scheduler.stats()["failed"] == 1
+    assert scheduler.stats()["retries"] == 0
+
+
+def test_exhausted_quota_sheds_when_reset_is_past_the_deadline():
+    scheduler = make_scheduler(max_wait=1.0)
+    scheduler.observe_headers(
+        {"X-RateLimit-Remaining-Requests": "0", "X-RateLimit-Reset-Requests": "1m"}
+    )
+    calls = []
+
+    with pytest.raises(LLMOverloadedError) as excinfo:
+        scheduler.submit(lambda: calls.append(1))
+
+    assert not calls
+    assert excinfo.value.retry_after >= 59
+
+
+def test_tokens_quota_waits_for_short_reset():
+    scheduler = make_scheduler()
+    scheduler.observe_headers(
+        {"x-ratelimit-remaining-tokens": "10", "x-ratelimit-reset-tokens": "50ms"}
+    )
+
+    started = time.monotonic()
+    assert scheduler.submit(lambda: "ok", estimated_tokens=100) == "ok"
+    assert time.monotonic() - started >= 0.04
+
+
+@pytest.mark.parametrize(
+    "value, seconds",
+    [("7.66s", 7.66), ("2m59.56s", 179.56), ("250ms", 0.25), ("3", 3.0), (None, None)],
+)
+def test_parse_duration(value, seconds):
+    assert parse_duration(value) == pytest.approx(seconds)
+
+
+def test_query_returns_503_with_retry_after_when_shed(monkeypatch):
+    import src.app_factory as app_factory
+
+    scheduler = make_scheduler(max_retries=0)
+    monkeypatch.setattr(app_factory, "get_scheduler", lambda: scheduler)
+    monkeypatch.setattr(app_factory, "get_admission", lambda: None)
+
+    def create(**kwargs):
+        raise ProviderError(503)
+
+    app = app_factory.create_app("minimal")
+    app.extensions["rag"]._built["groq_client"] = SimpleNamespace(
+        chat=SimpleNamespace(completions=SimpleNamespace(create=create))
+    )
+
+    response = app.test_client().post(
+        "/query", json={"query": "how do I treat a sore throat", "skip_fast_path": True}
+    )
+
+    assert response.status_code == 503
+    assert int(response.headers["Retry-After"]) >= 1
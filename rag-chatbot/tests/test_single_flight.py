@@ -0,0 +1,139 @@
+"""Tests for single-flight coalescing of identical requests"""
+
+import threading
+import time
+import pytest
+from src.utils.single_flight import SingleFlight, flight_key, normalize_query
+
+
+@pytest.fixture
+def flight_path(tmp_path):
+    return str(tmp_path / "single_flight.sqlite3")
+
+
+def test_keys_ignore_case_spacing_and_trailing_punctuation():
+    assert normalize_query("  How do I treat a BURN?? ") == "how do i treat a burn"
+    assert flight_key(query="a", k=3) == flight_key(k=3, query="a")
+    assert flight_key(query="a", k=3) != flight_key(query="a", k=4)
+
+
+def test_concurrent_callers_share_one_execution():
+    group = SingleFlight(path="", wait_timeout=5)
+    release = threading.Event()
+    calls = []
+
+    def work():
+        calls.append(1)
+        release.wait(5)
+        return {"answer": "cool the burn"}
+
+    results = []
+
+    def caller():
+        results.append(group.do("burn", work))
+
+    threads = [threading.Thread(target=caller) for _ in range(5)]
+    for thread in threads:
+        thread.start()
+    while group.stats()["in_flight"] == 0:
+        time.sleep(0.01)
+    # Give the other callers time to find the leader's call
+    time.sleep(0.2)
+    release.set()
+    for thread in threads:
+        thread.join()
+
+    assert len(calls) == 1
+    assert all(result == {"answer": "cool the burn"} for result, _ in results)
+    assert sorted(shared for _, shared in results) == [False] + [True] * 4
+    assert group.stats() == {
+        "in_flight": 0,
+        "executed": 1,
+        "shared_local": 4,
+        "shared_remote": 0,
+    }
+
+
+def test_waiters_see_the_leaders_error():
+    group = SingleFlight(path="", wait_timeout=5)
+    started = threading.Event()
+    release = threading.Event()
+
+    def failing():
+        started.set()
+        release.wait(5)
+        raise RuntimeError("backend down")
+
+    errors = []
+
+    def caller():
+        try:
+            group.do("burn", failing)
+        except RuntimeError as e:
+            errors.append(e)
+
+    leader = threading.Thread(target=caller)
+    leader.start()
+    started.wait(5)
+    waiter = threading.Thread(target=caller)
+    waiter.start()
+    time.sleep(0.05)
+    release.set()
+    leader.join()
+    waiter.join()
+
+    assert len(errors) == 2
+    assert group.stats()["executed"] == 1
+
+
+def test_workers_share_a_recent_result(flight_path):
+    first = SingleFlight(path=flight_path, wait_timeout=5, result_ttl=30)
+    second = SingleFlight(path=flight_path, wait_timeout=5, result_ttl=30)
+
+    assert first.do("burn", lambda: {"answer": "cool it"}) == (
+        {"answer": "cool it"},
+        False,
+    )
+    assert second.do("burn", lambda: {"answer": "recomputed"}) == (
+        {"answer": "cool it"},
+        True,
+    )
+    assert second.stats()["shared_remote"] == 1
+
+
+def test_expired_results_are_recomputed(flight_path):
+    first = SingleFlight(path=flight_path, wait_timeout=5, result_ttl=0)
+    second = SingleFlight(path=flight_path, wait_timeout=5, result_ttl=0)
+
+    first.do("burn", lambda: {"answer": "cool it"})
+    time.sleep(0.01)
+
+    assert second.do("burn", lambda: {"answer": "fresh"}) == (
+        {"answer": "fresh"},
+        False,
+    )
+
+
+def test_claim_of_a_dead_worker_is_taken_over(flight_path):
+    group = SingleFlight(path=flight_path, wait_timeout=5, poll_interval=0.01)
+    dead_pid = 2**22 + 12345
+    with group._connection() as connection:
+        connection.execute(
+            "INSERT INTO flights (key, owner_pid, started_at) VALUES (?, ?, ?)",
+            ("burn", dead_pid, time.time()),
+        )
+
+    started = time.monotonic()
+    result, shared = group.do("burn", lambda: {"answer": "cool it"})
+
+    assert (result, shared) == ({"answer": "cool it"}, False)
+    assert time.monotonic() - started < 1
+
+
+def test_unserializable_results_are_not_shared(flight_path):
+    first = SingleFlight(path=flight_path, wait_timeout=5, result_ttl=30)
+    second = SingleFlight(path=flight_path, wait_timeout=5, result_ttl=30)
+    marker = object()
+
+    assert first.do("burn", lambda: {"raw": marker}) == ({"raw": marker}, False)
+    assert second.do("burn", lambda: {"answer": "own"}) == ({"answer": "own"}, False)
@@ -0,0 +1,94 @@
+"""Tests for restoring a collection snapshot at boot"""
+
+import threading
+import chromadb
+from chromadb.config import Settings
+from conftest import make_documents
+from src.utils.config import Config
+from src.vectorstore.chroma_store import ChromaStore
+
+TEXTS = [
+    "apply pressure to stop bleeding from a wound",
+    "cool a burn under running water for twenty minutes",
+    "call emergency services for chest pain",
+]
+
+
+def export_cosine_snapshot(embeddings, tmp_path, monkeypatch):
+    source = ChromaStore(embeddings=embeddings, collection_name="snapshot_source")
+    source.client.delete_collection(name="snapshot_source")
+    source._create_vector_store(collection_metadata={"hnsw:space": "cosine"})
+    source.add_documents(make_documents(TEXTS))
+
+    path = str(tmp_path / "collection.snap")
+    source.export_snapshot(path)
+    monkeypatch.setattr(Config, "CHROMA_DB_PATH", str(tmp_path / "restored_db"))
+    monkeypatch.setattr(Config, "VECTOR_SNAPSHOT_PATH", path)
+
+
+def test_restore_applies_collection_metadata(
+    store_config, embeddings, tmp_path, monkeypatch
+):
+    export_cosine_snapshot(embeddings, tmp_path, monkeypatch)
+
+    store = ChromaStore(embeddings=embeddings, collection_name="restored")
+
+    assert store.vector_store._collection.count() == len(TEXTS)
+    assert store.vector_store._collection.metadata == {"hnsw:space": "cosine"}
+    doc, score = store.similarity_search_with_score(TEXTS[0], k=1)[0]
+    assert doc.page_content == TEXTS[0]
+    assert score > 0.99
+
+
+def test_concurrent_workers_restore_once(
+    store_config, embeddings, tmp_path, monkeypatch
+):
+    export_cosine_snapshot(embeddings, tmp_path, monkeypatch)
+    restores = []
+    restore = ChromaStore.restore_snapshot
+
+    def counting_restore(self, *args, **kwargs):
+        restores.append(self)
+        return restore(self, *args, **kwargs)
+
+    monkeypatch.setattr(ChromaStore, "restore_snapshot", counting_restore)
+    # Chroma's per-path client cache is not thread-safe on first use
+    chromadb.PersistentClient(
+        path=Config.CHROMA_DB_PATH,
+        settings=Settings(anonymized_telemetry=False, allow_reset=True),
+    )
+    stores = []
+
+    def start_worker():
+        stores.append(ChromaStore(embeddings=embeddings, collection_name="restored"))
+
+    threads = [threading.Thread(target=start_worker) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(restores) == 1
+    assert [store.vector_store._collection.count() for store in stores] == [3] * 4
+
+
+def test_restore_reuses_the_saved_compressed_index(
+    store_config, embeddings, tmp_path, monkeypatch
+):
+    monkeypatch.setattr(Config, "VECTOR_COMPRESSION", "pq")
+    monkeypatch.setattr(Config, "PQ_SUBVECTORS", 8)
+    export_cosine_snapshot(embeddings, tmp_path, monkeypatch)
+    monkeypatch.setattr(
+        Config, "COMPRESSED_INDEX_PATH", str(tmp_path / "restored_index.npz")
+    )
+    builds = []
+    monkeypatch.setattr(
+        ChromaStore, "build_compressed_index", lambda *args, **kw: builds.append(1)
+    )
+
+    store = ChromaStore(embeddings=embeddings, collection_name="restored")
+
+    assert len(store.get_compressed_index()) == len(TEXTS)
+    assert builds == []
+    doc, _ = store.similarity_search_with_score(TEXTS[1], k=1)[0]
+    assert doc.page_content == TEXTS[1]
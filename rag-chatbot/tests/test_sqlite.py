@@ -0,0 +1,20 @@
+"""Tests for the per-thread SQLite connection helper"""
+
+import threading
+from src.utils.sqlite import thread_connection
+
+
+def test_one_connection_per_thread_and_path(tmp_path):
+    first = str(tmp_path / "first.db")
+    second = str(tmp_path / "second.db")
+
+    connection = thread_connection(first)
+    assert thread_connection(first) is connection
+    assert thread_connection(second) is not connection
+    assert connection.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+
+    other = []
+    thread = threading.Thread(target=lambda: other.append(thread_connection(first)))
+    thread.start()
+    thread.join()
+    assert other[0] is not connection
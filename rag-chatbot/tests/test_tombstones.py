@@ -0,0 +1,73 @@
+"""Tests for tombstoned deletes and compaction"""
+
+import src.vectorstore.chroma_store as chroma_store
+from conftest import make_documents
+from src.vectorstore.tombstones import TombstoneLog
+
+
+def test_logs_sharing_a_connection_see_each_others_writes(tmp_path):
+    path = str(tmp_path / "tombstones.db")
+    reader = TombstoneLog("docs", path)
+    writer = TombstoneLog("docs", path)
+    assert reader.ids() == set()
+
+    writer.add(["a", "b"], [{"source": "x.md"}, {"source": "x.md"}])
+    assert reader.ids() == {"a", "b"}
+
+    writer.remove(["a"])
+    assert reader.ids() == {"b"}
+    assert len(reader) == 1
+
+
+TEXTS = [
+    "flu symptoms include fever cough and aches",
+    "flu treatment is rest fluids and fever reducers",
+    "a migraine is a severe throbbing headache",
+    "tension headaches feel like a tight band",
+    "sprained ankles need rest ice and compression",
+    "minor burns should be cooled under running water",
+]
+
+
+def test_deleted_chunks_are_hidden_until_compacted(store, monkeypatch):
+    # Hash embeddings of unrelated texts can score below zero
+    monkeypatch.setattr(chroma_store.Config, "SIMILARITY_THRESHOLD", -10.0)
+    store.add_documents(make_documents(TEXTS[:2], source="flu.md"))
+    store.add_documents(make_documents(TEXTS[2:], source="other.md"))
+
+    assert store.delete_documents(source="flu.md") == {"flu.md": 2}
+    results = store.similarity_search_with_score("flu fever", k=3)
+    assert len(results) == 3
+    assert all(doc.metadata["source"] == "other.md" for doc, _ in results)
+    assert store.get_collection_count() == 6
+
+    assert store.compact() == 2
+    assert store.get_collection_count() == 4
+    assert len(store.tombstones) == 0
+    assert store.delete_documents(source="flu.md") == {}
+
+
+def test_tombstone_overfetch_is_capped(store, monkeypatch):
+    ids = store.add_documents(make_documents(TEXTS))
+    store.tombstones.add(ids[1:5], [{"source": "doc.md"}] * 4)
+
+    fetched = []
+    nearest = store._nearest
+
+    def recording_nearest(query, k, embedding=None):
+        fetched.append(k)
+        return nearest(query, k, embedding)
+
+    monkeypatch.setattr(store, "_nearest", recording_nearest)
+    monkeypatch.setattr(chroma_store, "_TOMBSTONE_OVERFETCH", 1)
+
+    results = store._scored_candidates(TEXTS[0], 1)
+    assert [doc.id for doc, _ in results] == [ids[0]]
+    assert fetched == [2]
+
+    # Too few live candidates: the query widens up to k + pending deletes
+    fetched.clear()
+    results = store._scored_candidates(TEXTS[1], 2)
+    assert {doc.id for doc, _ in results} == {ids[0], ids[5]}
+    assert fetched[0] == 4
+    assert fetched[-1] <= 6